@@ -2,8 +2,27 @@
 """
 Генератор датасета для BabylonFish ML модели
 Создает разнообразные примеры для классификации: en, ru, ru_wrong
+
+Датасет - фиксированные слова и фразы плюс --combos случайных комбинаций
+двух русских слов (ru_wrong), всего не больше --count строк. Многопроцессный
+режим генерирует то же самое, только комбинации делятся между N шардами,
+у каждого свой random.Random (см. ML/sharding.py):
+
+    python3 ML/Data/generate_dataset.py --count 5000000 --combos 5000000 --shards 8 --seed 42 --output big.csv
 """
 
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dataset_io  # noqa: E402
+import layout_transcoder  # noqa: E402
+import sharding  # noqa: E402
+
 # Английские слова и фразы
 english_words = [
     # Общие слова
@@ -103,26 +122,24 @@ russian_words = [
     "раскладка клавиатуры", "метод ввода", "ввод текста", "проверка орфографии", "автоисправление"
 ]
 
-# Раскладки для конвертации
-en_layout = "qwertyuiop[]asdfghjkl;'zxcvbnm,./QWERTYUIOP{}ASDFGHJKL:\"ZXCVBNM<>?"
-ru_layout = "йцукенгшщзхъфывапролджэячсмитьбю.ЙЦУКЕНГШЩЗХЪФЫВАПРОЛДЖЭЯЧСМИТЬБЮ,"
+# Раскладки для конвертации (общая таблица для всех ML скриптов, см. ML/layout_transcoder.py)
+en_layout = layout_transcoder.EN_LAYOUT
+ru_layout = layout_transcoder.RU_LAYOUT
+
+# Комбинаций из двух слов в конце датасета по умолчанию
+DEFAULT_COMBO_COUNT = 50
 
 def convert_to_wrong_layout(russian_text):
     """Конвертирует русский текст в 'неправильную' раскладку"""
-    result = ""
-    for char in russian_text:
-        if char in ru_layout:
-            ru_index = ru_layout.index(char)
-            if ru_index < len(en_layout):
-                result += en_layout[ru_index]
-            else:
-                result += char
-        else:
-            result += char  # Сохраняем пробелы и знаки препинания
-    return result
-
-def generate_dataset(target_count=1200):
-    """Генерирует датасет"""
+    # Сохраняем пробелы и знаки препинания
+    return layout_transcoder.ru_to_en(russian_text)
+
+def generate_dataset(target_count=1200, rng=None, combo_count=DEFAULT_COMBO_COUNT):
+    """
+    Генерирует датасет
+    rng - random.Random для комбинаций слов (по умолчанию Random(42))
+    combo_count - сколько комбинаций из двух слов добавить в конце
+    """
     dataset = []
 
     # Добавляем оригинальные данные из sample_dataset.csv
@@ -221,35 +238,56 @@ def generate_dataset(target_count=1200):
     # Дополнительные ru_wrong примеры из комбинаций слов
     if len(dataset) < target_count:
         # Генерируем случайные комбинации из русских слов
-        import random
-        random.seed(42)
-        short_russian_words = [w for w in russian_words if len(w) >= 3 and len(w) <= 8][:100]
-
-        for i in range(50):  # Добавляем 50 комбинаций
-            if len(short_russian_words) >= 2:
-                word1 = random.choice(short_russian_words)
-                word2 = random.choice(short_russian_words)
-                phrase = f"{word1} {word2}"
-                wrong_layout = convert_to_wrong_layout(phrase)
-                if wrong_layout != phrase:
-                    dataset.append((wrong_layout.lower(), "ru_wrong"))
+        if rng is None:
+            rng = random.Random(42)
+        for row in generate_combinations(combo_count, rng):
+            dataset.append(row)
             if len(dataset) >= target_count:
                 break
 
     return dataset
 
-def save_dataset(dataset, output_path):
-    """Сохраняет датасет в CSV файл"""
-    with open(output_path, 'w', encoding='utf-8') as f:
+def generate_combinations(count, rng):
+    """Генерирует до count ru_wrong примеров из случайных пар русских слов"""
+    short_russian_words = [w for w in russian_words if len(w) >= 3 and len(w) <= 8][:100]
+    combinations = []
+    if len(short_russian_words) < 2:
+        return combinations
+
+    for i in range(count):
+        word1 = rng.choice(short_russian_words)
+        word2 = rng.choice(short_russian_words)
+        phrase = f"{word1} {word2}"
+        wrong_layout = convert_to_wrong_layout(phrase)
+        if wrong_layout != phrase:
+            combinations.append((wrong_layout.lower(), "ru_wrong"))
+    return combinations
+
+def format_row(text, label):
+    """Одна строка CSV (кавычки и запятые экранируются по правилам CSV)"""
+    line = io.StringIO()
+    csv.writer(line, lineterminator="\n").writerow((text, label))
+    return line.getvalue()
+
+def write_rows(dataset, output_path):
+    """Пишет строки датасета с заголовком, без вывода статистики (.bfds - бинарный формат)"""
+    if output_path.endswith(dataset_io.BINARY_EXTENSION):
+        dataset_io.write_binary(dataset, output_path)
+        return
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
         f.write("text,label\n")
         for text, label in dataset:
-            # Экранируем запятые в тексте
-            escaped_text = f'"{text}"' if ',' in text else text
-            f.write(f"{escaped_text},{label}\n")
+            f.write(format_row(text, label))
+
+def save_dataset(dataset, output_path):
+    """Сохраняет датасет в CSV файл"""
+    write_rows(dataset, output_path)
 
     print(f"✅ Датасет сохранен в: {output_path}")
     print(f"📊 Всего примеров: {len(dataset)}")
+    print_stats(dataset)
 
+def print_stats(dataset):
     # Статистика по категориям
     en_count = sum(1 for _, label in dataset if label == "en")
     ru_count = sum(1 for _, label in dataset if label == "ru")
@@ -260,6 +298,70 @@ def save_dataset(dataset, output_path):
     print(f"   - ru (русский): {ru_count}")
     print(f"   - ru_wrong (ошибочная раскладка): {ru_wrong_count}")
 
+def _generate_shard(task):
+    """Worker пула: пишет prefix + count комбинаций со своим seed в part-файл"""
+    prefix, count, seed, path = task
+    rows = generate_combinations(count, random.Random(seed))
+    write_rows(prefix + rows, path)
+    return len(prefix) + len(rows)
+
+def generate_sharded(target_count, output_path, seed, shards, processes=None, keep_parts=False,
+                     combo_count=DEFAULT_COMBO_COUNT):
+    """
+    Шардированная генерация того же датасета, что generate_dataset(target_count,
+    combo_count=combo_count): фиксированная часть идет в начало первого шарда,
+    комбинации (не больше, чем осталось до target_count) делятся между шардами.
+    Вывод детерминирован для пары (seed, shards).
+    """
+    base = generate_dataset(target_count, combo_count=0)
+    remaining = min(combo_count, max(0, target_count - len(base)))
+    counts = sharding.split_count(remaining, shards)
+    part_paths = [sharding.part_path(output_path, i) for i in range(shards)]
+    tasks = [
+        (base if i == 0 else [], count, sharding.shard_seed(seed, i), path)
+        for i, (count, path) in enumerate(zip(counts, part_paths))
+    ]
+    part_rows = sharding.run_shards(_generate_shard, tasks, processes)
+
+    if keep_parts:
+        sharding.write_manifest(output_path, part_paths, part_rows, seed,
+                                extra={"generator": "generate_dataset"})
+    elif output_path.endswith(dataset_io.BINARY_EXTENSION):
+        dataset_io.concat_binary(part_paths, output_path)
+    else:
+        sharding.concat_parts(part_paths, output_path)
+    return sum(part_rows)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Генератор датасета BabylonFish ML")
+    parser.add_argument("--count", type=int, default=1200,
+                        help="целевое количество строк (по умолчанию %(default)s)")
+    parser.add_argument("--output", default="sample_dataset.csv",
+                        help="путь к выходному файлу, .bfds - бинарный формат (по умолчанию %(default)s)")
+    parser.add_argument("--combos", type=int, default=DEFAULT_COMBO_COUNT,
+                        help="случайных комбинаций из двух слов (ru_wrong) в конце (по умолчанию %(default)s)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="мастер-seed для шардов")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="количество шардов для многопроцессной генерации (по умолчанию %(default)s)")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="размер пула процессов (по умолчанию - число ядер)")
+    parser.add_argument("--parts", action="store_true",
+                        help="не склеивать шарды, оставить part-файлы и manifest.json")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.shards > 1 or args.parts:
+        seed = sharding.resolve_seed(args.seed)
+        total = generate_sharded(args.count, args.output, seed, args.shards,
+                                 processes=args.processes, keep_parts=args.parts, combo_count=args.combos)
+        print(f"✅ Датасет сохранен в: {args.output} (шардов: {args.shards}, seed: {seed})")
+        print(f"📊 Всего примеров: {total}")
+    else:
+        rng = random.Random(args.seed) if args.seed is not None else None
+        dataset = generate_dataset(target_count=args.count, rng=rng, combo_count=args.combos)
+        save_dataset(dataset, args.output)
+
 if __name__ == "__main__":
-    dataset = generate_dataset(target_count=1200)
-    save_dataset(dataset, "sample_dataset.csv")
+    main()
@@ -0,0 +1,598 @@
+#!/usr/bin/env python3
+"""
+Симулятор политик кэша для подбора емкостей уровней CacheManager по реальному трафику
+
+CacheManager объявляет для словарей CacheType.maxSize (1000/2000/500/300/1000/100)
+и TTL. Порт текущего поведения (политика current):
+- get: промах, если ключа нет или запись старше TTL уровня (тогда она удаляется);
+  попадание не обновляет ни время, ни счетчик (CacheEntry.incrementAccess пустой);
+- set копирует словарь (var cache = getCache(...)) до вызова evictOldEntries и
+  потом записывает эту копию обратно через setCache - удаление ключей в
+  evictOldEntries теряется, и maxSize на самом деле ничего не ограничивает;
+- раз в CLEANUP_INTERVAL секунд cleanupExpiredEntries удаляет записи старше TTL.
+То есть размер кэша сейчас ограничен только TTL: у current нет емкости, для нее
+печатаются попадания, пиковое число записей и память при этом пике.
+Для сравнения: LRU, LFU (вытесняется наименее частый, при равенстве - давний) и
+W-TinyLFU (окно LRU 1% + сегментированный LRU, допуск по Count-Min Sketch
+с 4-битными счетчиками и периодическим старением). У всех политик тот же TTL
+от момента записи; для сравнения просроченные записи удаляются сразу (очередь по
+времени записи, как таймеры Caffeine), иначе LFU и W-TinyLFU держали бы
+"частые" мертвые записи, которые никогда не вытесняются.
+
+Потоки обращений по уровням:
+- languageDetection - ключ "en|ru" (EnhancedLanguageDetector, key_strings слова)
+  на каждое обработанное слово;
+- spellingCheck - ключи "en:слово" и "ru:слово" (SystemDictionaryService.checkSpelling);
+- suggestions/autoComplete/typoCorrection - слово (в Swift у этих уровней пока нет
+  вызывающих, поток - те же слова); learningData - один ключ, не моделируется.
+Источники: датасеты CSV/.bfds (слова строк подряд, --words-per-minute задает время),
+трассы .bfkt keystroke_replay.py (реальные вызовы словаря и processWord со временем
+событий) и частотные списки (--en-words/--ru-words, выборка по закону Ципфа).
+
+Память оценивается для Swift: корзины Dictionary (степень двойки, заполнение до 3/4)
+по ключу String (16 байт, длиннее 15 байт UTF-8 - плюс буфер в куче) и CacheEntry
+уровня, плюс служебные структуры политики (узлы списков, счетчики скетча).
+
+    python3 ML/cache_simulator.py ML/Data/expanded_dataset.csv
+    python3 ML/cache_simulator.py trace.bfkt --generator-words --tiers languageDetection,spellingCheck --csv cache.csv
+    python3 ML/cache_simulator.py --en-words ML/Data/words_en.tsv --ru-words ML/Data/words_ru.tsv --samples 500000
+"""
+
+import argparse
+import csv
+import random
+import sys
+import time
+from collections import OrderedDict, defaultdict, deque
+from multiprocessing import Pool
+
+import dataset_io
+import heuristic_detector
+import keystroke_replay
+import layout_transcoder
+import warm_cache
+import word_lists
+
+CLEANUP_INTERVAL = 300
+
+# CacheType.maxSize и CacheType.ttl
+TIERS = {
+    "languageDetection": (1000, 3600),
+    "spellingCheck": (2000, 7200),
+    "suggestions": (500, 1800),
+    "autoComplete": (300, 900),
+    "typoCorrection": (1000, 3600),
+}
+DEFAULT_TIERS = ("languageDetection", "spellingCheck")
+
+# Размер CacheEntry<T> (value + Date + Int) и данных значения в куче, байт
+ENTRY_BYTES = {
+    "languageDetection": (32, 0),   # (Language, Double)
+    "spellingCheck": (24, 0),       # Bool
+    "suggestions": (24, 80),        # [String]: буфер массива на ~3 коротких строки
+    "autoComplete": (24, 80),
+    "typoCorrection": (32, 0),      # String, обычно короткая (inline)
+}
+KEY_BYTES = 16
+SMALL_STRING_BYTES = 15
+# Служебное на запись: узел двусвязного списка (prev, next, ключ) и счетчики
+POLICY_ENTRY_BYTES = {"current": 0, "lru": 40, "lfu": 56, "wtinylfu": 48}
+
+POLICIES = ("current", "lru", "lfu", "wtinylfu")
+DEFAULT_CAPACITIES = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+# MARK: - Политики
+
+
+class CurrentPolicy:
+    """Порт CacheManager.get/set/cleanupExpiredEntries (evictOldEntries не действует)"""
+
+    def __init__(self, capacity, ttl):
+        self.ttl = ttl
+        self.born = {}
+        self.next_cleanup = None
+        self.peak_entries = 0
+
+    def access(self, key, now):
+        if self.next_cleanup is None:
+            self.next_cleanup = now + CLEANUP_INTERVAL
+        while now >= self.next_cleanup:
+            cleanup = self.next_cleanup
+            self.born = {key: born for key, born in self.born.items() if cleanup - born <= self.ttl}
+            self.next_cleanup += CLEANUP_INTERVAL
+
+        born = self.born.get(key)
+        if born is not None and now - born <= self.ttl:
+            return True
+        # Просроченная запись удаляется в get и тут же записывается заново в set
+        self.born[key] = now
+        if len(self.born) > self.peak_entries:
+            self.peak_entries = len(self.born)
+        return False
+
+
+class ExpiryQueue:
+    """
+    Удаление просроченных записей по очереди времени записи (TTL от set, как expireAfterWrite).
+    born(key) - время записи ключа в политике или None, discard(key) - удалить ключ.
+    """
+
+    def __init__(self, ttl, born, discard):
+        self.ttl = ttl
+        self.born = born
+        self.discard = discard
+        self.queue = deque()
+
+    def push(self, key, now):
+        self.queue.append((now, key))
+
+    def expire(self, now):
+        queue = self.queue
+        while queue and now - queue[0][0] > self.ttl:
+            born, key = queue.popleft()
+            # Ключ мог быть вытеснен и записан заново - тогда в очереди есть более поздняя запись
+            if self.born(key) == born:
+                self.discard(key)
+
+
+class LRUPolicy:
+    def __init__(self, capacity, ttl):
+        self.expiry = ExpiryQueue(ttl, self._born, self._discard)
+        self.capacity = capacity
+        self.entries = OrderedDict()
+
+    def _born(self, key):
+        return self.entries.get(key)
+
+    def _discard(self, key):
+        del self.entries[key]
+
+    def access(self, key, now):
+        self.expiry.expire(now)
+        entries = self.entries
+        if key in entries:
+            entries.move_to_end(key)
+            return True
+        entries[key] = now
+        self.expiry.push(key, now)
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+        return False
+
+
+class LFUPolicy:
+    """LFU за O(1): корзины по частоте, внутри корзины - порядок обращений"""
+
+    def __init__(self, capacity, ttl):
+        self.expiry = ExpiryQueue(ttl, self._born, self._discard)
+        self.capacity = capacity
+        self.entries = {}
+        self.buckets = defaultdict(OrderedDict)
+        self.min_frequency = 0
+
+    def _born(self, key):
+        entry = self.entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def _discard(self, key):
+        frequency, _ = self.entries.pop(key)
+        bucket = self.buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[frequency]
+
+    def access(self, key, now):
+        self.expiry.expire(now)
+        entry = self.entries.get(key)
+        if entry is not None:
+            frequency, born = entry
+            bucket = self.buckets[frequency]
+            del bucket[key]
+            if not bucket:
+                del self.buckets[frequency]
+                if self.min_frequency == frequency:
+                    self.min_frequency = frequency + 1
+            self.entries[key] = (frequency + 1, born)
+            self.buckets[frequency + 1][key] = None
+            return True
+
+        if len(self.entries) >= self.capacity:
+            if self.min_frequency not in self.buckets:
+                self.min_frequency = min(self.buckets)
+            victim = next(iter(self.buckets[self.min_frequency]))
+            self._discard(victim)
+        self.entries[key] = (1, now)
+        self.buckets[1][key] = None
+        self.expiry.push(key, now)
+        self.min_frequency = 1
+        return False
+
+
+class FrequencySketch:
+    """Count-Min Sketch с 4-битными счетчиками (4 строки) и старением делением пополам"""
+
+    SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+    HALVE = bytes(value >> 1 for value in range(256))
+
+    def __init__(self, capacity):
+        width = 16
+        while width < capacity:
+            width <<= 1
+        self.shift = 64 - width.bit_length() + 1
+        self.width = width
+        self.table = bytearray(4 * width)
+        self.sample_size = 10 * max(capacity, 1)
+        self.additions = 0
+
+    def _indexes(self, key):
+        return [row * self.width + (((key * seed) & 0xFFFFFFFFFFFFFFFF) >> self.shift)
+                for row, seed in enumerate(self.SEEDS)]
+
+    def increment(self, key):
+        table = self.table
+        for index in self._indexes(key):
+            if table[index] < 15:
+                table[index] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.table = bytearray(self.table.translate(self.HALVE))
+            self.additions //= 2
+
+    def frequency(self, key):
+        table = self.table
+        return min(table[index] for index in self._indexes(key))
+
+    def memory_bytes(self):
+        """Счетчики здесь по байту, в реализации для Swift - по 4 бита, как в Caffeine"""
+        return len(self.table) // 2
+
+
+class WTinyLFUPolicy:
+    """W-TinyLFU (Caffeine): окно LRU 1%, основная часть - SLRU (probation 20% / protected 80%)"""
+
+    def __init__(self, capacity, ttl):
+        self.expiry = ExpiryQueue(ttl, self._born, self._discard)
+        self.window_capacity = max(1, capacity // 100)
+        main = max(capacity - self.window_capacity, 1)
+        self.protected_capacity = max(1, main * 4 // 5)
+        self.main_capacity = main
+        self.window = OrderedDict()
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.sketch = FrequencySketch(capacity)
+
+    def _born(self, key):
+        for segment in (self.window, self.probation, self.protected):
+            born = segment.get(key)
+            if born is not None:
+                return born
+        return None
+
+    def _discard(self, key):
+        for segment in (self.window, self.probation, self.protected):
+            if segment.pop(key, None) is not None:
+                return
+
+    def _evict_window(self):
+        candidate, born = self.window.popitem(last=False)
+        if len(self.probation) + len(self.protected) < self.main_capacity:
+            self.probation[candidate] = born
+            return
+        victim = next(iter(self.probation)) if self.probation else next(iter(self.protected))
+        if self.sketch.frequency(candidate) > self.sketch.frequency(victim):
+            if victim in self.probation:
+                del self.probation[victim]
+            else:
+                del self.protected[victim]
+            self.probation[candidate] = born
+
+    def access(self, key, now):
+        self.expiry.expire(now)
+        self.sketch.increment(key)
+        born = self.probation.pop(key, None)
+        if born is not None:
+            self.protected[key] = born
+            if len(self.protected) > self.protected_capacity:
+                demoted, demoted_born = self.protected.popitem(last=False)
+                self.probation[demoted] = demoted_born
+            return True
+        for segment in (self.window, self.protected):
+            if key in segment:
+                segment.move_to_end(key)
+                return True
+
+        self.window[key] = now
+        self.expiry.push(key, now)
+        if len(self.window) > self.window_capacity:
+            self._evict_window()
+        return False
+
+
+POLICY_CLASSES = {"current": CurrentPolicy, "lru": LRUPolicy, "lfu": LFUPolicy, "wtinylfu": WTinyLFUPolicy}
+
+
+def simulate(policy, stream):
+    """Доля попаданий политики на потоке (times, ids)"""
+    access = policy.access
+    hits = sum(1 for now, key in zip(*stream) if access(key, now))
+    return hits / len(stream[0]) if stream[0] else 0.0
+
+
+# MARK: - Память
+
+
+def memory_estimate(tier, policy, entries, key_lengths):
+    """Оценка памяти уровня в Swift при entries записях, байт"""
+    entry_bytes, value_heap = ENTRY_BYTES[tier]
+    buckets = 1
+    while buckets * 3 < entries * 4:
+        buckets <<= 1
+    long_keys = sum(32 + (length + 15) // 16 * 16 for length in key_lengths if length > SMALL_STRING_BYTES)
+    key_heap = long_keys / max(len(key_lengths), 1) * entries
+    total = buckets * (KEY_BYTES + entry_bytes) + buckets // 8 + key_heap + entries * value_heap
+    total += entries * POLICY_ENTRY_BYTES[policy]
+    if policy == "wtinylfu":
+        total += FrequencySketch(entries).memory_bytes()
+    return int(total)
+
+
+# MARK: - Потоки обращений
+
+
+class Streams:
+    """Потоки по уровням: время (с) и номер ключа; ключи нумеруются один раз для всех политик"""
+
+    def __init__(self, tiers):
+        self.tiers = tiers
+        self.times = {tier: [] for tier in tiers}
+        self.ids = {tier: [] for tier in tiers}
+        self.key_ids = {tier: {} for tier in tiers}
+
+    def add(self, tier, key, now):
+        if tier not in self.times:
+            return
+        key_ids = self.key_ids[tier]
+        self.times[tier].append(now)
+        self.ids[tier].append(key_ids.setdefault(key, len(key_ids)))
+
+    def add_word(self, word, now):
+        """Одно обработанное слово: детекция языка, проверка в обоих словарях, словесные уровни"""
+        word = word.lower()
+        self.add("languageDetection", "|".join(layout_transcoder.key_strings(word)), now)
+        self.add("spellingCheck", "en:" + word, now)
+        self.add("spellingCheck", "ru:" + word, now)
+        for tier in ("suggestions", "autoComplete", "typoCorrection"):
+            self.add(tier, word, now)
+
+    def stream(self, tier):
+        return self.times[tier], self.ids[tier]
+
+    def key_lengths(self, tier):
+        return [len(key.encode("utf-8")) for key in self.key_ids[tier]]
+
+
+def add_dataset(streams, path, seconds_per_word, limit=None, start=0.0):
+    now = start
+    for index, (text, _) in enumerate(dataset_io.iter_rows(path)):
+        if limit is not None and index >= limit:
+            break
+        for word in text.split():
+            streams.add_word(word, now)
+            now += seconds_per_word
+    return now
+
+
+def add_word_lists(streams, lists, samples, seconds_per_word, seed, start=0.0):
+    """Выборка слов по частоте (оба языка вместе, пропорционально частотам)"""
+    words = []
+    counts = []
+    for language_words, language_counts in lists.values():
+        words += language_words
+        counts += language_counts
+    now = start
+    for word in word_lists.WordSampler(words, counts).sample(random.Random(seed), samples):
+        streams.add_word(word, now)
+        now += seconds_per_word
+    return now
+
+
+class RecordingDictionary:
+    """Словарь для keystroke_replay, который пишет каждый вызов checkSpelling в поток spellingCheck"""
+
+    def __init__(self, dictionary, processor, streams, start):
+        self.dictionary = dictionary
+        self.processor = processor
+        self.streams = streams
+        self.start = start
+
+    def check_spelling(self, word, language_code):
+        self.streams.add("spellingCheck", f"{language_code}:{word}", self.start + self.processor.time_us / 1e6)
+        return self.dictionary.check_spelling(word, language_code)
+
+
+class RecordingProcessor(keystroke_replay.EventProcessor):
+    """EventProcessor, который пишет слова processWord (ContextAnalyzer -> EnhancedLanguageDetector)"""
+
+    def __init__(self, streams, dictionary, start=0.0):
+        super().__init__()
+        self.streams = streams
+        self.start = start
+        self.dictionary = RecordingDictionary(dictionary, self, streams, start)
+
+    def process_word(self):
+        word = self.buffer.get_current_word()
+        if word is not None and len(word) <= self.max_word_length:
+            now = self.start + self.time_us / 1e6
+            word = word.lower()
+            self.streams.add("languageDetection", "|".join(layout_transcoder.key_strings(word)), now)
+            for tier in ("suggestions", "autoComplete", "typoCorrection"):
+                self.streams.add(tier, word, now)
+        super().process_word()
+
+
+def add_trace(streams, path, dictionary, start=0.0):
+    with keystroke_replay.KeystrokeTrace(path) as trace:
+        processor = RecordingProcessor(streams, dictionary, start)
+        keystroke_replay.replay(trace.events, processor)
+        return start + (int(trace.events["time_us"][-1]) / 1e6 if len(trace) else 0.0)
+
+
+# MARK: - Отчет
+
+
+_worker_stream = None
+
+
+def _init_worker(stream):
+    global _worker_stream
+    _worker_stream = stream
+
+
+def _simulate_job(job):
+    """(доля попаданий, записей в кэше): у current - пик, у остальных - емкость"""
+    policy, capacity, ttl = job
+    instance = POLICY_CLASSES[policy](capacity, ttl)
+    hit_ratio = simulate(instance, _worker_stream)
+    return hit_ratio, instance.peak_entries if policy == "current" else capacity
+
+
+def run_tier(streams, tier, policies, capacities, processes=1):
+    """
+    [(policy, capacity, hit_ratio, entries, memory_bytes)] для уровня; симуляции независимы
+    и идут в пуле. current от емкости не зависит - одна симуляция с capacity None.
+    """
+    ttl = TIERS[tier][1]
+    jobs = [("current", None, ttl)] if "current" in policies else []
+    jobs += [(policy, capacity, ttl) for capacity in capacities for policy in policies if policy != "current"]
+    if processes > 1:
+        with Pool(processes, initializer=_init_worker, initargs=(streams.stream(tier),)) as pool:
+            outcomes = pool.map(_simulate_job, jobs)
+    else:
+        _init_worker(streams.stream(tier))
+        outcomes = [_simulate_job(job) for job in jobs]
+    key_lengths = streams.key_lengths(tier)
+    return [(policy, capacity, hit_ratio, entries, memory_estimate(tier, policy, entries, key_lengths))
+            for (policy, capacity, _), (hit_ratio, entries) in zip(jobs, outcomes)]
+
+
+def recommend(results, knee):
+    """Наименьшая емкость, где ограниченная политика набирает knee от лучшей доли попаданий уровня"""
+    best = max(hit_ratio for _, _, hit_ratio, _, _ in results)
+    bounded = [result for result in results if result[1] is not None]
+    for result in sorted(bounded, key=lambda item: (item[1], -item[2])):
+        if result[2] >= best * knee:
+            return result
+    return None
+
+
+def print_tier(tier, streams, results, policies, knee):
+    max_size, ttl = TIERS[tier]
+    times, ids = streams.stream(tier)
+    span = (times[-1] - times[0]) / 3600 if times else 0.0
+    print(f"=== {tier}: maxSize {max_size}, TTL {ttl} с; {len(ids):,} обращений, "
+          f"{len(streams.key_ids[tier]):,} ключей, {span:.1f} ч")
+    bounded = [policy for policy in policies if policy != "current"]
+    table = defaultdict(dict)
+    memory = {}
+    for policy, capacity, hit_ratio, _, memory_bytes in results:
+        if capacity is not None:
+            table[capacity][policy] = hit_ratio
+            memory[capacity, policy] = memory_bytes
+    if bounded:
+        print(f"{'емкость':>9}" + "".join(f"{policy:>10}" for policy in bounded) + f"{'память ' + bounded[0]:>16}")
+        for capacity in sorted(table):
+            mark = "*" if capacity == max_size else " "
+            print(f"{capacity:>8}{mark}" + "".join(f"{table[capacity][policy] * 100:>9.2f}%" for policy in bounded)
+                  + f"{memory[capacity, bounded[0]] / 1024:>13.1f} КБ")
+
+    choice = recommend(results, knee)
+    if choice is not None:
+        policy, capacity, hit_ratio, _, memory_bytes = choice
+        print(f"   рекомендация: {policy}, емкость {capacity} - {hit_ratio * 100:.2f}% попаданий "
+              f"(>= {knee * 100:.0f}% от лучшего), ~{memory_bytes / 1024:.1f} КБ")
+    elif bounded:
+        print(f"   рекомендация: ни одна емкость не дает {knee * 100:.0f}% от лучшего - нужны емкости больше")
+    for policy, capacity, hit_ratio, entries, memory_bytes in results:
+        if policy == "current":
+            print(f"   сейчас: current (maxSize не действует, только TTL) - {hit_ratio * 100:.2f}%, "
+                  f"пик {entries:,} записей, ~{memory_bytes / 1024:.1f} КБ")
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["tier", "policy", "capacity", "hit_ratio", "entries", "memory_bytes", "requests", "keys"])
+        writer.writerows(rows)
+
+
+def parse_list(value, cast=str):
+    return tuple(cast(item) for item in value.split(",") if item)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Симулятор политик кэша для уровней CacheManager")
+    parser.add_argument("inputs", nargs="*", help="датасеты CSV/.bfds и трассы .bfkt (keystroke_replay.py)")
+    parser.add_argument("--tiers", type=parse_list, default=DEFAULT_TIERS,
+                        help=f"уровни через запятую из {', '.join(TIERS)} (по умолчанию {','.join(DEFAULT_TIERS)})")
+    parser.add_argument("--policies", type=parse_list, default=POLICIES,
+                        help=f"политики через запятую (по умолчанию {','.join(POLICIES)})")
+    parser.add_argument("--capacities", type=lambda value: parse_list(value, int), default=DEFAULT_CAPACITIES,
+                        help="емкости через запятую; maxSize уровня добавляется всегда")
+    parser.add_argument("--limit", type=int, default=None, help="строк каждого датасета")
+    parser.add_argument("--words-per-minute", type=float, default=40.0,
+                        help="темп набора для датасетов и частотных списков (по умолчанию %(default)s)")
+    parser.add_argument("--samples", type=int, default=200_000,
+                        help="слов из частотных списков (по умолчанию %(default)s)")
+    parser.add_argument("--knee", type=float, default=0.95,
+                        help="доля лучшего попадания для рекомендации (по умолчанию %(default)s)")
+    parser.add_argument("--seed", type=int, default=42, help="seed выборки из частотных списков (по умолчанию %(default)s)")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="процессов для симуляций (по умолчанию %(default)s)")
+    parser.add_argument("--csv", help="записать кривые в CSV")
+    heuristic_detector.add_dictionary_arguments(parser)
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.tiers if name not in TIERS] + \
+              [name for name in args.policies if name not in POLICY_CLASSES]
+    if unknown:
+        parser.error(f"неизвестные уровни или политики: {', '.join(unknown)}")
+
+    seconds_per_word = 60.0 / args.words_per_minute
+    streams = Streams(args.tiers)
+    start = time.perf_counter()
+    now = 0.0
+    for path in args.inputs:
+        if path.endswith(keystroke_replay.EXTENSION):
+            now = add_trace(streams, path, heuristic_detector.build_dictionary(args), now)
+        else:
+            now = add_dataset(streams, path, seconds_per_word, args.limit, now)
+    if args.en_words or args.ru_words:
+        now = add_word_lists(streams, warm_cache.load_ranked_words(args), args.samples, seconds_per_word,
+                             args.seed, now)
+    if not any(streams.ids[tier] for tier in args.tiers):
+        parser.error("нет обращений: нужны датасеты, трассы или частотные списки")
+    print(f"Потоки построены за {time.perf_counter() - start:.1f} с, {now / 3600:.1f} ч набора")
+
+    rows = []
+    for tier in args.tiers:
+        if not streams.ids[tier]:
+            continue
+        capacities = sorted(set(args.capacities) | {TIERS[tier][0]})
+        start = time.perf_counter()
+        results = run_tier(streams, tier, args.policies, capacities, args.processes)
+        print_tier(tier, streams, results, args.policies, args.knee)
+        print(f"   симуляция: {time.perf_counter() - start:.1f} с")
+        requests = len(streams.ids[tier])
+        keys = len(streams.key_ids[tier])
+        rows += [(tier, policy, "" if capacity is None else capacity, f"{hit_ratio:.6f}", entries, memory,
+                  requests, keys)
+                 for policy, capacity, hit_ratio, entries, memory in results]
+    if args.csv:
+        write_csv(args.csv, rows)
+        print(f"✅ Кривые сохранены: {args.csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
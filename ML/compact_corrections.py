@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Компактизация пользовательских исправлений и слияние с базовым датасетом
+
+LearningManager.appendToDataset дописывает каждое принятое или отклоненное
+исправление строкой "text",label в Documents/BabylonFish/ML/Data/user_corrections.csv.
+Файл растет без ограничений, в нем много повторов, а старые версии не экранировали
+кавычки, поэтому встречаются битые строки. Метки тоже смешанные: english/russian
+(Language.rawValue) и en/ru.
+
+Скрипт потоково читает файл, начиная с водяного знака (смещение в байтах, до
+которого файл уже обработан), пропускает битые строки, дедуплицирует тексты через
+хэш-индекс и копит для каждого текста число повторов и голоса за метки. Итог
+сливается с базовым датасетом (generate_expanded_dataset.py): базовая часть выходного
+CSV переписывается только при изменении базы, а пользовательский хвост - заново
+из голосов. Поэтому каждый запуск читает только новые байты журнала, а не всю
+историю пользователя.
+
+Рядом с выходным файлом хранятся:
+    <output>.state.json - водяной знак, отпечаток журнала и базы;
+    <output>.votes.csv - text,en,ru,ru_wrong: голоса за метки по уникальным текстам;
+    <output>.base.npy - отсортированные хэши (text, label) базы для дедупликации.
+
+    python3 ML/compact_corrections.py ~/Documents/BabylonFish/ML/Data/user_corrections.csv \\
+        --base ML/Data/expanded_dataset.csv --output ML/Data/merged_dataset.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import dataset_io
+
+# Метки LearningManager -> метки датасета (ru_wrong определяется по тексту)
+LABEL_ALIASES = {
+    "en": "en",
+    "english": "en",
+    "ru": "ru",
+    "russian": "ru",
+    "ru_wrong": "ru_wrong",
+}
+MAX_TEXT_LENGTH = 200
+READ_BLOCK_SIZE = 1 << 20
+HEAD_SIZE = 64
+LINE_TERMINATOR = "\r\n"
+
+
+def text_hash(text, label=""):
+    """64-битный ключ хэш-индекса (blake2b) текста или пары (текст, метка)"""
+    digest = hashlib.blake2b(f"{text}\0{label}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def has_cyrillic(text):
+    return any("а" <= ch <= "я" or ch == "ё" for ch in text.lower())
+
+
+def has_latin(text):
+    return any("a" <= ch <= "z" for ch in text.lower())
+
+
+def parse_line(raw):
+    """
+    Разбирает строку журнала (bytes без перевода строки) в (text, label) или None.
+
+    Поддерживаются и старые строки с неэкранированными кавычками внутри, и
+    строки с CSV-экранированием (""). Склеенные при одновременной записи строки,
+    неизвестные метки, пустые и слишком длинные тексты, невалидный UTF-8 - None.
+    """
+    try:
+        line = raw.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError:
+        return None
+    text, separator, label = line.rpartition(",")
+    label = LABEL_ALIASES.get(label.strip().lower())
+    if not separator or label is None:
+        return None
+
+    if len(text) >= 2 and text[0] == '"' and text[-1] == '"':
+        text = text[1:-1]
+        # Склейка строк - неэкранированная кавычка перед запятой; пары "" сначала убираются,
+        # иначе правильно экранированный текст вида ""hi"", ok тоже выглядел бы склеенным
+        if '",' in text.replace('""', ''):
+            return None
+        text = text.replace('""', '"')
+    elif '"' in text:
+        return None
+    text = text.strip()
+    if not text or len(text) > MAX_TEXT_LENGTH:
+        return None
+
+    # Русский текст, набранный латиницей, в датасете - ru_wrong
+    if label == "ru" and has_latin(text) and not has_cyrillic(text):
+        label = "ru_wrong"
+    elif label == "en" and has_cyrillic(text):
+        # Английский на русской раскладке: такой метки у классификатора нет
+        return None
+    return text, label
+
+
+class VoteIndex:
+    """Уникальные тексты с голосами за метки; хэш-индекс текст -> позиция"""
+
+    def __init__(self):
+        self.texts = []
+        self.votes = []
+        self._index = {}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, text, label, count=1):
+        """Добавляет голос, возвращает True для нового текста"""
+        key = text_hash(text)
+        position = self._index.get(key)
+        if position is not None and self.texts[position] != text:
+            # Коллизия 64-битного хэша: ищем по тексту (практически не встречается)
+            position = next((i for i, t in enumerate(self.texts) if t == text), None)
+        if position is None:
+            position = len(self.texts)
+            self._index.setdefault(key, position)
+            self.texts.append(text)
+            self.votes.append([0] * len(dataset_io.LABELS))
+            self.votes[position][dataset_io.LABEL_IDS[label]] += count
+            return True
+        self.votes[position][dataset_io.LABEL_IDS[label]] += count
+        return False
+
+    def resolved(self):
+        """
+        (text, label, голосов за метку) по большинству голосов.
+        Тексты с равенством голосов за разные метки пропускаются (конфликт).
+        """
+        for text, votes in zip(self.texts, self.votes):
+            best = max(votes)
+            if votes.count(best) > 1:
+                continue
+            yield text, dataset_io.LABELS[votes.index(best)], best
+
+    def conflicts(self):
+        """Число текстов, за которые голосовали больше чем за одну метку"""
+        return sum(1 for votes in self.votes if sum(1 for v in votes if v) > 1)
+
+    def load(self, path):
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                for label, count in zip(dataset_io.LABELS, row[1:]):
+                    if int(count):
+                        self.add(row[0], label, int(count))
+
+    def save(self, path):
+        temporary = path + ".tmp"
+        with open(temporary, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, lineterminator=LINE_TERMINATOR)
+            writer.writerow(["text", *dataset_io.LABELS])
+            for text, votes in zip(self.texts, self.votes):
+                writer.writerow([text, *votes])
+        os.replace(temporary, path)
+
+
+def read_head(path):
+    with open(path, "rb") as f:
+        return f.read(HEAD_SIZE).hex()
+
+
+def iter_new_lines(path, offset, stats):
+    """
+    Строки журнала после смещения offset. Незавершенная последняя строка (запись
+    еще идет) не читается - водяной знак останавливается перед ней.
+    stats["offset"] - новый водяной знак.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        pending = b""
+        while True:
+            block = f.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+            lines = (pending + block).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                offset += len(line) + 1
+                stats["offset"] = offset
+                yield line
+
+
+def ingest(path, index, offset, stats):
+    """Добавляет новые строки журнала в индекс голосов, заполняет stats"""
+    for line in iter_new_lines(path, offset, stats):
+        stats["lines"] += 1
+        if line.rstrip(b"\r") == b"text,label":
+            continue
+        row = parse_line(line)
+        if row is None:
+            stats["skipped"] += 1
+            continue
+        if index.add(*row):
+            stats["new_texts"] += 1
+
+
+def base_fingerprint(path):
+    info = os.stat(path)
+    return {"path": os.path.abspath(path), "size": info.st_size, "mtime_ns": info.st_mtime_ns}
+
+
+def write_base(base_path, output_path, hashes_path):
+    """Копирует базу в выходной CSV, сохраняет хэши ее пар; возвращает размер базовой части"""
+    hashes = []
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator=LINE_TERMINATOR)
+        writer.writerow(["text", "label"])
+        for text, label in dataset_io.iter_rows(base_path):
+            writer.writerow([text, label])
+            hashes.append(text_hash(text, label))
+    np.save(hashes_path, np.unique(np.array(hashes, dtype=np.uint64)))
+    return os.path.getsize(output_path)
+
+
+def append_user_rows(index, output_path, base_size, base_hashes, max_repeat):
+    """
+    Переписывает пользовательский хвост выходного CSV: обрезает файл до базовой
+    части и дописывает решенные тексты (повторяя до max_repeat раз по числу голосов).
+    Пары, которые уже есть в базе, не дублируются. Возвращает (строк, уже в базе).
+    """
+    os.truncate(output_path, base_size)
+    rows = 0
+    in_base = 0
+    with open(output_path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator=LINE_TERMINATOR)
+        for text, label, votes in index.resolved():
+            key = np.uint64(text_hash(text, label))
+            position = np.searchsorted(base_hashes, key)
+            if position < len(base_hashes) and base_hashes[position] == key:
+                in_base += 1
+                continue
+            for _ in range(min(votes, max_repeat)):
+                writer.writerow([text, label])
+                rows += 1
+    return rows, in_base
+
+
+def compact(journal_path, base_path, output_path, max_repeat=1, rebuild=False):
+    """Один инкрементальный проход; возвращает словарь статистики"""
+    state_path = output_path + ".state.json"
+    votes_path = output_path + ".votes.csv"
+    hashes_path = output_path + ".base.npy"
+
+    state = {}
+    if not rebuild and os.path.exists(state_path) and os.path.exists(output_path):
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+
+    journal_size = os.path.getsize(journal_path)
+    head = read_head(journal_path)
+    offset = state.get("offset", 0)
+    # Журнал обрезан или заменен новым файлом - водяной знак недействителен
+    if offset > journal_size or state.get("head") != head[:len(state.get("head", ""))]:
+        state = {}
+        offset = 0
+
+    index = VoteIndex()
+    if state and os.path.exists(votes_path):
+        index.load(votes_path)
+
+    stats = {"start_offset": offset, "offset": offset, "lines": 0, "skipped": 0, "new_texts": 0}
+    ingest(journal_path, index, offset, stats)
+    index.save(votes_path)
+
+    fingerprint = base_fingerprint(base_path)
+    stats["base_rewritten"] = state.get("base") != fingerprint or not os.path.exists(hashes_path)
+    if stats["base_rewritten"]:
+        state["base_size"] = write_base(base_path, output_path, hashes_path)
+    base_hashes = np.load(hashes_path)
+    stats["rows"], stats["in_base"] = append_user_rows(index, output_path, state["base_size"],
+                                                       base_hashes, max_repeat)
+    stats["texts"] = len(index)
+    stats["conflicts"] = index.conflicts()
+    stats["base_rows"] = len(base_hashes)
+
+    state.update({"journal": os.path.abspath(journal_path), "head": head, "offset": stats["offset"],
+                  "base": fingerprint, "updated": time.time()})
+    temporary = state_path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(temporary, state_path)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Компактизация user_corrections.csv и слияние с базовым датасетом")
+    parser.add_argument("journal", help="user_corrections.csv из LearningManager")
+    parser.add_argument("--base", required=True, help="базовый датасет (CSV или .bfds)")
+    parser.add_argument("--output", required=True, help="объединенный CSV датасет")
+    parser.add_argument("--max-repeat", type=int, default=1,
+                        help="сколько раз повторять текст с несколькими голосами (по умолчанию %(default)s)")
+    parser.add_argument("--rebuild", action="store_true", help="игнорировать водяной знак и собрать заново")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.journal):
+        print(f"❌ Журнал не найден: {args.journal}")
+        return 1
+
+    start = time.perf_counter()
+    stats = compact(args.journal, args.base, args.output, max(1, args.max_repeat), args.rebuild)
+    new_bytes = stats["offset"] - stats["start_offset"]
+    print(f"Журнал: {new_bytes} новых байт (с {stats['start_offset']}), строк {stats['lines']}, "
+          f"битых {stats['skipped']}, новых текстов {stats['new_texts']}")
+    print(f"Голоса: {stats['texts']} уникальных текстов, с конфликтом меток {stats['conflicts']}")
+    print(f"База: {stats['base_rows']} уникальных строк"
+          f"{' (переписана)' if stats['base_rewritten'] else ''}, уже в базе {stats['in_base']}")
+    print(f"✅ Датасет сохранен: {args.output} (+{stats['rows']} пользовательских строк, "
+          f"{time.perf_counter() - start:.2f} с)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
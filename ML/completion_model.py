@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Офлайн модель автодополнения для AutoCompleteEngine: префиксы -> top-k слов и марковские переходы
+
+Сейчас AutoCompleteEngine.loadDictionaries начинает с 10 слов, updateNgramModel
+заполняет ngramDictionary по одному слову (с Array.contains на каждую вставку),
+а MarkovModel(order: 2) учится только на том, что пользователь набирает.
+Скрипт заранее строит то же самое по локальным корпусам:
+- словарь: --vocab самых частых слов (слова как в extractWords: нижний регистр,
+  не короче 2 символов);
+- префиксы длиной 1..--max-prefix -> --top-k самых частых слов с этим префиксом;
+  для более длинных префиксов - поиск диапазона в отсортированном словаре;
+- переходы порядка 2 (два предыдущих слова -> следующее) и порядка 1 для отката,
+  --top-k следующих слов на состояние.
+Корпуса читаются потоково, счетчики слов и n-грамм ограничены сводками Misra-Gries
+(word_lists.py). Вероятности квантуются в uint8: q = round(-log2(p) * QUANT_SCALE).
+
+Раскладка файла .bfac (little-endian, секции выровнены на 8 байт):
+    заголовок HEADER_SIZE байт: magic "BFAC", версия, размер заголовка, размеры таблиц,
+        top_k, max_prefix, смещения секций
+    словарь: слова UTF-8 по возрастанию байтов, offsets uint32[V + 1], counts uint32[V]
+    префиксы: ключи UTF-8 по возрастанию, offsets uint32[P + 1],
+        starts uint32[P + 1], word_ids uint32[E], qprobs uint8[E]
+    состояния: keys uint64[S] по возрастанию (id1 << 32 | id2, для порядка 1 id1 = 0xFFFFFFFF),
+        starts uint32[S + 1], word_ids uint32[T], qprobs uint8[T]
+Поиск - двоичный поиск по отсортированным ключам, без хеш-таблиц и без копирования.
+
+    python3 ML/completion_model.py build corpus/ --output autocomplete.bfac
+    python3 ML/completion_model.py complete autocomplete.bfac при "как дела"
+    python3 ML/completion_model.py benchmark autocomplete.bfac --eval corpus/holdout.txt
+"""
+
+import argparse
+import heapq
+import math
+import mmap
+import random
+import re
+import struct
+import sys
+import time
+from array import array
+from collections import Counter, defaultdict
+
+import word_lists
+
+MAGIC = b"BFAC"
+VERSION = 1
+EXTENSION = ".bfac"
+HEADER_FORMAT = "<4sHHIIIIHHQQQQQQQQQQQQ"
+HEADER_SIZE = 128
+QUANT_SCALE = 16
+BACKOFF_ID = 0xFFFFFFFF
+TOKEN_PATTERN = re.compile(r"[a-zа-яё]+(?:['-][a-zа-яё]+)?")
+MIN_WORD_LENGTH = 2
+DEFAULT_VOCAB = 100_000
+DEFAULT_TOP_K = 8
+DEFAULT_MAX_PREFIX = 4
+DEFAULT_CAPACITY = 2_000_000
+
+
+def tokenize(line):
+    """Слова строки как в AutoCompleteEngine.extractWords (нижний регистр, длина >= 2)"""
+    return [word for word in TOKEN_PATTERN.findall(line.lower()) if len(word) >= MIN_WORD_LENGTH]
+
+
+def quantize(probability):
+    if probability <= 0:
+        return 255
+    return min(255, int(round(-math.log2(probability) * QUANT_SCALE)))
+
+
+def dequantize(q):
+    return 2.0 ** (-q / QUANT_SCALE)
+
+
+class NgramCounts:
+    """Ограниченные по памяти счетчики слов, пар и троек слов (по строкам корпуса)"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.words = word_lists.MisraGries(capacity)
+        self.bigrams = word_lists.MisraGries(capacity)
+        self.trigrams = word_lists.MisraGries(capacity)
+
+    def update(self, lines):
+        words = Counter()
+        bigrams = Counter()
+        trigrams = Counter()
+        for line in lines:
+            tokens = tokenize(line)
+            words.update(tokens)
+            bigrams.update(zip(tokens, tokens[1:]))
+            trigrams.update(zip(tokens, tokens[1:], tokens[2:]))
+        self.words.update(words)
+        self.bigrams.update(bigrams)
+        self.trigrams.update(trigrams)
+
+
+def ingest(paths, capacity=DEFAULT_CAPACITY, chunk_lines=word_lists.DEFAULT_CHUNK_LINES, log=print):
+    counts = NgramCounts(capacity)
+    lines = 0
+    start = time.perf_counter()
+    for chunk in word_lists.iter_line_chunks(paths, chunk_lines):
+        counts.update(chunk)
+        lines += len(chunk)
+        if log:
+            log(f"   строк: {lines:,}, слов: {counts.words.total:,} ({time.perf_counter() - start:.1f} с)")
+    return counts
+
+
+def _top_k(items, k):
+    """items - [(count, word_id)]: k лучших по убыванию частоты, при равенстве - по id"""
+    return heapq.nsmallest(k, items, key=lambda item: (-item[0], item[1]))
+
+
+def build_tables(counts, vocab_size=DEFAULT_VOCAB, top_k=DEFAULT_TOP_K, max_prefix=DEFAULT_MAX_PREFIX,
+                 min_count=2, min_transition_count=2):
+    """
+    Из счетчиков - словарь и таблицы:
+    (words, word_counts, {префикс: [(word_id, q)]}, {ключ состояния: [(word_id, q)]})
+    """
+    ranked = [(word, count) for word, count in counts.words.counters.items() if count >= min_count]
+    ranked = heapq.nsmallest(vocab_size, ranked, key=lambda item: (-item[1], item[0]))
+    ranked.sort(key=lambda item: item[0].encode("utf-8"))
+    words = [word for word, _ in ranked]
+    word_counts = [count for _, count in ranked]
+    ids = {word: index for index, word in enumerate(words)}
+
+    by_prefix = defaultdict(list)
+    for index, (word, count) in enumerate(ranked):
+        for n in range(1, min(max_prefix, len(word)) + 1):
+            by_prefix[word[:n]].append((count, index))
+    prefixes = {}
+    for prefix, items in by_prefix.items():
+        total = sum(count for count, _ in items)
+        prefixes[prefix] = [(index, quantize(count / total)) for count, index in _top_k(items, top_k)]
+
+    by_state = defaultdict(list)
+    for (w1, w2, w3), count in counts.trigrams.counters.items():
+        if count >= min_transition_count and w1 in ids and w2 in ids and w3 in ids:
+            by_state[(ids[w1] << 32) | ids[w2]].append((count, ids[w3]))
+    for (w1, w2), count in counts.bigrams.counters.items():
+        if count >= min_transition_count and w1 in ids and w2 in ids:
+            by_state[(BACKOFF_ID << 32) | ids[w1]].append((count, ids[w2]))
+    states = {}
+    for key, items in by_state.items():
+        total = sum(count for count, _ in items)
+        states[key] = [(index, quantize(count / total)) for count, index in _top_k(items, top_k)]
+    return words, word_counts, prefixes, states
+
+
+def _align(f):
+    position = f.tell()
+    if position % 8:
+        f.write(b"\0" * (8 - position % 8))
+    return f.tell()
+
+
+def _write_strings(f, strings):
+    """Строки UTF-8 подряд и их offsets uint32; возвращает (смещение блоба, смещение offsets)"""
+    blob_offset = _align(f)
+    offsets = array("I", [0])
+    for data in strings:
+        f.write(data)
+        offsets.append(offsets[-1] + len(data))
+    offsets_offset = _align(f)
+    f.write(offsets.tobytes())
+    return blob_offset, offsets_offset
+
+
+def _write_lists(f, lists):
+    """Списки [(word_id, q)] подряд: starts uint32, word_ids uint32, qprobs uint8"""
+    starts = array("I", [0])
+    word_ids = array("I")
+    qprobs = array("B")
+    for items in lists:
+        for index, q in items:
+            word_ids.append(index)
+            qprobs.append(q)
+        starts.append(len(word_ids))
+    result = []
+    for data in (starts, word_ids, qprobs):
+        result.append(_align(f))
+        f.write(data.tobytes())
+    return result
+
+
+def write_model(output_path, words, word_counts, prefixes, states, top_k, max_prefix):
+    if sys.byteorder != "little":
+        raise RuntimeError("Запись .bfac поддерживается только на little-endian")
+    prefix_keys = sorted(prefixes, key=lambda prefix: prefix.encode("utf-8"))
+    state_keys = sorted(states)
+
+    with open(output_path, "wb") as f:
+        f.write(b"\0" * HEADER_SIZE)
+        words_offset, word_offsets_offset = _write_strings(f, (word.encode("utf-8") for word in words))
+        counts_offset = _align(f)
+        f.write(array("I", (min(count, 0xFFFFFFFF) for count in word_counts)).tobytes())
+
+        prefixes_offset, prefix_offsets_offset = _write_strings(f, (p.encode("utf-8") for p in prefix_keys))
+        prefix_lists = _write_lists(f, (prefixes[p] for p in prefix_keys))
+
+        keys_offset = _align(f)
+        f.write(array("Q", state_keys).tobytes())
+        state_lists = _write_lists(f, (states[key] for key in state_keys))
+
+        header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, HEADER_SIZE, len(words), len(prefix_keys),
+                             len(state_keys), sum(len(items) for items in states.values()),
+                             top_k, max_prefix, words_offset, word_offsets_offset, counts_offset,
+                             prefixes_offset, prefix_offsets_offset, *prefix_lists,
+                             keys_offset, *state_lists)
+        f.seek(0)
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+
+
+class _Strings:
+    """Отсортированные строки над mmap: двоичный поиск по байтам"""
+
+    def __init__(self, view, blob_offset, offsets_offset, count):
+        self.blob = view[blob_offset:offsets_offset]
+        self.offsets = view[offsets_offset:offsets_offset + 4 * (count + 1)].cast("I")
+        self.count = count
+
+    def key(self, index):
+        return bytes(self.blob[self.offsets[index]:self.offsets[index + 1]])
+
+    def lower_bound(self, key, lo=0, hi=None):
+        hi = self.count if hi is None else hi
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if self.key(middle) < key:
+                lo = middle + 1
+            else:
+                hi = middle
+        return lo
+
+    def find(self, key):
+        index = self.lower_bound(key)
+        return index if index < self.count and self.key(index) == key else -1
+
+    def release(self):
+        self.blob.release()
+        self.offsets.release()
+
+
+class CompletionModel:
+    """Модель .bfac, открытая через mmap (memoryview, без NumPy и без копирования)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, vocab_size, prefix_count, state_count, transition_count,
+         self.top_k, self.max_prefix, words_offset, word_offsets_offset, counts_offset,
+         prefixes_offset, prefix_offsets_offset, prefix_starts, prefix_ids, prefix_qprobs,
+         keys_offset, state_starts, state_ids, state_qprobs) = struct.unpack_from(HEADER_FORMAT, self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: не файл {EXTENSION}")
+        if version != VERSION:
+            raise ValueError(f"{path}: неподдерживаемая версия {EXTENSION} {version}")
+
+        view = memoryview(self._mmap)
+        self.vocab_size = vocab_size
+        self.state_count = state_count
+        self._words = _Strings(view, words_offset, word_offsets_offset, vocab_size)
+        self._counts = view[counts_offset:counts_offset + 4 * vocab_size].cast("I")
+        self._prefixes = _Strings(view, prefixes_offset, prefix_offsets_offset, prefix_count)
+        self._prefix_lists = self._lists(view, prefix_starts, prefix_ids, prefix_qprobs, prefix_count)
+        self._keys = view[keys_offset:keys_offset + 8 * state_count].cast("Q")
+        self._state_lists = self._lists(view, state_starts, state_ids, state_qprobs, state_count)
+
+    @staticmethod
+    def _lists(view, starts_offset, ids_offset, qprobs_offset, count):
+        starts = view[starts_offset:starts_offset + 4 * (count + 1)].cast("I")
+        total = starts[count]
+        return (starts, view[ids_offset:ids_offset + 4 * total].cast("I"),
+                view[qprobs_offset:qprobs_offset + total])
+
+    def word(self, index):
+        return self._words.key(index).decode("utf-8")
+
+    def word_id(self, word):
+        return self._words.find(word.encode("utf-8"))
+
+    def _entries(self, lists, index):
+        starts, ids, qprobs = lists
+        return [(self.word(ids[i]), dequantize(qprobs[i])) for i in range(starts[index], starts[index + 1])]
+
+    def complete(self, prefix, k=None):
+        """Дополнения префикса: [(слово, вероятность среди слов с этим префиксом)]"""
+        k = k or self.top_k
+        prefix = prefix.lower()
+        if not prefix:
+            return []
+        if len(prefix) <= self.max_prefix:
+            index = self._prefixes.find(prefix.encode("utf-8"))
+            return self._entries(self._prefix_lists, index)[:k] if index >= 0 else []
+
+        # Длинный префикс: диапазон слов в отсортированном словаре
+        key = prefix.encode("utf-8")
+        lo = self._words.lower_bound(key)
+        hi = self._words.lower_bound(key + b"\xff", lo)
+        items = _top_k(((self._counts[i], i) for i in range(lo, hi)), k)
+        total = sum(self._counts[i] for i in range(lo, hi))
+        return [(self.word(i), count / total) for count, i in items]
+
+    def _state(self, key):
+        lo, hi = 0, self.state_count
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if self._keys[middle] < key:
+                lo = middle + 1
+            else:
+                hi = middle
+        return lo if lo < self.state_count and self._keys[lo] == key else -1
+
+    def predict(self, previous_words, k=None):
+        """Следующее слово по двум (или одному) предыдущим: сначала порядок 2, затем откат к порядку 1"""
+        k = k or self.top_k
+        ids = [self.word_id(word.lower()) for word in previous_words[-2:]]
+        if not ids or ids[-1] < 0:
+            return []
+        if len(ids) == 2 and ids[0] >= 0:
+            index = self._state((ids[0] << 32) | ids[1])
+            if index >= 0:
+                return self._entries(self._state_lists, index)[:k]
+        index = self._state((BACKOFF_ID << 32) | ids[-1])
+        return self._entries(self._state_lists, index)[:k] if index >= 0 else []
+
+    def suggest(self, prefix, previous_words=(), k=None):
+        """Дополнения с учетом контекста: сначала предсказанные слова с этим префиксом, затем по частоте"""
+        k = k or self.top_k
+        prefix = prefix.lower()
+        result = [(word, p) for word, p in self.predict(previous_words) if word.startswith(prefix)]
+        seen = {word for word, _ in result}
+        result += [(word, p) for word, p in self.complete(prefix, k) if word not in seen]
+        return result[:k]
+
+    def close(self):
+        self._words.release()
+        self._prefixes.release()
+        for view in (self._counts, self._keys, *self._prefix_lists, *self._state_lists):
+            view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def sample_queries(model, count, seed=42):
+    """Случайные запросы: префиксы частых слов длиной 1..6 и пары предыдущих слов"""
+    rng = random.Random(seed)
+    ids = list(range(model.vocab_size))
+    weights = [model._counts[i] for i in ids]
+    chosen = rng.choices(ids, weights=weights, k=count * 3)
+    prefixes = []
+    for index in chosen[:count]:
+        word = model.word(index)
+        prefixes.append(word[:rng.randint(1, min(6, len(word)))])
+    contexts = [[model.word(a), model.word(b)] for a, b in zip(chosen[count::2], chosen[count + 1::2])]
+    return prefixes, contexts
+
+
+def evaluate(model, paths, k, limit=None):
+    """
+    Качество на отложенном тексте: доля слов, попавших в top-k дополнений после
+    1/2/3 набранных символов (с контекстом двух предыдущих слов), и top-k следующего слова.
+    Для n символов знаменатель - только слова длиннее n (totals[n]): короче дополнять нечего.
+    """
+    hits = Counter()
+    totals = Counter()
+    total = 0
+    next_hits = 0
+    next_total = 0
+    for chunk in word_lists.iter_line_chunks(paths):
+        for line in chunk:
+            tokens = tokenize(line)
+            for position, word in enumerate(tokens):
+                context = tokens[max(0, position - 2):position]
+                for typed in (1, 2, 3):
+                    if typed >= len(word):
+                        break
+                    totals[typed] += 1
+                    if word in (w for w, _ in model.suggest(word[:typed], context, k)):
+                        hits[typed] += 1
+                if context:
+                    next_total += 1
+                    next_hits += word in (w for w, _ in model.predict(context, k))
+                total += 1
+                if limit is not None and total >= limit:
+                    return hits, totals, total, next_hits, next_total
+    return hits, totals, total, next_hits, next_total
+
+
+def benchmark(model, count, seed=42):
+    """Латентность complete/predict/suggest в микросекундах на запрос"""
+    prefixes, contexts = sample_queries(model, count, seed)
+    results = {}
+    for name, run in (
+        ("complete", lambda: [model.complete(prefix) for prefix in prefixes]),
+        ("predict", lambda: [model.predict(context) for context in contexts]),
+        ("suggest", lambda: [model.suggest(prefix[:2], context)
+                             for prefix, context in zip(prefixes, contexts)]),
+    ):
+        start = time.perf_counter()
+        queries = len(run())
+        results[name] = (time.perf_counter() - start) / max(queries, 1) * 1e6
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Офлайн модель автодополнения для AutoCompleteEngine")
+    parser.add_argument("command", choices=("build", "complete", "benchmark"))
+    parser.add_argument("inputs", nargs="+",
+                        help="build: корпуса (файлы, каталоги, glob); complete/benchmark: модель и запросы")
+    parser.add_argument("--output", help=f"файл модели {EXTENSION} для build")
+    parser.add_argument("--vocab", type=int, default=DEFAULT_VOCAB, help="размер словаря (по умолчанию %(default)s)")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K,
+                        help="слов на префикс и на состояние (по умолчанию %(default)s)")
+    parser.add_argument("--max-prefix", type=int, default=DEFAULT_MAX_PREFIX,
+                        help="таблицы для префиксов длиной до N (по умолчанию %(default)s)")
+    parser.add_argument("--min-count", type=int, default=2, help="минимальная частота слова")
+    parser.add_argument("--min-transition-count", type=int, default=2, help="минимальная частота перехода")
+    parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY,
+                        help="счетчиков Misra-Gries на слова/пары/тройки (по умолчанию %(default)s)")
+    parser.add_argument("--count", type=int, default=20_000, help="запросов в benchmark")
+    parser.add_argument("--eval", nargs="+", help="отложенные тексты для оценки качества в benchmark")
+    parser.add_argument("--eval-limit", type=int, default=100_000, help="не больше N слов для оценки")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        if not args.output:
+            parser.error("для build нужен --output")
+        paths = list(word_lists.iter_files(args.inputs))
+        print(f"Файлов: {len(paths)}")
+        counts = ingest(paths, capacity=args.capacity)
+        start = time.perf_counter()
+        words, word_counts, prefixes, states = build_tables(
+            counts, vocab_size=args.vocab, top_k=args.top_k, max_prefix=args.max_prefix,
+            min_count=args.min_count, min_transition_count=args.min_transition_count)
+        write_model(args.output, words, word_counts, prefixes, states, args.top_k, args.max_prefix)
+        print(f"✅ Модель сохранена: {args.output} (слов {len(words)}, префиксов {len(prefixes)}, "
+              f"состояний {len(states)}, {time.perf_counter() - start:.1f} с)")
+        return 0
+
+    path, queries = args.inputs[0], args.inputs[1:]
+    with CompletionModel(path) as model:
+        if args.command == "complete":
+            for query in queries:
+                *context, prefix = query.split(" ")
+                suggestions = model.suggest(prefix, context) if prefix else model.predict(context)
+                formatted = ", ".join(f"{word} ({p:.3f})" for word, p in suggestions)
+                print(f"{query!r}: {formatted or '-'}")
+            return 0
+
+        print(f"Модель: слов {model.vocab_size}, состояний {model.state_count}, top-k {model.top_k}")
+        for name, latency in benchmark(model, args.count).items():
+            print(f"   {name}: {latency:.1f} мкс/запрос")
+        if args.eval:
+            hits, totals, total, next_hits, next_total = evaluate(model, list(word_lists.iter_files(args.eval)),
+                                                          model.top_k, args.eval_limit)
+            print(f"Оценка на {total} словах (top-{model.top_k}):")
+            for typed in (1, 2, 3):
+                print(f"   после {typed} символов: {hits[typed] / max(totals[typed], 1) * 100:.2f}% "
+                      f"(слов длиннее {typed}: {totals[typed]})")
+            print(f"   следующее слово: {next_hits / max(next_total, 1) * 100:.2f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
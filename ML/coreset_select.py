@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Отбор компактного обучающего набора (coreset) с упором на трудные примеры
+
+generate_expanded_dataset.py перемешивает данные и обрезает их случайно
+(dataset[:5000]), поэтому большая часть бюджета уходит на повторы простых
+частых слов, а неоднозначные короткие токены почти не попадают в выборку.
+Скрипт отбирает --budget строк осмысленно:
+    1. Кандидаты - уникальные пары (текст, метка) обучающей части, с числом повторов.
+    2. Быстрый эталонный классификатор (MaxEnt train_model.py, одна эпоха на
+       подвыборке или готовая модель --reference) оценивает каждого кандидата:
+       трудность = 1 - p(верная метка), пограничные - малый отрыв от второй метки.
+    3. Кластеры - MinHash по хешированным символьным n-граммам (ngram_features.py):
+       похожие строки попадают в один кластер, большие кластеры получают меньший вес.
+    4. Бюджет делится между классами (смесь пропорций датасета и равных долей,
+       --class-balance), внутри класса строки выбираются без возвращения с весом
+       (--hard-floor + трудность) * (1 + --length-boost / длина) * повторов^--count-power
+       / размер кластера^--cluster-power (ключи Efraimidis-Spirakis).
+В отчете - точность MaxEnt на отложенной части для полного набора, coreset и
+случайной выборки того же размера, время обучения и число задействованных весов.
+Отложенная часть делится по тексту (хеш строки), а не по строкам файла: датасет
+почти целиком из повторов, и при разбиении по строкам тест совпадал бы с обучением.
+
+    python3 ML/coreset_select.py ML/Data/expanded_dataset.csv --budget 5000 --output ML/Data/coreset.csv
+"""
+
+import argparse
+import hashlib
+import sys
+import time
+
+import numpy as np
+
+import dataset_io
+import ngram_features
+import train_model
+
+DEFAULT_BUDGET = 5000
+DEFAULT_REFERENCE_ROWS = 200_000
+DEFAULT_REFERENCE_BITS = 16
+CLUSTER_BITS = 20
+CLUSTER_ORDERS = (2, 3)
+MINHASH_SEEDS = ((0x2545F491, 0x9E3779B9), (0x6C8E9CF5, 0x7F4A7C15))
+BORDERLINE_MARGIN = 0.2
+SHORT_LENGTH = 3
+
+
+def split_by_text(texts, test_fraction, seed):
+    """Разбиение на train/test по хешу текста: все повторы строки попадают в одну часть"""
+    if test_fraction <= 0:
+        return np.arange(len(texts)), np.zeros(0, dtype=np.int64)
+    salt = seed.to_bytes(8, "little", signed=True)
+    threshold = int(test_fraction * 2 ** 64)
+    bucket = {}
+    in_test = np.empty(len(texts), dtype=bool)
+    for row, text in enumerate(texts):
+        flag = bucket.get(text)
+        if flag is None:
+            digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8, salt=salt).digest()
+            flag = bucket[text] = int.from_bytes(digest, "little") < threshold
+        in_test[row] = flag
+    return np.flatnonzero(~in_test), np.flatnonzero(in_test)
+
+
+def unique_candidates(texts, label_ids, rows):
+    """Уникальные пары (текст, метка) среди rows: (тексты, метки, число повторов)"""
+    index = {}
+    counts = []
+    for row in rows.tolist():
+        key = (texts[row], label_ids[row])
+        position = index.get(key)
+        if position is None:
+            index[key] = len(counts)
+            counts.append(1)
+        else:
+            counts[position] += 1
+    candidate_texts = [text for text, _ in index]
+    candidate_labels = np.fromiter((label for _, label in index), dtype=np.int64, count=len(index))
+    return candidate_texts, candidate_labels, np.array(counts, dtype=np.int64)
+
+
+def reference_model(texts, label_ids, rows, sample_rows, bits, seed):
+    """Быстрая MaxEnt модель: одна эпоха на случайной подвыборке обучающих строк"""
+    rng = np.random.default_rng(seed)
+    if len(rows) > sample_rows:
+        rows = rng.choice(rows, sample_rows, replace=False)
+    model = train_model.MaxEntModel(bits=bits)
+    features = model.features([texts[row] for row in rows.tolist()])
+    train_model.train(model, features, np.asarray(label_ids)[rows], epochs=1, seed=seed, log=lambda *_: None)
+    return model
+
+
+def score(model, texts, labels, batch_size=200_000):
+    """(трудность, отрыв верной метки от лучшей другой) для кандидатов"""
+    hardness = np.empty(len(texts), dtype=np.float64)
+    margin = np.empty(len(texts), dtype=np.float64)
+    for start in range(0, len(texts), batch_size):
+        probs = model.predict_proba(texts[start:start + batch_size])
+        rows = np.arange(len(probs))
+        true = probs[rows, labels[start:start + batch_size]]
+        others = probs.copy()
+        others[rows, labels[start:start + batch_size]] = -1.0
+        hardness[start:start + len(probs)] = 1.0 - true
+        margin[start:start + len(probs)] = true - others.max(axis=1)
+    return hardness, margin
+
+
+def cluster_ids(texts, labels, bits=CLUSTER_BITS, orders=CLUSTER_ORDERS):
+    """
+    Кластеры MinHash: для каждой строки минимум двух хешей ее n-грамм; строки
+    одного класса с одинаковой парой минимумов - один кластер. Возвращает
+    (id кластера, размер кластера строки).
+    """
+    indptr, indices = ngram_features.batch_ngram_ids(texts, bits=bits, orders=orders)
+    counts = np.diff(indptr)
+    nonempty = counts > 0
+    starts = indptr[:-1][nonempty]
+    keys = labels.astype(np.uint64)
+    for multiplier, offset in MINHASH_SEEDS:
+        hashed = (indices.astype(np.uint64) * np.uint64(multiplier) + np.uint64(offset)) & np.uint64(0xFFFFFFFF)
+        minimum = np.zeros(len(texts), dtype=np.uint64)
+        if len(hashed):
+            minimum[nonempty] = np.minimum.reduceat(hashed, starts)
+        keys = keys * np.uint64(0x100000001B3) ^ minimum
+    _, ids, sizes = np.unique(keys, return_inverse=True, return_counts=True)
+    ids = ids.reshape(-1)
+    return ids, sizes[ids]
+
+
+def class_budgets(labels, budget, balance):
+    """Бюджет по классам: (1 - balance) * доля класса + balance * равная доля"""
+    classes = len(dataset_io.LABELS)
+    available = np.bincount(labels, minlength=classes)
+    present = available > 0
+    shares = (1 - balance) * available / max(available.sum(), 1) + balance * present / max(present.sum(), 1)
+    budgets = np.minimum(np.floor(shares * budget).astype(np.int64), available)
+    # Остаток (округление, маленькие классы) - классам, у которых есть еще строки
+    while budgets.sum() < min(budget, available.sum()):
+        spare = available - budgets
+        budgets[np.argmax(spare * shares)] += 1
+    return budgets
+
+
+def select(texts, labels, counts, hardness, clusters_size, budget, seed=5, class_balance=0.5,
+           hard_floor=0.05, length_boost=4.0, cluster_power=0.5, count_power=1.0):
+    """Индексы выбранных кандидатов"""
+    rng = np.random.default_rng(seed)
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.float64, count=len(texts))
+    weights = ((hard_floor + hardness) * (1.0 + length_boost / np.maximum(lengths, 1))
+               * counts ** count_power / clusters_size ** cluster_power)
+    # Efraimidis-Spirakis: top-k по ln(u) / w - выборка без возвращения с весами
+    keys = np.log(rng.random(len(texts))) / np.maximum(weights, 1e-12)
+
+    selected = []
+    for label_id, class_budget in enumerate(class_budgets(labels, budget, class_balance).tolist()):
+        members = np.flatnonzero(labels == label_id)
+        if class_budget <= 0 or not len(members):
+            continue
+        if class_budget < len(members):
+            members = members[np.argpartition(-keys[members], class_budget - 1)[:class_budget]]
+        selected.append(members)
+    return np.sort(np.concatenate(selected)) if selected else np.zeros(0, dtype=np.int64)
+
+
+def fit_and_evaluate(texts, labels, test_features, test_labels, short_mask, bits, epochs, seed):
+    """Обучает MaxEnt на (texts, labels): (точность, точность на коротких, секунды, ненулевых весов)"""
+    model = train_model.MaxEntModel(bits=bits)
+    start = time.perf_counter()
+    features = model.features(texts)
+    train_model.train(model, features, labels, epochs=epochs, seed=seed, log=lambda *_: None)
+    elapsed = time.perf_counter() - start
+    predicted = np.argmax(model.scores(*test_features), axis=1)
+    correct = predicted == test_labels
+    short = float(correct[short_mask].mean()) if short_mask.any() else float("nan")
+    return float(correct.mean()), short, elapsed, int(np.count_nonzero(np.any(model.weights != 0, axis=1)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Отбор coreset с упором на трудные примеры")
+    parser.add_argument("dataset", help="датасет CSV или .bfds")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                        help="строк в итоговом наборе (по умолчанию %(default)s)")
+    parser.add_argument("--output", help="записать выбранные строки (CSV или .bfds)")
+    parser.add_argument("--limit", type=int, default=None, help="читать не больше N строк")
+    parser.add_argument("--reference", help="готовая модель .npz из train_model.py вместо быстрой")
+    parser.add_argument("--reference-rows", type=int, default=DEFAULT_REFERENCE_ROWS,
+                        help="строк для быстрой эталонной модели (по умолчанию %(default)s)")
+    parser.add_argument("--class-balance", type=float, default=0.5,
+                        help="0 - доли классов как в датасете, 1 - поровну (по умолчанию %(default)s)")
+    parser.add_argument("--hard-floor", type=float, default=0.05,
+                        help="вес простых строк относительно трудности (по умолчанию %(default)s)")
+    parser.add_argument("--length-boost", type=float, default=4.0,
+                        help="прибавка веса коротких строк: 1 + N / длина (по умолчанию %(default)s)")
+    parser.add_argument("--cluster-power", type=float, default=0.5,
+                        help="вес делится на размер кластера^N (по умолчанию %(default)s)")
+    parser.add_argument("--count-power", type=float, default=1.0,
+                        help="вес умножается на число повторов^N (по умолчанию %(default)s)")
+    parser.add_argument("--test-fraction", type=float, default=0.2,
+                        help="доля отложенных уникальных текстов для отчета (по умолчанию %(default)s)")
+    parser.add_argument("--bits", type=int, default=ngram_features.DEFAULT_BITS,
+                        help="2^bits весов моделей в отчете (по умолчанию %(default)s)")
+    parser.add_argument("--epochs", type=int, default=5, help="эпох моделей в отчете (по умолчанию %(default)s)")
+    parser.add_argument("--no-report", action="store_true", help="не обучать модели для сравнения")
+    parser.add_argument("--seed", type=int, default=5, help="seed (по умолчанию %(default)s)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    texts, label_ids = dataset_io.load_dataset(args.dataset, limit=args.limit)
+    if not texts:
+        print("❌ Датасет пуст")
+        return 1
+    label_ids = np.asarray(label_ids, dtype=np.int64)
+    test_fraction = 0.0 if args.no_report else args.test_fraction
+    train_rows, test_rows = split_by_text(texts, test_fraction, args.seed)
+    candidates, labels, counts = unique_candidates(texts, label_ids, train_rows)
+    print(f"Строк: {len(texts)}, обучающих: {len(train_rows)}, уникальных кандидатов: {len(candidates)} "
+          f"({time.perf_counter() - start:.1f} с)")
+
+    start = time.perf_counter()
+    if args.reference:
+        reference = train_model.MaxEntModel.load(args.reference)
+    else:
+        reference = reference_model(texts, label_ids, train_rows, args.reference_rows,
+                                    DEFAULT_REFERENCE_BITS, args.seed)
+    hardness, margin = score(reference, candidates, labels)
+    clusters, sizes = cluster_ids(candidates, labels)
+    chosen = select(candidates, labels, counts, hardness, sizes, args.budget, args.seed,
+                    args.class_balance, args.hard_floor, args.length_boost, args.cluster_power, args.count_power)
+    print(f"Оценка и отбор: {time.perf_counter() - start:.1f} с, кластеров {clusters.max() + 1 if len(clusters) else 0}")
+
+    borderline = np.abs(margin) < BORDERLINE_MARGIN
+    lengths = np.fromiter((len(text) for text in candidates), dtype=np.int64, count=len(candidates))
+    print(f"Выбрано {len(chosen)}: трудность {hardness[chosen].mean():.3f} (у всех {hardness.mean():.3f}), "
+          f"пограничных {borderline[chosen].mean() * 100:.1f}% (у всех {borderline.mean() * 100:.1f}%), "
+          f"коротких <= {SHORT_LENGTH} {np.mean(lengths[chosen] <= SHORT_LENGTH) * 100:.1f}% "
+          f"(у всех {np.mean(lengths <= SHORT_LENGTH) * 100:.1f}%)")
+    per_class = np.bincount(labels[chosen], minlength=len(dataset_io.LABELS))
+    print("   по классам: " + ", ".join(f"{label} {count}" for label, count in zip(dataset_io.LABELS, per_class)))
+
+    if args.output:
+        count = dataset_io.write_rows(((candidates[i], dataset_io.LABELS[labels[i]]) for i in chosen.tolist()),
+                                      args.output)
+        print(f"✅ Coreset сохранен: {args.output} ({count} строк)")
+
+    if args.no_report or not len(test_rows):
+        return 0
+
+    model = train_model.MaxEntModel(bits=args.bits)
+    test_texts = [texts[row] for row in test_rows.tolist()]
+    test_features = model.features(test_texts)
+    test_labels = label_ids[test_rows]
+    short_mask = np.fromiter((len(text) <= SHORT_LENGTH for text in test_texts), dtype=bool, count=len(test_texts))
+    rng = np.random.default_rng(args.seed)
+    random_rows = rng.choice(train_rows, min(len(chosen), len(train_rows)), replace=False)
+    variants = (
+        ("полный", [texts[row] for row in train_rows.tolist()], label_ids[train_rows]),
+        ("coreset", [candidates[i] for i in chosen.tolist()], labels[chosen]),
+        ("случайный", [texts[row] for row in random_rows.tolist()], label_ids[random_rows]),
+    )
+    print(f"\nОтложено {len(test_rows)} строк, {len(set(test_texts))} уникальных текстов, не встречаются в обучении "
+          f"(коротких <= {SHORT_LENGTH}: {int(short_mask.sum())})")
+    print(f"{'набор':<10} {'строк':>9} {'точность':>9} {'короткие':>9} {'обучение':>9} {'весов':>8}")
+    for name, variant_texts, variant_labels in variants:
+        accuracy, short, elapsed, used = fit_and_evaluate(variant_texts, variant_labels, test_features,
+                                                          test_labels, short_mask, args.bits,
+                                                          args.epochs, args.seed)
+        print(f"{name:<10} {len(variant_texts):>9} {accuracy * 100:>8.2f}% {short * 100:>8.2f}% "
+              f"{elapsed:>8.1f}с {used:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Индекс дубликатов и конфликтов меток для больших датасетов
+
+generate_expanded_dataset.py выдает одни и те же слова много раз (циклы
+range(12), повторы в списках слов), а короткие строки бывают допустимы в
+нескольких классах: результат layout_switch_ru_to_en может оказаться настоящим
+английским словом. Скрипт строит хэш-индекс (64-битный blake2b текста + метка) по
+CSV или .bfds параллельными чанками и сообщает:
+    - точные дубликаты (одинаковые текст и метка) и коэффициент дублирования по меткам;
+    - тексты с несколькими метками (en / ru_wrong и т.д.) по парам меток;
+    - примеры самых частых дубликатов и конфликтов.
+
+С --output пишет очищенный датасет: повторы пары (текст, метка) обрезаются до
+--keep-duplicates, конфликты разрешаются по --resolve:
+    keep - оставить все метки текста;
+    majority - оставить метку с большинством вхождений (при равенстве текст удаляется);
+    drop - удалить конфликтные тексты целиком.
+Порядок строк сохраняется.
+
+CSV режется на чанки по границам строк, поэтому тексты с переводом строки
+внутри кавычек не поддерживаются (генераторы таких не пишут).
+
+    python3 ML/dataset_conflicts.py ML/Data/expanded_dataset.csv --processes 8
+    python3 ML/dataset_conflicts.py expanded.bfds --output clean.csv --resolve majority
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+import dataset_io
+
+DEFAULT_CHUNK_BYTES = 32 << 20
+DEFAULT_CHUNK_ROWS = 1_000_000
+RESOLVE_MODES = ("keep", "majority", "drop")
+
+
+def text_hash(text):
+    """64-битный ключ индекса: blake2b от UTF-8 текста (одинаков во всех процессах)"""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+# MARK: - Чанки
+
+def csv_chunks(path, chunk_bytes):
+    """Границы чанков CSV [start, end), выровненные по переводам строк"""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        while bounds[-1] < size:
+            f.seek(min(bounds[-1] + chunk_bytes, size))
+            f.readline()
+            bounds.append(min(f.tell(), size))
+    return [("csv", path, start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def binary_chunks(path, chunk_rows):
+    with dataset_io.open_binary(path) as dataset:
+        rows = len(dataset)
+    return [("bfds", path, start, min(start + chunk_rows, rows)) for start in range(0, rows, chunk_rows)]
+
+
+def make_chunks(path, chunk_bytes=DEFAULT_CHUNK_BYTES, chunk_rows=DEFAULT_CHUNK_ROWS):
+    if dataset_io.is_binary(path):
+        return binary_chunks(path, chunk_rows)
+    return csv_chunks(path, chunk_bytes)
+
+
+def iter_chunk_rows(chunk):
+    """
+    (text, label) чанка. Как и dataset_io.iter_csv_rows, строки с неизвестной
+    меткой или неправильным числом колонок пропускаются (вместо них - None,
+    чтобы номера строк во всех проходах совпадали).
+    """
+    kind, path, start, end = chunk
+    if kind == "bfds":
+        with dataset_io.open_binary(path) as dataset:
+            labels = dataset.labels
+            texts = dataset.texts(start, end)
+            for text, label_id in zip(texts, dataset.label_ids[start:end].tolist()):
+                label = labels[label_id]
+                yield (text, label) if label in dataset_io.LABEL_IDS else None
+        return
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start).decode("utf-8", errors="replace")
+    reader = csv.reader(io.StringIO(data, newline=""))
+    if start == 0:
+        header = next(reader, None)
+        if header is not None and [column.strip() for column in header[:2]] != ["text", "label"]:
+            yield (header[0], header[1]) if len(header) == 2 and header[1] in dataset_io.LABEL_IDS else None
+    for row in reader:
+        yield (row[0], row[1]) if len(row) == 2 and row[1] in dataset_io.LABEL_IDS else None
+
+
+def _index_chunk(chunk):
+    """Хэши текстов и id меток чанка; пропущенные строки - метка 255"""
+    hashes = []
+    labels = []
+    for row in iter_chunk_rows(chunk):
+        if row is None:
+            hashes.append(0)
+            labels.append(255)
+        else:
+            hashes.append(text_hash(row[0]))
+            labels.append(dataset_io.LABEL_IDS[row[1]])
+    return np.array(hashes, dtype=np.uint64), np.array(labels, dtype=np.uint8)
+
+
+def build_index(chunks, processes=None):
+    """(хэши uint64[rows], метки uint8[rows]) всех строк в порядке файла"""
+    if processes == 1 or len(chunks) <= 1:
+        parts = [_index_chunk(chunk) for chunk in chunks]
+    else:
+        with Pool(processes) as pool:
+            parts = pool.map(_index_chunk, chunks, chunksize=1)
+    if not parts:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.uint8)
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+
+# MARK: - Анализ
+
+class ConflictIndex:
+    """Сгруппированный индекс: уникальные пары (текст, метка) и тексты с их метками"""
+
+    def __init__(self, hashes, labels):
+        self.rows = len(labels)
+        valid = labels != 255
+        self.skipped = int(self.rows - valid.sum())
+        self.row_ids = np.flatnonzero(valid)
+        hashes = hashes[valid]
+        labels = labels[valid]
+
+        # Стабильная сортировка по (хэш, метка): внутри группы - порядок файла
+        order = np.lexsort((labels, hashes))
+        self.order = self.row_ids[order]
+        sorted_hashes = hashes[order]
+        sorted_labels = labels[order]
+        pair_start = np.ones(len(order), dtype=bool)
+        pair_start[1:] = (sorted_hashes[1:] != sorted_hashes[:-1]) | (sorted_labels[1:] != sorted_labels[:-1])
+        self.pair_first = np.flatnonzero(pair_start)
+        self.pair_hashes = sorted_hashes[self.pair_first]
+        self.pair_labels = sorted_labels[self.pair_first]
+        self.pair_counts = np.diff(np.append(self.pair_first, len(order)))
+        # Номер вхождения строки внутри своей пары (0 - первое в файле)
+        pair_ids = np.cumsum(pair_start) - 1
+        self.occurrence = np.arange(len(order)) - self.pair_first[pair_ids]
+        self.row_pair = pair_ids
+
+        # Тексты: голоса меток по уникальным хэшам
+        self.text_hashes, text_ids = np.unique(self.pair_hashes, return_inverse=True)
+        self.pair_text = text_ids
+        self.votes = np.zeros((len(self.text_hashes), len(dataset_io.LABELS)), dtype=np.int64)
+        np.add.at(self.votes, (text_ids, self.pair_labels), self.pair_counts)
+
+    def label_stats(self):
+        """{метка: (строк, уникальных текстов)}"""
+        stats = {}
+        for label_id, label in enumerate(dataset_io.LABELS):
+            mask = self.pair_labels == label_id
+            stats[label] = (int(self.pair_counts[mask].sum()), int(mask.sum()))
+        return stats
+
+    def conflict_mask(self):
+        """Маска текстов с больше чем одной меткой"""
+        return (self.votes > 0).sum(axis=1) > 1
+
+    def conflict_pairs(self):
+        """{(метка, метка): число текстов}"""
+        present = self.votes > 0
+        result = {}
+        for a in range(len(dataset_io.LABELS)):
+            for b in range(a + 1, len(dataset_io.LABELS)):
+                count = int((present[:, a] & present[:, b]).sum())
+                if count:
+                    result[(dataset_io.LABELS[a], dataset_io.LABELS[b])] = count
+        return result
+
+    def keep_mask(self, keep_duplicates=1, resolve="keep"):
+        """Маска строк файла для очищенного датасета"""
+        keep_pairs = np.ones(len(self.pair_hashes), dtype=bool)
+        if resolve != "keep":
+            conflicts = self.conflict_mask()
+            if resolve == "drop":
+                keep_pairs &= ~conflicts[self.pair_text]
+            else:
+                best = self.votes.max(axis=1)
+                ties = (self.votes == best[:, None]).sum(axis=1) > 1
+                majority = self.votes.argmax(axis=1)
+                keep_pairs &= ~ties[self.pair_text] & (self.pair_labels == majority[self.pair_text])
+
+        keep_sorted = keep_pairs[self.row_pair]
+        if keep_duplicates > 0:
+            keep_sorted &= self.occurrence < keep_duplicates
+        mask = np.zeros(self.rows, dtype=bool)
+        mask[self.order[keep_sorted]] = True
+        return mask
+
+    def top_duplicates(self, count):
+        """Хэши и метки самых повторяющихся пар: [(хэш, метка, вхождений)]"""
+        top = np.argsort(-self.pair_counts, kind="stable")[:count]
+        return [(int(self.pair_hashes[i]), dataset_io.LABELS[self.pair_labels[i]], int(self.pair_counts[i]))
+                for i in top if self.pair_counts[i] > 1]
+
+    def top_conflicts(self, count):
+        """Самые частые конфликтные тексты: [(хэш, {метка: вхождений})]"""
+        conflicts = np.flatnonzero(self.conflict_mask())
+        totals = self.votes[conflicts].sum(axis=1)
+        top = conflicts[np.argsort(-totals, kind="stable")[:count]]
+        return [(int(self.text_hashes[i]),
+                 {label: int(v) for label, v in zip(dataset_io.LABELS, self.votes[i]) if v}) for i in top]
+
+
+def find_texts(chunks, hashes):
+    """Тексты по хэшам (для примеров в отчете): последовательный проход до первых находок"""
+    wanted = set(hashes)
+    found = {}
+    for chunk in chunks:
+        for row in iter_chunk_rows(chunk):
+            if row is None:
+                continue
+            key = text_hash(row[0])
+            if key in wanted:
+                found[key] = row[0]
+                wanted.discard(key)
+                if not wanted:
+                    return found
+    return found
+
+
+def iter_kept_rows(chunks, mask):
+    """Строки файла, отмеченные маской (нумерация как в build_index)"""
+    row_index = 0
+    for chunk in chunks:
+        for row in iter_chunk_rows(chunk):
+            if row is not None and mask[row_index]:
+                yield row
+            row_index += 1
+
+
+def print_report(index, chunks, examples):
+    print(f"Строк: {index.rows}, пропущено битых: {index.skipped}, "
+          f"уникальных пар (текст, метка): {len(index.pair_hashes)}, уникальных текстов: {len(index.text_hashes)}")
+    total_rows = int(index.pair_counts.sum())
+    print(f"Точных дубликатов: {total_rows - len(index.pair_hashes)} "
+          f"({(total_rows - len(index.pair_hashes)) / max(total_rows, 1) * 100:.1f}%)")
+    print("\nДублирование по меткам:")
+    for label, (rows, unique) in index.label_stats().items():
+        if rows:
+            print(f"   {label}: {rows} строк, {unique} уникальных, коэффициент {rows / unique:.2f}")
+
+    conflicts = int(index.conflict_mask().sum())
+    print(f"\nТекстов с конфликтом меток: {conflicts} "
+          f"({conflicts / max(len(index.text_hashes), 1) * 100:.1f}% уникальных)")
+    for (a, b), count in sorted(index.conflict_pairs().items(), key=lambda item: -item[1]):
+        print(f"   {a} / {b}: {count}")
+
+    if examples <= 0:
+        return
+    duplicates = index.top_duplicates(examples)
+    top_conflicts = index.top_conflicts(examples)
+    texts = find_texts(chunks, [h for h, _, _ in duplicates] + [h for h, _ in top_conflicts])
+    if duplicates:
+        print("\nСамые частые дубликаты:")
+        for key, label, count in duplicates:
+            print(f"   {texts.get(key, '?')!r} [{label}]: {count}")
+    if top_conflicts:
+        print("\nСамые частые конфликты:")
+        for key, votes in top_conflicts:
+            summary = ", ".join(f"{label} {count}" for label, count in votes.items())
+            print(f"   {texts.get(key, '?')!r}: {summary}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Дубликаты и конфликты меток в датасете")
+    parser.add_argument("dataset", help="датасет CSV или .bfds")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="процессов для индексации (по умолчанию - число CPU)")
+    parser.add_argument("--chunk-mb", type=int, default=DEFAULT_CHUNK_BYTES >> 20,
+                        help="размер чанка CSV в МБ (по умолчанию %(default)s)")
+    parser.add_argument("--examples", type=int, default=10,
+                        help="примеров дубликатов и конфликтов в отчете (по умолчанию %(default)s)")
+    parser.add_argument("--output", help="записать очищенный датасет (CSV или .bfds)")
+    parser.add_argument("--keep-duplicates", type=int, default=1,
+                        help="сколько повторов пары (текст, метка) оставлять, 0 - все (по умолчанию %(default)s)")
+    parser.add_argument("--resolve", choices=RESOLVE_MODES, default="majority",
+                        help="разрешение конфликтов меток в --output (по умолчанию %(default)s)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.dataset):
+        print(f"❌ Датасет не найден: {args.dataset}")
+        return 1
+
+    start = time.perf_counter()
+    chunks = make_chunks(args.dataset, max(1, args.chunk_mb) << 20)
+    hashes, labels = build_index(chunks, args.processes)
+    index = ConflictIndex(hashes, labels)
+    elapsed = time.perf_counter() - start
+    print(f"Индекс: {len(chunks)} чанков, {elapsed:.1f} с ({index.rows / max(elapsed, 1e-9):,.0f} строк/с)\n")
+    print_report(index, chunks, args.examples)
+
+    if args.output:
+        mask = index.keep_mask(args.keep_duplicates, args.resolve)
+        count = dataset_io.write_rows(iter_kept_rows(chunks, mask), args.output)
+        print(f"\n✅ Очищенный датасет сохранен: {args.output} ({count} из {index.rows} строк, "
+              f"--resolve {args.resolve})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Чтение и запись датасетов BabylonFish ML (text,label) для Python инструментов
+
+Метки те же, что у BabylonFishClassifier: en, ru, ru_wrong.
+
+Два формата:
+- CSV с заголовком text,label (как читает CreateML в train_model.swift);
+- бинарный колоночный .bfds: UTF-8 блоб всех текстов, массив смещений uint32,
+  массив id меток uint8 и небольшой заголовок. Читается через mmap без копирования:
+  смещения и метки - numpy-представления прямо над файлом.
+
+Раскладка .bfds (little-endian):
+    заголовок HEADER_SIZE байт: magic "BFDS", версия, размер заголовка, число строк,
+        смещение и размер блоба, смещения массивов offsets/labels/имен меток
+    блоб текстов UTF-8
+    offsets uint32[rows + 1] (выровнены на 4 байта) - границы текстов в блобе
+    labels uint8[rows]
+    имена меток через запятую (UTF-8)
+
+Конвертеры:
+
+    python3 ML/dataset_io.py to-binary ML/Data/expanded_dataset.csv expanded.bfds
+    python3 ML/dataset_io.py to-csv expanded.bfds expanded.csv
+"""
+
+import argparse
+import csv
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+LABELS = ("en", "ru", "ru_wrong")
+LABEL_IDS = {label: index for index, label in enumerate(LABELS)}
+
+# В датасетах встречаются длинные фразы, стандартного лимита csv может не хватить
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+
+def iter_csv_rows(path):
+    """
+    Потоково читает CSV с заголовком text,label.
+    Строки с неизвестной меткой или неправильным числом колонок пропускаются.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        if [column.strip() for column in header[:2]] != ["text", "label"]:
+            # Файл без заголовка: первая строка - тоже данные
+            if len(header) == 2 and header[1] in LABEL_IDS:
+                yield header[0], header[1]
+        for row in reader:
+            if len(row) != 2 or row[1] not in LABEL_IDS:
+                continue
+            yield row[0], row[1]
+
+
+def write_csv(rows, path, lineterminator="\r\n"):
+    """Пишет (text, label) в CSV с правильным экранированием, возвращает число строк"""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator=lineterminator)
+        writer.writerow(["text", "label"])
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+# MARK: - Бинарный формат .bfds
+
+BINARY_MAGIC = b"BFDS"
+BINARY_VERSION = 1
+BINARY_EXTENSION = ".bfds"
+HEADER_FORMAT = "<4sHHQQQQQQI"
+HEADER_SIZE = 64
+MAX_BLOB_SIZE = 2 ** 32 - 1
+
+
+class BinaryDatasetWriter:
+    """
+    Потоковая запись .bfds: тексты сразу пишутся в блоб, в памяти остаются
+    только смещения (4 байта на строку) и метки (1 байт на строку).
+    """
+
+    def __init__(self, path, labels=LABELS):
+        self.path = path
+        self.labels = tuple(labels)
+        self.label_ids = {label: index for index, label in enumerate(self.labels)}
+        self.offsets = array("I", [0])
+        self.label_array = bytearray()
+        self.blob_size = 0
+        self.file = open(path, "wb")
+        self.file.write(b"\0" * HEADER_SIZE)
+
+    def write(self, text, label):
+        data = text.encode("utf-8")
+        if self.blob_size + len(data) > MAX_BLOB_SIZE:
+            raise ValueError("Блоб текстов .bfds не может быть больше 4 ГБ (смещения uint32)")
+        self.file.write(data)
+        self.blob_size += len(data)
+        self.offsets.append(self.blob_size)
+        self.label_array.append(self.label_ids[label])
+
+    def writerows(self, rows):
+        for text, label in rows:
+            self.write(text, label)
+
+    def append_dataset(self, dataset):
+        """Дописывает открытый BinaryDataset целиком: блоб копируется байтами, смещения сдвигаются"""
+        if self.blob_size + len(dataset.blob) > MAX_BLOB_SIZE:
+            raise ValueError("Блоб текстов .bfds не может быть больше 4 ГБ (смещения uint32)")
+        remap = bytes(self.label_ids[label] for label in dataset.labels)
+        self.file.write(dataset.blob)
+        self.offsets.extend((dataset.offsets[1:].astype("int64") + self.blob_size).tolist())
+        self.label_array.extend(dataset.label_ids.tobytes().translate(remap.ljust(256, b"\0")))
+        self.blob_size += len(dataset.blob)
+
+    def close(self):
+        if self.file is None:
+            return
+        self.file.write(b"\0" * (-self.file.tell() % 4))
+        offsets_offset = self.file.tell()
+        if sys.byteorder != "little":
+            self.offsets.byteswap()
+        self.file.write(self.offsets.tobytes())
+        labels_offset = self.file.tell()
+        self.file.write(self.label_array)
+        names_offset = self.file.tell()
+        names = ",".join(self.labels).encode("utf-8")
+        self.file.write(names)
+
+        header = struct.pack(HEADER_FORMAT, BINARY_MAGIC, BINARY_VERSION, HEADER_SIZE,
+                             len(self.label_array), HEADER_SIZE, self.blob_size,
+                             offsets_offset, labels_offset, names_offset, len(names))
+        self.file.seek(0)
+        self.file.write(header.ljust(HEADER_SIZE, b"\0"))
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_binary(rows, path, labels=LABELS):
+    """Пишет (text, label) в .bfds, возвращает число строк"""
+    with BinaryDatasetWriter(path, labels=labels) as writer:
+        writer.writerows(rows)
+        return len(writer.label_array)
+
+
+class BinaryDataset:
+    """
+    .bfds, открытый через mmap. offsets и label_ids - numpy-массивы над файлом
+    (без копирования), тексты декодируются по требованию.
+    """
+
+    def __init__(self, path):
+        import numpy as np
+
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, rows, blob_offset, blob_size, offsets_offset,
+         labels_offset, names_offset, names_size) = struct.unpack_from(HEADER_FORMAT, self._mmap)
+        if magic != BINARY_MAGIC:
+            raise ValueError(f"{path}: не файл .bfds")
+        if version != BINARY_VERSION:
+            raise ValueError(f"{path}: неподдерживаемая версия .bfds {version}")
+
+        self.labels = tuple(bytes(self._mmap[names_offset:names_offset + names_size]).decode("utf-8").split(","))
+        self.blob = memoryview(self._mmap)[blob_offset:blob_offset + blob_size]
+        self.offsets = np.frombuffer(self._mmap, dtype="<u4", count=rows + 1, offset=offsets_offset)
+        self.label_ids = np.frombuffer(self._mmap, dtype=np.uint8, count=rows, offset=labels_offset)
+
+    def __len__(self):
+        return len(self.label_ids)
+
+    def text(self, index):
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return bytes(self.blob[start:end]).decode("utf-8")
+
+    def texts(self, start=0, stop=None):
+        """Тексты строк [start, stop) одним декодированием блоба"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return []
+        offsets = self.offsets[start:stop + 1].tolist()
+        base = offsets[0]
+        chunk = bytes(self.blob[base:offsets[-1]])
+        return [chunk[a - base:b - base].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+
+    def __iter__(self):
+        labels = self.labels
+        chunk_size = 100_000
+        for start in range(0, len(self), chunk_size):
+            texts = self.texts(start, start + chunk_size)
+            for text, label_id in zip(texts, self.label_ids[start:start + chunk_size].tolist()):
+                yield text, labels[label_id]
+
+    def close(self):
+        # numpy-представления держат буфер mmap, поэтому закрываем только если их больше нет
+        self.offsets = self.label_ids = self.blob = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def concat_binary(part_paths, output_path, remove_parts=True):
+    """Склеивает .bfds файлы в один (для шардированной генерации)"""
+    with BinaryDatasetWriter(output_path) as writer:
+        for path in part_paths:
+            with open_binary(path) as part:
+                writer.append_dataset(part)
+            if remove_parts:
+                os.remove(path)
+
+
+def is_binary(path):
+    with open(path, "rb") as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def open_binary(path):
+    return BinaryDataset(path)
+
+
+def iter_rows(path):
+    """(text, label) из CSV или .bfds (формат определяется по содержимому)"""
+    if is_binary(path):
+        with open_binary(path) as dataset:
+            yield from dataset
+    else:
+        yield from iter_csv_rows(path)
+
+
+def write_rows(rows, path):
+    """Пишет (text, label) в .bfds, если у пути расширение .bfds, иначе в CSV"""
+    if path.endswith(BINARY_EXTENSION):
+        return write_binary(rows, path)
+    return write_csv(rows, path)
+
+
+def load_dataset(path, limit=None):
+    """
+    Загружает датасет целиком (CSV или .bfds): (список текстов, список id меток).
+    limit - прочитать не больше limit строк.
+    """
+    if is_binary(path):
+        with open_binary(path) as dataset:
+            stop = len(dataset) if limit is None else min(limit, len(dataset))
+            ids = [LABEL_IDS[label] for label in dataset.labels]
+            texts = dataset.texts(0, stop)
+            label_ids = [ids[i] for i in dataset.label_ids[:stop].tolist()]
+        return texts, label_ids
+
+    texts = []
+    label_ids = []
+    for text, label in iter_csv_rows(path):
+        texts.append(text)
+        label_ids.append(LABEL_IDS[label])
+        if limit is not None and len(texts) >= limit:
+            break
+    return texts, label_ids
+
+
+def load_word_list(path, limit=None):
+    """
+    Читает список слов: одно слово в строке, опционально через табуляцию частота
+    ("слово\\tчастота"). Порядок строк сохраняется (частотные списки - по убыванию).
+    Пустые строки и строки, начинающиеся с "#", пропускаются.
+    """
+    words = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            words.append(line.split("\t", 1)[0])
+            if limit is not None and len(words) >= limit:
+                break
+    return words
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Конвертация датасетов CSV <-> .bfds")
+    parser.add_argument("command", choices=("to-binary", "to-csv", "info"))
+    parser.add_argument("input", help="входной файл")
+    parser.add_argument("output", nargs="?", help="выходной файл")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        if is_binary(args.input):
+            with open_binary(args.input) as dataset:
+                print(f"{args.input}: .bfds, строк {len(dataset)}, блоб {len(dataset.blob)} байт, "
+                      f"метки {', '.join(dataset.labels)}")
+        else:
+            print(f"{args.input}: CSV, {os.path.getsize(args.input)} байт")
+        return 0
+
+    if not args.output:
+        parser.error("нужен выходной файл")
+    if args.command == "to-binary":
+        count = write_binary(iter_rows(args.input), args.output)
+    else:
+        count = write_csv(iter_rows(args.input), args.output)
+    print(f"✅ {args.input} -> {args.output}: {count} строк")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
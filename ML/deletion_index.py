@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Индекс удалений в стиле SymSpell для исправления опечаток (замена TypoCorrector.generateSuggestionsManually)
+
+Сейчас TypoCorrector на каждое слово порождает тысячи строк-кандидатов
+(generateReplacements/Deletions/Insertions/Transpositions), проверяет каждую по
+словарю и ранжирует через calculateEditDistance. Индекс удалений переносит эту
+работу в офлайн: для каждого слова словаря заранее строятся все варианты с
+удалением до --max-distance символов (из первых --prefix-length символов),
+и у запроса достаточно построить его собственные удаления и сделать по одной
+пробе хеш-таблицы на каждое. Кандидаты проверяются расстоянием Дамерау-Левенштейна
+(с перестановкой соседних символов) и ранжируются по (расстояние, -частота).
+
+Раскладка файла .bfsi (little-endian, секции выровнены на 8 байт):
+    заголовок HEADER_SIZE байт: magic "BFSI", версия, размер заголовка, число слов,
+        число записей, max_distance, prefix_length, bucket_bits, смещения секций
+    слова UTF-8 подряд, word_offsets uint32[words + 1]
+    counts uint32[words] - частоты, languages uint8[words] - индекс в LANGUAGES
+    buckets uint32[2^bucket_bits + 1] - начало корзины в массиве записей
+    fingerprints uint32[entries] - младшие 32 бита хеша удаления (старшие - номер корзины)
+    postings uint32[entries] - номер слова для записи
+Хеш удаления - 64-битный blake2b от UTF-8. Записи отсортированы по хешу, поэтому
+корзина - непрерывный отрезок, а проба - сравнение нескольких отпечатков.
+Ложные совпадения отпечатков отсеиваются проверкой расстояния.
+
+benchmark сравнивает индекс с портом generateSuggestionsManually на одинаковых
+опечатках. Главная метрика - работа на слово: в Swift каждый кандидат - вызов
+checkSpelling системного словаря, а в порте это поиск в set, поэтому время
+порта здесь сильно занижено.
+
+    python3 ML/deletion_index.py build typo.bfsi --en-words ML/Data/words_en.tsv --ru-words ML/Data/words_ru.tsv
+    python3 ML/deletion_index.py lookup typo.bfsi ghbdtn ghbdtn превет
+    python3 ML/deletion_index.py benchmark typo.bfsi --en-words ML/Data/words_en.tsv --ru-words ML/Data/words_ru.tsv
+"""
+
+import argparse
+import hashlib
+import mmap
+import random
+import struct
+import sys
+import time
+
+import word_lists
+
+MAGIC = b"BFSI"
+VERSION = 1
+EXTENSION = ".bfsi"
+HEADER_FORMAT = "<4sHHIIBBBxQQQQQQQ"
+HEADER_SIZE = 96
+LANGUAGES = ("en", "ru")
+DEFAULT_MAX_DISTANCE = 2
+DEFAULT_PREFIX_LENGTH = 7
+
+
+def delete_hash(key):
+    """64-битный хеш строки удаления"""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def deletes(word, max_distance):
+    """Само слово и все его варианты с удалением 1..max_distance символов (без пустой строки)"""
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        generated = set()
+        for item in frontier:
+            if len(item) > 1:
+                for i in range(len(item)):
+                    generated.add(item[:i] + item[i + 1:])
+        generated -= result
+        result |= generated
+        frontier = generated
+    return result
+
+
+def edit_distance(a, b, max_distance):
+    """
+    Расстояние Дамерау-Левенштейна (optimal string alignment): замена, вставка,
+    удаление и перестановка соседних символов. Больше max_distance - возвращается max_distance + 1.
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    # Общие начало и конец не влияют на расстояние
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a = a[start:len(a) - end]
+    b = b[start:len(b) - end]
+    if not a or not b:
+        return min(len(a) + len(b), max_distance + 1)
+    # Считаются только клетки в полосе |i - j| <= max_distance, остальные заведомо больше порога
+    limit = max_distance + 1
+    width = len(b)
+    previous2 = None
+    previous = [j if j <= max_distance else limit for j in range(width + 1)]
+    for i in range(1, len(a) + 1):
+        current = [limit] * (width + 1)
+        if i <= max_distance:
+            current[0] = i
+        ch = a[i - 1]
+        row_min = limit
+        for j in range(max(1, i - max_distance), min(width, i + max_distance) + 1):
+            value = previous[j - 1] + (ch != b[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if (previous2 is not None and j > 1 and ch == b[j - 2] and a[i - 2] == b[j - 1]
+                    and previous2[j - 2] + 1 < value):
+                value = previous2[j - 2] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return limit
+        previous2, previous = previous, current
+    return min(previous[-1], limit)
+
+
+def _align(f):
+    position = f.tell()
+    if position % 8:
+        f.write(b"\0" * (8 - position % 8))
+    return f.tell()
+
+
+def build_index(words, output_path, max_distance=DEFAULT_MAX_DISTANCE,
+                prefix_length=DEFAULT_PREFIX_LENGTH, bucket_bits=None):
+    """
+    words - последовательность (слово, частота, язык); повторы слова одного языка
+    суммируются. Возвращает (слов, записей).
+    """
+    import numpy as np
+
+    merged = {}
+    for word, count, language in words:
+        key = (word, LANGUAGES.index(language))
+        merged[key] = merged.get(key, 0) + count
+    entries = sorted(merged.items(), key=lambda item: (-item[1], item[0]))
+
+    hashes = []
+    postings = []
+    for index, ((word, _), _) in enumerate(entries):
+        for key in deletes(word[:prefix_length], max_distance):
+            hashes.append(delete_hash(key))
+            postings.append(index)
+
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    postings = np.asarray(postings, dtype=np.uint32)
+    order = np.lexsort((postings, hashes))
+    hashes = hashes[order]
+    postings = postings[order]
+
+    if bucket_bits is None:
+        # В среднем 2-4 записи на корзину
+        bucket_bits = max(8, int(np.ceil(np.log2(max(len(hashes), 1) / 2))))
+    buckets = (hashes >> np.uint64(64 - bucket_bits)).astype(np.int64)
+    bucket_starts = np.searchsorted(buckets, np.arange((1 << bucket_bits) + 1), side="left").astype(np.uint32)
+    fingerprints = (hashes & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+    blob = bytearray()
+    word_offsets = [0]
+    for (word, _), _ in entries:
+        blob += word.encode("utf-8")
+        word_offsets.append(len(blob))
+
+    with open(output_path, "wb") as f:
+        f.write(b"\0" * HEADER_SIZE)
+        words_offset = f.tell()
+        f.write(blob)
+        offsets_offset = _align(f)
+        f.write(np.asarray(word_offsets, dtype="<u4").tobytes())
+        counts_offset = _align(f)
+        f.write(np.asarray([min(count, 0xFFFFFFFF) for _, count in entries], dtype="<u4").tobytes())
+        languages_offset = _align(f)
+        f.write(np.asarray([language for (_, language), _ in entries], dtype=np.uint8).tobytes())
+        buckets_offset = _align(f)
+        f.write(bucket_starts.astype("<u4").tobytes())
+        fingerprints_offset = _align(f)
+        f.write(fingerprints.astype("<u4").tobytes())
+        postings_offset = _align(f)
+        f.write(postings.astype("<u4").tobytes())
+
+        header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, HEADER_SIZE, len(entries), len(hashes),
+                             max_distance, prefix_length, bucket_bits, words_offset, offsets_offset,
+                             counts_offset, languages_offset, buckets_offset, fingerprints_offset,
+                             postings_offset)
+        f.seek(0)
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+    return len(entries), len(hashes)
+
+
+class DeletionIndex:
+    """
+    Индекс .bfsi, открытый через mmap. Массивы - memoryview над файлом
+    (без NumPy и без копирования), слова декодируются по требованию.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, word_count, entry_count, self.max_distance, self.prefix_length,
+         self.bucket_bits, words_offset, offsets_offset, counts_offset, languages_offset,
+         buckets_offset, fingerprints_offset, postings_offset) = struct.unpack_from(HEADER_FORMAT, self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: не файл {EXTENSION}")
+        if version != VERSION:
+            raise ValueError(f"{path}: неподдерживаемая версия {EXTENSION} {version}")
+
+        view = memoryview(self._mmap)
+        self.word_count = word_count
+        self.entry_count = entry_count
+        self._blob = view[words_offset:offsets_offset]
+        self._word_offsets = view[offsets_offset:offsets_offset + 4 * (word_count + 1)].cast("I")
+        self.counts = view[counts_offset:counts_offset + 4 * word_count].cast("I")
+        self.languages = view[languages_offset:languages_offset + word_count]
+        self._buckets = view[buckets_offset:buckets_offset + 4 * ((1 << self.bucket_bits) + 1)].cast("I")
+        self._fingerprints = view[fingerprints_offset:fingerprints_offset + 4 * entry_count].cast("I")
+        self._postings = view[postings_offset:postings_offset + 4 * entry_count].cast("I")
+        self._shift = 64 - self.bucket_bits
+        self.probes = 0
+        self.verified = 0
+
+    def __len__(self):
+        return self.word_count
+
+    def word(self, index):
+        return bytes(self._blob[self._word_offsets[index]:self._word_offsets[index + 1]]).decode("utf-8")
+
+    def language(self, index):
+        return LANGUAGES[self.languages[index]]
+
+    def probe(self, key):
+        """Номера слов, у которых есть удаление с таким же хешем, как у key"""
+        self.probes += 1
+        h = delete_hash(key)
+        bucket = h >> self._shift
+        fingerprint = h & 0xFFFFFFFF
+        fingerprints = self._fingerprints
+        return [self._postings[i]
+                for i in range(self._buckets[bucket], self._buckets[bucket + 1])
+                if fingerprints[i] == fingerprint]
+
+    def lookup(self, word, max_distance=None, language=None, top=5):
+        """
+        Исправления для word: [(слово, язык, расстояние, частота)] по (расстояние, -частота).
+        language - "en"/"ru" или None (оба языка).
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        max_distance = min(max_distance, self.max_distance)
+        language_id = None if language is None else LANGUAGES.index(language)
+
+        candidates = set()
+        for key in deletes(word[:self.prefix_length], max_distance):
+            candidates.update(self.probe(key))
+
+        # Слова в файле отсортированы по убыванию частоты: когда набрано top результатов,
+        # следующий кандидат попадет в них, только если он строго ближе худшего из них
+        results = []
+        bound = max_distance
+        for index in sorted(candidates):
+            if language_id is not None and self.languages[index] != language_id:
+                continue
+            candidate = self.word(index)
+            self.verified += 1
+            distance = edit_distance(word, candidate, bound)
+            if distance <= bound:
+                results.append((candidate, LANGUAGES[self.languages[index]], distance, self.counts[index]))
+                if top and len(results) >= top:
+                    results.sort(key=lambda item: (item[2], -item[3], item[0]))
+                    del results[top:]
+                    bound = results[-1][2] - 1
+                    if bound < 0:
+                        break
+        results.sort(key=lambda item: (item[2], -item[3], item[0]))
+        return results[:top] if top else results
+
+    def close(self):
+        for name in ("_blob", "_word_offsets", "counts", "languages", "_buckets", "_fingerprints", "_postings"):
+            getattr(self, name).release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Порт TypoCorrector.generateSuggestionsManually для сравнения
+
+QWERTY_NEIGHBOURS = {
+    "q": "wa", "w": "qes", "e": "wrd", "r": "etf", "t": "ryg", "y": "tuh",
+    "u": "yij", "i": "uok", "o": "ipl", "p": "o[", "a": "qwsz", "s": "awedxz",
+    "d": "serfcx", "f": "drtgvc", "g": "ftyhbv", "h": "gyujnb",
+    "j": "huikmn", "k": "jiol,m", "l": "kop;.,", "z": "asx", "x": "zsdc",
+    "c": "xdfv", "v": "cfgb", "b": "vghn", "n": "bhjm", "m": "njk",
+}
+INSERT_ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+
+
+def manual_candidates(word):
+    """Кандидаты как в generateSuggestionsManually: замены по соседям QWERTY, удаления, вставки a-z, перестановки"""
+    candidates = set()
+    for i, ch in enumerate(word):
+        for similar in QWERTY_NEIGHBOURS.get(ch, ""):
+            candidates.add(word[:i] + similar + word[i + 1:])
+        candidates.add(word[:i] + word[i + 1:])
+    for i in range(len(word) + 1):
+        for ch in INSERT_ALPHABET:
+            candidates.add(word[:i] + ch + word[i:])
+    for i in range(len(word) - 1):
+        candidates.add(word[:i] + word[i + 1] + word[i] + word[i + 2:])
+    return candidates
+
+
+def manual_score(suggestion, original):
+    """calculateSuggestionScore без контекста"""
+    distance = edit_distance(original, suggestion, max(len(original), len(suggestion)))
+    score = (1.0 - distance / max(len(original), len(suggestion))) * 0.4
+    score += (1.0 - abs(len(original) - len(suggestion)) / max(len(original), 1)) * 0.2
+    if original[:1] and original[:1] == suggestion[:1]:
+        score += 0.1
+    return score
+
+
+def manual_lookup(word, dictionary, top=5):
+    """Возвращает (предложения, число сгенерированных кандидатов)"""
+    candidates = manual_candidates(word)
+    found = [candidate for candidate in candidates if candidate in dictionary]
+    found.sort(key=lambda suggestion: (-manual_score(suggestion, word), suggestion))
+    return found[:top], len(candidates)
+
+
+def make_typo(word, rng, alphabet):
+    """Одна случайная правка: замена, удаление, вставка или перестановка"""
+    i = rng.randrange(len(word))
+    kind = rng.randrange(4) if len(word) > 1 else 2
+    if kind == 0:
+        return word[:i] + rng.choice(alphabet) + word[i + 1:]
+    if kind == 1:
+        return word[:i] + word[i + 1:]
+    if kind == 2:
+        return word[:i] + rng.choice(alphabet) + word[i:]
+    i = min(i, len(word) - 2)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def benchmark(index, words, count, seed=42):
+    """
+    Опечатки в случайных словах (по частоте) и поиск исправлений индексом и портом
+    generateSuggestionsManually. Возвращает {метод: метрики}.
+    """
+    rng = random.Random(seed)
+    by_language = {language: [(w, c) for w, c, lang in words if lang == language and len(w) > 2]
+                   for language in LANGUAGES}
+    alphabets = {"en": INSERT_ALPHABET, "ru": "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"}
+    dictionaries = {language: {w for w, _ in items} for language, items in by_language.items()}
+    samplers = {language: word_lists.WordSampler([w for w, _ in items], [c for _, c in items])
+                for language, items in by_language.items() if items}
+
+    cases = []
+    languages = sorted(samplers)
+    for _ in range(count):
+        language = rng.choice(languages)
+        correct = samplers[language].choice(rng)
+        cases.append((make_typo(correct, rng, alphabets[language]), correct, language))
+
+    results = {}
+    index.probes = index.verified = 0
+    start = time.perf_counter()
+    found = [index.lookup(typo, language=language) for typo, _, language in cases]
+    elapsed = time.perf_counter() - start
+    results["deletion index"] = _metrics(
+        cases, [[s[0] for s in f] for f in found], elapsed, work=index.probes,
+        work_name=f"проб хеш-таблицы, {index.verified / max(count, 1):.1f} проверок расстояния")
+
+    start = time.perf_counter()
+    generated = 0
+    manual = []
+    for typo, _, language in cases:
+        suggestions, candidates = manual_lookup(typo, dictionaries[language])
+        manual.append(suggestions)
+        generated += candidates
+    elapsed = time.perf_counter() - start
+    results["generateSuggestionsManually"] = _metrics(cases, manual, elapsed,
+                                                      work=generated, work_name="кандидатов")
+    return results
+
+
+def _metrics(cases, suggestions, elapsed, work, work_name):
+    top1 = sum(1 for (_, correct, _), found in zip(cases, suggestions) if found[:1] == [correct])
+    top5 = sum(1 for (_, correct, _), found in zip(cases, suggestions) if correct in found[:5])
+    count = max(len(cases), 1)
+    return {
+        "top1": top1 / count,
+        "top5": top5 / count,
+        "us_per_word": elapsed / count * 1e6,
+        "work_per_word": work / count,
+        "work_name": work_name,
+    }
+
+
+def load_words(args):
+    """(слово, частота, язык) из частотных списков и/или списков генераторов"""
+    words = []
+    for language, path in (("en", args.en_words), ("ru", args.ru_words)):
+        if path:
+            items, counts = word_lists.load_word_counts(path, limit=args.words_limit)
+            words += [(word.lower(), count, language) for word, count in zip(items, counts)]
+    if args.generator_words:
+        import heuristic_detector
+
+        en_words, ru_words = heuristic_detector.generator_word_lists()
+        words += [(word.lower(), 1, "en") for word in en_words]
+        words += [(word.lower(), 1, "ru") for word in ru_words]
+    return words
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Индекс удалений (SymSpell) для исправления опечаток")
+    parser.add_argument("command", choices=("build", "lookup", "benchmark"))
+    parser.add_argument("index", help=f"файл индекса {EXTENSION}")
+    parser.add_argument("words", nargs="*", help="слова для lookup")
+    parser.add_argument("--en-words", help="частотный список английских слов (word_lists.py)")
+    parser.add_argument("--ru-words", help="частотный список русских слов (word_lists.py)")
+    parser.add_argument("--generator-words", action="store_true",
+                        help="добавить списки слов генераторов датасетов")
+    parser.add_argument("--words-limit", type=int, default=None, help="не больше N слов из каждого списка")
+    parser.add_argument("--max-distance", type=int, default=DEFAULT_MAX_DISTANCE,
+                        help="максимальное расстояние правки (по умолчанию %(default)s)")
+    parser.add_argument("--prefix-length", type=int, default=DEFAULT_PREFIX_LENGTH,
+                        help="удаления строятся из первых N символов (по умолчанию %(default)s)")
+    parser.add_argument("--language", choices=LANGUAGES, help="искать только в одном языке")
+    parser.add_argument("--count", type=int, default=10_000, help="опечаток для benchmark")
+    parser.add_argument("--seed", type=int, default=42, help="seed для benchmark")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        words = load_words(args)
+        if not words:
+            parser.error("нужны --en-words/--ru-words или --generator-words")
+        start = time.perf_counter()
+        word_count, entry_count = build_index(words, args.index, args.max_distance, args.prefix_length)
+        print(f"✅ Индекс сохранен: {args.index} (слов {word_count}, записей {entry_count}, "
+              f"{time.perf_counter() - start:.1f} с)")
+        return 0
+
+    with DeletionIndex(args.index) as index:
+        if args.command == "lookup":
+            for word in args.words:
+                suggestions = index.lookup(word.lower(), language=args.language)
+                formatted = ", ".join(f"{w} ({lang}, d={d}, n={n})" for w, lang, d, n in suggestions)
+                print(f"{word}: {formatted or '-'}")
+            return 0
+
+        words = load_words(args)
+        if not words:
+            parser.error("для benchmark нужны те же списки слов, что и для build")
+        print(f"Индекс: {len(index)} слов, {index.entry_count} записей, корзин 2^{index.bucket_bits}")
+        print(f"{'метод':<30} {'top-1':>7} {'top-5':>7} {'мкс/слово':>10}  работа на слово")
+        for method, row in benchmark(index, words, args.count, args.seed).items():
+            print(f"{method:<30} {row['top1'] * 100:>6.2f}% {row['top5'] * 100:>6.2f}% "
+                  f"{row['us_per_word']:>10.1f}  {row['work_per_word']:,.1f} {row['work_name']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
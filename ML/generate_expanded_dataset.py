@@ -3,11 +3,40 @@
 Генератор расширенного датасета для BabylonFish ML
 5000 слов: 2500 русских + 2500 английских
 Включая популярные слова, союзы, короткие слова (1-3 буквы)
+
+Потоковый режим: строки генерируются генератором, перемешиваются через
+ограниченный буфер и пишутся в CSV порциями, поэтому память не растет
+с количеством строк:
+
+    python3 ML/generate_expanded_dataset.py --count 20000000 --output big.csv --seed 42
+
+Многопроцессный режим: --shards N делит генерацию на N шардов со своими
+seed (см. sharding.py); с --parts шарды остаются part-файлами с манифестом:
+
+    python3 ML/generate_expanded_dataset.py --count 50000000 --shards 8 --seed 42
+
+С частотными списками (word_lists.py) популярные слова и слова для ru_wrong
+выбираются с весом по реальной частоте вместо повторов popular_en/popular_ru[:250]:
+
+    python3 ML/generate_expanded_dataset.py --en-words ML/Data/words_en.tsv --ru-words ML/Data/words_ru.tsv
+
+С моделью phrase_synth.py каждый проход дополнительно получает --phrases-per-pass
+многословных фраз en/ru/ru_wrong, в том числе с переключением языка посреди фразы:
+
+    python3 ML/generate_expanded_dataset.py --phrase-model ML/Models/phrases.npz
 """
 
+import argparse
 import csv
+import os
 import random
 
+import dataset_io
+import layout_transcoder
+import phrase_synth
+import sharding
+import word_lists
+
 # Популярные английские слова (частотные)
 popular_en = [
     "the", "be", "to", "of", "and", "a", "in", "that", "have", "i",
@@ -123,166 +152,329 @@ phrases_ru = [
     "среда разработки", "сервер для продакшена",
 ]
 
+# Дополнительные английские слова (больше примеров для достижения 5000)
+additional_en = [
+    "apple", "banana", "orange", "grape", "mango", "pineapple", "peach",
+    "computer", "laptop", "keyboard", "mouse", "monitor", "printer", "scanner",
+    "internet", "wifi", "bluetooth", "network", "server", "database", "cloud",
+    "software", "hardware", "program", "code", "develop", "test", "debug",
+    "swift", "python", "java", "javascript", "rust", "go", "ruby", "php",
+    "github", "git", "docker", "kubernetes", "linux", "windows", "macos",
+    "ios", "android", "mobile", "web", "api", "rest", "json", "xml", "html", "css",
+    "security", "privacy", "permission", "access", "control", "user", "admin",
+    "login", "password", "email", "address", "phone", "contact", "message",
+    # Фрукты
+    "lemon", "lime", "cherry", "berry", "melon", "kiwi", "papaya",
+    "coconut", "avocado", "guava", "mangosteen", "passionfruit",
+    # Овощи
+    "tomato", "potato", "carrot", "cucumber", "pepper", "onion", "garlic",
+    "broccoli", "cabbage", "spinach", "lettuce", "celery", "beet",
+    # Животные
+    "dog", "cat", "bird", "fish", "horse", "cow", "pig", "sheep",
+    "chicken", "duck", "goose", "rabbit", "deer", "bear", "wolf", "fox",
+    # Цветы
+    "rose", "tulip", "daisy", "lily", "sunflower", "orchid", "lotus",
+    "jasmine", "lavender", "dandelion", "daffodil", "marigold",
+    # Технологии
+    "blockchain", "cryptocurrency", "nft", "metaverse", "artificial", "neural",
+    "algorithm", "automation", "robot", "machine", "intelligence", "learning",
+    # Еда
+    "pizza", "burger", "sushi", "pasta", "noodle", "rice", "bread", "cake",
+    "cookie", "chocolate", "coffee", "tea", "juice", "water", "soda", "beer",
+    # Транспорт
+    "car", "bus", "train", "plane", "ship", "bicycle", "motorcycle", "scooter",
+    "subway", "taxi", "uber", "truck", "van", "boat", "yacht", "helicopter",
+    # Одежда
+    "shirt", "pants", "dress", "skirt", "jacket", "coat", "shoes", "boots",
+    "hat", "cap", "scarf", "gloves", "socks", "belt", "tie", "uniform",
+    # Спорт
+    "soccer", "football", "basketball", "tennis", "volleyball", "baseball",
+    "hockey", "golf", "swimming", "running", "jumping", "dancing", "singing",
+    # Музыка
+    "rock", "pop", "jazz", "blues", "classical", "country", "rap", "hiphop",
+    "electronic", "techno", "house", "trance", "ambient", "folk", "reggae",
+    # Погода
+    "sunny", "rainy", "cloudy", "windy", "snowy", "stormy", "foggy", "hazy",
+    "breezy", "humid", "dry", "wet", "hot", "cold", "warm", "cool",
+    # Время
+    "morning", "afternoon", "evening", "night", "midnight", "dawn", "dusk", "twilight",
+    "sunrise", "sunset", "daylight", "darkness", "sunshine", "moonlight",
+]
+
+# Дополнительные русские слова (больше примеров)
+additional_ru = [
+    "яблоко", "банан", "апельсин", "виноград", "манго", "ананас", "персик",
+    "компьютер", "ноутбук", "клавиатура", "мышь", "монитор", "принтер", "сканер",
+    "интернет", "вайфай", "блютус", "сеть", "сервер", "база данных", "облако",
+    "программа", "код", "разработка", "тест", "отладка",
+    "свифт", "питон", "джава", "джаваскрипт", "раст", "го", "руби", "пхп",
+    "гитхаб", "гит", "докер", "кубернетес", "линукс", "виндоус", "макос",
+    "айос", "андроид", "мобила", "веб", "апи", "рест", "джейсон", "эксэмэль", "хтмл", "цсс",
+    "безопасность", "конфиденциальность", "права", "доступ", "контроль", "пользователь", "админ",
+    "логин", "пароль", "почта", "адрес", "телефон", "контакт", "сообщение",
+    # Фрукты
+    "лимон", "лайм", "вишня", "ягодка", "дыня", "киви", "папайя",
+    "кокос", "авокадо", "гуава", "мангостин", "маракуйя",
+    # Овощи
+    "томат", "картофель", "морковь", "огурец", "перец", "лук", "чеснок",
+    "брокколи", "капуста", "шпинат", "салат", "сельдерей", "свёкла",
+    # Животные
+    "собака", "кошка", "птица", "рыба", "лошадь", "корова", "свинья", "овца",
+    "курица", "утка", "гусь", "кролик", "олень", "медведь", "волк", "лиса",
+    # Цветы
+    "роза", "тюльпан", "маргаритка", "лилия", "подсолнух", "орхидея", "лотос",
+    "жасмин", "лаванда", "одуванчик", "нарцисс", "бархатцы",
+    # Технологии
+    "блокчейн", "криптовалюта", "нфт", "метавсел", "искусственный", "нейросеть",
+    "алгоритм", "автоматизация", "робот", "машина", "интеллект", "обучение",
+    # Еда
+    "пицца", "бургер", "суши", "паста", "лапша", "рис", "хлеб", "торт",
+    "печенье", "шоколад", "кофе", "чай", "сок", "вода", "газировка", "пиво",
+    # Транспорт
+    "машина", "автобус", "поезд", "самолёт", "корабль", "велосипед", "мотоцикл", "скутер",
+    "метро", "такси", "убер", "грузовик", "фургон", "лодка", "яхта", "вертолёт",
+    # Одежда
+    "рубашка", "штаны", "платье", "юбка", "пальто", "пиджак", "туфли", "сапоги",
+    "шляпа", "кепка", "шарф", "перчатки", "носки", "ремень", "галстук", "униформа",
+    # Спорт
+    "футбол", "баскетбол", "волейбол", "теннис", "плавание", "бег", "прыжки",
+    "танцы", "пение", "хоккей", "гольф", "бокс", "борьба", "гимнастика",
+    # Музыка
+    "рок", "поп", "джаз", "блюз", "классика", "кантри", "рэп", "хипхоп",
+    "электроника", "техно", "хаус", "транс", "эмбиент", "фолк", "регги",
+    # Погода
+    "солнечно", "дождливо", "облачно", "ветрено", "снежно", "штормит", "туманно", "дымно",
+    "ветрено", "влажно", "сухо", "мокро", "жарко", "холодно", "тепло", "прохладно",
+    # Время
+    "утро", "день", "вечер", "ночь", "полночь", "рассвет", "закат", "сумерки",
+    "рассвет", "закат", "дневной свет", "тьма", "солнце", "лунный свет",
+]
+
 # Генерация ошибок ru_wrong (русский текст на английской раскладке)
 def layout_switch_ru_to_en(text):
     """
     Конвертация русского текста в английскую раскладку
     """
-    # Русская: ЙЦУКЕНГШЩЗХФЫВАПРОЛДЖЭЯЧСМИТБЮ
-    # Английская: QWERTYUIOP[]FGHJKL;'ZXCVBNM,./
-    ru_layout = "йцукенгшщзхфывапролджэячсмитбю"
-    en_layout = "qwertyuiop[]fghjkl;'zxcvbnm,./"
-    ru_to_en_map = str.maketrans(ru_layout, en_layout)
-    return text.translate(ru_to_en_map)
+    # Общая таблица ЙЦУКЕН -> QWERTY, см. layout_transcoder.py
+    return layout_transcoder.ru_to_en(text)
+
+# Размеры по умолчанию для потоковой генерации
+DEFAULT_COUNT = 5000
+DEFAULT_BUFFER_SIZE = 100_000
+DEFAULT_CHUNK_SIZE = 10_000
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Data", "expanded_dataset.csv")
+LABELS = ("en", "ru", "ru_wrong")
 
-def generate_dataset():
-    dataset = []
+
+# Популярные слова одного прохода: первые POPULAR_LIMIT слов списка POPULAR_REPEATS раз
+POPULAR_REPEATS = 12
+POPULAR_LIMIT = 250
+# Русских слов для ru_wrong за проход (не больше, чем есть в списках)
+RU_WRONG_PER_PASS = 1000
+
+
+def iter_popular(words, label, rng, sampler=None):
+    """
+    Популярные слова одного прохода: без частотного списка - первые POPULAR_LIMIT
+    слов POPULAR_REPEATS раз, с частотным списком - столько же слов (по длине
+    встроенного списка, чтобы баланс меток не зависел от режима), выбранных по частоте.
+    """
+    popular = words[:POPULAR_LIMIT]
+    if sampler is not None:
+        for word in sampler.sample(rng, POPULAR_REPEATS * len(popular)):
+            yield (word, label)
+        return
+    for _ in range(POPULAR_REPEATS):
+        for word in popular:
+            yield (word, label)
+
+
+def iter_base_rows(rng=random, samplers=None):
+    """
+    Один проход по всем спискам слов: отдает (text, label) по одной строке.
+    rng - объект с интерфейсом random (модуль random или random.Random)
+    samplers - {"en": WordSampler, "ru": WordSampler} из частотных списков (word_lists.py)
+        и "phrases": PhraseSynthesizer (phrase_synth.py)
+    """
+    samplers = samplers or {}
 
     # Английские слова
     # Популярные (добавляем несколько раз для количества)
-    for _ in range(12):
-        for word in popular_en[:250]:
-            dataset.append((word, "en"))
-
-    # Союзы (200)
-    for word in conjunctions_en:
-        dataset.append((word, "en"))
-
-    # Короткие слова (500)
-    for word in short_en:
-        dataset.append((word, "en"))
-
-    # Фразы (300)
-    for phrase in phrases_en:
-        dataset.append((phrase, "en"))
-
-    # Дополнительные слова (больше примеров для достижения 5000)
-    additional_en = [
-        "apple", "banana", "orange", "grape", "mango", "pineapple", "peach",
-        "computer", "laptop", "keyboard", "mouse", "monitor", "printer", "scanner",
-        "internet", "wifi", "bluetooth", "network", "server", "database", "cloud",
-        "software", "hardware", "program", "code", "develop", "test", "debug",
-        "swift", "python", "java", "javascript", "rust", "go", "ruby", "php",
-        "github", "git", "docker", "kubernetes", "linux", "windows", "macos",
-        "ios", "android", "mobile", "web", "api", "rest", "json", "xml", "html", "css",
-        "security", "privacy", "permission", "access", "control", "user", "admin",
-        "login", "password", "email", "address", "phone", "contact", "message",
-        # Фрукты
-        "lemon", "lime", "cherry", "berry", "melon", "kiwi", "papaya",
-        "coconut", "avocado", "guava", "mangosteen", "passionfruit",
-        # Овощи
-        "tomato", "potato", "carrot", "cucumber", "pepper", "onion", "garlic",
-        "broccoli", "cabbage", "spinach", "lettuce", "celery", "beet",
-        # Животные
-        "dog", "cat", "bird", "fish", "horse", "cow", "pig", "sheep",
-        "chicken", "duck", "goose", "rabbit", "deer", "bear", "wolf", "fox",
-        # Цветы
-        "rose", "tulip", "daisy", "lily", "sunflower", "orchid", "lotus",
-        "jasmine", "lavender", "dandelion", "daffodil", "marigold",
-        # Технологии
-        "blockchain", "cryptocurrency", "nft", "metaverse", "artificial", "neural",
-        "algorithm", "automation", "robot", "machine", "intelligence", "learning",
-        # Еда
-        "pizza", "burger", "sushi", "pasta", "noodle", "rice", "bread", "cake",
-        "cookie", "chocolate", "coffee", "tea", "juice", "water", "soda", "beer",
-        # Транспорт
-        "car", "bus", "train", "plane", "ship", "bicycle", "motorcycle", "scooter",
-        "subway", "taxi", "uber", "truck", "van", "boat", "yacht", "helicopter",
-        # Одежда
-        "shirt", "pants", "dress", "skirt", "jacket", "coat", "shoes", "boots",
-        "hat", "cap", "scarf", "gloves", "socks", "belt", "tie", "uniform",
-        # Спорт
-        "soccer", "football", "basketball", "tennis", "volleyball", "baseball",
-        "hockey", "golf", "swimming", "running", "jumping", "dancing", "singing",
-        # Музыка
-        "rock", "pop", "jazz", "blues", "classical", "country", "rap", "hiphop",
-        "electronic", "techno", "house", "trance", "ambient", "folk", "reggae",
-        # Погода
-        "sunny", "rainy", "cloudy", "windy", "snowy", "stormy", "foggy", "hazy",
-        "breezy", "humid", "dry", "wet", "hot", "cold", "warm", "cool",
-        # Время
-        "morning", "afternoon", "evening", "night", "midnight", "dawn", "dusk", "twilight",
-        "sunrise", "sunset", "daylight", "darkness", "sunshine", "moonlight",
-    ]
-    for word in additional_en:
-        dataset.append((word, "en"))
+    yield from iter_popular(popular_en, "en", rng, samplers.get("en"))
+
+    # Союзы, короткие слова, фразы и дополнительные слова
+    for words in (conjunctions_en, short_en, phrases_en, additional_en):
+        for word in words:
+            yield (word, "en")
 
     # Русские слова
-    # Популярные (добавляем несколько раз для количества)
-    for _ in range(12):
-        for word in popular_ru[:250]:
-            dataset.append((word, "ru"))
-
-    # Союзы (200)
-    for word in conjunctions_ru:
-        dataset.append((word, "ru"))
-
-    # Короткие слова (500)
-    for word in short_ru:
-        dataset.append((word, "ru"))
-
-    # Фразы (300)
-    for phrase in phrases_ru:
-        dataset.append((phrase, "ru"))
-
-    # Дополнительные слова (больше примеров)
-    additional_ru = [
-        "яблоко", "банан", "апельсин", "виноград", "манго", "ананас", "персик",
-        "компьютер", "ноутбук", "клавиатура", "мышь", "монитор", "принтер", "сканер",
-        "интернет", "вайфай", "блютус", "сеть", "сервер", "база данных", "облако",
-        "программа", "код", "разработка", "тест", "отладка",
-        "свифт", "питон", "джава", "джаваскрипт", "раст", "го", "руби", "пхп",
-        "гитхаб", "гит", "докер", "кубернетес", "линукс", "виндоус", "макос",
-        "айос", "андроид", "мобила", "веб", "апи", "рест", "джейсон", "эксэмэль", "хтмл", "цсс",
-        "безопасность", "конфиденциальность", "права", "доступ", "контроль", "пользователь", "админ",
-        "логин", "пароль", "почта", "адрес", "телефон", "контакт", "сообщение",
-        # Фрукты
-        "лимон", "лайм", "вишня", "ягодка", "дыня", "киви", "папайя",
-        "кокос", "авокадо", "гуава", "мангостин", "маракуйя",
-        # Овощи
-        "томат", "картофель", "морковь", "огурец", "перец", "лук", "чеснок",
-        "брокколи", "капуста", "шпинат", "салат", "сельдерей", "свёкла",
-        # Животные
-        "собака", "кошка", "птица", "рыба", "лошадь", "корова", "свинья", "овца",
-        "курица", "утка", "гусь", "кролик", "олень", "медведь", "волк", "лиса",
-        # Цветы
-        "роза", "тюльпан", "маргаритка", "лилия", "подсолнух", "орхидея", "лотос",
-        "жасмин", "лаванда", "одуванчик", "нарцисс", "бархатцы",
-        # Технологии
-        "блокчейн", "криптовалюта", "нфт", "метавсел", "искусственный", "нейросеть",
-        "алгоритм", "автоматизация", "робот", "машина", "интеллект", "обучение",
-        # Еда
-        "пицца", "бургер", "суши", "паста", "лапша", "рис", "хлеб", "торт",
-        "печенье", "шоколад", "кофе", "чай", "сок", "вода", "газировка", "пиво",
-        # Транспорт
-        "машина", "автобус", "поезд", "самолёт", "корабль", "велосипед", "мотоцикл", "скутер",
-        "метро", "такси", "убер", "грузовик", "фургон", "лодка", "яхта", "вертолёт",
-        # Одежда
-        "рубашка", "штаны", "платье", "юбка", "пальто", "пиджак", "туфли", "сапоги",
-        "шляпа", "кепка", "шарф", "перчатки", "носки", "ремень", "галстук", "униформа",
-        # Спорт
-        "футбол", "баскетбол", "волейбол", "теннис", "плавание", "бег", "прыжки",
-        "танцы", "пение", "хоккей", "гольф", "бокс", "борьба", "гимнастика",
-        # Музыка
-        "рок", "поп", "джаз", "блюз", "классика", "кантри", "рэп", "хипхоп",
-        "электроника", "техно", "хаус", "транс", "эмбиент", "фолк", "регги",
-        # Погода
-        "солнечно", "дождливо", "облачно", "ветрено", "снежно", "штормит", "туманно", "дымно",
-        "ветрено", "влажно", "сухо", "мокро", "жарко", "холодно", "тепло", "прохладно",
-        # Время
-        "утро", "день", "вечер", "ночь", "полночь", "рассвет", "закат", "сумерки",
-        "рассвет", "закат", "дневной свет", "тьма", "солнце", "лунный свет",
-    ]
-    for word in additional_ru:
-        dataset.append((word, "ru"))
+    yield from iter_popular(popular_ru, "ru", rng, samplers.get("ru"))
+
+    for words in (conjunctions_ru, short_ru, phrases_ru, additional_ru):
+        for word in words:
+            yield (word, "ru")
 
     # Добавляем ru_wrong примеры (русский на английской раскладке)
-    # Берем 1000 случайных русских слов и конвертируем
+    # Берем до RU_WRONG_PER_PASS случайных русских слов и конвертируем
     all_ru_words = popular_ru + additional_ru
-    random_ru_for_wrong = random.sample(all_ru_words, min(1000, len(all_ru_words)))
-    for word in random_ru_for_wrong:
-        wrong_layout = layout_switch_ru_to_en(word)
-        dataset.append((wrong_layout, "ru_wrong"))
+    wrong_count = min(RU_WRONG_PER_PASS, len(all_ru_words))
+    if "ru" in samplers:
+        ru_for_wrong = samplers["ru"].sample(rng, wrong_count)
+    else:
+        ru_for_wrong = rng.sample(all_ru_words, wrong_count)
+    for word in ru_for_wrong:
+        yield (layout_switch_ru_to_en(word), "ru_wrong")
+
+    # Синтезированные фразы (марковская модель по корпусам)
+    if "phrases" in samplers:
+        yield from samplers["phrases"].rows(rng)
+
+
+def load_samplers(en_words=None, ru_words=None, limit=None, power=1.0, phrase_model=None,
+                  phrases_per_pass=phrase_synth.PHRASES_PER_PASS):
+    """WordSampler для частотных списков и синтезатор фраз, которые заданы (None - ничего нет)"""
+    samplers = {}
+    for language, path in (("en", en_words), ("ru", ru_words)):
+        if path:
+            samplers[language] = word_lists.WordSampler.from_file(path, limit=limit, power=power)
+    if phrase_model:
+        samplers["phrases"] = phrase_synth.PhraseSynthesizer.load(phrase_model, per_pass=phrases_per_pass)
+    return samplers or None
+
+
+def iter_rows(target_count, rng=random, samplers=None):
+    """
+    Повторяет проходы iter_base_rows, пока не наберется target_count строк.
+    Каждый проход (несколько тысяч строк) перемешивается целиком, чтобы
+    обрезка на target_count не смещала распределение меток.
+    Память не зависит от target_count.
+    """
+    produced = 0
+    while produced < target_count:
+        epoch = list(iter_base_rows(rng, samplers))
+        rng.shuffle(epoch)
+        for row in epoch:
+            yield row
+            produced += 1
+            if produced >= target_count:
+                return
+
+
+def shuffle_buffer(rows, buffer_size, rng=random):
+    """
+    Перемешивание потока через ограниченный буфер (как shuffle buffer в tf.data):
+    в памяти одновременно не больше buffer_size строк.
+    """
+    buffer = []
+    for row in rows:
+        if len(buffer) < buffer_size:
+            buffer.append(row)
+            continue
+        index = rng.randrange(buffer_size)
+        yield buffer[index]
+        buffer[index] = row
+
+    rng.shuffle(buffer)
+    yield from buffer
+
+
+def iter_chunks(rows, chunk_size):
+    """Группирует поток строк в списки по chunk_size"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def write_csv(rows, output_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Пишет поток (text, label) в CSV порциями по chunk_size строк.
+    Возвращает словарь {label: count}.
+    """
+    counts = dict.fromkeys(LABELS, 0)
+    with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['text', 'label'])
+        for chunk in iter_chunks(rows, chunk_size):
+            writer.writerows(chunk)
+            for _, label in chunk:
+                counts[label] = counts.get(label, 0) + 1
+    return counts
+
+
+def write_binary(rows, output_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """То же, что write_csv, но в колоночный формат .bfds (см. dataset_io.py)"""
+    counts = dict.fromkeys(LABELS, 0)
+    with dataset_io.BinaryDatasetWriter(output_path, labels=LABELS) as writer:
+        for chunk in iter_chunks(rows, chunk_size):
+            writer.writerows(chunk)
+            for _, label in chunk:
+                counts[label] += 1
+    return counts
+
+
+def write_dataset(rows, output_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Формат по расширению: .bfds - бинарный, иначе CSV"""
+    if output_path.endswith(dataset_io.BINARY_EXTENSION):
+        return write_binary(rows, output_path, chunk_size=chunk_size)
+    return write_csv(rows, output_path, chunk_size=chunk_size)
+
+
+def generate_stream(target_count, seed=None, buffer_size=DEFAULT_BUFFER_SIZE, samplers=None):
+    """Потоковый конвейер: генерация -> перемешивание через буфер"""
+    rng = random.Random(seed)
+    return shuffle_buffer(iter_rows(target_count, rng, samplers), buffer_size, rng)
+
+
+def _generate_shard(task):
+    """Worker пула: генерирует один шард в свой part-файл"""
+    count, seed, buffer_size, chunk_size, path, word_list_options = task
+    samplers = load_samplers(**word_list_options)
+    rows = generate_stream(count, seed=seed, buffer_size=buffer_size, samplers=samplers)
+    return write_dataset(rows, path, chunk_size=chunk_size)
+
+
+def generate_sharded(target_count, output_path, seed, shards, processes=None,
+                     buffer_size=DEFAULT_BUFFER_SIZE, chunk_size=DEFAULT_CHUNK_SIZE,
+                     keep_parts=False, word_list_options=None):
+    """
+    Шардированная генерация в пуле процессов.
+    Шард i использует seed sharding.shard_seed(seed, i), поэтому вывод
+    детерминирован для пары (seed, shards).
+    word_list_options - аргументы load_samplers (списки загружаются в каждом процессе).
+    Возвращает словарь {label: count}.
+    """
+    word_list_options = word_list_options or {}
+    counts_per_shard = sharding.split_count(target_count, shards)
+    part_paths = [sharding.part_path(output_path, i) for i in range(shards)]
+    tasks = [
+        (count, sharding.shard_seed(seed, i), buffer_size, chunk_size, path, word_list_options)
+        for i, (count, path) in enumerate(zip(counts_per_shard, part_paths))
+    ]
+    shard_counts = sharding.run_shards(_generate_shard, tasks, processes)
+
+    if keep_parts:
+        sharding.write_manifest(output_path, part_paths, counts_per_shard, seed,
+                                extra={"generator": "generate_expanded_dataset"})
+    elif output_path.endswith(dataset_io.BINARY_EXTENSION):
+        dataset_io.concat_binary(part_paths, output_path)
+    else:
+        sharding.concat_parts(part_paths, output_path)
+
+    counts = dict.fromkeys(LABELS, 0)
+    for shard in shard_counts:
+        for label, count in shard.items():
+            counts[label] = counts.get(label, 0) + count
+    return counts
+
+
+def generate_dataset():
+    """Исходный вариант: весь датасет в памяти, перемешан и обрезан до 5000"""
+    dataset = list(iter_base_rows(random))
 
     # Перемешиваем датасет
     random.shuffle(dataset)
@@ -290,29 +482,62 @@ def generate_dataset():
     # Ограничиваем до 5000
     return dataset[:5000]
 
-def main():
-    print("Генерация расширенного датасета BabylonFish ML...")
-    dataset = generate_dataset()
 
-    # Сохраняем в CSV
-    output_file = "/home/botik/.openclaw/workspace/babylonfish/ML/Data/expanded_dataset.csv"
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Генератор расширенного датасета BabylonFish ML")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT,
+                        help="сколько строк сгенерировать (по умолчанию %(default)s)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT,
+                        help="путь к выходному файлу, .bfds - бинарный формат (по умолчанию %(default)s)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed генератора случайных чисел")
+    parser.add_argument("--buffer-size", type=int, default=DEFAULT_BUFFER_SIZE,
+                        help="размер буфера перемешивания (по умолчанию %(default)s)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="сколько строк писать за один вызов writerows (по умолчанию %(default)s)")
+    parser.add_argument("--en-words", help="частотный список английских слов (word_lists.py) вместо popular_en")
+    parser.add_argument("--ru-words", help="частотный список русских слов (word_lists.py) вместо popular_ru")
+    parser.add_argument("--words-limit", type=int, default=None,
+                        help="брать из частотных списков не больше N первых слов")
+    parser.add_argument("--weight-power", type=float, default=1.0,
+                        help="вес слова = частота^N, N < 1 сглаживает распределение (по умолчанию %(default)s)")
+    parser.add_argument("--phrase-model", help="модель фраз .npz (phrase_synth.py)")
+    parser.add_argument("--phrases-per-pass", type=int, default=phrase_synth.PHRASES_PER_PASS,
+                        help="синтезированных фраз на проход (по умолчанию %(default)s)")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="количество шардов для многопроцессной генерации (по умолчанию %(default)s)")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="размер пула процессов (по умолчанию - число ядер)")
+    parser.add_argument("--parts", action="store_true",
+                        help="не склеивать шарды, оставить part-файлы и manifest.json")
+    return parser.parse_args(argv)
 
-    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(['text', 'label'])
-        writer.writerows(dataset)
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("Генерация расширенного датасета BabylonFish ML...")
+    word_list_options = {"en_words": args.en_words, "ru_words": args.ru_words,
+                         "limit": args.words_limit, "power": args.weight_power,
+                         "phrase_model": args.phrase_model, "phrases_per_pass": args.phrases_per_pass}
+
+    if args.shards > 1 or args.parts:
+        seed = sharding.resolve_seed(args.seed)
+        print(f"Шардов: {args.shards}, seed: {seed}")
+        counts = generate_sharded(args.count, args.output, seed, args.shards,
+                                  processes=args.processes, buffer_size=args.buffer_size,
+                                  chunk_size=args.chunk_size, keep_parts=args.parts,
+                                  word_list_options=word_list_options)
+    else:
+        rows = generate_stream(args.count, seed=args.seed, buffer_size=args.buffer_size,
+                               samplers=load_samplers(**word_list_options))
+        counts = write_dataset(rows, args.output, chunk_size=args.chunk_size)
 
     # Статистика
-    labels = [label for _, label in dataset]
-    en_count = labels.count('en')
-    ru_count = labels.count('ru')
-    ru_wrong_count = labels.count('ru_wrong')
-
-    print(f"\nДатасет сохранён: {output_file}")
-    print(f"Всего примеров: {len(dataset)}")
-    print(f"Английских (en): {en_count}")
-    print(f"Русских (ru): {ru_count}")
-    print(f"Неправильных (ru_wrong): {ru_wrong_count}")
+    print(f"\nДатасет сохранён: {args.output}")
+    print(f"Всего примеров: {sum(counts.values())}")
+    print(f"Английских (en): {counts['en']}")
+    print(f"Русских (ru): {counts['ru']}")
+    print(f"Неправильных (ru_wrong): {counts['ru_wrong']}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Эталонный Python порт эвристик определения языка BabylonFish и пакетная оценка на датасетах
+
+Портированы:
+- EnhancedLanguageDetector.analyzeWithoutContext / analyzeAmbiguousCase / countBigrams;
+- EventProcessor.isRussianWordInEnglishLayout;
+- множества из LanguageConstants.swift.
+
+NSSpellChecker (SystemDictionaryService) на Linux нет, поэтому словарная проверка
+идет по спискам слов (--en-words/--ru-words, формат dataset_io.load_word_list) или по
+спискам слов генераторов (--generator-words). Без словаря шаг 3 всегда "не найдено",
+как и для слов, которых нет в системном словаре. Подсказки словаря (getSuggestions)
+не портированы: неоднозначные слова остаются ambiguous.
+
+    python3 ML/heuristic_detector.py ML/Data/expanded_dataset.csv --generator-words
+
+Отчет: матрица ошибок, точность для коротких (1-3 буквы) и длинных слов, методы
+решений и скорость в словах в секунду.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter, namedtuple
+from itertools import islice
+from multiprocessing import Pool
+
+import dataset_io
+import layout_transcoder
+
+# MARK: - LanguageConstants.swift
+
+COMMON_RU_BIGRAMS = {
+    "пр", "ри", "ив", "ве", "ет", "по", "ка", "то", "на", "не", "ст", "но", "ал", "ни",
+    "ра", "го", "ко", "ов", "во", "ли", "ре", "ос", "од", "ва", "де", "ес", "за", "ль",
+    "ел", "ем", "ен", "ер", "еч", "ею", "ея",
+    "ом", "он", "оп", "ор", "от", "оф", "ох", "оц", "оч", "ош", "ощ", "ою", "оя",
+    "ам", "ан", "ап", "ар", "ас", "ат", "аф", "ах", "ац", "ач", "аш", "ащ", "аю", "ая",
+    "др", "ру", "уг", "га",
+}
+
+COMMON_EN_BIGRAMS = {
+    "th", "he", "in", "er", "an", "re", "on", "at", "en", "nd", "ti", "es", "or", "te", "of", "ed",
+    "is", "it", "al", "ar", "st", "to", "nt", "ng", "se", "ha", "as", "ou", "io", "le", "ve", "me",
+    "ea", "hi", "wa", "ro", "co", "ne", "de", "ri", "no", "us", "li", "ra", "ce", "ta", "ma",
+}
+
+COMMON_ENGLISH_WORDS = {
+    "hello", "world", "test", "please", "thanks", "thank", "google", "facebook", "twitter", "keyboard",
+    "forget", "and", "the", "this", "that", "with", "are", "you", "what", "how", "who", "which", "from", "into",
+    "switch", "layout", "babylon", "fish", "babylonfish", "work", "home", "email", "password", "login",
+    "good", "bad", "yes", "no", "maybe", "today", "tomorrow", "yesterday", "time", "date", "year", "month",
+    "day", "hour", "minute", "second", "now", "later", "before", "after", "never", "always", "sometimes",
+    "friend", "friends", "family", "love", "hate", "like", "dislike", "want", "need", "have", "has", "had",
+    "do", "does", "did", "done", "go", "goes", "gone", "went", "come", "comes", "came", "coming",
+    "say", "says", "said", "saying", "tell", "tells", "told", "telling", "speak", "speaks", "spoke", "speaking",
+    "look", "looks", "looked", "looking", "see", "sees", "saw", "seen", "seeing", "watch", "watches", "watched",
+    "hear", "hears", "heard", "hearing", "listen", "listens", "listened", "listening",
+    "think", "thinks", "thought", "thinking", "know", "knows", "knew", "known", "knowing",
+    "lol", "lmao", "omg", "wtf", "brb", "idk", "imho", "imo", "tbh", "btw", "fyi", "asap",
+    "cool", "nice", "great", "awesome", "amazing", "beautiful", "ugly", "bad", "terrible", "horrible",
+    "sorry", "excuse", "pardon", "please", "thanks", "thank", "you", "welcome", "bye", "goodbye",
+}
+
+COMMON_RU_SHORT_WORDS = {
+    "я", "и", "а", "но", "да", "не", "же", "ли", "э", "ё", "ей", "её", "мы", "ты", "вы", "он", "на", "за",
+    "по", "со", "из", "от", "до", "во", "об", "у", "к", "с", "в", "о", "ж", "б", "бы",
+    "ну", "эх", "ой", "ай", "ух", "ах", "фу", "фи", "бе", "ме", "му", "га", "гав", "мяу",
+    "еще", "ещё", "уже", "все", "всё", "кто", "что", "где", "как", "там", "тут", "так",
+    "вот", "вон", "это", "эта", "этот", "эти", "тот", "та", "те", "то", "те",
+    "мой", "моя", "моё", "мои", "твой", "твоя", "твоё", "твои", "наш", "ващ",
+    "спс", "пжл", "плз", "ок", "да", "нет", "мб", "хз", "лол", "омг", "втф", "имхо",
+    "прив", "пок", "ку", "хай", "йо", "че", "чо", "шо", "ща", "щас", "щаз",
+    "друг", "рыбка", "эту",
+}
+
+IMPOSSIBLE_RU_IN_EN_KEYS = {
+    "ghbd", "ghb", "nth", "cjd", "cjdf", "yt", "byl", "ntrc", "djp", "gj", "gjh",
+    "ghb", "ghbd", "ghbdt", "ghbdtn",
+    "plhf", "plhfd", "plhfdc",
+    "cjdf", "cjd",
+    "rfr", "rfrbt",
+    "xt", "xtuj",
+    "ds", "z", "ns",
+    "ntrc", "ntrcn",
+    "gjxt", "gjxtve",
+    "gkj", "gkj[",
+    "[jh", "[jhj",
+    "bpd", "bpdby",
+    "cgfc", "cgfcb",
+}
+
+IMPOSSIBLE_EN_IN_RU_KEYS = {
+    "рудд", "руддщ",
+    "руду", "рудущ",
+    "цр", "црфе",
+    "рщ", "рщц",
+    "ер", "ерфе",
+    "ершы", "ершы",
+    "еру", "ерун",
+    "фтв", "фтв",
+    "ащк", "ащкпуе",
+    "фку", "фку",
+    "цшер", "цшер",
+    "нщг", "нщг",
+}
+
+PROGRAMMING_KEYWORDS = {
+    "func", "var", "let", "if", "else", "guard", "return", "class", "struct", "enum",
+    "import", "public", "private", "extension", "protocol", "init", "deinit", "subscript",
+    "typealias", "associatedtype", "break", "case", "continue", "default", "defer", "do",
+    "fallthrough", "for", "in", "repeat", "switch", "where", "while", "as", "catch", "false",
+    "is", "nil", "rethrows", "super", "self", "Self", "throw", "throws", "true", "try",
+    "int", "double", "string", "bool", "void", "float", "char", "const", "static", "final",
+    "print", "println", "console", "log", "debug", "error", "warn", "info",
+    "function", "const", "await", "async", "export", "default", "from", "null", "undefined",
+    "val", "fun", "package", "interface", "implements", "extends", "protected", "abstract",
+}
+
+# Паттерны из EventProcessor.isRussianWordInEnglishLayout (проверка по префиксу)
+RUSSIAN_IN_ENGLISH_PATTERNS = (
+    "ghbdtn", "yfcnz", "njkmrj", "rfr", "vjq", "yt", "lj", "xtkjdtr", "cnfnm", "gjckt",
+    "rjvgm", "dctv", "gjcnj", "rfrjq", "vj;tn", "ytn", "ljkz", "xtkjd", "cnf", "gjc",
+)
+
+ENGLISH_LETTERS = frozenset("abcdefghijklmnopqrstuvwxyz")
+
+# Языки и методы как в Swift (Language / DetectionMethod)
+RUSSIAN = "russian"
+ENGLISH = "english"
+
+BasicAnalysis = namedtuple("BasicAnalysis", "language confidence method")
+
+# Предсказания оценки: метки датасета плюс английский текст на русской раскладке и "не определено"
+PREDICTIONS = dataset_io.LABELS + ("en_wrong", "unknown")
+
+
+class WordListDictionary:
+    """Замена SystemDictionaryService: проверка слов по спискам"""
+
+    def __init__(self, en_words=(), ru_words=()):
+        self.en_words = {word.lower() for word in en_words}
+        self.ru_words = {word.lower() for word in ru_words}
+
+    def is_english_word(self, word):
+        return word in self.en_words
+
+    def is_russian_word(self, word):
+        return word in self.ru_words
+
+    def check_spelling(self, word, language_code):
+        return word in (self.en_words if language_code == "en" else self.ru_words)
+
+    def get_english_suggestions(self, word):
+        return []
+
+    def get_russian_suggestions(self, word):
+        return []
+
+
+def count_bigrams(text, dictionary):
+    """countBigrams: +1 за каждую известную биграмму, +2 бонус в начале слова"""
+    count = 0
+    for i in range(len(text) - 1):
+        if text[i:i + 2] in dictionary:
+            count += 3 if i < 2 else 1
+    return count
+
+
+def analyze_ambiguous_case(en_string, ru_string, dictionary):
+    """analyzeAmbiguousCase: слово valid в обоих языках"""
+    if len(en_string) <= 2:
+        return BasicAnalysis(None, 0.3, "ambiguous")
+    if any(not ch.isalpha() for ch in en_string):
+        return BasicAnalysis(ENGLISH, 0.7, "specialCharacters")
+
+    en_suggestions = dictionary.get_english_suggestions(en_string)
+    ru_suggestions = dictionary.get_russian_suggestions(ru_string)
+    if en_suggestions and not ru_suggestions:
+        return BasicAnalysis(ENGLISH, 0.75, "dictionarySuggestions")
+    if ru_suggestions and not en_suggestions:
+        return BasicAnalysis(RUSSIAN, 0.75, "dictionarySuggestions")
+    return BasicAnalysis(None, 0.4, "ambiguous")
+
+
+def analyze_without_context(en_string, ru_string, dictionary):
+    """Порт EnhancedLanguageDetector.analyzeWithoutContext"""
+    en_lower = en_string.lower()
+    ru_lower = ru_string.lower()
+
+    # 1. Проверка общих слов (быстрый путь)
+    if ru_lower in COMMON_RU_SHORT_WORDS:
+        return BasicAnalysis(RUSSIAN, 0.95, "commonWords")
+    if en_lower in COMMON_ENGLISH_WORDS:
+        return BasicAnalysis(ENGLISH, 0.95, "commonWords")
+
+    # 2. Проверка ключевых слов программирования
+    if en_lower in PROGRAMMING_KEYWORDS:
+        return BasicAnalysis(ENGLISH, 0.98, "programmingKeywords")
+
+    # 3. Проверка словаря
+    is_ru_valid = dictionary.is_russian_word(ru_lower)
+    is_en_valid = dictionary.is_english_word(en_lower)
+
+    if len(ru_lower) <= 3 and not is_ru_valid and is_en_valid:
+        return BasicAnalysis(ENGLISH, 0.85, "dictionary")
+    if is_ru_valid and not is_en_valid:
+        return BasicAnalysis(RUSSIAN, 0.9, "dictionary")
+    if is_en_valid and not is_ru_valid:
+        return BasicAnalysis(ENGLISH, 0.9, "dictionary")
+    if is_ru_valid and is_en_valid:
+        return analyze_ambiguous_case(en_string, ru_string, dictionary)
+
+    # 4. Анализ биграмм
+    en_score = count_bigrams(en_string, COMMON_EN_BIGRAMS)
+    ru_score = count_bigrams(ru_string, COMMON_RU_BIGRAMS)
+
+    if ru_score > 0 and en_score == 0:
+        return BasicAnalysis(RUSSIAN, 0.8, "bigrams")
+    if en_score > 0 and ru_score == 0:
+        return BasicAnalysis(ENGLISH, 0.8, "bigrams")
+    if ru_score > en_score + 1:
+        return BasicAnalysis(RUSSIAN, min(0.85, 0.5 + (ru_score - en_score) * 0.1), "bigrams")
+    if en_score > ru_score + 1:
+        return BasicAnalysis(ENGLISH, min(0.85, 0.5 + (en_score - ru_score) * 0.1), "bigrams")
+
+    # 5. Невозможные паттерны
+    clean_en = "".join(ch for ch in en_lower if ch.isalpha())
+    clean_ru = "".join(ch for ch in ru_lower if ch.isalpha())
+    for pattern in IMPOSSIBLE_RU_IN_EN_KEYS:
+        if len(pattern) >= 3 and pattern in clean_en:
+            return BasicAnalysis(RUSSIAN, 0.95, "impossiblePatterns")
+    for pattern in IMPOSSIBLE_EN_IN_RU_KEYS:
+        if len(pattern) >= 3 and pattern in clean_ru:
+            return BasicAnalysis(ENGLISH, 0.95, "impossiblePatterns")
+
+    # 6. Не удалось определить
+    return BasicAnalysis(None, 0.0, "unknown")
+
+
+def is_russian_word_in_english_layout(word, dictionary, classifier=None):
+    """
+    Порт EventProcessor.isRussianWordInEnglishLayout.
+    classifier - необязательная функция word -> (language, confidence) вместо
+    NeuralLanguageClassifier (шаг 3); без нее шаг пропускается.
+    """
+    lowercased = word.lower()
+    if not set(lowercased) <= ENGLISH_LETTERS:
+        return False
+
+    # 1. Известные паттерны
+    if lowercased.startswith(RUSSIAN_IN_ENGLISH_PATTERNS):
+        return True
+
+    # 2. Короткие слова (3-6 символов): проверка по словарю
+    if 3 <= len(lowercased) <= 6:
+        is_english_word = dictionary.check_spelling(lowercased, "en")
+        is_russian_word = dictionary.check_spelling(lowercased, "ru")
+        if is_russian_word and not is_english_word:
+            return True
+        if is_english_word and is_russian_word:
+            return False
+
+    # 3. Классификатор
+    if classifier is not None:
+        language, confidence = classifier(lowercased)
+        if language == RUSSIAN and confidence >= 0.7:
+            return True
+
+    # 4. Конвертация в русскую раскладку и проверка словаря
+    return dictionary.check_spelling(layout_transcoder.en_to_ru(lowercased), "ru")
+
+
+def detect(text, dictionary):
+    """
+    Метка датасета для строки по analyzeWithoutContext: язык нажатых клавиш
+    плюс то, какой раскладкой набран текст.
+    """
+    en_string, ru_string = layout_transcoder.key_strings(text)
+    analysis = analyze_without_context(en_string, ru_string, dictionary)
+    return prediction_label(text, analysis.language), analysis
+
+
+def prediction_label(text, language):
+    if language is None:
+        return "unknown"
+    typed_in_russian = any("а" <= ch <= "я" or ch == "ё" for ch in text.lower())
+    if language == RUSSIAN:
+        return "ru" if typed_in_russian else "ru_wrong"
+    return "en_wrong" if typed_in_russian else "en"
+
+
+def letter_count(text):
+    return sum(1 for ch in text if ch.isalpha())
+
+
+def length_bucket(text):
+    return "1-3" if letter_count(text) <= 3 else "4+"
+
+
+def evaluate(rows, dictionary, classifier=None):
+    """
+    Прогоняет (text, label) через порт эвристик.
+    Возвращает словарь со счетчиками для print_report.
+    """
+    confusion = Counter()
+    buckets = Counter()
+    bucket_correct = Counter()
+    methods = Counter()
+    layout_check = Counter()
+    total = 0
+
+    start = time.perf_counter()
+    for text, label in rows:
+        predicted, analysis = detect(text, dictionary)
+        confusion[label, predicted] += 1
+        methods[analysis.method] += 1
+        bucket = length_bucket(text)
+        buckets[bucket] += 1
+        if predicted == label:
+            bucket_correct[bucket] += 1
+
+        # Бинарная проверка isRussianWordInEnglishLayout на строках латиницей
+        if label in ("en", "ru_wrong") and " " not in text:
+            verdict = is_russian_word_in_english_layout(text, dictionary, classifier)
+            layout_check[label, verdict] += 1
+        total += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "total": total,
+        "elapsed": elapsed,
+        "confusion": confusion,
+        "buckets": buckets,
+        "bucket_correct": bucket_correct,
+        "methods": methods,
+        "layout_check": layout_check,
+    }
+
+
+def merge_results(results):
+    """Складывает счетчики нескольких результатов evaluate"""
+    merged = None
+    for result in results:
+        if merged is None:
+            merged = result
+            continue
+        for key, value in result.items():
+            merged[key] = merged[key] + value
+    return merged
+
+
+_worker_dictionary = None
+
+
+def _init_worker(dictionary):
+    global _worker_dictionary
+    _worker_dictionary = dictionary
+
+
+def _evaluate_chunk(rows):
+    return evaluate(rows, _worker_dictionary)
+
+
+def iter_row_chunks(rows, chunk_size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def evaluate_parallel(rows, dictionary, processes, chunk_size=50_000):
+    """evaluate по кускам в пуле процессов; elapsed - общее время стены"""
+    start = time.perf_counter()
+    with Pool(processes, initializer=_init_worker, initargs=(dictionary,)) as pool:
+        result = merge_results(pool.imap(_evaluate_chunk, iter_row_chunks(rows, chunk_size)))
+    if result is None:
+        result = evaluate([], dictionary)
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+def print_report(result):
+    total = result["total"]
+    confusion = result["confusion"]
+    correct = sum(confusion[label, label] for label in dataset_io.LABELS)
+
+    print(f"Строк: {total}")
+    print(f"Точность: {correct / max(total, 1) * 100:.2f}%")
+    print("Матрица ошибок (строки - истинные, столбцы - предсказанные):")
+    print(" " * 10 + "".join(f"{label:>10}" for label in PREDICTIONS))
+    for label in dataset_io.LABELS:
+        print(f"{label:<10}" + "".join(f"{confusion[label, predicted]:>10}" for predicted in PREDICTIONS))
+
+    print("Точность по длине слова (буквы):")
+    for bucket in ("1-3", "4+"):
+        count = result["buckets"][bucket]
+        accuracy = result["bucket_correct"][bucket] / count * 100 if count else 0.0
+        print(f"   {bucket:<4} {accuracy:6.2f}%  ({count} строк)")
+
+    print("Методы решения:")
+    for method, count in result["methods"].most_common():
+        print(f"   {method:<22} {count:>10}  {count / max(total, 1) * 100:6.2f}%")
+
+    layout_check = result["layout_check"]
+    checked = sum(layout_check.values())
+    if checked:
+        true_positive = layout_check["ru_wrong", True]
+        predicted_positive = true_positive + layout_check["en", True]
+        actual_positive = true_positive + layout_check["ru_wrong", False]
+        precision = true_positive / predicted_positive if predicted_positive else 0.0
+        recall = true_positive / actual_positive if actual_positive else 0.0
+        print(f"isRussianWordInEnglishLayout на {checked} словах латиницей: "
+              f"precision {precision:.4f}, recall {recall:.4f}")
+
+    rate = total / result["elapsed"] if result["elapsed"] > 0 else float("inf")
+    print(f"Скорость: {rate:,.0f} слов/с ({result['elapsed']:.2f} с)")
+
+
+def generator_word_lists():
+    """Списки слов генераторов датасетов (en, ru) - грубая замена системного словаря"""
+    ml_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.join(ml_dir, "Data"))
+    import generate_dataset
+    import generate_expanded_dataset as expanded
+
+    en_words = (expanded.popular_en + expanded.conjunctions_en + expanded.short_en
+                + expanded.additional_en + generate_dataset.english_words)
+    ru_words = (expanded.popular_ru + expanded.conjunctions_ru + expanded.short_ru
+                + expanded.additional_ru + generate_dataset.russian_words)
+    return [w for w in en_words if " " not in w], [w for w in ru_words if " " not in w]
+
+
+def build_dictionary(args):
+    en_words = []
+    ru_words = []
+    if args.generator_words:
+        en_words, ru_words = generator_word_lists()
+    if args.en_words:
+        en_words += dataset_io.load_word_list(args.en_words)
+    if args.ru_words:
+        ru_words += dataset_io.load_word_list(args.ru_words)
+    return WordListDictionary(en_words, ru_words)
+
+
+def add_dictionary_arguments(parser):
+    parser.add_argument("--en-words", help="список английских слов для словарной проверки")
+    parser.add_argument("--ru-words", help="список русских слов для словарной проверки")
+    parser.add_argument("--generator-words", action="store_true",
+                        help="использовать списки слов генераторов датасетов как словарь")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетная оценка эвристик определения языка BabylonFish")
+    parser.add_argument("datasets", nargs="+", help="датасеты CSV или .bfds (text,label)")
+    parser.add_argument("--limit", type=int, default=None, help="не больше N строк из каждого файла")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="процессов для больших датасетов (по умолчанию %(default)s)")
+    add_dictionary_arguments(parser)
+    args = parser.parse_args(argv)
+
+    dictionary = build_dictionary(args)
+    for path in args.datasets:
+        print(f"=== {path}")
+        rows = dataset_io.iter_rows(path)
+        if args.limit is not None:
+            rows = islice(rows, args.limit)
+        if args.processes > 1:
+            print_report(evaluate_parallel(rows, dictionary, args.processes))
+        else:
+            print_report(evaluate(rows, dictionary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,912 @@
+#!/usr/bin/env python3
+"""
+Трассы нажатий клавиш и Python порт сегментации буфера BabylonFish для их воспроизведения
+
+Трасса - поток событий клавиатуры в том виде, в каком их видит EventTapManager:
+код клавиши, модификаторы, время и тип события. Символ события не хранится,
+он получается из кода клавиши, Shift и активной раскладки, как в macOS.
+
+Раскладка .bfkt (little-endian):
+    заголовок HEADER_SIZE байт: magic "BFKT", версия, размер заголовка, число событий
+    события EVENT_DTYPE по 16 байт:
+        time_us uint64 - микросекунды от начала трассы
+        flags   uint32 - CGEventFlags (maskShift/maskControl/maskAlternate/maskCommand)
+        key     uint16 - виртуальный код клавиши macOS
+        kind    uint8  - KEY_DOWN / KEY_UP / FLAGS_CHANGED
+        layout  uint8  - активная раскладка (LAYOUT_EN / LAYOUT_RU)
+
+Генератор превращает строки датасета в набор текста: интервалы между нажатиями,
+Shift для заглавных и верхнего регистра, опечатки с Backspace (в том числе
+исправление уже после пробела), знаки препинания после слов, Return,
+переключение раскладки Ctrl+Space и двойной Shift.
+
+Портированы:
+- BufferManager целиком: addCharacter/processCharacter/shouldProcessWord/getCurrentWord,
+  removeLast с reconstructWordBuffer, clearWord/clear/clearForNewInput, handleBufferOverflow;
+- EventProcessor.processEvent по стадиям, processWord (проверка длины),
+  isEnglishWordInRussianLayout, shouldClearBufferForNewInput, shouldIgnoreEvent, isDoubleShift;
+- фильтр EventTapManager: маска keyDown|flagsChanged, события с Cmd/Ctrl до процессора не доходят
+  (--fallback - глобальный монитор NSEvent без этого фильтра);
+- таблица KeyMapper.getChars.
+NeuralLanguageClassifier заменяется функцией classifier(word) -> (language, confidence)
+(без нее ответ всегда "не уверен" - верхняя граница числа вызовов), NSSpellChecker -
+словарем heuristic_detector.WordListDictionary или словарем .bflx (lexicon.py).
+ContextAnalyzer и переключение раскладки не портированы: processWord всегда
+заканчивается clearWord, как и все его ветви в Swift.
+
+    python3 ML/keystroke_replay.py generate ML/Data/expanded_dataset.csv trace.bfkt
+    python3 ML/keystroke_replay.py replay trace.bfkt --generator-words
+    python3 ML/keystroke_replay.py dump trace.bfkt --limit 40
+"""
+
+import argparse
+import mmap
+import random
+import struct
+import sys
+import time
+from collections import Counter
+from itertools import islice
+
+import numpy as np
+
+import dataset_io
+import heuristic_detector
+import layout_transcoder
+
+MAGIC = b"BFKT"
+VERSION = 1
+EXTENSION = ".bfkt"
+HEADER_FORMAT = "<4sHHQ"
+HEADER_SIZE = 32
+EVENT_DTYPE = np.dtype([("time_us", "<u8"), ("flags", "<u4"), ("key", "<u2"),
+                        ("kind", "u1"), ("layout", "u1")])
+
+KEY_DOWN, KEY_UP, FLAGS_CHANGED = 0, 1, 2
+KIND_NAMES = ("keyDown", "keyUp", "flagsChanged")
+LAYOUT_EN, LAYOUT_RU = 0, 1
+LAYOUT_NAMES = ("en", "ru")
+
+# CGEventFlags
+MASK_SHIFT = 0x20000
+MASK_CONTROL = 0x40000
+MASK_ALTERNATE = 0x80000
+MASK_COMMAND = 0x100000
+
+KEY_RETURN = 36
+KEY_TAB = 48
+KEY_SPACE = 49
+KEY_DELETE = 51
+KEY_ESCAPE = 53
+KEY_LEFT_SHIFT = 56
+KEY_RIGHT_SHIFT = 60
+
+# MARK: - Клавиатура
+
+# Коды клавиш символов layout_transcoder.EN_LAYOUT/RU_LAYOUT (первая половина строк - без Shift)
+LAYOUT_KEYS = (50, 12, 13, 14, 15, 17, 16, 32, 34, 31, 35, 33, 30,
+               0, 1, 2, 3, 5, 4, 38, 40, 37, 41, 39,
+               6, 7, 8, 9, 11, 45, 46, 43, 47, 44)
+DIGIT_KEYS = (18, 19, 20, 21, 23, 22, 26, 28, 25, 29, 27, 24)
+DIGITS = "1234567890-="
+SHIFTED_DIGITS = {LAYOUT_EN: "!@#$%^&*()_+", LAYOUT_RU: "!\"№;%:?*()_+"}
+KEY_BACKSLASH = 42
+SHIFTED_BACKSLASH = {LAYOUT_EN: "|", LAYOUT_RU: "/"}
+# Символы клавиш, которые не зависят от раскладки (unicodeString в CGEvent)
+CONTROL_CHARS = {KEY_SPACE: " ", KEY_RETURN: "\r", KEY_TAB: "\t", KEY_DELETE: "\x7f", KEY_ESCAPE: "\x1b"}
+
+# KeyMapper.map: код клавиши -> (en, ru); клавиши 44 ("/" и русские "." ",") в Swift нет
+KEY_MAPPER = {
+    0: ("a", "ф"), 1: ("s", "ы"), 2: ("d", "в"), 3: ("f", "а"), 4: ("h", "р"), 5: ("g", "п"),
+    6: ("z", "я"), 7: ("x", "ч"), 8: ("c", "с"), 9: ("v", "м"), 11: ("b", "и"),
+    12: ("q", "й"), 13: ("w", "ц"), 14: ("e", "у"), 15: ("r", "к"), 16: ("y", "н"), 17: ("t", "е"),
+    31: ("o", "щ"), 32: ("u", "г"), 34: ("i", "ш"), 35: ("p", "з"), 37: ("l", "д"),
+    38: ("j", "о"), 40: ("k", "л"), 41: (";", "ж"), 39: ("'", "э"),
+    45: ("n", "т"), 46: ("m", "ь"), 43: (",", "б"), 47: (".", "ю"), 50: ("`", "ё"),
+    33: ("[", "х"), 30: ("]", "ъ"), 42: ("\\", "\\"),
+    18: ("1", "1"), 19: ("2", "2"), 20: ("3", "3"), 21: ("4", "4"), 23: ("5", "5"),
+    22: ("6", "6"), 26: ("7", "7"), 28: ("8", "8"), 25: ("9", "9"), 29: ("0", "0"),
+    27: ("-", "-"), 24: ("=", "="),
+}
+
+
+def get_chars(key):
+    """KeyMapper.getChars: (en, ru) для кода клавиши или None"""
+    return KEY_MAPPER.get(key)
+
+
+def build_keyboard():
+    """
+    {layout: [символы без Shift, символы с Shift]} - списки по коду клавиши (0..127),
+    "" для клавиш без символа (модификаторы, стрелки)
+    """
+    keyboard = {}
+    for layout, chars in ((LAYOUT_EN, layout_transcoder.EN_LAYOUT), (LAYOUT_RU, layout_transcoder.RU_LAYOUT)):
+        half = len(chars) // 2
+        plain = [""] * 128
+        shifted = [""] * 128
+        for key, low, high in zip(LAYOUT_KEYS, chars[:half], chars[half:]):
+            plain[key] = low
+            shifted[key] = high
+        for key, low, high in zip(DIGIT_KEYS, DIGITS, SHIFTED_DIGITS[layout]):
+            plain[key] = low
+            shifted[key] = high
+        plain[KEY_BACKSLASH] = "\\"
+        shifted[KEY_BACKSLASH] = SHIFTED_BACKSLASH[layout]
+        for key, char in CONTROL_CHARS.items():
+            plain[key] = shifted[key] = char
+        keyboard[layout] = [plain, shifted]
+    return keyboard
+
+
+KEYBOARD = build_keyboard()
+
+
+def build_typing_tables():
+    """{layout: {символ: (код клавиши, нужен ли Shift)}} - обратная таблица для генератора"""
+    tables = {}
+    for layout, (plain, shifted) in KEYBOARD.items():
+        table = {}
+        for is_shifted, chars in ((True, shifted), (False, plain)):
+            for key, char in enumerate(chars):
+                if char and key not in (KEY_DELETE, KEY_ESCAPE, KEY_TAB):
+                    table[char] = (key, is_shifted)
+        table["\n"] = (KEY_RETURN, False)
+        tables[layout] = table
+    return tables
+
+
+TYPING = build_typing_tables()
+
+# MARK: - Формат .bfkt
+
+
+class TraceWriter:
+    """Потоковая запись .bfkt: события пишутся кусками numpy-массивов EVENT_DTYPE"""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self.file = open(path, "wb")
+        self.file.write(b"\0" * HEADER_SIZE)
+
+    def write(self, events):
+        events = np.asarray(events, dtype=EVENT_DTYPE)
+        self.file.write(events.tobytes())
+        self.count += len(events)
+
+    def close(self):
+        if self.file is None:
+            return
+        self.file.seek(0)
+        self.file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, HEADER_SIZE, self.count).ljust(HEADER_SIZE, b"\0"))
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class KeystrokeTrace:
+    """.bfkt, открытый через mmap; events - структурированный numpy-массив над файлом"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_size, count = struct.unpack_from(HEADER_FORMAT, self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: не файл {EXTENSION}")
+        if version != VERSION:
+            raise ValueError(f"{path}: неподдерживаемая версия {EXTENSION} {version}")
+        self.events = np.frombuffer(self._mmap, dtype=EVENT_DTYPE, count=count, offset=header_size)
+
+    def __len__(self):
+        return len(self.events)
+
+    def close(self):
+        if self._mmap is None:
+            return
+        self.events = None
+        self._mmap.close()
+        self._file.close()
+        self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def event_char(key, kind, flags, layout):
+    """unicodeString события: у flagsChanged пустая строка, иначе символ клавиши в раскладке"""
+    if kind == FLAGS_CHANGED or key >= 128:
+        return ""
+    return KEYBOARD[layout][1 if flags & MASK_SHIFT else 0][key]
+
+
+# MARK: - Генератор
+
+
+class TraceGenerator:
+    """
+    Набор строк датасета на клавиатуре. Интервалы между нажатиями - логнормальные
+    (медиана mean_interval_ms), символ, которого нет в активной раскладке,
+    набирается после Ctrl+Space, символы вне обеих раскладок пропускаются.
+    """
+
+    def __init__(self, seed=None, mean_interval_ms=120.0, typo_rate=0.02, late_fix_rate=0.005,
+                 capital_rate=0.1, punctuation_rate=0.08, return_rate=0.02,
+                 double_shift_rate=0.005, glue_rate=0.0):
+        self.rng = random.Random(seed)
+        self.mu = np.log(mean_interval_ms * 1000.0)
+        self.typo_rate = typo_rate
+        self.late_fix_rate = late_fix_rate
+        self.capital_rate = capital_rate
+        self.punctuation_rate = punctuation_rate
+        self.return_rate = return_rate
+        self.double_shift_rate = double_shift_rate
+        self.glue_rate = glue_rate
+        self.layout = LAYOUT_EN
+        self.time_us = 0
+        self.shift = False
+        self.skipped = Counter()
+        self.typo_keys = {layout: [key for key in LAYOUT_KEYS if KEYBOARD[layout][0][key].isalpha()]
+                          for layout in KEYBOARD}
+        self.events = []
+
+    def _tick(self, scale=1.0):
+        self.time_us += max(int(self.rng.lognormvariate(self.mu, 0.45) * scale), 1000)
+
+    def _emit(self, key, kind, flags):
+        self.events.append((self.time_us, flags, key, kind, self.layout))
+
+    def _press(self, key, flags=0):
+        self._tick()
+        self._emit(key, KEY_DOWN, flags)
+        self._tick(0.4)
+        self._emit(key, KEY_UP, flags)
+
+    def _set_shift(self, pressed):
+        if pressed == self.shift:
+            return
+        self._tick(0.5)
+        self._emit(KEY_LEFT_SHIFT, FLAGS_CHANGED, MASK_SHIFT if pressed else 0)
+        self.shift = pressed
+
+    def switch_layout(self, layout):
+        """Ctrl+Space: flagsChanged Control, keyDown/keyUp пробела с Control, отпускание Control"""
+        self._set_shift(False)
+        self._tick()
+        self._emit(59, FLAGS_CHANGED, MASK_CONTROL)
+        self._press(KEY_SPACE, MASK_CONTROL)
+        self._tick(0.5)
+        self._emit(59, FLAGS_CHANGED, 0)
+        self.layout = layout
+
+    def double_shift(self):
+        """Два нажатия Shift с интервалом меньше EventProcessor.doubleShiftThreshold"""
+        self._set_shift(False)
+        for _ in range(2):
+            self._tick()
+            self._emit(KEY_LEFT_SHIFT, FLAGS_CHANGED, MASK_SHIFT)
+            self._tick(0.3)
+            self._emit(KEY_LEFT_SHIFT, FLAGS_CHANGED, 0)
+
+    def backspace(self):
+        self._set_shift(False)
+        self._press(KEY_DELETE)
+
+    def type_char(self, char):
+        """Одно нажатие (с опечаткой и Backspace перед ним с вероятностью typo_rate); False - символа нет"""
+        stroke = TYPING[self.layout].get(char)
+        if stroke is None:
+            other = LAYOUT_RU if self.layout == LAYOUT_EN else LAYOUT_EN
+            if char not in TYPING[other]:
+                self.skipped[char] += 1
+                return False
+            self.switch_layout(other)
+            stroke = TYPING[self.layout][char]
+        if self.rng.random() < self.typo_rate:
+            self._set_shift(False)
+            self._press(self.rng.choice(self.typo_keys[self.layout]))
+            self.backspace()
+        key, shifted = stroke
+        self._set_shift(shifted)
+        self._press(key, MASK_SHIFT if shifted else 0)
+        return True
+
+    def type_row(self, text):
+        rng = self.rng
+        if text and rng.random() < self.capital_rate:
+            text = text[0].upper() + text[1:]
+        typed = [char for char in text if self.type_char(char)]
+        if rng.random() < self.double_shift_rate:
+            self.double_shift()
+        if rng.random() < self.glue_rate:
+            separators = [rng.choice("._-/")]
+        else:
+            separators = [rng.choice(",.!?:;")] if rng.random() < self.punctuation_rate else []
+            separators.append("\n" if rng.random() < self.return_rate else " ")
+        for char in separators:
+            self.type_char(char)
+        if typed and rng.random() < self.late_fix_rate:
+            # Опечатку заметили после пробела: стереть разделители и последнюю букву, набрать снова
+            for _ in range(len(separators) + 1):
+                self.backspace()
+            for char in typed[-1:] + separators:
+                self.type_char(char)
+        self._set_shift(False)
+
+    def generate(self, texts, chunk_size=100_000):
+        """Куски событий (numpy EVENT_DTYPE) по chunk_size строк"""
+        for index, text in enumerate(texts, 1):
+            self.type_row(text)
+            if index % chunk_size == 0:
+                yield self.flush()
+        if self.events:
+            yield self.flush()
+
+    def flush(self):
+        events = np.array(self.events, dtype=EVENT_DTYPE)
+        self.events = []
+        return events
+
+
+def generate_trace(dataset_path, output_path, generator, limit=None):
+    """Набирает тексты датасета и пишет трассу, возвращает (строк, событий)"""
+    texts = [text for text, _ in islice(dataset_io.iter_rows(dataset_path), limit)]
+    with TraceWriter(output_path) as writer:
+        for events in generator.generate(texts):
+            writer.write(events)
+        return len(texts), writer.count
+
+
+# MARK: - BufferManager.swift
+
+STRICT_WORD_BOUNDARIES = frozenset(" \t\n\r")
+PUNCTUATION = frozenset("!?.,;:'\"()[]{}-_=+@#$%^&*~`|\\/<>")
+SEPARATORS = STRICT_WORD_BOUNDARIES | PUNCTUATION
+
+
+class BufferManager:
+    """Порт BufferManager: буфер символов, текущее слово и завершенные слова"""
+
+    __slots__ = ("max_buffer_size", "max_word_length", "character_buffer", "word_buffer",
+                 "previous_words", "buffer_history", "total_characters_processed",
+                 "total_words_processed", "buffer_overflows", "overflow_word_clears", "max_character_buffer")
+
+    def __init__(self, max_buffer_size=1000, max_word_length=50):
+        self.max_buffer_size = max_buffer_size
+        self.max_word_length = max_word_length
+        self.character_buffer = []
+        self.word_buffer = ""
+        self.previous_words = []
+        self.buffer_history = []
+        self.total_characters_processed = 0
+        self.total_words_processed = 0
+        self.buffer_overflows = 0
+        # Статистика порта (в Swift нет): сколько раз переполнение сбросило wordBuffer, пик буфера
+        self.overflow_word_clears = 0
+        self.max_character_buffer = 0
+
+    def add_character(self, character):
+        if not character:
+            return
+        self.total_characters_processed += 1
+        if len(character) == 1:
+            self.process_character(character)
+        else:
+            for char in character:
+                self.process_character(char)
+        size = len(self.character_buffer)
+        if size > self.max_character_buffer:
+            self.max_character_buffer = size
+        if size > self.max_buffer_size:
+            self.handle_buffer_overflow()
+
+    def should_process_word(self):
+        if self.previous_words:
+            return True
+        return len(self.word_buffer) >= self.max_word_length > 0
+
+    def get_current_word(self):
+        if self.previous_words:
+            return self.previous_words[-1]
+        return self.word_buffer or None
+
+    def remove_last(self):
+        if not self.character_buffer:
+            return
+        self.character_buffer.pop()
+        self.reconstruct_word_buffer()
+
+    def clear_word(self):
+        if self.previous_words:
+            self.previous_words.pop()
+        if self.buffer_history:
+            self.buffer_history.pop()
+        self.word_buffer = ""
+
+    def clear(self):
+        if self.word_buffer:
+            self.clear_word()
+        self.character_buffer.clear()
+
+    def force_complete_current_word(self):
+        if self.word_buffer:
+            self.complete_current_word()
+
+    def clear_for_new_input(self):
+        self.character_buffer.clear()
+        self.word_buffer = ""
+        self.previous_words.clear()
+        self.buffer_history.clear()
+
+    def process_character(self, char):
+        self.character_buffer.append(char)
+        if char in SEPARATORS:
+            # Строгие границы и знаки препинания одинаково завершают слово и в него не попадают
+            if self.word_buffer:
+                self.complete_current_word()
+        elif len(self.word_buffer) < self.max_word_length:
+            self.word_buffer += char
+        else:
+            self.complete_current_word()
+            self.word_buffer = char
+
+    def complete_current_word(self):
+        if not self.word_buffer:
+            return
+        self.total_words_processed += 1
+        self.previous_words.append(self.word_buffer)
+        self.buffer_history.append(self.word_buffer)
+        self.word_buffer = ""
+
+    def handle_buffer_overflow(self):
+        self.buffer_overflows += 1
+        del self.character_buffer[:len(self.character_buffer) - self.max_buffer_size]
+        if self.word_buffer:
+            remaining = "".join(self.character_buffer[-len(self.word_buffer):])
+            if remaining != self.word_buffer:
+                self.word_buffer = ""
+                self.overflow_word_clears += 1
+
+    def reconstruct_word_buffer(self):
+        """Как в Swift: wordBuffer из ВСЕГО буфера символов без границ, а не из последнего слова"""
+        self.word_buffer = "".join(char for char in self.character_buffer if char not in SEPARATORS)
+
+
+# MARK: - EventProcessor.swift
+
+RUSSIAN_LETTERS = frozenset("абвгдеёжзийклмнопрстуфхцчшщъыьэюя")
+
+# Паттерны из EventProcessor.isEnglishWordInRussianLayout (проверка по префиксу)
+ENGLISH_IN_RUSSIAN_PATTERNS = (
+    "руддщ", "щт", "йфя", "еуые", "рщц", "яку", "нщг", "фку", "ерш", "ышы", "феу",
+    "ыеш", "тпд", "шыр", "юиф", "инд", "щта", "шырт", "щец", "щкл", "штп", "ю",
+)
+
+NEW_INPUT_KEYS = frozenset((36, 76, 49, 48, 53, 123, 124, 125, 126, 115, 119, 117, 114,
+                            122, 120, 99, 118, 96, 97, 98, 100, 101, 109, 103, 111))
+SPECIAL_KEYS = frozenset((53, 48, 51, 117, 115, 119, 116, 121, 123, 124, 125, 126))
+DOUBLE_SHIFT_THRESHOLD_US = 300_000
+
+# Стадии processEvent и их подписи в отчете (порядок - порядок проверок в Swift)
+STAGES = (
+    ("not_subscribed", "keyUp (нет в маске event tap)"),
+    ("tap_filtered", "Cmd/Ctrl, отброшено EventTapManager"),
+    ("events", "дошло до processEvent"),
+    ("manual_switch", "  Cmd/Ctrl+Space замечен updateContext"),
+    ("backspace", "  Backspace -> removeLast"),
+    ("backspace_empty", "    при пустом буфере символов"),
+    ("boundary_word", "  Space/Return со словом"),
+    ("boundary_pending", "    слово отложено на processPendingWord"),
+    ("boundary_empty", "  Space/Return без слова"),
+    ("clear_new_input", "  clearForNewInput по спецклавише/модификатору"),
+    ("arrow", "  стрелки -> clear"),
+    ("ignored_empty", "  игнор: пустой unicodeString"),
+    ("ignored_modifier", "  игнор: Cmd/Ctrl"),
+    ("ignored_special", "  игнор: спецклавиша"),
+    ("added", "  addCharacter"),
+    ("word_ready", "    shouldProcessWord -> processWord"),
+    ("length_check", "    слово >= minWordLengthForSwitch, проверка на каждом нажатии"),
+    ("forced_english", "      forceComplete: isEnglishWordInRussianLayout"),
+    ("forced_confident", "      forceComplete: классификатор >= 0.8"),
+    ("double_shift", "    handleDoubleShift"),
+    ("process_word", "processWord"),
+    ("process_word_too_long", "  слово длиннее maxWordLength -> clearWord"),
+    ("en_in_ru_checks", "isEnglishWordInRussianLayout (только русские буквы)"),
+    ("en_in_ru_pattern", "  совпал паттерн"),
+    ("en_in_ru_spelling", "  только английское по словарю (2-4 буквы)"),
+    ("en_in_ru_classifier", "  классификатор: английский >= 0.7"),
+    ("spell_checks", "вызовы NSSpellChecker"),
+    ("classifier_boundary", "NeuralLanguageClassifier: Space/Return"),
+    ("classifier_length", "NeuralLanguageClassifier: длина слова"),
+    ("classifier_en_in_ru", "NeuralLanguageClassifier: isEnglishWordInRussianLayout"),
+    ("classifier_process_word", "NeuralLanguageClassifier: processWord"),
+)
+CLASSIFIER_SITES = ("classifier_boundary", "classifier_length", "classifier_en_in_ru", "classifier_process_word")
+
+
+class EventProcessor:
+    """
+    Порт EventProcessor.processEvent до уровня буфера. classifier(word) -> (language, confidence)
+    с языками heuristic_detector.ENGLISH/RUSSIAN или None; dictionary - объект с check_spelling.
+    """
+
+    def __init__(self, buffer=None, classifier=None, dictionary=None, min_word_length_for_switch=3,
+                 max_word_length=50, enable_double_shift=False):
+        self.buffer = buffer or BufferManager()
+        self.classifier = classifier
+        self.dictionary = dictionary or heuristic_detector.WordListDictionary()
+        self.min_word_length_for_switch = min_word_length_for_switch
+        self.max_word_length = max_word_length
+        self.enable_double_shift = enable_double_shift
+        self.last_shift_time_us = None
+        # Время текущего события - для подписчиков, которые записывают вызовы словаря и классификатора
+        self.time_us = 0
+        self.stats = dict.fromkeys((name for name, _ in STAGES), 0)
+        self.pattern_hits = Counter()
+
+    def classify(self, word, site):
+        self.stats[site] += 1
+        if self.classifier is None:
+            return None, 0.0
+        return self.classifier(word)
+
+    def process_event(self, key, unicode, flags, time_us):
+        stats = self.stats
+        buffer = self.buffer
+        stats["events"] += 1
+        self.time_us = time_us
+
+        # 1. updateContext -> checkForManualLayoutSwitch
+        if key == KEY_SPACE and flags & (MASK_COMMAND | MASK_CONTROL):
+            stats["manual_switch"] += 1
+
+        if key == KEY_DELETE:
+            if not buffer.character_buffer:
+                stats["backspace_empty"] += 1
+            stats["backspace"] += 1
+            buffer.remove_last()
+            return
+
+        if key == KEY_SPACE or key == KEY_RETURN:
+            word = buffer.get_current_word()
+            if word:
+                stats["boundary_word"] += 1
+                if self.is_english_word_in_russian_layout(word):
+                    stats["boundary_pending"] += 1
+                else:
+                    language, confidence = self.classify(word, "classifier_boundary")
+                    if language is not None and confidence >= 0.8:
+                        stats["boundary_pending"] += 1
+            else:
+                stats["boundary_empty"] += 1
+            buffer.clear_for_new_input()
+            return
+
+        if key in NEW_INPUT_KEYS or flags & (MASK_COMMAND | MASK_CONTROL | MASK_ALTERNATE):
+            stats["clear_new_input"] += 1
+            buffer.clear_for_new_input()
+
+        if 123 <= key <= 126:
+            stats["arrow"] += 1
+            buffer.clear()
+            return
+
+        # 2. shouldIgnoreEvent
+        if not unicode:
+            stats["ignored_empty"] += 1
+            return
+        if flags & (MASK_COMMAND | MASK_CONTROL):
+            stats["ignored_modifier"] += 1
+            return
+        if key in SPECIAL_KEYS:
+            if key == 124:
+                buffer.clear_word()
+            stats["ignored_special"] += 1
+            return
+
+        # 3. Символ в буфер
+        stats["added"] += 1
+        buffer.add_character(unicode)
+
+        # 4. Границы слов
+        if buffer.should_process_word():
+            stats["word_ready"] += 1
+            self.process_word()
+            return
+
+        # 4.1. Длина слова без явной границы
+        word = buffer.get_current_word()
+        if word is not None and len(word) >= self.min_word_length_for_switch:
+            stats["length_check"] += 1
+            if self.is_english_word_in_russian_layout(word):
+                stats["forced_english"] += 1
+                buffer.force_complete_current_word()
+                self.process_word()
+                return
+            language, confidence = self.classify(word, "classifier_length")
+            if language is not None and confidence >= 0.8:
+                stats["forced_confident"] += 1
+                buffer.force_complete_current_word()
+                self.process_word()
+                return
+
+        # 5. handleSpecialKeyCombinations
+        if self.enable_double_shift and self.is_double_shift(key, flags, time_us):
+            stats["double_shift"] += 1
+
+    def process_word(self):
+        word = self.buffer.get_current_word()
+        if word is None:
+            return
+        self.stats["process_word"] += 1
+        if len(word) > self.max_word_length:
+            self.stats["process_word_too_long"] += 1
+            self.buffer.clear_word()
+            return
+        self.classify(word, "classifier_process_word")
+        self.buffer.clear_word()
+
+    def is_english_word_in_russian_layout(self, word):
+        lowercased = word.lower()
+        if not RUSSIAN_LETTERS.issuperset(lowercased):
+            return False
+        stats = self.stats
+        stats["en_in_ru_checks"] += 1
+
+        # 1. Известные паттерны
+        if lowercased.startswith(ENGLISH_IN_RUSSIAN_PATTERNS):
+            stats["en_in_ru_pattern"] += 1
+            self.pattern_hits[next(p for p in ENGLISH_IN_RUSSIAN_PATTERNS if lowercased.startswith(p))] += 1
+            return True
+
+        # 2. Короткие слова (2-4 символа): NSSpellChecker в обоих языках
+        if 2 <= len(lowercased) <= 4:
+            stats["spell_checks"] += 2
+            is_english_word = self.dictionary.check_spelling(lowercased, "en")
+            is_russian_word = self.dictionary.check_spelling(lowercased, "ru")
+            if is_english_word and not is_russian_word:
+                stats["en_in_ru_spelling"] += 1
+                return True
+            if is_english_word and is_russian_word:
+                return False
+
+        # 3. Нейросеть
+        language, confidence = self.classify(lowercased, "classifier_en_in_ru")
+        if language == heuristic_detector.ENGLISH and confidence >= 0.7:
+            stats["en_in_ru_classifier"] += 1
+            return True
+        return False
+
+    def is_double_shift(self, key, flags, time_us):
+        if key != KEY_LEFT_SHIFT and key != KEY_RIGHT_SHIFT:
+            return False
+        if not flags & MASK_SHIFT:
+            return False
+        previous = self.last_shift_time_us
+        self.last_shift_time_us = time_us
+        return previous is not None and time_us - previous < DOUBLE_SHIFT_THRESHOLD_US
+
+
+class LexiconDictionary:
+    """NSSpellChecker по словарю .bflx (lexicon.py)"""
+
+    def __init__(self, lexicon):
+        self.lexicon = lexicon
+
+    def check_spelling(self, word, language_code):
+        return language_code in self.lexicon.languages(word)
+
+
+# MARK: - Воспроизведение
+
+
+def screen_word(screen):
+    """Слово перед курсором на экране: символы после последнего разделителя"""
+    index = len(screen)
+    while index > 0 and screen[index - 1] not in SEPARATORS:
+        index -= 1
+    return "".join(screen[index:])
+
+
+def build_unicode_table():
+    """Символы событий массивом numpy: [раскладка, Shift, код клавиши], последний код - пустая строка"""
+    table = np.full((len(LAYOUT_NAMES), 2, 129), "", dtype=object)
+    for layout, rows in KEYBOARD.items():
+        for shifted, chars in enumerate(rows):
+            table[layout, shifted, :128] = chars
+    return table
+
+
+UNICODE_TABLE = build_unicode_table()
+
+
+def replay(events, processor, fallback=False, chunk_size=1 << 16):
+    """
+    Прогоняет события через processor; рядом ведется текст на экране, чтобы
+    сравнить слово буфера с реально набранным. Возвращает словарь метрик трассы.
+    Символы событий и фильтр event tap считаются numpy на весь кусок, в цикле остается
+    только экран и вызов processor.process_event. Цель 1M событий/с выполняется не всегда:
+    на трассе 4.4M событий 1.0-1.25M/с, под нагрузкой меньше; почти все время - сам
+    порт processEvent, который вызывается на каждое событие.
+    """
+    buffer = processor.buffer
+    get_current_word = buffer.get_current_word
+    process_event = processor.process_event
+    stats = processor.stats
+    tap_mask = 0 if fallback else MASK_COMMAND | MASK_CONTROL
+    screen = []
+    append = screen.append
+    trace = Counter()
+    boundaries = boundary_mismatch = backspace_desync = double_shift = tap_filtered = 0
+    last_shift_us = None
+
+    for start in range(0, len(events), chunk_size):
+        part = events[start:start + chunk_size]
+        # keyUp нет в маске event tap: отсеиваются целиком, до цикла
+        subscribed = part["kind"] != KEY_UP
+        stats["not_subscribed"] += len(part) - int(np.count_nonzero(subscribed))
+        part = part[subscribed]
+        flags = part["flags"]
+        keys = part["key"]
+        is_flags_changed = part["kind"] == FLAGS_CHANGED
+        # unicodeString: у flagsChanged и клавиш >= 128 - пустая строка (последний столбец таблицы)
+        columns = np.where(is_flags_changed | (keys >= 128), 128, keys)
+        shifted = ((flags & MASK_SHIFT) != 0).astype(np.intp)
+        unicodes = UNICODE_TABLE[part["layout"], shifted, columns]
+        on_screen = ~is_flags_changed & ((flags & (MASK_COMMAND | MASK_CONTROL)) == 0)
+        tapped = (flags & tap_mask) != 0
+        tap_filtered += int(np.count_nonzero(tapped))
+        for time_us, flag, key, flags_changed, unicode, visible, filtered in zip(
+                part["time_us"].tolist(), flags.tolist(), keys.tolist(), is_flags_changed.tolist(),
+                unicodes.tolist(), on_screen.tolist(), tapped.tolist()):
+            if flags_changed:
+                if (key == KEY_LEFT_SHIFT or key == KEY_RIGHT_SHIFT) and flag & MASK_SHIFT:
+                    if last_shift_us is not None and time_us - last_shift_us < DOUBLE_SHIFT_THRESHOLD_US:
+                        double_shift += 1
+                    last_shift_us = time_us
+            elif visible:
+                # Текст на экране (Return переводит строку, Backspace стирает)
+                if key == KEY_DELETE:
+                    if screen:
+                        screen.pop()
+                elif key == KEY_SPACE or key == KEY_RETURN:
+                    if (get_current_word() or "") != screen_word(screen):
+                        boundary_mismatch += 1
+                    boundaries += 1
+                    screen.clear()
+                elif unicode:
+                    append(unicode)
+                    if len(screen) > 4096:
+                        del screen[:2048]
+            if filtered:
+                continue
+            process_event(key, unicode, flag, time_us)
+            if key == KEY_DELETE and (get_current_word() or "") != screen_word(screen):
+                backspace_desync += 1
+    stats["tap_filtered"] += tap_filtered
+    trace.update(boundaries=boundaries, boundary_mismatch=boundary_mismatch,
+                 backspace_desync=backspace_desync, double_shift=double_shift)
+    return trace
+
+
+def print_report(processor, trace, elapsed, total):
+    stats = processor.stats
+    buffer = processor.buffer
+    print(f"Событий в трассе: {total:,}")
+    for name, title in STAGES:
+        value = stats[name]
+        share = f" ({value / total * 100:.2f}% событий)" if total else ""
+        print(f"   {title}: {value:,}{share}")
+    print(f"   вызовы NeuralLanguageClassifier всего: {sum(stats[site] for site in CLASSIFIER_SITES):,}")
+    if processor.pattern_hits:
+        print("   паттерны isEnglishWordInRussianLayout: "
+              + ", ".join(f"{pattern} {count:,}" for pattern, count in processor.pattern_hits.most_common(8)))
+
+    print("BufferManager:")
+    print(f"   символов {buffer.total_characters_processed:,}, завершено слов {buffer.total_words_processed:,}")
+    print(f"   пик буфера символов {buffer.max_character_buffer:,} из {buffer.max_buffer_size:,}")
+    print(f"   handleBufferOverflow: {buffer.buffer_overflows:,} вызовов, "
+          f"сброс wordBuffer {buffer.overflow_word_clears:,}")
+
+    boundaries = trace["boundaries"]
+    print("Сегментация против текста на экране:")
+    if boundaries:
+        print(f"   слово буфера на Space/Return не совпало с набранным: {trace['boundary_mismatch']:,} "
+              f"из {boundaries:,} ({trace['boundary_mismatch'] / boundaries * 100:.2f}%)")
+    print(f"   после Backspace буфер разошелся с экраном: {trace['backspace_desync']:,}")
+    print(f"   двойных Shift в трассе: {trace['double_shift']:,}, "
+          f"дошло до handleDoubleShift: {stats['double_shift']:,}"
+          + ("" if processor.enable_double_shift else " (enableDoubleShift выключен)"))
+    rate = total / elapsed if elapsed > 0 else float("inf")
+    print(f"Скорость: {rate:,.0f} нажатий/с ({elapsed:.2f} с)")
+
+
+def dump(events, limit):
+    for time_us, flags, key, kind, layout in events[:limit].tolist():
+        char = event_char(key, kind, flags, layout)
+        modifiers = "".join(name for mask, name in ((MASK_SHIFT, "⇧"), (MASK_CONTROL, "⌃"),
+                                                    (MASK_ALTERNATE, "⌥"), (MASK_COMMAND, "⌘")) if flags & mask)
+        print(f"{time_us / 1e6:10.3f}  {KIND_NAMES[kind]:<12} key={key:<3} {modifiers:<2} "
+              f"{LAYOUT_NAMES[layout]} {char!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Трассы нажатий клавиш и воспроизведение буфера BabylonFish")
+    parser.add_argument("command", choices=("generate", "replay", "dump"))
+    parser.add_argument("paths", nargs="+", help=f"generate: датасет и трасса {EXTENSION}; replay/dump: трасса")
+    parser.add_argument("--limit", type=int, default=None, help="строк датасета (generate) или событий (dump)")
+    parser.add_argument("--seed", type=int, default=42, help="seed генератора (по умолчанию %(default)s)")
+    parser.add_argument("--typo-rate", type=float, default=0.02,
+                        help="доля символов с опечаткой и Backspace (по умолчанию %(default)s)")
+    parser.add_argument("--late-fix-rate", type=float, default=0.005,
+                        help="доля слов, исправленных после пробела (по умолчанию %(default)s)")
+    parser.add_argument("--capital-rate", type=float, default=0.1,
+                        help="доля строк с заглавной буквы (по умолчанию %(default)s)")
+    parser.add_argument("--punctuation-rate", type=float, default=0.08,
+                        help="доля строк со знаком препинания в конце (по умолчанию %(default)s)")
+    parser.add_argument("--return-rate", type=float, default=0.02,
+                        help="доля строк, завершенных Return (по умолчанию %(default)s)")
+    parser.add_argument("--double-shift-rate", type=float, default=0.005,
+                        help="доля строк с двойным Shift (по умолчанию %(default)s)")
+    parser.add_argument("--glue-rate", type=float, default=0.0,
+                        help="доля строк, склеенных знаком без пробела - длинные куски для "
+                             "handleBufferOverflow (по умолчанию %(default)s)")
+    parser.add_argument("--fallback", action="store_true",
+                        help="события глобального монитора NSEvent (без фильтра Cmd/Ctrl event tap)")
+    parser.add_argument("--enable-double-shift", action="store_true", help="config.enableDoubleShift = true")
+    parser.add_argument("--max-buffer-size", type=int, default=1000,
+                        help="BufferManager.maxBufferSize (по умолчанию %(default)s)")
+    parser.add_argument("--lexicon", help="словарь .bflx (lexicon.py) вместо NSSpellChecker")
+    heuristic_detector.add_dictionary_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        if len(args.paths) != 2:
+            parser.error("generate: нужны датасет и файл трассы")
+        generator = TraceGenerator(seed=args.seed, typo_rate=args.typo_rate, late_fix_rate=args.late_fix_rate,
+                                   capital_rate=args.capital_rate, punctuation_rate=args.punctuation_rate,
+                                   return_rate=args.return_rate, double_shift_rate=args.double_shift_rate,
+                                   glue_rate=args.glue_rate)
+        start = time.perf_counter()
+        rows, events = generate_trace(args.paths[0], args.paths[1], generator, args.limit)
+        print(f"✅ Трасса сохранена: {args.paths[1]} ({rows:,} строк, {events:,} событий, "
+              f"{generator.time_us / 3.6e9:.1f} ч набора, {time.perf_counter() - start:.1f} с)")
+        if generator.skipped:
+            skipped = ", ".join(f"{char!r} {count:,}" for char, count in generator.skipped.most_common(10))
+            print(f"   пропущены символы вне раскладок: {skipped}")
+        return 0
+
+    for path in args.paths:
+        with KeystrokeTrace(path) as trace:
+            if args.command == "dump":
+                dump(trace.events, args.limit or 50)
+                continue
+            lexicon = None
+            if args.lexicon:
+                import lexicon as lexicon_module
+                lexicon = lexicon_module.Lexicon(args.lexicon)
+                dictionary = LexiconDictionary(lexicon)
+            else:
+                dictionary = heuristic_detector.build_dictionary(args)
+            processor = EventProcessor(BufferManager(max_buffer_size=args.max_buffer_size),
+                                       dictionary=dictionary, enable_double_shift=args.enable_double_shift)
+            print(f"=== {path}")
+            start = time.perf_counter()
+            counts = replay(trace.events, processor, fallback=args.fallback)
+            print_report(processor, counts, time.perf_counter() - start, len(trace))
+            if lexicon is not None:
+                lexicon.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
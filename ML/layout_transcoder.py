@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Табличный транскодер раскладок клавиатуры ЙЦУКЕН <-> QWERTY для ML скриптов BabylonFish
+
+Одна и та же таблица используется всеми генераторами датасетов и совпадает
+с EventProcessor.convertFromRussianLayout/convertFromEnglishLayout и
+KeyMapper.convertString на стороне Swift (плюс русские "." и "," на клавише "/").
+
+Два пути конвертации:
+- ru_to_en/en_to_ru - предкомпилированные таблицы str.translate для отдельных строк;
+- batch_ru_to_en/batch_en_to_ru - NumPy: массив строк конвертируется целиком
+  через таблицу кодовых точек, без цикла Python по символам.
+
+Запуск как скрипта проверяет round-trip по раскладкам и меряет скорость:
+
+    python3 ML/layout_transcoder.py --benchmark 1000000
+"""
+
+import argparse
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:  # NumPy нужен только для пакетного режима
+    np = None
+
+# Раскладки по позициям клавиш: i-й символ en_layout набирается той же клавишей, что i-й символ ru_layout
+EN_LAYOUT = "`qwertyuiop[]asdfghjkl;'zxcvbnm,./~QWERTYUIOP{}ASDFGHJKL:\"ZXCVBNM<>?"
+RU_LAYOUT = "ёйцукенгшщзхъфывапролджэячсмитьбю.ЁЙЦУКЕНГШЩЗХЪФЫВАПРОЛДЖЭЯЧСМИТЬБЮ,"
+
+RU_TO_EN = str.maketrans(RU_LAYOUT, EN_LAYOUT)
+EN_TO_RU = str.maketrans(EN_LAYOUT, RU_LAYOUT)
+
+
+# Только буквы: для восстановления нажатых клавиш по тексту ("ghbdtn, lheu" остается
+# со своей запятой, а не превращается в "?")
+KEYS_FROM_RU = str.maketrans({ru: en for ru, en in zip(RU_LAYOUT, EN_LAYOUT) if ru.isalpha()})
+
+
+def ru_to_en(text):
+    """Русский текст, набранный на английской раскладке ("привет" -> "ghbdtn")"""
+    return text.translate(RU_TO_EN)
+
+
+def en_to_ru(text):
+    """Английский текст, набранный на русской раскладке ("ghbdtn" -> "привет")"""
+    return text.translate(EN_TO_RU)
+
+
+def key_strings(text):
+    """
+    Пара (en, ru), как ее строит EnhancedLanguageDetector.convertKeyCodesToStrings:
+    одни и те же нажатые клавиши в английской и в русской раскладке.
+    Русские буквы текста считаются набранными на русской раскладке, остальное - на английской.
+    """
+    en = text.translate(KEYS_FROM_RU)
+    return en, en.translate(EN_TO_RU)
+
+
+def _build_code_table(source, target):
+    """Таблица кодовых точек: table[ord(src)] = ord(dst), остальные символы без изменений"""
+    size = max(ord(ch) for ch in source) + 1
+    table = np.arange(size, dtype=np.uint32)
+    table[[ord(ch) for ch in source]] = [ord(ch) for ch in target]
+    return table
+
+
+_code_tables = {}
+
+
+def _code_table(direction):
+    if np is None:
+        raise RuntimeError("Для пакетной конвертации нужен NumPy: pip install numpy")
+    if direction not in _code_tables:
+        if direction == "ru_to_en":
+            _code_tables[direction] = _build_code_table(RU_LAYOUT, EN_LAYOUT)
+        else:
+            _code_tables[direction] = _build_code_table(EN_LAYOUT, RU_LAYOUT)
+    return _code_tables[direction]
+
+
+def translate_codes(codes, direction):
+    """
+    Конвертирует массив кодовых точек (любой формы, uint32) на месте и возвращает его.
+    Символы вне таблицы не меняются.
+    """
+    table = _code_table(direction)
+    mask = codes < table.size
+    codes[mask] = table[codes[mask]]
+    return codes
+
+
+def _batch(texts, direction):
+    """Строки -> массив UCS4 (n, width) -> таблица -> обратно в строки"""
+    array = np.asarray(texts, dtype=np.str_)
+    if array.size == 0:
+        return array
+    width = array.dtype.itemsize // 4
+    codes = np.ascontiguousarray(array).view(np.uint32).reshape(array.size, width).copy()
+    translate_codes(codes, direction)
+    return codes.view(f"<U{width}").reshape(array.shape)
+
+
+def batch_ru_to_en(texts):
+    """Пакетная версия ru_to_en: последовательность строк -> numpy-массив строк"""
+    return _batch(texts, "ru_to_en")
+
+
+def batch_en_to_ru(texts):
+    """Пакетная версия en_to_ru: последовательность строк -> numpy-массив строк"""
+    return _batch(texts, "en_to_ru")
+
+
+def check_round_trip():
+    """
+    Проверяет таблицы: раскладки одной длины, без повторов, и каждый символ
+    возвращается в себя после конвертации туда и обратно.
+    Возвращает список найденных проблем (пустой - все в порядке).
+    """
+    problems = []
+    if len(EN_LAYOUT) != len(RU_LAYOUT):
+        problems.append(f"длины раскладок различаются: {len(EN_LAYOUT)} != {len(RU_LAYOUT)}")
+    for name, layout in (("EN_LAYOUT", EN_LAYOUT), ("RU_LAYOUT", RU_LAYOUT)):
+        if len(set(layout)) != len(layout):
+            problems.append(f"в {name} есть повторяющиеся символы")
+    for ch in RU_LAYOUT:
+        if en_to_ru(ru_to_en(ch)) != ch:
+            problems.append(f"ru->en->ru: {ch!r} -> {ru_to_en(ch)!r} -> {en_to_ru(ru_to_en(ch))!r}")
+    for ch in EN_LAYOUT:
+        if ru_to_en(en_to_ru(ch)) != ch:
+            problems.append(f"en->ru->en: {ch!r} -> {en_to_ru(ch)!r} -> {ru_to_en(en_to_ru(ch))!r}")
+    if np is not None:
+        for direction, single, source in (("ru_to_en", ru_to_en, RU_LAYOUT), ("en_to_ru", en_to_ru, EN_LAYOUT)):
+            batch = _batch([source, source[::-1], ""], direction)
+            expected = [single(source), single(source[::-1]), ""]
+            if batch.tolist() != expected:
+                problems.append(f"пакетный {direction} не совпадает со str.translate")
+    return problems
+
+
+def benchmark(count):
+    """Замер скорости на count коротких слов, возвращает {режим: слов в секунду}"""
+    words = ["привет", "клавиатура", "да", "раскладка", "программирование", "нет", "код", "мир"]
+    texts = (words * (count // len(words) + 1))[:count]
+    results = {}
+
+    start = time.perf_counter()
+    for text in texts:
+        ru_to_en(text)
+    results["str.translate"] = count / (time.perf_counter() - start)
+
+    if np is not None:
+        array = np.asarray(texts, dtype=np.str_)
+        start = time.perf_counter()
+        batch_ru_to_en(array)
+        results["numpy batch"] = count / (time.perf_counter() - start)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Транскодер раскладок ЙЦУКЕН <-> QWERTY")
+    parser.add_argument("text", nargs="*", help="строки для конвертации")
+    parser.add_argument("--to", choices=("en", "ru"), default="en",
+                        help="направление: en - русский текст на английской раскладке (по умолчанию), ru - обратно")
+    parser.add_argument("--benchmark", type=int, metavar="N", default=0,
+                        help="замерить скорость на N словах")
+    args = parser.parse_args(argv)
+
+    convert = ru_to_en if args.to == "en" else en_to_ru
+    for text in args.text:
+        print(convert(text))
+
+    if args.text and not args.benchmark:
+        return 0
+
+    problems = check_round_trip()
+    if problems:
+        print("❌ Round-trip проверка не пройдена:")
+        for problem in problems:
+            print(f"   - {problem}")
+        return 1
+    print(f"✅ Round-trip проверка пройдена ({len(RU_LAYOUT)} символов)")
+
+    if args.benchmark:
+        for mode, rate in benchmark(args.benchmark).items():
+            print(f"   {mode}: {rate:,.0f} слов/с")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Компилятор словаря ru/en в минимальный ациклический автомат (DAFSA) и mmap-читатель
+
+TypoCorrector.isWordCorrect, SystemDictionaryService.checkSpelling/getCompletions
+и EventProcessor.isEnglishWordInRussianLayout спрашивают NSSpellChecker на каждый
+вызов (с кэшем по строкам), а рядом живут разрозненные Set<String> вроде
+LanguageConstants.commonEnglishWords. Скрипт собирает из частотных списков
+(word_lists.py) один бинарный файл, который открывается через mmap: проверка
+слова и префикса - проход по автомату за время длины слова, без обращений к
+словарному сервису, а страницы файла общие для всех процессов.
+
+Автомат строится алгоритмом Дачука (отсортированные слова, регистр
+эквивалентных узлов) по байтам UTF-8 слов в нижнем регистре. Для каждого узла
+хранится число слов под ним, для ребра - число слов в предыдущих ветвях узла,
+поэтому путь по автомату дает номер слова в лексикографическом порядке
+(минимальный идеальный хеш), а слова с общим префиксом занимают непрерывный
+диапазон номеров - отсортированный массив префиксов без хранения строк.
+По номеру лежат языки слова и его частотный ранг; для автодополнения по
+диапазону дополнительно хранятся top-k рангов в блоках по BLOCK_SIZE слов.
+
+Раскладка .bflx (little-endian, секции выровнены на 4 байта):
+    заголовок HEADER_SIZE байт: magic "BFLX", версия, размер заголовка, число
+        узлов, ребер и слов, BLOCK_SIZE, TOP_K, смещения секций
+    node_first_edge uint32[N + 1], node_count uint32[N], node_final uint8[N]
+    edge_label uint8[E] (по возрастанию внутри узла), edge_target uint32[E], edge_skip uint32[E]
+    word_languages uint8[W] (бит 0 - en, бит 1 - ru), word_rank uint32[W]
+    block_top uint32[ceil(W / BLOCK_SIZE) * TOP_K] - номера слов с лучшим рангом в блоке
+
+    python3 ML/lexicon.py build lexicon.bflx --en-words ML/Data/words_en.tsv --ru-words ML/Data/words_ru.tsv
+    python3 ML/lexicon.py lookup lexicon.bflx привет hello прив
+    python3 ML/lexicon.py benchmark lexicon.bflx --en-words ML/Data/words_en.tsv --ru-words ML/Data/words_ru.tsv
+"""
+
+import argparse
+import heapq
+import mmap
+import random
+import struct
+import sys
+import time
+from array import array
+
+import warm_cache
+import word_lists
+
+MAGIC = b"BFLX"
+VERSION = 1
+EXTENSION = ".bflx"
+HEADER_FORMAT = "<4sHHIIIHH" + "Q" * 9
+HEADER_SIZE = 112
+BLOCK_SIZE = 256
+TOP_K = 8
+NO_WORD = 0xFFFFFFFF
+LANGUAGE_BITS = {"en": 1, "ru": 2}
+_BYTES = [bytes((value,)) for value in range(256)]
+
+
+# MARK: - Построение
+
+class _Node:
+    __slots__ = ("id", "final", "edges")
+
+    def __init__(self, node_id):
+        self.id = node_id
+        self.final = False
+        self.edges = {}
+
+    def signature(self):
+        return self.final, tuple(sorted((label, child.id) for label, child in self.edges.items()))
+
+
+def build_dafsa(keys):
+    """Минимальный автомат по отсортированным уникальным ключам (bytes); возвращает корень"""
+    next_id = 1
+    root = _Node(0)
+    register = {}
+    unchecked = []
+    previous = b""
+
+    def minimize(down_to):
+        while len(unchecked) > down_to:
+            parent, label, child = unchecked.pop()
+            signature = child.signature()
+            existing = register.get(signature)
+            if existing is not None:
+                parent.edges[label] = existing
+            else:
+                register[signature] = child
+
+    for key in keys:
+        if key <= previous and previous:
+            raise ValueError("Ключи должны быть уникальными и отсортированными")
+        common = 0
+        for a, b in zip(key, previous):
+            if a != b:
+                break
+            common += 1
+        minimize(common)
+        node = unchecked[-1][2] if unchecked else root
+        for label in key[common:]:
+            child = _Node(next_id)
+            next_id += 1
+            node.edges[label] = child
+            unchecked.append((node, label, child))
+            node = child
+        node.final = True
+        previous = key
+    minimize(0)
+    return root
+
+
+def flatten(root):
+    """Узлы в порядке обхода в ширину (корень - 0): массивы секций автомата"""
+    order = [root]
+    numbers = {root.id: 0}
+    first_edge = [0]
+    finals = []
+    labels = array("B")
+    targets = array("I")
+    position = 0
+    while position < len(order):
+        node = order[position]
+        position += 1
+        finals.append(1 if node.final else 0)
+        for label in sorted(node.edges):
+            child = node.edges[label]
+            if child.id not in numbers:
+                numbers[child.id] = len(order)
+                order.append(child)
+            labels.append(label)
+            targets.append(numbers[child.id])
+        first_edge.append(len(labels))
+
+    # Слов под узлом: порядок обхода в ширину не топологический, поэтому - обход в глубину с мемоизацией
+    counts = [0] * len(order)
+    done = [False] * len(order)
+    for start in range(len(order) - 1, -1, -1):
+        stack = [start]
+        while stack:
+            node = stack[-1]
+            if done[node]:
+                stack.pop()
+                continue
+            pending = [targets[e] for e in range(first_edge[node], first_edge[node + 1]) if not done[targets[e]]]
+            if pending:
+                stack.extend(pending)
+                continue
+            counts[node] = finals[node] + sum(counts[targets[e]] for e in range(first_edge[node], first_edge[node + 1]))
+            done[node] = True
+            stack.pop()
+
+    skips = array("I")
+    for node in range(len(order)):
+        skip = finals[node]
+        for e in range(first_edge[node], first_edge[node + 1]):
+            skips.append(skip)
+            skip += counts[targets[e]]
+    return array("I", first_edge), array("I", counts), bytes(finals), labels, targets, skips
+
+
+def block_tops(ranks, block_size=BLOCK_SIZE, top_k=TOP_K):
+    """Для каждого блока номеров слов - top_k номеров с лучшим (меньшим) рангом"""
+    tops = array("I")
+    for start in range(0, len(ranks), block_size):
+        indices = heapq.nsmallest(top_k, range(start, min(start + block_size, len(ranks))), key=ranks.__getitem__)
+        tops.extend(indices + [NO_WORD] * (top_k - len(indices)))
+    return tops
+
+
+def merge_word_lists(lists):
+    """{язык: [слова по убыванию частоты]} -> [(ключ UTF-8, языки, ранг)] по возрастанию ключа"""
+    entries = {}
+    for language, words in lists.items():
+        for rank, word in enumerate(words):
+            key = word.lower().encode("utf-8")
+            if not key:
+                continue
+            languages, best = entries.get(key, (0, rank))
+            entries[key] = (languages | LANGUAGE_BITS[language], min(best, rank))
+    return [(key, languages, rank) for key, (languages, rank) in sorted(entries.items())]
+
+
+def _align(f, alignment=4):
+    f.write(b"\0" * (-f.tell() % alignment))
+    return f.tell()
+
+
+def build_lexicon(lists, output_path):
+    """Компилирует словарь в .bflx, возвращает (узлов, ребер, слов)"""
+    entries = merge_word_lists(lists)
+    root = build_dafsa(key for key, _, _ in entries)
+    first_edge, counts, finals, labels, targets, skips = flatten(root)
+    languages = bytes(languages for _, languages, _ in entries)
+    ranks = array("I", (rank for _, _, rank in entries))
+    tops = block_tops(ranks)
+    nodes = len(counts)
+
+    with open(output_path, "wb") as f:
+        f.write(b"\0" * HEADER_SIZE)
+        offsets = []
+        for section in (first_edge, counts, finals, labels, targets, skips, languages, ranks, tops):
+            offsets.append(_align(f))
+            f.write(section if isinstance(section, bytes) else section.tobytes())
+        f.seek(0)
+        f.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, HEADER_SIZE, nodes, len(labels), len(entries),
+                            BLOCK_SIZE, TOP_K, *offsets).ljust(HEADER_SIZE, b"\0"))
+    return nodes, len(labels), len(entries)
+
+
+# MARK: - Чтение
+
+class Lexicon:
+    """Словарь .bflx через mmap: проверка слов, префиксов и автодополнение без копирования"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, nodes, edges, words, self.block_size, self.top_k,
+         first_edge_offset, counts_offset, finals_offset, labels_offset, targets_offset,
+         skips_offset, languages_offset, ranks_offset, tops_offset) = struct.unpack_from(HEADER_FORMAT, self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: не файл {EXTENSION}")
+        if version != VERSION:
+            raise ValueError(f"{path}: неподдерживаемая версия {EXTENSION} {version}")
+
+        view = memoryview(self._mmap)
+        self._first_edge = view[first_edge_offset:first_edge_offset + 4 * (nodes + 1)].cast("I")
+        self._counts = view[counts_offset:counts_offset + 4 * nodes].cast("I")
+        self._finals = view[finals_offset:finals_offset + nodes]
+        self._labels_offset = labels_offset
+        self._labels = view[labels_offset:labels_offset + edges]
+        self._targets = view[targets_offset:targets_offset + 4 * edges].cast("I")
+        self._skips = view[skips_offset:skips_offset + 4 * edges].cast("I")
+        self._languages = view[languages_offset:languages_offset + words]
+        self._ranks = view[ranks_offset:ranks_offset + 4 * words].cast("I")
+        blocks = (words + self.block_size - 1) // self.block_size
+        self._tops = view[tops_offset:tops_offset + 4 * blocks * self.top_k].cast("I")
+        self.nodes = nodes
+        self.edges = edges
+        self.words = words
+
+    def __len__(self):
+        return self.words
+
+    def _walk(self, key):
+        """(узел, номер первого слова под узлом) после прохода по key или None"""
+        node = 0
+        index = 0
+        find = self._mmap.find
+        first_edge = self._first_edge
+        base = self._labels_offset
+        for byte in key:
+            start = first_edge[node]
+            end = first_edge[node + 1]
+            if end - start == 1:
+                # Цепочки с одним ребром - большая часть узлов
+                if self._labels[start] != byte:
+                    return None
+                edge = start
+            else:
+                position = find(_BYTES[byte], base + start, base + end)
+                if position < 0:
+                    return None
+                edge = position - base
+            index += self._skips[edge]
+            node = self._targets[edge]
+        return node, index
+
+    def index(self, word):
+        """Номер слова (минимальный идеальный хеш) или None"""
+        found = self._walk(word.lower().encode("utf-8"))
+        if found is None or not self._finals[found[0]]:
+            return None
+        return found[1]
+
+    def __contains__(self, word):
+        return self.index(word) is not None
+
+    def languages(self, word):
+        """Языки слова ("en", "ru") или пустой кортеж"""
+        index = self.index(word)
+        if index is None:
+            return ()
+        bits = self._languages[index]
+        return tuple(language for language, bit in LANGUAGE_BITS.items() if bits & bit)
+
+    def rank(self, word):
+        index = self.index(word)
+        return None if index is None else self._ranks[index]
+
+    def has_prefix(self, prefix):
+        """Есть ли слово, начинающееся с prefix"""
+        return self._walk(prefix.lower().encode("utf-8")) is not None
+
+    def prefix_range(self, prefix):
+        """Диапазон номеров [start, stop) слов с префиксом prefix"""
+        found = self._walk(prefix.lower().encode("utf-8"))
+        if found is None:
+            return 0, 0
+        node, start = found
+        return start, start + self._counts[node]
+
+    def word(self, index):
+        """Слово по номеру: спуск по автомату с выбором ветви по edge_skip"""
+        if not 0 <= index < self.words:
+            raise IndexError(index)
+        node = 0
+        key = bytearray()
+        while True:
+            if self._finals[node] and index == 0:
+                return key.decode("utf-8")
+            start = self._first_edge[node]
+            end = self._first_edge[node + 1]
+            # Последнее ребро с edge_skip <= index (двоичный поиск)
+            lo, hi = start, end - 1
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if self._skips[mid] <= index:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            index -= self._skips[lo]
+            key.append(self._labels[lo])
+            node = self._targets[lo]
+
+    def complete(self, prefix, k=TOP_K):
+        """k самых частых слов с префиксом: [(слово, ранг)]"""
+        start, stop = self.prefix_range(prefix)
+        if start >= stop:
+            return []
+        ranks = self._ranks
+        size = self.block_size
+        first_block = (start + size - 1) // size
+        last_block = stop // size
+        # Top-k блока покрывает запрос только при k <= TOP_K
+        if first_block >= last_block or k > self.top_k:
+            candidates = range(start, stop)
+        else:
+            candidates = list(range(start, first_block * size)) + list(range(last_block * size, stop))
+            tops = self._tops
+            for block in range(first_block, last_block):
+                for index in tops[block * self.top_k:(block + 1) * self.top_k]:
+                    if index != NO_WORD:
+                        candidates.append(index)
+        best = heapq.nsmallest(k, candidates, key=ranks.__getitem__)
+        return [(self.word(index), ranks[index]) for index in best]
+
+    def close(self):
+        for view in (self._first_edge, self._counts, self._finals, self._labels, self._targets,
+                     self._skips, self._languages, self._ranks, self._tops):
+            view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# MARK: - Бенчмарк
+
+def benchmark(lexicon, words, counts, count, seed=42):
+    """
+    мкс на запрос: проверка слова (попадания по частоте и промахи с опечаткой),
+    проверка префикса, автодополнение; для сравнения - Python set тех же слов.
+    """
+    rng = random.Random(seed)
+    sampler = word_lists.WordSampler(words, counts)
+    hits = sampler.sample(rng, count)
+    misses = [word[:-1] + "ъ" if len(word) > 1 else word + "ъ" for word in sampler.sample(rng, count)]
+    prefixes = [word[:rng.randint(1, max(1, len(word)))] for word in sampler.sample(rng, count)]
+    reference = set(words)
+
+    def timed(function, queries):
+        start = time.perf_counter()
+        for query in queries:
+            function(query)
+        return (time.perf_counter() - start) / max(len(queries), 1) * 1e6
+
+    results = {
+        "contains (hit)": timed(lexicon.__contains__, hits),
+        "contains (miss)": timed(lexicon.__contains__, misses),
+        "has_prefix": timed(lexicon.has_prefix, prefixes),
+        "complete top-8": timed(lexicon.complete, prefixes[:max(1, count // 10)]),
+        "python set (hit)": timed(reference.__contains__, hits),
+    }
+    found = sum(1 for word in hits if word in lexicon)
+    return results, found / max(count, 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Компилятор словаря ru/en в DAFSA (.bflx)")
+    parser.add_argument("command", choices=("build", "lookup", "complete", "benchmark"))
+    parser.add_argument("lexicon", help=f"файл словаря {EXTENSION}")
+    parser.add_argument("words", nargs="*", help="слова для lookup или префиксы для complete")
+    parser.add_argument("--en-words", help="частотный список английских слов (word_lists.py)")
+    parser.add_argument("--ru-words", help="частотный список русских слов (word_lists.py)")
+    parser.add_argument("--generator-words", action="store_true",
+                        help="списки слов генераторов датасетов (для языков без частотного списка)")
+    parser.add_argument("--limit", type=int, default=None, help="слов каждого языка")
+    parser.add_argument("--top", type=int, default=TOP_K, help="вариантов автодополнения (по умолчанию %(default)s)")
+    parser.add_argument("--count", type=int, default=200_000, help="запросов в benchmark")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        lists = {language: words[:args.limit] if args.limit else words
+                 for language, (words, _) in warm_cache.load_ranked_words(args).items()}
+        if not lists:
+            parser.error("нужны --en-words/--ru-words или --generator-words")
+        start = time.perf_counter()
+        nodes, edges, words = build_lexicon(lists, args.lexicon)
+        raw = sum(len(word.encode("utf-8")) + 1 for words_ in lists.values() for word in words_)
+        print(f"✅ Словарь сохранен: {args.lexicon} ({words} слов, {nodes} узлов, {edges} ребер; "
+              f"слова {raw} байт, {time.perf_counter() - start:.1f} с)")
+        return 0
+
+    with Lexicon(args.lexicon) as lexicon:
+        if args.command == "lookup":
+            for word in args.words:
+                languages = lexicon.languages(word)
+                status = f"{', '.join(languages)} (ранг {lexicon.rank(word)})" if languages else "нет"
+                print(f"{word}: {status}, префикс {'есть' if lexicon.has_prefix(word) else 'нет'}")
+            return 0
+        if args.command == "complete":
+            for prefix in args.words:
+                print(f"{prefix}: {', '.join(word for word, _ in lexicon.complete(prefix, args.top))}")
+            return 0
+
+        lists = warm_cache.load_ranked_words(args)
+        if not lists:
+            parser.error("для benchmark нужны частотные списки")
+        print(f"Словарь: {len(lexicon)} слов, {lexicon.nodes} узлов, {lexicon.edges} ребер")
+        for language, (words, counts) in lists.items():
+            if args.limit:
+                words, counts = words[:args.limit], counts[:args.limit]
+            results, found = benchmark(lexicon, words, counts, args.count)
+            print(f"   {language}: найдено {found * 100:.2f}% запросов по частоте")
+            for name, latency in results.items():
+                print(f"      {name}: {latency:.2f} мкс")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
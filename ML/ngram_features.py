@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Хешированные символьные n-граммы для Python классификаторов BabylonFish
+
+Текст приводится к нижнему регистру и обрамляется граничным символом "\\0"
+("\\0привет\\0"), из него берутся n-граммы порядков ORDERS. Каждая n-грамма
+хешируется FNV-1 по кодовым точкам и сворачивается в 2^bits корзин
+(фибоначчиево хеширование).
+
+Хеш считается одинаково в двух реализациях:
+- text_ngram_ids - обычный Python для одной строки;
+- batch_ngram_ids - NumPy для массива строк целиком (CSR: indptr, indices).
+Поэтому модель, обученная на пакетных признаках, применима к одиночным строкам.
+"""
+
+import numpy as np
+
+ORDERS = (1, 2, 3)
+DEFAULT_BITS = 18
+BOUNDARY = "\0"
+
+FNV_PRIME = 0x01000193
+GOLDEN = 0x9E3779B1
+MASK32 = 0xFFFFFFFF
+
+
+def _bucket(h, bits):
+    return ((h * GOLDEN) & MASK32) >> (32 - bits)
+
+
+def text_ngram_ids(text, bits=DEFAULT_BITS, orders=ORDERS):
+    """Список номеров корзин n-грамм одной строки (с повторами)"""
+    padded = BOUNDARY + text.lower() + BOUNDARY
+    codes = [ord(ch) for ch in padded]
+    ids = []
+    for n in orders:
+        # Униграммы не берем с граничных позиций
+        start, stop = (1, len(codes) - 1) if n == 1 else (0, len(codes) - n + 1)
+        for position in range(start, stop):
+            h = n
+            for code in codes[position:position + n]:
+                h = ((h * FNV_PRIME) & MASK32) ^ code
+            ids.append(_bucket(h, bits))
+    return ids
+
+
+def encode_texts(texts, lower=True):
+    """
+    Склеивает строки в один массив кодовых точек "\\0t1\\0t2\\0...\\0".
+    Возвращает (codes uint32, starts int64, lengths int64): строка j занимает
+    codes[starts[j]:starts[j] + lengths[j]].
+    """
+    if lower:
+        texts = [text.lower() for text in texts]
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    joined = BOUNDARY + BOUNDARY.join(texts) + BOUNDARY
+    codes = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32)
+    starts = np.empty(len(texts), dtype=np.int64)
+    if len(texts):
+        starts[0] = 1
+        np.cumsum(lengths[:-1] + 1, out=starts[1:])
+        starts[1:] += 1
+    return codes, starts, lengths
+
+
+def hash_positions(codes, positions, n):
+    """FNV-1 хеш n-грамм, начинающихся в positions (uint64, значения < 2^32)"""
+    h = np.full(positions.shape, n, dtype=np.uint64)
+    for k in range(n):
+        h = ((h * np.uint64(FNV_PRIME)) & np.uint64(MASK32)) ^ codes[positions + k].astype(np.uint64)
+    return h
+
+
+def bucket_hashes(h, bits):
+    return ((h * np.uint64(GOLDEN)) & np.uint64(MASK32)) >> np.uint64(32 - bits)
+
+
+def batch_ngram_ids(texts, bits=DEFAULT_BITS, orders=ORDERS, encoded=None):
+    """
+    Номера корзин n-грамм для массива строк за один проход NumPy.
+    Возвращает CSR-пару (indptr int64 [n+1], indices int32): n-граммы строки j -
+    indices[indptr[j]:indptr[j + 1]]. encoded - результат encode_texts, если уже есть.
+    """
+    codes, starts, lengths = encoded if encoded is not None else encode_texts(texts)
+    count = len(starts)
+    if count == 0:
+        return np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32)
+
+    # Позиции начала n-грамм строки j: от starts[j] - 1 (граница) до starts[j] + lengths[j]
+    spans = lengths + 1
+    rows = np.repeat(np.arange(count, dtype=np.int64), spans)
+    # Позиции идут подряд: у соседних строк общая граница, первая граница - codes[0]
+    positions = np.arange(len(rows), dtype=np.int64)
+    end_boundary = (starts + lengths)[rows]
+
+    row_parts = []
+    id_parts = []
+    for n in orders:
+        if n == 1:
+            mask = positions >= starts[rows]
+            mask &= positions < end_boundary
+        else:
+            mask = positions + (n - 1) <= end_boundary
+        selected = positions[mask]
+        row_parts.append(rows[mask])
+        id_parts.append(bucket_hashes(hash_positions(codes, selected, n), bits))
+
+    all_rows = np.concatenate(row_parts)
+    order = np.argsort(all_rows, kind="stable")
+    indices = np.concatenate(id_parts)[order].astype(np.int32)
+    indptr = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(all_rows, minlength=count), out=indptr[1:])
+    return indptr, indices
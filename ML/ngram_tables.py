@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Таблицы log-вероятностей биграмм и триграмм букв ru/en из датасетов и корпусов
+
+Замена ручных множеств LanguageConstants.commonRuBigrams/commonEnBigrams
+(с повторами "ль", "ес", "ет", "ос") и списков EventProcessor.isRussianBigram/
+isEnglishTrigram: вместо "есть в множестве или нет" каждая n-грамма получает
+log-вероятность, посчитанную по данным.
+
+Для каждого языка:
+- биграммы - плотная таблица alphabet x alphabet (33 x 33 для ru, 26 x 26 для en),
+  ln P(ab) со сглаживанием add-alpha по всем клеткам;
+- триграммы - 2^trigram_bits корзин по хешу FNV-1 кодовых точек (как в
+  ngram_features.py), ln P(корзина) со сглаживанием.
+Оценка слова - средний log-lift его n-грамм: ln P + ln(число клеток), то есть
+0 для равномерного шума и > 0 для типичных для языка сочетаний. Уверенность
+ru против en - сигмоида от разности оценок строк en/ru одних и тех же клавиш.
+
+Источники: датасеты CSV/.bfds (en -> английский, ru -> русский, ru_wrong -
+обратно в русский через layout_transcoder) и/или текстовые корпуса (--corpus).
+
+Выход:
+- --output: бинарный блоб .bfng (little-endian): заголовок HEADER_SIZE байт
+  (magic "BFNG", версия, размер заголовка, размеры алфавитов, trigram_bits,
+  длины алфавитов в байтах), алфавиты UTF-8, выравнивание на 4 байта, затем
+  float32 массивы ru_bigrams, en_bigrams, ru_trigrams, en_trigrams;
+- --swift-output: Swift исходник enum LanguageNgramTables с теми же таблицами
+  и функциями score/compare.
+
+    python3 ML/ngram_tables.py ML/Data/expanded_dataset.csv --output ngrams.bfng \\
+        --swift-output Sources/BabylonFish3/Language/LanguageNgramTables.swift
+    python3 ML/ngram_tables.py --evaluate ngrams.bfng ML/Data/sample_dataset.csv
+"""
+
+import argparse
+import math
+import os
+import re
+import struct
+import sys
+from array import array
+from collections import Counter
+
+import dataset_io
+import layout_transcoder
+import ngram_features
+import word_lists
+
+MAGIC = b"BFNG"
+VERSION = 1
+HEADER_FORMAT = "<4sHHHHHHII"
+HEADER_SIZE = 32
+RU_ALPHABET = "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
+EN_ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+ALPHABETS = {"en": EN_ALPHABET, "ru": RU_ALPHABET}
+WORD_PATTERNS = {"en": re.compile(r"[a-z]+"), "ru": re.compile(r"[а-яё]+")}
+DEFAULT_TRIGRAM_BITS = 10
+DEFAULT_ALPHA = 0.5
+# Крутизна сигмоиды для уверенности по разности средних log-lift
+CONFIDENCE_SHARPNESS = 2.0
+
+
+def trigram_bucket(a, b, c, bits):
+    """Корзина триграммы: FNV-1 по кодовым точкам с начальным значением 3 (как ngram_features)"""
+    h = 3
+    for code in (ord(a), ord(b), ord(c)):
+        h = ((h * ngram_features.FNV_PRIME) & ngram_features.MASK32) ^ code
+    return ngram_features._bucket(h, bits)
+
+
+def iter_dataset_texts(paths):
+    """(язык, текст) из датасетов: ru_wrong возвращается в русскую раскладку"""
+    for path in paths:
+        for text, label in dataset_io.iter_rows(path):
+            if label == "en":
+                yield "en", text
+            elif label == "ru":
+                yield "ru", text
+            elif label == "ru_wrong":
+                yield "ru", layout_transcoder.en_to_ru(text)
+
+
+def iter_corpus_texts(patterns):
+    """(язык, строка) из текстовых корпусов: каждая строка отдается обоим языкам"""
+    for chunk in word_lists.iter_line_chunks(list(word_lists.iter_files(patterns))):
+        for line in chunk:
+            yield "en", line
+            yield "ru", line
+
+
+def count_words(texts):
+    """Частоты слов по языкам: n-граммы потом считаются один раз на уникальное слово"""
+    counts = {language: Counter() for language in ALPHABETS}
+    for language, text in texts:
+        counts[language].update(WORD_PATTERNS[language].findall(text.lower()))
+    return counts
+
+
+def build_tables(word_counts, trigram_bits=DEFAULT_TRIGRAM_BITS, alpha=DEFAULT_ALPHA):
+    """{язык: (bigrams, trigrams)} - списки ln P длиной len(alphabet)^2 и 2^trigram_bits"""
+    tables = {}
+    for language, alphabet in ALPHABETS.items():
+        index = {ch: i for i, ch in enumerate(alphabet)}
+        size = len(alphabet)
+        bigrams = [0] * (size * size)
+        trigrams = [0] * (1 << trigram_bits)
+        for word, count in word_counts[language].items():
+            for a, b in zip(word, word[1:]):
+                bigrams[index[a] * size + index[b]] += count
+            for a, b, c in zip(word, word[1:], word[2:]):
+                trigrams[trigram_bucket(a, b, c, trigram_bits)] += count
+        tables[language] = tuple(_log_probs(counts, alpha) for counts in (bigrams, trigrams))
+    return tables
+
+
+def _log_probs(counts, alpha):
+    denominator = sum(counts) + alpha * len(counts)
+    return [math.log((count + alpha) / denominator) for count in counts]
+
+
+def write_binary(tables, path, trigram_bits):
+    if sys.byteorder != "little":
+        raise RuntimeError("Запись .bfng поддерживается только на little-endian")
+    ru_bytes = RU_ALPHABET.encode("utf-8")
+    en_bytes = EN_ALPHABET.encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, HEADER_SIZE, len(RU_ALPHABET), len(EN_ALPHABET),
+                            trigram_bits, 0, len(ru_bytes), len(en_bytes)).ljust(HEADER_SIZE, b"\0"))
+        f.write(ru_bytes + en_bytes)
+        f.write(b"\0" * (-f.tell() % 4))
+        for values in (tables["ru"][0], tables["en"][0], tables["ru"][1], tables["en"][1]):
+            f.write(array("f", values).tobytes())
+
+
+class NgramTables:
+    """Таблицы из .bfng и оценка слов (то же, что генерируемый Swift код)"""
+
+    def __init__(self, tables, trigram_bits):
+        self.trigram_bits = trigram_bits
+        self.tables = tables
+        self.indexes = {language: {ch: i for i, ch in enumerate(alphabet)}
+                        for language, alphabet in ALPHABETS.items()}
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        (magic, version, header_size, ru_size, en_size, trigram_bits, _, ru_bytes,
+         en_bytes) = struct.unpack_from(HEADER_FORMAT, data)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: не файл .bfng")
+        if version != VERSION:
+            raise ValueError(f"{path}: неподдерживаемая версия .bfng {version}")
+        position = header_size
+        alphabets = data[position:position + ru_bytes + en_bytes].decode("utf-8")
+        if alphabets != RU_ALPHABET + EN_ALPHABET:
+            raise ValueError(f"{path}: алфавиты не совпадают с RU_ALPHABET/EN_ALPHABET")
+        position += ru_bytes + en_bytes
+        position += -position % 4
+
+        arrays = []
+        for count in (ru_size * ru_size, en_size * en_size, 1 << trigram_bits, 1 << trigram_bits):
+            values = array("f")
+            values.frombytes(data[position:position + 4 * count])
+            arrays.append(values.tolist())
+            position += 4 * count
+        return cls({"ru": (arrays[0], arrays[2]), "en": (arrays[1], arrays[3])}, trigram_bits)
+
+    def score(self, word, language):
+        """Средний log-lift биграмм и триграмм слова (None - в слове нет n-грамм алфавита)"""
+        bigrams, trigrams = self.tables[language]
+        index = self.indexes[language]
+        size = len(index)
+        bigram_lift = math.log(len(bigrams))
+        trigram_lift = math.log(len(trigrams))
+        total = 0.0
+        count = 0
+        # Символы вне алфавита разрывают последовательность
+        for run in WORD_PATTERNS[language].findall(word.lower()):
+            for a, b in zip(run, run[1:]):
+                total += bigrams[index[a] * size + index[b]] + bigram_lift
+                count += 1
+            for a, b, c in zip(run, run[1:], run[2:]):
+                total += trigrams[trigram_bucket(a, b, c, self.trigram_bits)] + trigram_lift
+                count += 1
+        return total / count if count else None
+
+    def compare(self, en_string, ru_string):
+        """
+        Язык и уверенность по одним и тем же клавишам в двух раскладках:
+        ("ru"/"en", 0.5...1.0) или None, если оценить нечего.
+        """
+        en_score = self.score(en_string, "en")
+        ru_score = self.score(ru_string, "ru")
+        if en_score is None and ru_score is None:
+            return None
+        if en_score is None:
+            return "ru", 1.0
+        if ru_score is None:
+            return "en", 1.0
+        probability_ru = 1.0 / (1.0 + math.exp(-CONFIDENCE_SHARPNESS * (ru_score - en_score)))
+        if probability_ru >= 0.5:
+            return "ru", probability_ru
+        return "en", 1.0 - probability_ru
+
+
+def _swift_floats(values, per_line=12):
+    lines = []
+    for start in range(0, len(values), per_line):
+        lines.append("        " + ", ".join(f"{value:.4f}" for value in values[start:start + per_line]) + ",")
+    return "\n".join(lines)
+
+
+def _swift_characters(alphabet):
+    return ", ".join(f'"{ch}"' for ch in alphabet)
+
+
+def write_swift(tables, path, trigram_bits, sources):
+    """Swift исходник с таблицами и функциями оценки, повторяющими NgramTables"""
+    source_names = ", ".join(os.path.basename(source) for source in sources)
+    code = f'''import Foundation
+
+// Сгенерировано ML/ngram_tables.py из: {source_names}
+// Не редактировать вручную - перегенерировать скриптом.
+
+/// Log-вероятности биграмм и хешированных триграмм букв, посчитанные по данным
+/// (замена множеств LanguageConstants.commonRuBigrams/commonEnBigrams).
+/// Пока не подключено: EnhancedLanguageDetector и EventProcessor используют множества.
+enum LanguageNgramTables {{
+    static let trigramBits = {trigram_bits}
+    static let confidenceSharpness = {CONFIDENCE_SHARPNESS}
+
+    static let ruAlphabet: [Character] = [{_swift_characters(RU_ALPHABET)}]
+    static let enAlphabet: [Character] = [{_swift_characters(EN_ALPHABET)}]
+
+    private static let ruIndex: [Character: Int] = Dictionary(
+        uniqueKeysWithValues: ruAlphabet.enumerated().map {{ ($1, $0) }})
+    private static let enIndex: [Character: Int] = Dictionary(
+        uniqueKeysWithValues: enAlphabet.enumerated().map {{ ($1, $0) }})
+
+    /// ln P(ab), индекс index(a) * {len(RU_ALPHABET)} + index(b)
+    static let ruBigramLogProb: [Float] = [
+{_swift_floats(tables["ru"][0])}
+    ]
+
+    /// ln P(ab), индекс index(a) * {len(EN_ALPHABET)} + index(b)
+    static let enBigramLogProb: [Float] = [
+{_swift_floats(tables["en"][0])}
+    ]
+
+    /// ln P(корзина триграммы), корзина - trigramBucket
+    static let ruTrigramLogProb: [Float] = [
+{_swift_floats(tables["ru"][1])}
+    ]
+
+    static let enTrigramLogProb: [Float] = [
+{_swift_floats(tables["en"][1])}
+    ]
+
+    /// FNV-1 по кодовым точкам с начальным значением 3, затем фибоначчиево хеширование
+    static func trigramBucket(_ a: UInt32, _ b: UInt32, _ c: UInt32) -> Int {{
+        var h: UInt32 = 3
+        for code in [a, b, c] {{
+            h = (h &* 0x01000193) ^ code
+        }}
+        return Int((h &* 0x9E3779B1) >> UInt32(32 - trigramBits))
+    }}
+
+    /// Средний log-lift n-грамм слова: 0 - как равномерный шум, больше 0 - типично для языка.
+    /// nil, если в слове нет ни одной n-граммы алфавита.
+    static func score(_ word: String, language: Language) -> Double? {{
+        let index = language == .russian ? ruIndex : enIndex
+        let bigrams = language == .russian ? ruBigramLogProb : enBigramLogProb
+        let trigrams = language == .russian ? ruTrigramLogProb : enTrigramLogProb
+        let size = index.count
+        let bigramLift = log(Double(bigrams.count))
+        let trigramLift = log(Double(trigrams.count))
+
+        var total = 0.0
+        var count = 0
+        // Символы вне алфавита разрывают последовательность
+        var run: [(Int, UInt32)] = []
+        for character in word.lowercased() + " " {{
+            if let i = index[character], let scalar = character.unicodeScalars.first {{
+                run.append((i, scalar.value))
+                let n = run.count
+                if n >= 2 {{
+                    total += Double(bigrams[run[n - 2].0 * size + run[n - 1].0]) + bigramLift
+                    count += 1
+                }}
+                if n >= 3 {{
+                    let bucket = trigramBucket(run[n - 3].1, run[n - 2].1, run[n - 1].1)
+                    total += Double(trigrams[bucket]) + trigramLift
+                    count += 1
+                }}
+            }} else {{
+                run.removeAll(keepingCapacity: true)
+            }}
+        }}
+        return count > 0 ? total / Double(count) : nil
+    }}
+
+    /// Язык и уверенность (0.5...1.0) по одним и тем же клавишам в английской и русской раскладке
+    static func compare(enString: String, ruString: String) -> (language: Language, confidence: Double)? {{
+        let enScore = score(enString, language: .english)
+        let ruScore = score(ruString, language: .russian)
+        switch (enScore, ruScore) {{
+        case (nil, nil):
+            return nil
+        case (nil, _):
+            return (.russian, 1.0)
+        case (_, nil):
+            return (.english, 1.0)
+        case let (en?, ru?):
+            let probabilityRu = 1.0 / (1.0 + exp(-confidenceSharpness * (ru - en)))
+            return probabilityRu >= 0.5 ? (.russian, probabilityRu) : (.english, 1.0 - probabilityRu)
+        }}
+    }}
+}}
+'''
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(code)
+
+
+def evaluate(tables, paths, limit=None):
+    """
+    Точность решения ru/en по словам датасета: таблицы против countBigrams
+    с множествами LanguageConstants (heuristic_detector). ru и ru_wrong - русский.
+    Возвращает {метод: (верно, решено)} и число слов.
+    """
+    import heuristic_detector
+
+    results = {"tables": [0, 0], "countBigrams": [0, 0]}
+    words = 0
+    confident = Counter()
+    for path in paths:
+        for text, label in dataset_io.iter_rows(path):
+            expected = "en" if label == "en" else "ru"
+            for word in text.split():
+                en_string, ru_string = layout_transcoder.key_strings(word)
+                words += 1
+                decision = tables.compare(en_string, ru_string)
+                if decision is not None:
+                    language, confidence = decision
+                    results["tables"][1] += 1
+                    results["tables"][0] += language == expected
+                    bucket = min(int(confidence * 10), 9) / 10
+                    confident[(bucket, language == expected)] += 1
+
+                en_score = heuristic_detector.count_bigrams(en_string, heuristic_detector.COMMON_EN_BIGRAMS)
+                ru_score = heuristic_detector.count_bigrams(ru_string, heuristic_detector.COMMON_RU_BIGRAMS)
+                if en_score != ru_score:
+                    results["countBigrams"][1] += 1
+                    results["countBigrams"][0] += ("ru" if ru_score > en_score else "en") == expected
+                if limit is not None and words >= limit:
+                    return results, words, confident
+    return results, words, confident
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Таблицы log-вероятностей биграмм/триграмм букв ru/en")
+    parser.add_argument("datasets", nargs="*", help="датасеты CSV или .bfds (text,label)")
+    parser.add_argument("--corpus", nargs="+", help="текстовые корпуса (файлы, каталоги, glob)")
+    parser.add_argument("--output", help="бинарный блоб .bfng")
+    parser.add_argument("--swift-output", help="Swift исходник с таблицами")
+    parser.add_argument("--trigram-bits", type=int, default=DEFAULT_TRIGRAM_BITS,
+                        help="корзин триграмм 2^N (по умолчанию %(default)s)")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA,
+                        help="сглаживание add-alpha (по умолчанию %(default)s)")
+    parser.add_argument("--evaluate", metavar="BFNG", help="оценить готовые таблицы на датасетах")
+    parser.add_argument("--limit", type=int, default=None, help="не больше N слов для --evaluate")
+    args = parser.parse_args(argv)
+
+    if args.evaluate:
+        tables = NgramTables.load(args.evaluate)
+        results, words, confident = evaluate(tables, args.datasets, args.limit)
+        print(f"Слов: {words}")
+        for method, (correct, decided) in results.items():
+            print(f"   {method}: решено {decided / max(words, 1) * 100:.2f}%, "
+                  f"верно {correct / max(decided, 1) * 100:.2f}% из решенных")
+        print("Уверенность таблиц -> точность:")
+        for bucket in sorted({bucket for bucket, _ in confident}):
+            right, wrong = confident[(bucket, True)], confident[(bucket, False)]
+            print(f"   {bucket:.1f}-{bucket + 0.1:.1f}: {right + wrong:>8} слов, "
+                  f"верно {right / max(right + wrong, 1) * 100:.2f}%")
+        return 0
+
+    if not args.datasets and not args.corpus:
+        parser.error("нужны датасеты и/или --corpus")
+    if not args.output and not args.swift_output:
+        parser.error("нужен --output и/или --swift-output")
+
+    texts = iter_dataset_texts(args.datasets)
+    counts = count_words(texts)
+    if args.corpus:
+        for language, counter in count_words(iter_corpus_texts(args.corpus)).items():
+            counts[language].update(counter)
+    tables = build_tables(counts, args.trigram_bits, args.alpha)
+    sources = args.datasets + (args.corpus or [])
+
+    for language in ALPHABETS:
+        print(f"   {language}: {len(counts[language])} уникальных слов, "
+              f"{sum(counts[language].values())} всего")
+    if args.output:
+        write_binary(tables, args.output, args.trigram_bits)
+        print(f"✅ Таблицы сохранены: {args.output}")
+    if args.swift_output:
+        write_swift(tables, args.swift_output, args.trigram_bits, sources)
+        print(f"✅ Swift исходник: {args.swift_output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
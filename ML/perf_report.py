@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Отчет по метрикам PerformanceMonitor: перцентили задержек, попадания в кэш, память
+
+PerformanceMonitor.endMeasurement хранит только последнее значение каждой
+задержки, а exportMetrics пишет один JSON снимок, поэтому p50/p99 задержки
+нажатия не видны. Скрипт читает много файлов сразу:
+- построчные замеры BFPERF (PerformanceMonitor.startSampleExport или строки
+  с BFPERF внутри вывода Logger);
+- JSON снимки exportMetrics (время - mtime файла);
+- блоки "Performance Metrics" из logMetrics в выводе Logger (память и доля попаданий).
+
+Формат строки BFPERF (поля через табуляцию, строка может иметь любой префикс,
+например "[дата] [DEBUG] "):
+    BFPERF  1  <unix время, с>  <тип>  <значение>  <имя>
+    тип lat  - задержка операции в секундах, имя - операция (eventProcessing, ...)
+    тип hit  - попадание в кэш (значение 1), имя - кэш
+    тип miss - промах кэша (значение 1), имя - кэш
+    тип mem  - резидентная память в байтах, имя - resident
+    тип err  - ошибка (значение 1), имя - текст ошибки
+Имя - последнее поле и может содержать пробелы.
+
+Задержки собираются в логарифмические гистограммы (SUB_BUCKETS корзин на
+удвоение, погрешность перцентиля ~4%) - память не зависит от числа замеров.
+Окна --window секунд дают скользящую картину; отчет - текст или CSV.
+
+    python3 ML/perf_report.py ~/Downloads/babylonfish_debug.log perf/*.tsv metrics/*.json
+    python3 ML/perf_report.py perf/ --window 300 --windows --csv report.csv
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import re
+import sys
+from collections import defaultdict
+
+import word_lists
+
+SAMPLE_MARKER = "BFPERF"
+SAMPLE_VERSION = "1"
+SAMPLE_TYPES = ("lat", "hit", "miss", "mem", "err")
+SUB_BUCKETS = 16
+DEFAULT_WINDOW = 60.0
+PERCENTILES = (50, 90, 99, 99.9)
+SNAPSHOT_TIMINGS = ("eventProcessingTime", "languageDetectionTime", "layoutSwitchTime",
+                    "typoCorrectionTime", "autoCompleteTime")
+
+LOG_MEMORY = re.compile(r"Memory usage: ([\d.]+) (B|KB|MB|GB)")
+LOG_HIT_RATE = re.compile(r"Cache hit rate: ([\d.]+)%")
+UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+
+class LatencyHistogram:
+    """Логарифмическая гистограмма задержек в микросекундах"""
+
+    def __init__(self):
+        self.buckets = defaultdict(int)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        micros = max(seconds * 1e6, 0.0)
+        bucket = int(math.floor(math.log2(micros) * SUB_BUCKETS)) if micros >= 1 else -1
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total += micros
+        self.max = max(self.max, micros)
+
+    def merge(self, other):
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p):
+        """Перцентиль в микросекундах (середина корзины в логарифмической шкале)"""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                if bucket < 0:
+                    return 0.5
+                return min(2 ** ((bucket + 0.5) / SUB_BUCKETS), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class Window:
+    """Агрегаты одного временного окна (или всего периода)"""
+
+    def __init__(self):
+        self.latency = defaultdict(LatencyHistogram)
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self.hit_rates = []
+        self.memory = []
+        self.errors = defaultdict(int)
+
+    def add(self, timestamp, kind, value, name):
+        if kind == "lat":
+            self.latency[name].add(value)
+        elif kind == "hit":
+            self.hits[name] += int(value)
+        elif kind == "miss":
+            self.misses[name] += int(value)
+        elif kind == "mem":
+            self.memory.append((timestamp, value))
+        elif kind == "err":
+            self.errors[name] += int(value)
+        elif kind == "hit_rate":
+            self.hit_rates.append(value)
+
+
+def parse_sample_line(line):
+    """(время, тип, значение, имя) из строки BFPERF или None"""
+    position = line.find(SAMPLE_MARKER + "\t")
+    if position < 0:
+        return None
+    fields = line[position:].rstrip("\r\n").split("\t", 5)
+    if len(fields) != 6 or fields[1] != SAMPLE_VERSION or fields[3] not in SAMPLE_TYPES:
+        return None
+    try:
+        return float(fields[2]), fields[3], float(fields[4]), fields[5]
+    except ValueError:
+        return None
+
+
+def iter_snapshot(path):
+    """Замеры из JSON снимка exportMetrics (время - mtime файла)"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    timestamp = os.path.getmtime(path)
+    for key in SNAPSHOT_TIMINGS:
+        # В снимке только последнее значение каждой задержки
+        if data.get(key):
+            yield timestamp, "lat", float(data[key]), key[:-len("Time")]
+    yield timestamp, "hit", float(data.get("cacheHits", 0)), "snapshot"
+    yield timestamp, "miss", float(data.get("cacheMisses", 0)), "snapshot"
+    if data.get("memoryUsage"):
+        yield timestamp, "mem", float(data["memoryUsage"]), "resident"
+    for error, count in (data.get("errors") or {}).items():
+        yield timestamp, "err", float(count), error
+
+
+def iter_log(path):
+    """Замеры BFPERF и блоки logMetrics из текстового потока (Logger или файл экспорта)"""
+    last_timestamp = None
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            sample = parse_sample_line(line)
+            if sample is not None:
+                last_timestamp = sample[0]
+                yield sample
+                continue
+            # Строки logMetrics без своего времени привязываются к последнему замеру
+            match = LOG_MEMORY.search(line)
+            if match:
+                yield last_timestamp, "mem", float(match.group(1)) * UNITS[match.group(2)], "resident"
+                continue
+            match = LOG_HIT_RATE.search(line)
+            if match:
+                yield last_timestamp, "hit_rate", float(match.group(1)) / 100, "logMetrics"
+
+
+def iter_samples(paths):
+    for path in paths:
+        if path.endswith(".json"):
+            yield from iter_snapshot(path)
+        else:
+            yield from iter_log(path)
+
+
+def aggregate(samples, window_seconds=DEFAULT_WINDOW):
+    """(итог, {начало окна: Window}); замеры без времени идут только в итог"""
+    total = Window()
+    windows = defaultdict(Window)
+    for timestamp, kind, value, name in samples:
+        total.add(timestamp, kind, value, name)
+        if timestamp is not None:
+            start = math.floor(timestamp / window_seconds) * window_seconds
+            windows[start].add(timestamp, kind, value, name)
+    return total, dict(sorted(windows.items()))
+
+
+def memory_trend(memory):
+    """(min, max, последнее значение, наклон в байтах/час) по замерам памяти"""
+    if not memory:
+        return None
+    values = [value for _, value in memory]
+    timed = sorted((t, v) for t, v in memory if t is not None)
+    last = timed[-1][1] if timed else values[-1]
+    slope = 0.0
+    if len(timed) >= 2:
+        mean_t = sum(t for t, _ in timed) / len(timed)
+        mean_v = sum(v for _, v in timed) / len(timed)
+        variance = sum((t - mean_t) ** 2 for t, _ in timed)
+        if variance > 0:
+            slope = sum((t - mean_t) * (v - mean_v) for t, v in timed) / variance * 3600
+    return min(values), max(values), last, slope
+
+
+def _ratio(hits, misses):
+    return hits / (hits + misses) if hits + misses else 0.0
+
+
+def _mb(value):
+    return value / 1024 ** 2
+
+
+def print_report(total, windows, show_windows=False):
+    print("Задержки (мкс):")
+    header = f"   {'операция':<20} {'замеров':>9} {'среднее':>9}" + "".join(
+        f" {'p' + format(p, 'g'):>8}" for p in PERCENTILES) + f" {'max':>9}"
+    print(header)
+    for name, histogram in sorted(total.latency.items()):
+        print(f"   {name:<20} {histogram.count:>9} {histogram.mean:>9.1f}"
+              + "".join(f" {histogram.percentile(p):>8.1f}" for p in PERCENTILES)
+              + f" {histogram.max:>9.1f}")
+
+    caches = sorted(set(total.hits) | set(total.misses))
+    if caches or total.hit_rates:
+        print("Кэш:")
+        for name in caches:
+            hits, misses = total.hits[name], total.misses[name]
+            print(f"   {name:<20} попаданий {hits}, промахов {misses}, доля {_ratio(hits, misses) * 100:.2f}%")
+        if total.hit_rates:
+            rates = total.hit_rates
+            print(f"   logMetrics: доля попаданий от {min(rates) * 100:.1f}% до {max(rates) * 100:.1f}%, "
+                  f"последняя {rates[-1] * 100:.1f}%")
+
+    trend = memory_trend(total.memory)
+    if trend:
+        low, high, last, slope = trend
+        print(f"Память: {_mb(low):.1f}-{_mb(high):.1f} МБ, последнее {_mb(last):.1f} МБ, "
+              f"тренд {_mb(slope):+.2f} МБ/ч")
+
+    if total.errors:
+        print("Ошибки:")
+        for name, count in sorted(total.errors.items(), key=lambda item: -item[1]):
+            print(f"   {count:>7}  {name}")
+
+    if show_windows and windows:
+        print("Окна:")
+        for start, window in windows.items():
+            parts = [f"{name} n={h.count} p50={h.percentile(50):.0f} p99={h.percentile(99):.0f}"
+                     for name, h in sorted(window.latency.items())]
+            hits, misses = sum(window.hits.values()), sum(window.misses.values())
+            if hits + misses:
+                parts.append(f"кэш {_ratio(hits, misses) * 100:.1f}%")
+            if window.memory:
+                parts.append(f"память {_mb(window.memory[-1][1]):.1f} МБ")
+            print(f"   {start:.0f}: " + ", ".join(parts))
+
+
+def write_csv_report(total, windows, path):
+    """Строки: окно (пусто - итог), метрика, имя, count, mean, перцентили, max, value"""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["window_start", "metric", "name", "count", "mean_us"]
+                        + [f"p{p:g}_us" for p in PERCENTILES] + ["max_us", "value"])
+        for start, window in [("", total)] + list(windows.items()):
+            for name, h in sorted(window.latency.items()):
+                writer.writerow([start, "latency", name, h.count, f"{h.mean:.3f}"]
+                                + [f"{h.percentile(p):.3f}" for p in PERCENTILES] + [f"{h.max:.3f}", ""])
+            for name in sorted(set(window.hits) | set(window.misses)):
+                hits, misses = window.hits[name], window.misses[name]
+                writer.writerow([start, "cache_hit_ratio", name, hits + misses, ""]
+                                + [""] * len(PERCENTILES) + ["", f"{_ratio(hits, misses):.6f}"])
+            if window.memory:
+                writer.writerow([start, "memory_bytes", "resident", len(window.memory), ""]
+                                + [""] * len(PERCENTILES) + ["", f"{window.memory[-1][1]:.0f}"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Отчет по метрикам PerformanceMonitor и выводу Logger")
+    parser.add_argument("inputs", nargs="+", help="файлы BFPERF, логи Logger, JSON снимки, каталоги или glob")
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW,
+                        help="длина окна в секундах (по умолчанию %(default)s)")
+    parser.add_argument("--windows", action="store_true", help="показать разбивку по окнам")
+    parser.add_argument("--csv", help="записать отчет в CSV")
+    args = parser.parse_args(argv)
+
+    paths = list(word_lists.iter_files(args.inputs))
+    total, windows = aggregate(iter_samples(paths), args.window)
+    print(f"Файлов: {len(paths)}, окон по {args.window:g} с: {len(windows)}")
+    print_report(total, windows, args.windows)
+    if args.csv:
+        write_csv_report(total, windows, args.csv)
+        print(f"✅ CSV отчет: {args.csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Марковский синтезатор фраз ru/en/ru_wrong для датасетов BabylonFish ML
+
+Многословные примеры сейчас - фиксированные phrases_en/phrases_ru и 50 случайных
+пар слов в generate_dataset.py, а EnhancedSentenceBuffer и ContextAnalyzer
+работают с целыми предложениями и переключением языка посреди фразы. Скрипт
+учит по локальным корпусам таблицы переходов слов (цепь Маркова порядка 1,
+отдельно для en и ru; граница предложения - токен 0) и генерирует фразы:
+    en, ru - фраза одного языка;
+    ru_wrong - русская фраза, набранная на английской раскладке;
+    switch - смена языка посреди фразы (ru -> ru_wrong, en -> ru, ru -> en,
+        en -> ru_wrong); метка - язык последнего сегмента, именно его детектор
+        должен распознать после переключения.
+
+Счетчики пар слов ограничены сводкой Misra-Gries (word_lists.py), у каждого слова
+хранится не больше --max-successors продолжений. Модель - .npz, для языка L:
+    L_vocab - слова (id 0 - граница предложения), L_offsets int64[V + 1] - строки
+    переходов, L_successors int32 - id следующих слов, L_cum float64 - сквозные
+    накопленные частоты всех строк.
+Выборка пакетная: на каждом шаге для всех незаконченных фраз одним
+np.searchsorted по L_cum выбирается следующее слово.
+
+В потоковый конвейер generate_expanded_dataset.py подключается через --phrase-model:
+
+    python3 ML/phrase_synth.py build corpus/ --output ML/Models/phrases.npz
+    python3 ML/phrase_synth.py sample ML/Models/phrases.npz --count 20
+    python3 ML/phrase_synth.py benchmark ML/Models/phrases.npz --count 1000000
+    python3 ML/generate_expanded_dataset.py --phrase-model ML/Models/phrases.npz --count 1000000
+"""
+
+import argparse
+import re
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+import layout_transcoder
+import word_lists
+
+LANGUAGES = ("en", "ru")
+TOKEN_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?|[а-яё]+(?:-[а-яё]+)?")
+SENTENCE_PATTERN = re.compile(r"[.!?;:\n]+")
+DEFAULT_VOCAB = 50_000
+DEFAULT_MAX_SUCCESSORS = 64
+DEFAULT_CAPACITY = 2_000_000
+MIN_WORDS = 2
+MAX_WORDS = 8
+PHRASES_PER_PASS = 2000
+
+# Доли видов фраз и варианты переключения: (язык начала, вид конца, метка)
+DEFAULT_MIX = {"en": 0.3, "ru": 0.3, "ru_wrong": 0.2, "switch": 0.2}
+SWITCHES = (
+    ("ru", "ru_wrong", "ru_wrong"),
+    ("en", "ru", "ru"),
+    ("ru", "en", "en"),
+    ("en", "ru_wrong", "ru_wrong"),
+)
+
+
+def language_of(token):
+    return "en" if "a" <= token[0] <= "z" else "ru"
+
+
+def iter_runs(line):
+    """Отрезки предложений одного языка: [(язык, [слова])]"""
+    for sentence in SENTENCE_PATTERN.split(line.lower()):
+        run = []
+        language = None
+        for token in TOKEN_PATTERN.findall(sentence):
+            token_language = language_of(token)
+            if run and token_language != language:
+                yield language, run
+                run = []
+            language = token_language
+            run.append(token)
+        if run:
+            yield language, run
+
+
+class TransitionCounts:
+    """Ограниченные по памяти счетчики слов и переходов по языкам ("" - граница)"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.words = {language: word_lists.MisraGries(capacity) for language in LANGUAGES}
+        self.pairs = {language: word_lists.MisraGries(capacity) for language in LANGUAGES}
+
+    def update(self, lines):
+        words = {language: Counter() for language in LANGUAGES}
+        pairs = {language: Counter() for language in LANGUAGES}
+        for line in lines:
+            for language, run in iter_runs(line):
+                words[language].update(run)
+                padded = ["", *run, ""]
+                pairs[language].update(zip(padded, padded[1:]))
+        for language in LANGUAGES:
+            self.words[language].update(words[language])
+            self.pairs[language].update(pairs[language])
+
+
+def ingest(paths, capacity=DEFAULT_CAPACITY, chunk_lines=word_lists.DEFAULT_CHUNK_LINES, log=print):
+    counts = TransitionCounts(capacity)
+    lines = 0
+    start = time.perf_counter()
+    for chunk in word_lists.iter_line_chunks(paths, chunk_lines):
+        counts.update(chunk)
+        lines += len(chunk)
+        if log:
+            log(f"   строк: {lines:,}, слов en/ru: {counts.words['en'].total:,}/"
+                f"{counts.words['ru'].total:,} ({time.perf_counter() - start:.1f} с)")
+    return counts
+
+
+def build_chain(word_counts, pair_counts, vocab_size=DEFAULT_VOCAB, max_successors=DEFAULT_MAX_SUCCESSORS):
+    """Таблицы одного языка: (vocab, offsets, successors, cum)"""
+    ranked = sorted(word_counts.items(), key=lambda item: (-item[1], item[0]))[:vocab_size]
+    vocab = [""] + [word for word, _ in ranked]
+    ids = {word: index for index, word in enumerate(vocab)}
+
+    rows = [[] for _ in vocab]
+    for (previous, following), count in pair_counts.items():
+        if previous in ids and following in ids and count > 0:
+            rows[ids[previous]].append((count, ids[following]))
+
+    offsets = [0]
+    successors = []
+    weights = []
+    for row in rows:
+        row.sort(key=lambda item: (-item[0], item[1]))
+        for count, following in row[:max_successors]:
+            successors.append(following)
+            weights.append(count)
+        offsets.append(len(successors))
+    return (np.array(vocab), np.array(offsets, dtype=np.int64), np.array(successors, dtype=np.int32),
+            np.cumsum(np.array(weights, dtype=np.float64)))
+
+
+def save_model(path, chains):
+    arrays = {}
+    for language, (vocab, offsets, successors, cum) in chains.items():
+        arrays.update({f"{language}_vocab": vocab, f"{language}_offsets": offsets,
+                       f"{language}_successors": successors, f"{language}_cum": cum})
+    np.savez_compressed(path, **arrays)
+
+
+class MarkovChain:
+    """Переходы одного языка и пакетная выборка фраз"""
+
+    def __init__(self, vocab, offsets, successors, cum):
+        self.vocab = vocab.tolist()
+        self.offsets = offsets
+        self.successors = successors
+        self.cum = cum
+        self.cum0 = np.concatenate(([0.0], cum))
+        if offsets[1] == 0:
+            raise ValueError("Нет начальных слов: корпус этого языка пуст")
+
+    def step(self, generator, states):
+        """Следующие слова для массива текущих (0 - начало); 0 - конец предложения"""
+        starts = self.offsets[states]
+        ends = self.offsets[states + 1]
+        base = self.cum0[starts]
+        totals = self.cum0[ends] - base
+        targets = base + generator.random(len(states)) * totals
+        index = np.minimum(np.searchsorted(self.cum, targets, side="right"), np.maximum(ends - 1, 0))
+        return np.where(totals > 0, self.successors[index], 0)
+
+    def sample_ids(self, generator, count, min_words=MIN_WORDS, max_words=MAX_WORDS):
+        """
+        Матрица id слов (count, max_words) и длины фраз. Конец предложения до
+        min_words слов начинает новое предложение той же фразы.
+        """
+        ids = np.zeros((count, max_words), dtype=np.int32)
+        lengths = np.full(count, max_words, dtype=np.int64)
+        active = np.arange(count)
+        states = np.zeros(count, dtype=np.int64)
+        for position in range(max_words):
+            following = self.step(generator, states)
+            if position < min_words:
+                restart = following == 0
+                while restart.any():
+                    following[restart] = self.step(generator, np.zeros(int(restart.sum()), dtype=np.int64))
+                    restart = following == 0
+            finished = following == 0
+            lengths[active[finished]] = position
+            active = active[~finished]
+            states = following[~finished].astype(np.int64)
+            if not len(active):
+                break
+            ids[active, position] = states
+        return ids, lengths
+
+    def render(self, ids, lengths, vocab=None):
+        vocab = vocab or self.vocab
+        return [" ".join([vocab[i] for i in row[:length]]) for row, length in zip(ids.tolist(), lengths.tolist())]
+
+
+class PhraseSynthesizer:
+    """Фразы en/ru/ru_wrong и с переключением языка из модели .npz"""
+
+    def __init__(self, chains, per_pass=PHRASES_PER_PASS, mix=None, min_words=MIN_WORDS, max_words=MAX_WORDS):
+        self.chains = chains
+        self.per_pass = per_pass
+        self.min_words = min_words
+        self.max_words = max_words
+        mix = {kind: share for kind, share in (mix or DEFAULT_MIX).items() if share > 0}
+        self.kinds = list(mix)
+        self.cum_mix = np.cumsum([mix[kind] for kind in self.kinds])
+        # ru_wrong - те же id слов, но через словарь на английской раскладке
+        self.wrong_vocab = [layout_transcoder.ru_to_en(word) for word in chains["ru"].vocab]
+
+    @classmethod
+    def load(cls, path, **options):
+        data = np.load(path)
+        chains = {language: MarkovChain(data[f"{language}_vocab"], data[f"{language}_offsets"],
+                                        data[f"{language}_successors"], data[f"{language}_cum"])
+                  for language in LANGUAGES}
+        return cls(chains, **options)
+
+    def phrases(self, generator, count, kind, min_words=None, max_words=None):
+        """count фраз одного вида без переключения: en, ru или ru_wrong"""
+        chain = self.chains["en" if kind == "en" else "ru"]
+        ids, lengths = chain.sample_ids(generator, count, min_words or self.min_words, max_words or self.max_words)
+        return chain.render(ids, lengths, self.wrong_vocab if kind == "ru_wrong" else None)
+
+    def switched(self, generator, count):
+        """Фразы с переключением посреди фразы: [(text, label)]"""
+        variants = generator.integers(len(SWITCHES), size=count)
+        half = max(1, self.max_words // 2)
+        rows = []
+        for variant, (head, tail, label) in enumerate(SWITCHES):
+            n = int((variants == variant).sum())
+            if not n:
+                continue
+            heads = self.phrases(generator, n, head, 1, half)
+            tails = self.phrases(generator, n, tail, 1, half)
+            rows.extend((f"{a} {b}", label) for a, b in zip(heads, tails))
+        order = generator.permutation(len(rows))
+        return [rows[i] for i in order.tolist()]
+
+    def sample(self, generator, count):
+        """count строк (text, label) по долям mix"""
+        kinds = np.searchsorted(self.cum_mix, generator.random(count) * self.cum_mix[-1], side="right")
+        rows = []
+        for index, kind in enumerate(self.kinds):
+            n = int((kinds == index).sum())
+            if not n:
+                continue
+            if kind == "switch":
+                rows.extend(self.switched(generator, n))
+            else:
+                rows.extend((text, kind) for text in self.phrases(generator, n, kind))
+        return rows
+
+    def rows(self, rng, count=None):
+        """Для конвейера генерации: Generator выводится из random.Random (детерминированно)"""
+        generator = np.random.default_rng(rng.getrandbits(64))
+        return self.sample(generator, self.per_pass if count is None else count)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Марковский синтезатор фраз ru/en/ru_wrong")
+    parser.add_argument("command", choices=("build", "sample", "benchmark"))
+    parser.add_argument("inputs", nargs="+",
+                        help="build: текстовые файлы, каталоги или glob-шаблоны; sample/benchmark: модель .npz")
+    parser.add_argument("--output", help="модель .npz для build")
+    parser.add_argument("--vocab", type=int, default=DEFAULT_VOCAB,
+                        help="слов в словаре каждого языка (по умолчанию %(default)s)")
+    parser.add_argument("--max-successors", type=int, default=DEFAULT_MAX_SUCCESSORS,
+                        help="продолжений на слово (по умолчанию %(default)s)")
+    parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY,
+                        help="счетчиков Misra-Gries на язык (по умолчанию %(default)s)")
+    parser.add_argument("--count", type=int, default=20, help="фраз для sample/benchmark")
+    parser.add_argument("--seed", type=int, default=None, help="seed генератора")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        if not args.output:
+            parser.error("для build нужен --output")
+        counts = ingest(list(word_lists.iter_files(args.inputs)), args.capacity)
+        chains = {}
+        for language in LANGUAGES:
+            chains[language] = build_chain(counts.words[language].counters, counts.pairs[language].counters,
+                                           args.vocab, args.max_successors)
+            vocab, _, successors, _ = chains[language]
+            print(f"   {language}: {len(vocab) - 1} слов, {len(successors)} переходов")
+        save_model(args.output, chains)
+        print(f"✅ Модель сохранена: {args.output}")
+        return 0
+
+    synthesizer = PhraseSynthesizer.load(args.inputs[0])
+    generator = np.random.default_rng(args.seed)
+    if args.command == "sample":
+        for text, label in synthesizer.sample(generator, args.count):
+            print(f"{label}\t{text}")
+        return 0
+
+    start = time.perf_counter()
+    rows = synthesizer.sample(generator, args.count)
+    elapsed = time.perf_counter() - start
+    labels = Counter(label for _, label in rows)
+    summary = ", ".join(f"{label}: {count}" for label, count in sorted(labels.items()))
+    print(f"Фраз: {len(rows)} ({summary}), {elapsed:.2f} с, {len(rows) / max(elapsed, 1e-9):,.0f} фраз/с")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
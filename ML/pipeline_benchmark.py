@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк пропускной способности конвейера данных ML с контролем регрессий
+
+TRAINING_PLAN.md требует real-time детекции при печати, но скорость генерации
+и загрузки датасетов ничем не измерялась. Здесь точки входа конвейера
+запускаются на нескольких размерах (по умолчанию 1k, 100k и 1M строк):
+- generate_dataset - Data/generate_dataset.generate_dataset (комбинации до размера);
+- generate_stream - потоковая генерация generate_expanded_dataset.py (исходный
+  generate_expanded_dataset.generate_dataset всегда дает 5000 строк и не масштабируется);
+- convert_to_wrong_layout и layout_switch_ru_to_en - конвертация русских строк;
+- save_dataset - запись CSV (вывод статистики подавлен);
+- load_csv и load_bfds - dataset_io.load_dataset.
+
+Каждый замер идет в отдельном процессе (spawn), поэтому пиковая RSS (ru_maxrss)
+относится к одному случаю. Подготовка входных данных в замер времени не входит, но входит
+в пиковую RSS - она записывается отдельно как setup_rss. Время - лучшее из --repeat
+прогонов (малые размеры повторяются, пока не наберется MIN_MEASURE_TIME секунд).
+
+Результаты дописываются в JSON историю (по умолчанию в .build, у каждой машины
+своя база). Первый запуск на машине становится базой; дальше запуск завершается
+с кодом 1, если строк/с стало меньше базы больше чем на --tolerance или пиковая
+RSS выросла больше чем на --memory-tolerance. --update-baseline принимает
+текущие результаты как новую базу.
+
+    python3 ML/pipeline_benchmark.py
+    python3 ML/pipeline_benchmark.py run --sizes 1000,100000 --cases load_csv,save_dataset --tolerance 0.15
+    python3 ML/pipeline_benchmark.py run --update-baseline
+    python3 ML/pipeline_benchmark.py show --last 10
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ML_DIR, "Data"))
+import dataset_io  # noqa: E402
+import generate_dataset  # noqa: E402
+import generate_expanded_dataset as expanded  # noqa: E402
+
+HISTORY_VERSION = 1
+DEFAULT_HISTORY = os.path.join(os.path.dirname(ML_DIR), ".build", "benchmarks", "pipeline_history.json")
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+DEFAULT_TOLERANCE = 0.10
+DEFAULT_MEMORY_TOLERANCE = 0.20
+DEFAULT_HISTORY_LIMIT = 200
+# Малые размеры прогоняются, пока суммарно не наберется столько секунд, иначе шум таймера
+MIN_MEASURE_TIME = 0.5
+
+
+# MARK: - Случаи
+
+
+def sample_rows(size, seed):
+    """Датасет на size строк для записи и загрузки"""
+    return generate_dataset.generate_dataset(target_count=size, rng=random.Random(seed), combo_count=size)
+
+
+def russian_texts(size):
+    return list(itertools.islice(itertools.cycle(generate_dataset.russian_words), size))
+
+
+def case_generate_dataset(size, workdir, seed):
+    return lambda: len(sample_rows(size, seed))
+
+
+def case_generate_stream(size, workdir, seed):
+    return lambda: sum(1 for _ in expanded.generate_stream(size, seed=seed))
+
+
+def case_convert_to_wrong_layout(size, workdir, seed):
+    texts = russian_texts(size)
+    return lambda: sum(1 for _ in map(generate_dataset.convert_to_wrong_layout, texts))
+
+
+def case_layout_switch_ru_to_en(size, workdir, seed):
+    texts = russian_texts(size)
+    return lambda: sum(1 for _ in map(expanded.layout_switch_ru_to_en, texts))
+
+
+def case_save_dataset(size, workdir, seed):
+    rows = sample_rows(size, seed)
+    path = os.path.join(workdir, f"save_{size}.csv")
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_dataset.save_dataset(rows, path)
+        return len(rows)
+
+    return run
+
+
+def case_load_csv(size, workdir, seed):
+    path = os.path.join(workdir, f"load_{size}.csv")
+    dataset_io.write_csv(sample_rows(size, seed), path)
+    return lambda: len(dataset_io.load_dataset(path)[0])
+
+
+def case_load_bfds(size, workdir, seed):
+    path = os.path.join(workdir, f"load_{size}{dataset_io.BINARY_EXTENSION}")
+    dataset_io.write_binary(sample_rows(size, seed), path)
+    return lambda: len(dataset_io.load_dataset(path)[0])
+
+
+CASES = {
+    "generate_dataset": case_generate_dataset,
+    "generate_stream": case_generate_stream,
+    "convert_to_wrong_layout": case_convert_to_wrong_layout,
+    "layout_switch_ru_to_en": case_layout_switch_ru_to_en,
+    "save_dataset": case_save_dataset,
+    "load_csv": case_load_csv,
+    "load_bfds": case_load_bfds,
+}
+
+
+# MARK: - Замер
+
+
+def peak_rss():
+    """Пиковая RSS процесса в байтах (ru_maxrss: на Linux в КБ, на macOS в байтах)"""
+    value = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return value if sys.platform == "darwin" else value * 1024
+
+
+def measure(name, size, workdir, seed, repeat):
+    """Worker: подготовка и repeat прогонов случая в чистом процессе"""
+    run = CASES[name](size, workdir, seed)
+    setup_rss = peak_rss()
+    best = float("inf")
+    rows = 0
+    runs = 0
+    total = 0.0
+    while runs < repeat or total < MIN_MEASURE_TIME:
+        start = time.perf_counter()
+        rows = run()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+        runs += 1
+    return {
+        "rows": rows,
+        "wall_s": best,
+        "rows_per_s": rows / best if best > 0 else 0.0,
+        "peak_rss": peak_rss(),
+        "setup_rss": setup_rss,
+    }
+
+
+def run_suite(cases, sizes, seed, repeat, log=print):
+    """{"случай/размер": результат measure}"""
+    results = {}
+    context = get_context("spawn")
+    with tempfile.TemporaryDirectory(prefix="bf-bench-") as workdir:
+        for size in sizes:
+            for name in cases:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    result = pool.submit(measure, name, size, workdir, seed, repeat).result()
+                results[result_key(name, size)] = result
+                log(f"   {name:<24} {size:>10,} строк: {result['rows_per_s']:>14,.0f} строк/с, "
+                    f"{result['wall_s']:8.3f} с, пик RSS {_mb(result['peak_rss'])}")
+    return results
+
+
+def result_key(name, size):
+    return f"{name}/{size}"
+
+
+def _mb(value):
+    return f"{value / 1024 ** 2:,.1f} МБ"
+
+
+# MARK: - История
+
+
+def machine_id():
+    """База сравнима только на той же машине и версии Python"""
+    return f"{platform.node()}/{platform.machine()}/py{platform.python_version()}"
+
+
+def git_commit():
+    try:
+        output = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ML_DIR,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return {"version": HISTORY_VERSION, "baselines": {}, "runs": []}
+    with open(path, encoding="utf-8") as f:
+        history = json.load(f)
+    if history.get("version") != HISTORY_VERSION:
+        raise ValueError(f"{path}: неподдерживаемая версия истории {history.get('version')}")
+    return history
+
+
+def save_history(history, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(history, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+    os.replace(temporary, path)
+
+
+def compare(results, baseline, tolerance, memory_tolerance):
+    """Список (ключ, описание) регрессий относительно базы; ключей без базы не касается"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result["rows_per_s"] < base["rows_per_s"] * (1 - tolerance):
+            regressions.append((key, f"{result['rows_per_s']:,.0f} строк/с против {base['rows_per_s']:,.0f} "
+                                     f"({result['rows_per_s'] / base['rows_per_s'] - 1:+.1%})"))
+        if result["peak_rss"] > base["peak_rss"] * (1 + memory_tolerance):
+            regressions.append((key, f"пик RSS {_mb(result['peak_rss'])} против {_mb(base['peak_rss'])} "
+                                     f"({result['peak_rss'] / base['peak_rss'] - 1:+.1%})"))
+    return regressions
+
+
+def print_history(history, last):
+    """Строк/с по случаям за последние last запусков этой машины"""
+    machine = machine_id()
+    runs = [run for run in history["runs"] if run["machine"] == machine][-last:]
+    if not runs:
+        print(f"Нет запусков для {machine}")
+        return
+    baseline = history["baselines"].get(machine, {})
+    keys = sorted({key for run in runs for key in run["results"]},
+                  key=lambda key: (int(key.rsplit("/", 1)[1]), key))
+    print(f"=== {machine}: {len(runs)} запусков, строк/с (* - база)")
+    print(f"{'случай':<36}" + "".join(f"{run['commit'] or '?':>12}" for run in runs) + f"{'база*':>12}")
+    for key in keys:
+        cells = "".join(f"{run['results'][key]['rows_per_s']:>12,.0f}" if key in run["results"] else f"{'-':>12}"
+                        for run in runs)
+        base = f"{baseline[key]['rows_per_s']:>12,.0f}" if key in baseline else f"{'-':>12}"
+        print(f"{key:<36}{cells}{base}")
+
+
+# MARK: - CLI
+
+
+def parse_list(value, cast=str):
+    return tuple(cast(item) for item in value.split(",") if item)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк конвейера данных ML с контролем регрессий")
+    parser.add_argument("command", nargs="?", choices=("run", "show"), default="run")
+    parser.add_argument("--cases", type=parse_list, default=tuple(CASES),
+                        help="случаи через запятую (по умолчанию все: %(default)s)")
+    parser.add_argument("--sizes", type=lambda value: parse_list(value, int), default=DEFAULT_SIZES,
+                        help="размеры в строках через запятую (по умолчанию %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="прогонов на замер (по умолчанию %(default)s)")
+    parser.add_argument("--seed", type=int, default=42, help="seed данных (по умолчанию %(default)s)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON история (по умолчанию %(default)s)")
+    parser.add_argument("--history-limit", type=int, default=DEFAULT_HISTORY_LIMIT,
+                        help="сколько последних запусков хранить (по умолчанию %(default)s)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="допустимое падение строк/с относительно базы (по умолчанию %(default)s)")
+    parser.add_argument("--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE,
+                        help="допустимый рост пиковой RSS (по умолчанию %(default)s)")
+    parser.add_argument("--update-baseline", action="store_true", help="сделать этот запуск базой машины")
+    parser.add_argument("--no-save", action="store_true", help="не записывать запуск в историю")
+    parser.add_argument("--last", type=int, default=10, help="show: число запусков (по умолчанию %(default)s)")
+    args = parser.parse_args(argv)
+
+    history = load_history(args.history)
+    if args.command == "show":
+        print_history(history, args.last)
+        return 0
+
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        print(f"❌ Неизвестные случаи: {', '.join(unknown)} (есть: {', '.join(CASES)})")
+        return 1
+
+    machine = machine_id()
+    print(f"=== {machine}: размеры {', '.join(f'{size:,}' for size in args.sizes)}, лучший из {args.repeat}")
+    results = run_suite(args.cases, args.sizes, args.seed, args.repeat)
+
+    baseline = history["baselines"].get(machine)
+    regressions = compare(results, baseline or {}, args.tolerance, args.memory_tolerance)
+    if not args.no_save:
+        history["runs"].append({
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "machine": machine,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "results": results,
+        })
+        history["runs"] = history["runs"][-args.history_limit:]
+        if baseline is None or args.update_baseline:
+            # Новая база дополняет старую: случаи, не попавшие в этот запуск, сохраняют свои значения
+            history["baselines"][machine] = {**(baseline or {}), **results}
+        save_history(history, args.history)
+        print(f"✅ Запуск записан: {args.history}")
+
+    if baseline is None:
+        print("Базы для этой машины не было - текущий запуск стал базой" if not args.no_save
+              else "Базы для этой машины нет - сравнивать не с чем")
+        return 0
+    if args.update_baseline:
+        print("✅ База обновлена")
+        return 0
+    if regressions:
+        for key, description in regressions:
+            print(f"❌ Регрессия {key}: {description}")
+        print(f"❌ Регрессий: {len(regressions)} (допуск строк/с {args.tolerance:.0%}, "
+              f"RSS {args.memory_tolerance:.0%})")
+        return 1
+    compared = sum(1 for key in results if key in baseline)
+    print(f"✅ Регрессий нет ({compared} замеров сравнено с базой)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
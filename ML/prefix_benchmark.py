@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк раннего решения: сколько символов нужно, чтобы переключить раскладку до конца слова
+
+Сейчас EventProcessor.processWord и BufferManager.shouldProcessWord решают только по
+завершенному слову, и пользователь видит стирание и перепечатку всего слова.
+Скрипт проигрывает каждое слово датасета по одному символу (префиксами) через
+Python порт эвристик (heuristic_detector.py) или через MaxEnt модель (train_model.py)
+и для нескольких порогов уверенности считает:
+- на каком символе решение впервые проходит порог и верно ли оно;
+- на каком символе решение становится верным и больше не меняется;
+- сколько символов перепечатки экономит раннее переключение для ru_wrong слов
+  и сколько раз оно сработало бы ложно на en/ru словах.
+
+Фразы режутся на слова по пробелам (как BufferManager), метка слова - метка фразы.
+
+    python3 ML/prefix_benchmark.py ML/Data/expanded_dataset.csv
+    python3 ML/prefix_benchmark.py ML/Data/expanded_dataset.csv --classifier model --model ML/Models/babylonfish_maxent.npz
+"""
+
+import argparse
+import sys
+import time
+from itertools import islice
+
+import dataset_io
+import heuristic_detector
+
+DEFAULT_THRESHOLDS = (0.5, 0.7, 0.8, 0.9, 0.95)
+# Префиксов на один вызов classify: память не зависит от размера датасета
+DEFAULT_CHUNK_SIZE = 100_000
+SWITCH_LABEL = "ru_wrong"
+
+
+def iter_words(rows):
+    """Фразы -> слова с меткой фразы"""
+    for text, label in rows:
+        for word in text.split():
+            yield word, label
+
+
+def heuristic_classifier(dictionary):
+    """Классификатор префиксов на эвристиках: список строк -> список (метка, уверенность)"""
+    def classify(prefixes):
+        results = []
+        for prefix in prefixes:
+            label, analysis = heuristic_detector.detect(prefix, dictionary)
+            results.append((label, analysis.confidence))
+        return results
+    return classify
+
+
+def model_classifier(path, batch_size=200_000):
+    """Классификатор префиксов на MaxEnt модели: префиксы оцениваются пачками"""
+    import numpy as np
+    from train_model import MaxEntModel
+
+    model = MaxEntModel.load(path)
+
+    def classify(prefixes):
+        results = []
+        for start in range(0, len(prefixes), batch_size):
+            probs = model.predict_proba(prefixes[start:start + batch_size])
+            best = np.argmax(probs, axis=1)
+            confidence = probs[np.arange(len(best)), best]
+            results.extend(zip((model.labels[i] for i in best), confidence.tolist()))
+        return results
+    return classify
+
+
+def replay(words, classify, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Поток (слово, метка, решения (метка, уверенность) по префиксам длины 1..len).
+    Префиксы слов копятся до chunk_size и классифицируются одним вызовом classify.
+    """
+    chunk = []
+    prefixes = []
+    for word, label in words:
+        chunk.append((word, label))
+        prefixes.extend(word[:k] for k in range(1, len(word) + 1))
+        if len(prefixes) >= chunk_size:
+            yield from _replay_chunk(chunk, prefixes, classify)
+            chunk = []
+            prefixes = []
+    if chunk:
+        yield from _replay_chunk(chunk, prefixes, classify)
+
+
+def _replay_chunk(chunk, prefixes, classify):
+    decisions = classify(prefixes)
+    offset = 0
+    for word, label in chunk:
+        yield word, label, decisions[offset:offset + len(word)]
+        offset += len(word)
+
+
+def stable_point(decisions, label):
+    """Минимальная длина префикса, начиная с которой решение верно до конца слова (None - никогда)"""
+    point = None
+    for k in range(len(decisions), 0, -1):
+        if decisions[k - 1][0] != label:
+            break
+        point = k
+    return point
+
+
+def first_fire(decisions, threshold):
+    """Первый префикс, где уверенность >= threshold и язык определен: (длина, метка) или None"""
+    for k, (predicted, confidence) in enumerate(decisions, start=1):
+        if predicted != "unknown" and confidence >= threshold:
+            return k, predicted
+    return None
+
+
+def summarize(replayed, thresholds):
+    """Сводка по порогам и точке стабилизации за один проход по потоку replay"""
+    words = total_chars = prefix_count = full_correct = 0
+    stable_words = stable_chars = 0
+    switch_words = switch_chars = 0
+    # На порог: сработало, верно, символов до срабатывания, сэкономлено, ложных переключений
+    counters = [[0, 0, 0, 0, 0] for _ in thresholds]
+    for word, label, decisions in replayed:
+        words += 1
+        total_chars += len(word)
+        prefix_count += len(decisions)
+        point = stable_point(decisions, label)
+        if point is not None:
+            stable_words += 1
+            stable_chars += point
+        if decisions and decisions[-1][0] == label:
+            full_correct += 1
+        if label == SWITCH_LABEL:
+            switch_words += 1
+            switch_chars += len(word)
+
+        for counter, threshold in zip(counters, thresholds):
+            fire = first_fire(decisions, threshold)
+            if fire is None:
+                continue
+            k, predicted = fire
+            counter[0] += 1
+            counter[2] += k
+            if predicted == label:
+                counter[1] += 1
+                if label == SWITCH_LABEL:
+                    # Символы после срабатывания не придется стирать и перепечатывать
+                    counter[3] += len(word) - k
+            elif predicted == SWITCH_LABEL:
+                counter[4] += 1
+
+    other_count = words - switch_words
+    rows = []
+    for threshold, (fired, correct, fire_chars, saved, false_switches) in zip(thresholds, counters):
+        rows.append({
+            "threshold": threshold,
+            "fired": fired,
+            "precision": correct / fired if fired else 0.0,
+            "avg_fire_chars": fire_chars / fired if fired else 0.0,
+            "retype_saved": saved / switch_chars if switch_chars else 0.0,
+            "false_switch_rate": false_switches / other_count if other_count else 0.0,
+        })
+
+    return {
+        "words": words,
+        "prefixes": prefix_count,
+        "avg_length": total_chars / max(words, 1),
+        "full_accuracy": full_correct / max(words, 1),
+        "stable_words": stable_words,
+        "avg_stable_chars": stable_chars / stable_words if stable_words else 0.0,
+        "stable_fraction": stable_chars / total_chars if total_chars else 0.0,
+        "switch_words": switch_words,
+        "thresholds": rows,
+    }
+
+
+def print_summary(summary, elapsed):
+    words = summary["words"]
+    prefix_count = summary["prefixes"]
+    print(f"Слов: {words}, средняя длина: {summary['avg_length']:.2f}, префиксов: {prefix_count}")
+    print(f"Точность по целому слову: {summary['full_accuracy'] * 100:.2f}%")
+    print(f"Решение становится верным и стабильным у {summary['stable_words']} слов "
+          f"({summary['stable_words'] / max(words, 1) * 100:.2f}%), в среднем на символе "
+          f"{summary['avg_stable_chars']:.2f}")
+    print(f"ru_wrong слов (нужно переключение): {summary['switch_words']}")
+    print(f"{'порог':>6} {'сработало':>10} {'верно':>8} {'символ':>7} {'экономия':>9} {'ложные':>8}")
+    for row in summary["thresholds"]:
+        print(f"{row['threshold']:>6.2f} {row['fired'] / max(words, 1) * 100:>9.2f}% "
+              f"{row['precision'] * 100:>7.2f}% {row['avg_fire_chars']:>7.2f} "
+              f"{row['retype_saved'] * 100:>8.2f}% {row['false_switch_rate'] * 100:>7.2f}%")
+    print("экономия - доля символов ru_wrong слов, которые не придется перепечатывать;")
+    print("ложные - доля en/ru слов, на которых раннее переключение сработало бы ошибочно")
+    rate = prefix_count / elapsed if elapsed > 0 else float("inf")
+    print(f"Скорость: {rate:,.0f} префиксов/с ({elapsed:.2f} с)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк раннего решения о переключении раскладки по префиксам")
+    parser.add_argument("dataset", help="датасет CSV или .bfds (text,label)")
+    parser.add_argument("--classifier", choices=("heuristic", "model"), default="heuristic",
+                        help="чем классифицировать префиксы (по умолчанию %(default)s)")
+    parser.add_argument("--model", help="модель .npz из train_model.py для --classifier model")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=DEFAULT_THRESHOLDS,
+                        help="пороги уверенности (по умолчанию %(default)s)")
+    parser.add_argument("--limit", type=int, default=None, help="не больше N строк датасета")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="префиксов на один вызов классификатора (по умолчанию %(default)s)")
+    heuristic_detector.add_dictionary_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.classifier == "model":
+        if not args.model:
+            print("Ошибка: для --classifier model нужен --model")
+            return 1
+        classify = model_classifier(args.model)
+    else:
+        classify = heuristic_classifier(heuristic_detector.build_dictionary(args))
+
+    words = iter_words(islice(dataset_io.iter_rows(args.dataset), args.limit))
+    start = time.perf_counter()
+    summary = summarize(replay(words, classify, args.chunk_size), args.thresholds)
+    elapsed = time.perf_counter() - start
+
+    print_summary(summary, elapsed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
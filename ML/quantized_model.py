@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Квантованный классификатор en / ru / ru_wrong в переносимом файле и пакетный рантайм
+
+NeuralLanguageClassifier.setupCustomModel компилирует BabylonFishClassifier.mlmodel
+на старте и дальше классифицирует по одной строке, а на Linux модель не запустить
+вовсе. Здесь MaxEnt модель train_model.py (веса по хешированным n-граммам
+ngram_features.py) сохраняется в компактный файл: веса квантованы в int8 с
+масштабом на класс, файл открывается через mmap без разбора и распаковки
+(загрузка - это открытие файла), а оценка идет сразу по массиву строк.
+
+Раскладка .bfqm (little-endian):
+    заголовок HEADER_SIZE байт: magic "BFQM", версия, размер заголовка, bits,
+        число классов, маска порядков n-грамм (бит n - порядок n),
+        смещения и размеры секций
+    имена меток через запятую (UTF-8)
+    scales float32[классы] - вес = int8 * scale класса
+    bias float32[классы]
+    weights int8[2^bits, классы] (выровнены на WEIGHTS_ALIGNMENT) - строка на корзину
+        n-граммы, поэтому одна выборка по номеру корзины дает веса всех классов
+
+Логит строки: bias + scale * сумма int8 весов ее n-грамм / sqrt(числа n-грамм) -
+суммы копятся в целых числах, масштаб применяется один раз на строку.
+
+    python3 ML/quantized_model.py convert ML/Models/babylonfish_maxent.npz ML/Models/babylonfish_maxent.bfqm
+    python3 ML/quantized_model.py predict ML/Models/babylonfish_maxent.bfqm привет ghbdtn hello
+    python3 ML/quantized_model.py benchmark ML/Models/babylonfish_maxent.bfqm ML/Data/expanded_dataset.csv \\
+        --float-model ML/Models/babylonfish_maxent.npz
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+import dataset_io
+import ngram_features
+import train_model
+
+MAGIC = b"BFQM"
+VERSION = 1
+EXTENSION = ".bfqm"
+HEADER_FORMAT = "<4sHHHHI" + "Q" * 5
+HEADER_SIZE = 64
+WEIGHTS_ALIGNMENT = 64
+DEFAULT_OUTPUT = os.path.splitext(train_model.DEFAULT_OUTPUT)[0] + EXTENSION
+DEFAULT_BATCH_SIZE = 100_000
+
+
+# MARK: - Конвертер
+
+
+def quantize(weights):
+    """Симметричное квантование по столбцам: (int8 [корзины, классы], scales float32 [классы])"""
+    weights = np.asarray(weights, dtype=np.float32)
+    peaks = np.abs(weights).max(axis=0)
+    scales = np.where(peaks > 0, peaks / 127.0, 1.0).astype(np.float32)
+    quantized = np.clip(np.rint(weights / scales), -127, 127).astype(np.int8)
+    return quantized, scales
+
+
+def write_quantized(model, path):
+    """Пишет train_model.MaxEntModel в .bfqm, возвращает (quantized, scales)"""
+    quantized, scales = quantize(model.weights)
+    names = ",".join(model.labels).encode("utf-8")
+    orders_mask = sum(1 << n for n in model.orders)
+    classes = len(model.labels)
+
+    labels_offset = HEADER_SIZE
+    scales_offset = labels_offset + len(names) + (-(labels_offset + len(names)) % 4)
+    bias_offset = scales_offset + 4 * classes
+    weights_offset = bias_offset + 4 * classes
+    weights_offset += -weights_offset % WEIGHTS_ALIGNMENT
+
+    header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, HEADER_SIZE, model.bits, classes, orders_mask,
+                         labels_offset, len(names), scales_offset, bias_offset, weights_offset)
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        f.write(names)
+        f.write(b"\0" * (scales_offset - f.tell()))
+        f.write(scales.astype("<f4").tobytes())
+        f.write(np.asarray(model.bias, dtype="<f4").tobytes())
+        f.write(b"\0" * (weights_offset - f.tell()))
+        f.write(quantized.tobytes())
+    os.replace(temporary, path)
+    return quantized, scales
+
+
+# MARK: - Рантайм
+
+
+class QuantizedModel:
+    """
+    .bfqm, открытый через mmap: weights, scales и bias - numpy-представления над файлом.
+    Интерфейс оценки тот же, что у train_model.MaxEntModel (predict_proba/predict).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, bits, classes, orders_mask, labels_offset, labels_size,
+         scales_offset, bias_offset, weights_offset) = struct.unpack_from(HEADER_FORMAT, self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: не файл {EXTENSION}")
+        if version != VERSION:
+            raise ValueError(f"{path}: неподдерживаемая версия {EXTENSION} {version}")
+
+        self.bits = bits
+        self.orders = tuple(n for n in range(32) if orders_mask >> n & 1)
+        self.labels = tuple(bytes(self._mmap[labels_offset:labels_offset + labels_size]).decode("utf-8").split(","))
+        self.scales = np.frombuffer(self._mmap, dtype="<f4", count=classes, offset=scales_offset)
+        self.bias = np.frombuffer(self._mmap, dtype="<f4", count=classes, offset=bias_offset)
+        self.weights = np.frombuffer(self._mmap, dtype=np.int8, count=(1 << bits) * classes,
+                                     offset=weights_offset).reshape(1 << bits, classes)
+
+    def scores(self, texts):
+        """Логиты [n, классы] для списка строк"""
+        indptr, indices = ngram_features.batch_ngram_ids(texts, bits=self.bits, orders=self.orders)
+        # Суммы по строкам через префиксные суммы; переполнение int32 в cumsum безопасно,
+        # пока помещается сумма одной строки (разность считается по модулю 2^32)
+        cumulative = np.zeros((len(indices) + 1, len(self.labels)), dtype=np.int32)
+        np.cumsum(self.weights[indices], axis=0, dtype=np.int32, out=cumulative[1:])
+        totals = cumulative[indptr[1:]] - cumulative[indptr[:-1]]
+        norms = 1.0 / np.sqrt(np.maximum(np.diff(indptr), 1)).astype(np.float32)
+        return totals * self.scales * norms[:, None] + self.bias
+
+    def predict_proba(self, texts, batch_size=DEFAULT_BATCH_SIZE):
+        if not len(texts):
+            return np.zeros((0, len(self.labels)), dtype=np.float32)
+        return np.concatenate([train_model.softmax(self.scores(texts[start:start + batch_size]))
+                               for start in range(0, len(texts), batch_size)])
+
+    def predict(self, texts, batch_size=DEFAULT_BATCH_SIZE):
+        if not len(texts):
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([np.argmax(self.scores(texts[start:start + batch_size]), axis=1)
+                               for start in range(0, len(texts), batch_size)])
+
+    def close(self):
+        if self._mmap is None:
+            return
+        self.weights = self.scales = self.bias = None
+        self._mmap.close()
+        self._file.close()
+        self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# MARK: - Бенчмарк
+
+
+def timed(function, repeat=1):
+    """(результат, лучшее время из repeat запусков в секундах)"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def benchmark_dataset(path, quantized, float_model=None, limit=None, batch_size=DEFAULT_BATCH_SIZE):
+    texts, label_ids = dataset_io.load_dataset(path, limit=limit)
+    label_ids = np.asarray(label_ids, dtype=np.int64)
+    print(f"=== {path}: {len(texts):,} строк")
+    if not texts:
+        return
+
+    predicted, elapsed = timed(lambda: quantized.predict(texts, batch_size=batch_size))
+    accuracy = float(np.mean(predicted == label_ids))
+    print(f"   {EXTENSION} int8:  {len(texts) / elapsed:>12,.0f} строк/с, точность {accuracy * 100:.2f}%")
+    if float_model is None:
+        return
+
+    def float_predict():
+        return np.concatenate([float_model.predict(texts[start:start + batch_size])
+                               for start in range(0, len(texts), batch_size)])
+
+    reference, float_elapsed = timed(float_predict)
+    float_accuracy = float(np.mean(reference == label_ids))
+    print(f"   .npz float32: {len(texts) / float_elapsed:>12,.0f} строк/с, точность {float_accuracy * 100:.2f}%")
+    print(f"   совпадение предсказаний: {np.mean(predicted == reference) * 100:.3f}%, "
+          f"ускорение x{float_elapsed / elapsed:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Квантованный int8 классификатор en/ru/ru_wrong (.bfqm)")
+    parser.add_argument("command", choices=("convert", "predict", "benchmark"))
+    parser.add_argument("paths", nargs="+",
+                        help=f"convert: модель .npz и файл {EXTENSION}; predict: {EXTENSION} и строки; "
+                             f"benchmark: {EXTENSION} и датасеты CSV/.bfds")
+    parser.add_argument("--float-model", help="модель .npz train_model.py для сравнения в benchmark")
+    parser.add_argument("--limit", type=int, default=None, help="строк каждого датасета")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="строк за один проход NumPy (по умолчанию %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        source = args.paths[0]
+        output = args.paths[1] if len(args.paths) > 1 else DEFAULT_OUTPUT
+        model = train_model.MaxEntModel.load(source)
+        quantized, scales = write_quantized(model, output)
+        error = np.abs(quantized.astype(np.float32) * scales - model.weights).max(axis=0)
+        print(f"✅ Модель сохранена: {output} ({os.path.getsize(output):,} байт, "
+              f".npz {os.path.getsize(source):,} байт, веса float32 {model.weights.nbytes:,} байт)")
+        for label, scale, max_error in zip(model.labels, scales, error):
+            print(f"   {label}: scale {scale:.6f}, макс. ошибка веса {max_error:.6f}")
+        return 0
+
+    with QuantizedModel(args.paths[0]) as quantized:
+        if args.command == "predict":
+            texts = args.paths[1:]
+            for text, probs in zip(texts, quantized.predict_proba(texts)):
+                best = int(np.argmax(probs))
+                print(f"{text}: {quantized.labels[best]} ({probs[best]:.3f})")
+            return 0
+
+        _, load_time = timed(lambda: QuantizedModel(args.paths[0]).close(), repeat=20)
+        print(f"Загрузка {EXTENSION}: {load_time * 1e3:.3f} мс")
+        float_model = None
+        if args.float_model:
+            float_model, float_load = timed(lambda: train_model.MaxEntModel.load(args.float_model), repeat=5)
+            print(f"Загрузка .npz: {float_load * 1e3:.3f} мс")
+            if tuple(float_model.labels) != quantized.labels:
+                print("❌ Метки моделей не совпадают")
+                return 1
+        for path in args.paths[1:]:
+            benchmark_dataset(path, quantized, float_model, args.limit, args.batch_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
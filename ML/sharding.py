@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Общие функции для многопроцессной (шардированной) генерации датасетов BabylonFish ML
+
+Генерация делится на N шардов. Каждый шард получает собственный random.Random,
+seed которого детерминированно выводится из мастер-seed и номера шарда,
+поэтому при одинаковых seed и количестве шардов результат побайтно совпадает
+независимо от количества процессов и порядка их завершения.
+
+Результаты шардов либо склеиваются в один CSV, либо остаются
+пронумерованными part-файлами с manifest.json.
+"""
+
+import hashlib
+import json
+import os
+import random
+import shutil
+from multiprocessing import Pool
+
+MANIFEST_SUFFIX = ".manifest.json"
+
+
+def shard_seed(master_seed, shard_index):
+    """Детерминированный seed шарда из мастер-seed (sha256, не зависит от PYTHONHASHSEED)"""
+    digest = hashlib.sha256(f"{master_seed}:{shard_index}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def shard_rng(master_seed, shard_index):
+    """Отдельный генератор случайных чисел для шарда"""
+    return random.Random(shard_seed(master_seed, shard_index))
+
+
+def resolve_seed(seed):
+    """Если seed не задан, выбираем случайный (его нужно вывести, чтобы повторить запуск)"""
+    if seed is None:
+        return random.SystemRandom().randrange(2 ** 32)
+    return seed
+
+
+def split_count(total, shards):
+    """Делит total строк на shards частей, разница между частями не больше 1"""
+    base, extra = divmod(total, shards)
+    return [base + (1 if i < extra else 0) for i in range(shards)]
+
+
+def part_path(output_path, shard_index):
+    """Путь к part-файлу шарда: data.csv -> data.part-00003.csv"""
+    root, ext = os.path.splitext(output_path)
+    return f"{root}.part-{shard_index:05d}{ext}"
+
+
+def run_shards(worker, tasks, processes=None):
+    """
+    Запускает worker(task) для каждого задания в пуле процессов.
+    Результаты возвращаются в порядке заданий.
+    """
+    if processes == 1 or len(tasks) <= 1:
+        return [worker(task) for task in tasks]
+    with Pool(processes=processes) as pool:
+        return pool.map(worker, tasks, chunksize=1)
+
+
+def file_sha256(path, block_size=1 << 20):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def concat_parts(part_paths, output_path, header_lines=1):
+    """
+    Склеивает part-файлы в один файл: заголовок берется из первого части,
+    у остальных пропускается. Part-файлы удаляются.
+    """
+    with open(output_path, "wb") as out:
+        for index, path in enumerate(part_paths):
+            with open(path, "rb") as part:
+                if index > 0:
+                    for _ in range(header_lines):
+                        part.readline()
+                shutil.copyfileobj(part, out, 1 << 20)
+            os.remove(path)
+
+
+def write_manifest(output_path, part_paths, part_rows, seed, extra=None):
+    """
+    Пишет <output>.manifest.json со списком part-файлов, числом строк и sha256.
+    Пути в манифесте относительные (относительно каталога манифеста).
+    """
+    manifest_path = output_path + MANIFEST_SUFFIX
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    manifest = {
+        "seed": seed,
+        "shards": len(part_paths),
+        "rows": sum(part_rows),
+        "parts": [
+            {
+                "path": os.path.relpath(os.path.abspath(path), base_dir),
+                "rows": rows,
+                "sha256": file_sha256(path),
+            }
+            for path, rows in zip(part_paths, part_rows)
+        ],
+    }
+    if extra:
+        manifest.update(extra)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    return manifest_path
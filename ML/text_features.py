@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Векторизованное извлечение TextFeatures (NeuralLanguageClassifier.extractFeatures) для целых датасетов
+
+Те же признаки, что и в Swift, но для всей колонки text за один проход NumPy:
+- length, wordCount (split по пробелу без пустых частей);
+- hasNumbers, hasPunctuation, hasSpecialChars;
+- cyrillicRatio (U+0400...U+04FF) и latinRatio (U+0041...U+007A, как в Swift);
+- uniqueCharacterRatio;
+- characterDistribution, bigrams, trigrams - хешированные счетчики (bincount
+  по корзинам 2^bits, хеш из ngram_features.py), без приведения регистра и
+  без граничных символов, как в extractNGrams.
+
+Результат - плотная float32 матрица в .npy (np.load(..., mmap_mode="r") открывает
+ее без чтения в память), рядом - <output>.json с именами колонок и параметрами.
+
+    python3 ML/text_features.py ML/Data/expanded_dataset.csv --output features.npy --labels-output labels.npy
+"""
+
+import argparse
+import json
+import sys
+import time
+import unicodedata
+
+import numpy as np
+
+import dataset_io
+import ngram_features
+
+SCALAR_FEATURES = (
+    "length", "wordCount", "hasNumbers", "hasPunctuation", "hasSpecialChars",
+    "cyrillicRatio", "latinRatio", "uniqueCharacterRatio",
+)
+DEFAULT_CHAR_BITS = 6
+DEFAULT_BIGRAM_BITS = 8
+DEFAULT_TRIGRAM_BITS = 8
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def feature_names(char_bits=DEFAULT_CHAR_BITS, bigram_bits=DEFAULT_BIGRAM_BITS,
+                  trigram_bits=DEFAULT_TRIGRAM_BITS):
+    names = list(SCALAR_FEATURES)
+    names += [f"char_{i}" for i in range(1 << char_bits)]
+    names += [f"bigram_{i}" for i in range(1 << bigram_bits)]
+    names += [f"trigram_{i}" for i in range(1 << trigram_bits)]
+    return names
+
+
+def _char_classes(unique_codes):
+    """Свойства символов (isNumber, isPunctuation, isLetter, isWhitespace) только для встретившихся кодов"""
+    classes = np.zeros((4, len(unique_codes)), dtype=bool)
+    for i, code in enumerate(unique_codes.tolist()):
+        ch = chr(code)
+        classes[0, i] = ch.isnumeric()
+        classes[1, i] = unicodedata.category(ch).startswith("P")
+        classes[2, i] = ch.isalpha()
+        classes[3, i] = ch.isspace()
+    return classes
+
+
+def extract(texts, char_bits=DEFAULT_CHAR_BITS, bigram_bits=DEFAULT_BIGRAM_BITS,
+            trigram_bits=DEFAULT_TRIGRAM_BITS, out=None):
+    """
+    Плотная матрица признаков [len(texts), len(feature_names(...))] float32.
+    out - готовый массив (например, срез memmap) для записи результата.
+    """
+    count = len(texts)
+    width = len(SCALAR_FEATURES) + (1 << char_bits) + (1 << bigram_bits) + (1 << trigram_bits)
+    if out is None:
+        out = np.zeros((count, width), dtype=np.float32)
+    else:
+        out[...] = 0
+    if count == 0:
+        return out
+
+    codes, starts, lengths = ngram_features.encode_texts(texts, lower=False)
+
+    # Позиции символов текста (без разделителей) и номер строки для каждой
+    is_char = np.ones(len(codes), dtype=bool)
+    is_char[starts - 1] = False
+    is_char[-1] = False
+    positions = np.flatnonzero(is_char)
+    rows = np.repeat(np.arange(count, dtype=np.int64), lengths)
+    char_codes = codes[positions]
+    safe_lengths = np.maximum(lengths, 1).astype(np.float32)
+
+    unique_codes, inverse = np.unique(char_codes, return_inverse=True)
+    is_number, is_punctuation, is_letter, is_whitespace = _char_classes(unique_codes)[:, inverse]
+    is_space = char_codes == ord(" ")
+
+    def any_per_row(mask):
+        return np.bincount(rows[mask], minlength=count) > 0
+
+    out[:, 0] = lengths
+    # Начало слова: не пробел, перед которым пробел или начало строки
+    previous_is_space = np.ones(len(codes), dtype=bool)
+    previous_is_space[1:] = (codes[:-1] == ord(" ")) | ~is_char[:-1]
+    word_starts = ~is_space & previous_is_space[positions]
+    out[:, 1] = np.bincount(rows[word_starts], minlength=count)
+    out[:, 2] = any_per_row(is_number)
+    out[:, 3] = any_per_row(is_punctuation)
+    out[:, 4] = any_per_row(~is_letter & ~is_number & ~is_whitespace)
+    cyrillic = (char_codes >= 0x0400) & (char_codes <= 0x04FF)
+    latin = (char_codes >= 0x0041) & (char_codes <= 0x007A)
+    out[:, 5] = np.bincount(rows[cyrillic], minlength=count) / safe_lengths
+    out[:, 6] = np.bincount(rows[latin], minlength=count) / safe_lengths
+
+    # Уникальные символы: уникальные пары (строка, код)
+    unique_pairs = np.unique((rows << 21) | char_codes.astype(np.int64))
+    out[:, 7] = np.bincount(unique_pairs >> 21, minlength=count) / safe_lengths
+    out[lengths == 0, 5:8] = 0
+
+    column = len(SCALAR_FEATURES)
+    end_of_row = (starts + lengths)[rows]
+    for n, bits in ((1, char_bits), (2, bigram_bits), (3, trigram_bits)):
+        mask = positions + (n - 1) < end_of_row
+        buckets = ngram_features.bucket_hashes(
+            ngram_features.hash_positions(codes, positions[mask], n), bits).astype(np.int64)
+        size = 1 << bits
+        counts = np.bincount(rows[mask] * size + buckets, minlength=count * size)
+        out[:, column:column + size] = counts.reshape(count, size)
+        column += size
+    return out
+
+
+def write_features(texts, output_path, chunk_size=DEFAULT_CHUNK_SIZE, **bits):
+    """Пишет матрицу признаков в .npy через memmap кусками по chunk_size строк"""
+    names = feature_names(**bits)
+    matrix = np.lib.format.open_memmap(output_path, mode="w+", dtype=np.float32,
+                                       shape=(len(texts), len(names)))
+    for start in range(0, len(texts), chunk_size):
+        chunk = texts[start:start + chunk_size]
+        extract(chunk, out=matrix[start:start + len(chunk)], **bits)
+    matrix.flush()
+    del matrix
+
+    with open(output_path + ".json", "w", encoding="utf-8") as f:
+        json.dump({"rows": len(texts), "columns": names, **bits}, f, ensure_ascii=False)
+    return len(names)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Векторизованные TextFeatures для CSV датасета")
+    parser.add_argument("dataset", help="датасет CSV или .bfds (text,label)")
+    parser.add_argument("--output", required=True, help="файл .npy для матрицы признаков")
+    parser.add_argument("--labels-output", help="файл .npy для id меток (uint8)")
+    parser.add_argument("--limit", type=int, default=None, help="не больше N строк")
+    parser.add_argument("--char-bits", type=int, default=DEFAULT_CHAR_BITS,
+                        help="корзин для characterDistribution: 2^N (по умолчанию %(default)s)")
+    parser.add_argument("--bigram-bits", type=int, default=DEFAULT_BIGRAM_BITS,
+                        help="корзин для биграмм: 2^N (по умолчанию %(default)s)")
+    parser.add_argument("--trigram-bits", type=int, default=DEFAULT_TRIGRAM_BITS,
+                        help="корзин для триграмм: 2^N (по умолчанию %(default)s)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="строк за один проход NumPy (по умолчанию %(default)s)")
+    args = parser.parse_args(argv)
+
+    texts, label_ids = dataset_io.load_dataset(args.dataset, limit=args.limit)
+    start = time.perf_counter()
+    columns = write_features(texts, args.output, chunk_size=args.chunk_size,
+                             char_bits=args.char_bits, bigram_bits=args.bigram_bits,
+                             trigram_bits=args.trigram_bits)
+    elapsed = time.perf_counter() - start
+    if args.labels_output:
+        np.save(args.labels_output, np.asarray(label_ids, dtype=np.uint8))
+
+    rate = len(texts) / elapsed if elapsed > 0 else float("inf")
+    print(f"✅ Признаки сохранены: {args.output} ({len(texts)} x {columns})")
+    print(f"Скорость: {rate:,.0f} строк/с ({elapsed:.2f} с)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Обучение классификатора en / ru / ru_wrong без CreateML (Linux, NumPy)
+
+Аналог ML/train_model.swift: те же метки и тот же тип модели - Maximum Entropy
+(мультиномиальная логистическая регрессия), но на хешированных символьных
+n-граммах (см. ngram_features.py) и минибатчевом SGD.
+
+    python3 ML/train_model.py --data ML/Data/expanded_dataset.csv --output ML/Models/babylonfish_maxent.npz
+
+Модель сохраняется в .npz: веса [2^bits, 3], смещения, метки и параметры признаков.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+import dataset_io
+import ngram_features
+
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA = os.path.join(ML_DIR, "Data", "expanded_dataset.csv")
+DEFAULT_OUTPUT = os.path.join(ML_DIR, "Models", "babylonfish_maxent.npz")
+
+
+class MaxEntModel:
+    """Мультиномиальная логистическая регрессия на хешированных n-граммах"""
+
+    def __init__(self, bits=ngram_features.DEFAULT_BITS, orders=ngram_features.ORDERS,
+                 labels=dataset_io.LABELS):
+        self.bits = bits
+        self.orders = tuple(orders)
+        self.labels = tuple(labels)
+        self.weights = np.zeros((1 << bits, len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+
+    def features(self, texts):
+        """CSR признаки (indptr, indices, values); значения нормированы на sqrt(числа n-грамм)"""
+        indptr, indices = ngram_features.batch_ngram_ids(texts, bits=self.bits, orders=self.orders)
+        counts = np.diff(indptr)
+        values = np.repeat(1.0 / np.sqrt(np.maximum(counts, 1)), counts).astype(np.float32)
+        return indptr, indices, values
+
+    def scores(self, indptr, indices, values):
+        """Логиты [n, классы] для CSR признаков"""
+        count = len(indptr) - 1
+        rows = np.repeat(np.arange(count), np.diff(indptr))
+        logits = np.zeros((count, len(self.labels)), dtype=np.float32)
+        np.add.at(logits, rows, self.weights[indices] * values[:, None])
+        return logits + self.bias
+
+    def predict_proba(self, texts):
+        return softmax(self.scores(*self.features(texts)))
+
+    def predict(self, texts):
+        return np.argmax(self.predict_proba(texts), axis=1)
+
+    def save(self, path):
+        np.savez_compressed(path, weights=self.weights, bias=self.bias,
+                            labels=np.array(self.labels), bits=self.bits,
+                            orders=np.array(self.orders))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        model = cls(bits=int(data["bits"]), orders=data["orders"].tolist(),
+                    labels=data["labels"].tolist())
+        model.weights = data["weights"]
+        model.bias = data["bias"]
+        return model
+
+
+def softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def slice_csr(indptr, indices, values, rows):
+    """Подматрица CSR по списку строк"""
+    counts = np.diff(indptr)[rows]
+    new_indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(counts, out=new_indptr[1:])
+    starts = np.repeat(indptr[rows] - new_indptr[:-1], counts)
+    positions = np.arange(new_indptr[-1]) + starts
+    return new_indptr, indices[positions], values[positions]
+
+
+def train(model, features, label_ids, epochs=5, batch_size=256, learning_rate=0.5,
+          l2=1e-6, seed=5, log=print):
+    """
+    Минибатчевый SGD по кросс-энтропии. features - CSR признаки всех строк.
+    Возвращает скорость обучения в строках в секунду.
+    """
+    indptr, indices, values = features
+    label_ids = np.asarray(label_ids)
+    count = len(label_ids)
+    rng = np.random.default_rng(seed)
+    eye = np.eye(len(model.labels), dtype=np.float32)
+
+    start = time.perf_counter()
+    for epoch in range(epochs):
+        rate = learning_rate / (1.0 + epoch)
+        order = rng.permutation(count)
+        loss = 0.0
+        for batch_start in range(0, count, batch_size):
+            rows = order[batch_start:batch_start + batch_size]
+            b_indptr, b_indices, b_values = slice_csr(indptr, indices, values, rows)
+            probs = softmax(model.scores(b_indptr, b_indices, b_values))
+            targets = eye[label_ids[rows]]
+            loss -= float(np.log(np.maximum(probs[targets > 0], 1e-12)).sum())
+
+            # Градиент по весам не усредняем по батчу: каждая n-грамма встречается
+            # в малой доле строк, и усреднение сделало бы шаг для нее в batch_size раз меньше
+            grad = probs - targets
+            row_of_feature = np.repeat(np.arange(len(rows)), np.diff(b_indptr))
+            update = grad[row_of_feature] * b_values[:, None]
+            if l2:
+                update += l2 * model.weights[b_indices]
+            np.add.at(model.weights, b_indices, -rate * update)
+            model.bias -= rate * grad.mean(axis=0)
+        log(f"   эпоха {epoch + 1}/{epochs}: loss {loss / count:.4f}")
+    elapsed = time.perf_counter() - start
+    return count * epochs / elapsed if elapsed > 0 else float("inf")
+
+
+def evaluate(model, features, label_ids):
+    """Точность, матрица ошибок и precision/recall по классам"""
+    predicted = np.argmax(model.scores(*features), axis=1)
+    label_ids = np.asarray(label_ids)
+    classes = len(model.labels)
+    confusion = np.bincount(label_ids * classes + predicted,
+                            minlength=classes * classes).reshape(classes, classes)
+    report = {"accuracy": float(np.trace(confusion) / max(confusion.sum(), 1)),
+              "confusion": confusion, "classes": {}}
+    for index, label in enumerate(model.labels):
+        predicted_count = confusion[:, index].sum()
+        actual_count = confusion[index, :].sum()
+        report["classes"][label] = {
+            "precision": float(confusion[index, index] / predicted_count) if predicted_count else 0.0,
+            "recall": float(confusion[index, index] / actual_count) if actual_count else 0.0,
+            "support": int(actual_count),
+        }
+    return report
+
+
+def print_report(report, labels):
+    print(f"Точность: {report['accuracy'] * 100:.2f}%")
+    print(f"{'класс':<10} {'precision':>9} {'recall':>9} {'support':>9}")
+    for label in labels:
+        stats = report["classes"][label]
+        print(f"{label:<10} {stats['precision']:>9.4f} {stats['recall']:>9.4f} {stats['support']:>9}")
+    print("Матрица ошибок (строки - истинные, столбцы - предсказанные):")
+    print(" " * 10 + "".join(f"{label:>10}" for label in labels))
+    for label, row in zip(labels, report["confusion"]):
+        print(f"{label:<10}" + "".join(f"{value:>10}" for value in row))
+
+
+def split_indices(count, test_fraction, seed):
+    """Случайное разбиение на train/test (как randomSplit(by: 0.8, seed: 5) в train_model.swift)"""
+    order = np.random.default_rng(seed).permutation(count)
+    test_count = int(round(count * test_fraction))
+    return order[test_count:], order[:test_count]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Обучение MaxEnt классификатора en/ru/ru_wrong на NumPy")
+    parser.add_argument("--data", default=DEFAULT_DATA, help="датасет CSV или .bfds (по умолчанию %(default)s)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="куда сохранить модель (по умолчанию %(default)s)")
+    parser.add_argument("--limit", type=int, default=None, help="читать не больше N строк")
+    parser.add_argument("--bits", type=int, default=ngram_features.DEFAULT_BITS,
+                        help="размер хеш-пространства 2^bits (по умолчанию %(default)s)")
+    parser.add_argument("--epochs", type=int, default=5, help="эпох SGD (по умолчанию %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=256, help="размер минибатча (по умолчанию %(default)s)")
+    parser.add_argument("--learning-rate", type=float, default=0.5, help="начальный шаг (по умолчанию %(default)s)")
+    parser.add_argument("--l2", type=float, default=1e-6, help="L2 регуляризация (по умолчанию %(default)s)")
+    parser.add_argument("--test-fraction", type=float, default=0.2, help="доля теста (по умолчанию %(default)s)")
+    parser.add_argument("--seed", type=int, default=5, help="seed разбиения и SGD (по умолчанию %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print(f"Загрузка {args.data}...")
+    start = time.perf_counter()
+    texts, label_ids = dataset_io.load_dataset(args.data, limit=args.limit)
+    label_ids = np.asarray(label_ids, dtype=np.int64)
+    if not texts:
+        print("Ошибка: датасет пуст")
+        return 1
+
+    model = MaxEntModel(bits=args.bits)
+    features = model.features(texts)
+    print(f"Строк: {len(texts)}, n-грамм: {len(features[1])}, "
+          f"загрузка и признаки: {time.perf_counter() - start:.2f} с")
+
+    train_rows, test_rows = split_indices(len(texts), args.test_fraction, args.seed)
+    train_features = slice_csr(*features, train_rows)
+    test_features = slice_csr(*features, test_rows)
+
+    print(f"Обучение на {len(train_rows)} строках...")
+    rows_per_second = train(model, train_features, label_ids[train_rows], epochs=args.epochs,
+                            batch_size=args.batch_size, learning_rate=args.learning_rate,
+                            l2=args.l2, seed=args.seed)
+    print(f"Скорость обучения: {rows_per_second:,.0f} строк/с")
+
+    if len(test_rows):
+        print_report(evaluate(model, test_features, label_ids[test_rows]), model.labels)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    model.save(args.output)
+    print(f"Модель сохранена: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Генератор пар опечаток (incorrect, correct, language) для обучения и проверки TypoCorrector
+
+TypoCorrector.train(with:) и EnhancedTypoCorrector принимают примеры
+(incorrect, correct, language), но массово их никто не производил. Скрипт берет
+частотные списки слов (word_lists.py, слова выбираются с весом по частоте) и
+вносит реалистичные ошибки с учетом физического соседства клавиш QWERTY/ЙЦУКЕН
+(раскладки en_layout/ru_layout из layout_transcoder.py):
+- substitution - замена буквы на соседнюю по клавиатуре;
+- omission - пропуск буквы;
+- doubling - удвоение буквы;
+- transposition - перестановка соседних букв.
+
+Шум вносится пачками в NumPy: слова пачки - матрица кодовых точек, для каждой
+строки выбираются вид и позиция ошибки, результат собирается одной выборкой
+по индексам. Пары пишутся в CSV потоково (incorrect,correct,language), память
+не зависит от --count.
+
+    python3 ML/typo_augment.py --en-words ML/Data/words_en.tsv --ru-words ML/Data/words_ru.tsv \\
+        --count 10000000 --output typos.csv
+    python3 ML/typo_augment.py --generator-words --count 20000 --evaluate typo.bfsi
+"""
+
+import argparse
+import csv
+import sys
+import time
+
+import numpy as np
+
+import heuristic_detector
+import layout_transcoder
+import word_lists
+
+KINDS = ("substitution", "omission", "doubling", "transposition")
+DEFAULT_WEIGHTS = (0.4, 0.25, 0.15, 0.2)
+DEFAULT_BATCH_SIZE = 200_000
+DEFAULT_MAX_LENGTH = 24
+# Расстояние между центрами соседних клавиш (в ширинах клавиши)
+NEIGHBOUR_DISTANCE = 1.3
+
+# Ряды клавиш в порядке EN_LAYOUT и горизонтальный сдвиг начала ряда
+KEY_ROWS = (("`", 0.0), ("qwertyuiop[]", 1.5), ("asdfghjkl;'", 1.75), ("zxcvbnm,./", 2.25))
+
+
+def key_positions():
+    """Координаты (x, y) клавиш в порядке EN_LAYOUT (только нижний регистр)"""
+    positions = {}
+    for y, (keys, offset) in enumerate(KEY_ROWS):
+        for x, key in enumerate(keys):
+            positions[key] = (offset + x, float(y))
+    return [positions[key] for key in layout_transcoder.EN_LAYOUT[:len(positions)]]
+
+
+def adjacency(layout):
+    """{буква: соседние по клавиатуре буквы} для раскладки (EN_LAYOUT или RU_LAYOUT)"""
+    positions = key_positions()
+    keys = layout[:len(positions)]
+    neighbours = {}
+    for i, key in enumerate(keys):
+        if not key.isalpha():
+            continue
+        x, y = positions[i]
+        neighbours[key] = [other for j, other in enumerate(keys)
+                           if j != i and other.isalpha()
+                           and ((positions[j][0] - x) ** 2 + (positions[j][1] - y) ** 2) ** 0.5 <= NEIGHBOUR_DISTANCE]
+    return neighbours
+
+
+LAYOUTS = {"en": layout_transcoder.EN_LAYOUT, "ru": layout_transcoder.RU_LAYOUT}
+
+
+class TypoNoise:
+    """Векторизованный шум для слов одного языка"""
+
+    def __init__(self, words, counts, language, weights=DEFAULT_WEIGHTS, max_length=DEFAULT_MAX_LENGTH,
+                 power=1.0):
+        neighbours = adjacency(LAYOUTS[language])
+        alphabet = set(neighbours)
+        pairs = [(word.lower(), count) for word, count in zip(words, counts)
+                 if 2 <= len(word) <= max_length and set(word.lower()) <= alphabet]
+        if not pairs:
+            raise ValueError(f"Нет подходящих слов для {language}")
+        self.language = language
+        self.words = np.asarray([word for word, _ in pairs], dtype=np.str_)
+        self.sampler = word_lists.WordSampler([word for word, _ in pairs], [count for _, count in pairs], power)
+        self.width = self.words.dtype.itemsize // 4
+        self.codes = self.words.view(np.uint32).reshape(len(self.words), self.width)
+        self.lengths = np.char.str_len(self.words).astype(np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64) / sum(weights)
+
+        # Таблица соседей по кодовой точке: neighbour_table[code, :neighbour_count[code]]
+        size = max(ord(ch) for ch in alphabet) + 1
+        widest = max(len(items) for items in neighbours.values())
+        self.neighbour_table = np.zeros((size, widest), dtype=np.uint32)
+        self.neighbour_count = np.zeros(size, dtype=np.int64)
+        for key, items in neighbours.items():
+            self.neighbour_table[ord(key), :len(items)] = [ord(ch) for ch in items]
+            self.neighbour_count[ord(key)] = len(items)
+
+    def apply(self, codes, lengths, generator):
+        """
+        Одна ошибка в каждой строке матрицы codes (n, width).
+        Возвращает (новые codes (n, width + 1), новые lengths, виды ошибок).
+        """
+        count, width = codes.shape
+        kinds = generator.choice(len(KINDS), size=count, p=self.weights)
+        kinds[(kinds == 3) & (lengths < 2)] = 0
+        limits = np.where(kinds == 3, lengths - 1, lengths)
+        positions = (generator.random(count) * limits).astype(np.int64)
+
+        # Индекс исходного символа для каждой позиции результата
+        j = np.arange(width + 1, dtype=np.int64)[None, :]
+        p = positions[:, None]
+        k = kinds[:, None]
+        source = j.copy().repeat(count, axis=0)
+        source += np.where(k == 1, j >= p, 0)
+        source -= np.where(k == 2, j > p, 0)
+        source += np.where(k == 3, (j == p).astype(np.int64) - (j == p + 1), 0)
+        new_lengths = lengths + np.select([kinds == 1, kinds == 2], [-1, 1], 0)
+
+        padded = np.zeros((count, width + 1), dtype=np.uint32)
+        padded[:, :width] = codes
+        result = np.take_along_axis(padded, np.clip(source, 0, width), axis=1)
+        result[j >= new_lengths[:, None]] = 0
+
+        rows = np.flatnonzero(kinds == 0)
+        if len(rows):
+            original = result[rows, positions[rows]]
+            available = self.neighbour_count[np.minimum(original, len(self.neighbour_count) - 1)]
+            available[original >= len(self.neighbour_count)] = 0
+            choice = (generator.random(len(rows)) * np.maximum(available, 1)).astype(np.int64)
+            replacement = self.neighbour_table[np.minimum(original, len(self.neighbour_count) - 1), choice]
+            result[rows, positions[rows]] = np.where(available > 0, replacement, original)
+        return result, new_lengths, kinds
+
+    def batch(self, size, generator, edits=1):
+        """Пачка (incorrect, correct, kinds): массивы строк и виды первой ошибки"""
+        indices = self.sampler.sample_indices(generator, size)
+        codes = self.codes[indices]
+        lengths = self.lengths[indices]
+        first_kinds = None
+        for _ in range(edits):
+            codes, lengths, kinds = self.apply(codes, lengths, generator)
+            if first_kinds is None:
+                first_kinds = kinds
+        incorrect = np.ascontiguousarray(codes).view(f"<U{codes.shape[1]}").ravel()
+        correct = self.words[indices]
+        changed = incorrect != correct
+        return incorrect[changed], correct[changed], first_kinds[changed]
+
+
+def generate(noises, count, seed=None, batch_size=DEFAULT_BATCH_SIZE, edits=1):
+    """
+    Поток пачек (incorrect, correct, language, kinds): count делится между языками
+    поровну, пачки языков (до batch_size строк на круг) чередуются
+    """
+    generator = np.random.default_rng(seed)
+    per_batch = -(-batch_size // len(noises))
+    remaining = [count // len(noises) + (i < count % len(noises)) for i in range(len(noises))]
+    while any(left > 0 for left in remaining):
+        for i, noise in enumerate(noises):
+            if remaining[i] <= 0:
+                continue
+            incorrect, correct, kinds = noise.batch(min(per_batch, remaining[i]), generator, edits)
+            remaining[i] -= len(incorrect)
+            yield incorrect, correct, noise.language, kinds
+
+
+def write_pairs(batches, path):
+    """Потоковая запись CSV incorrect,correct,language; возвращает {язык: число пар}"""
+    counts = {}
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["incorrect", "correct", "language"])
+        for incorrect, correct, language, _ in batches:
+            writer.writerows(zip(incorrect.tolist(), correct.tolist(), [language] * len(incorrect)))
+            counts[language] = counts.get(language, 0) + len(incorrect)
+    return counts
+
+
+def evaluate(batches, index_path, limit):
+    """Точность и скорость DeletionIndex (deletion_index.py) на сгенерированных парах по видам ошибок"""
+    import deletion_index
+
+    stats = {kind: [0, 0, 0] for kind in KINDS}
+    elapsed = 0.0
+    total = 0
+    with deletion_index.DeletionIndex(index_path) as index:
+        for incorrect, correct, language, kinds in batches:
+            for typo, word, kind in zip(incorrect.tolist(), correct.tolist(), kinds.tolist()):
+                start = time.perf_counter()
+                suggestions = [item[0] for item in index.lookup(typo, language=language)]
+                elapsed += time.perf_counter() - start
+                row = stats[KINDS[kind]]
+                row[0] += 1
+                row[1] += suggestions[:1] == [word]
+                row[2] += word in suggestions
+                total += 1
+                if total >= limit:
+                    return stats, elapsed, total
+    return stats, elapsed, total
+
+
+def load_noises(args):
+    weights = tuple(args.weights)
+    noises = []
+    for language, path in (("en", args.en_words), ("ru", args.ru_words)):
+        if path:
+            words, counts = word_lists.load_word_counts(path, limit=args.words_limit)
+            noises.append(TypoNoise(words, counts, language, weights, args.max_length, args.weight_power))
+    if args.generator_words and not noises:
+        for language, words in zip(("en", "ru"), heuristic_detector.generator_word_lists()):
+            noises.append(TypoNoise(words, [1] * len(words), language, weights, args.max_length))
+    return noises
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Генератор пар опечаток для TypoCorrector")
+    parser.add_argument("--en-words", help="частотный список английских слов (word_lists.py)")
+    parser.add_argument("--ru-words", help="частотный список русских слов (word_lists.py)")
+    parser.add_argument("--generator-words", action="store_true",
+                        help="списки слов генераторов датасетов вместо частотных списков")
+    parser.add_argument("--words-limit", type=int, default=None, help="не больше N слов из каждого списка")
+    parser.add_argument("--weight-power", type=float, default=1.0,
+                        help="вес слова = частота^N (по умолчанию %(default)s)")
+    parser.add_argument("--count", type=int, default=1_000_000, help="число пар (по умолчанию %(default)s)")
+    parser.add_argument("--output", help="CSV incorrect,correct,language")
+    parser.add_argument("--seed", type=int, default=None, help="seed для воспроизводимости")
+    parser.add_argument("--edits", type=int, default=1, help="ошибок на слово (по умолчанию %(default)s)")
+    parser.add_argument("--weights", type=float, nargs=4, default=DEFAULT_WEIGHTS,
+                        metavar=("SUB", "OMIT", "DOUBLE", "SWAP"),
+                        help="доли видов ошибок (по умолчанию %(default)s)")
+    parser.add_argument("--max-length", type=int, default=DEFAULT_MAX_LENGTH, help="максимальная длина слова")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="пар в пачке NumPy (по умолчанию %(default)s)")
+    parser.add_argument("--evaluate", metavar="BFSI",
+                        help="проверить индекс удалений (deletion_index.py) на сгенерированных парах")
+    parser.add_argument("--evaluate-limit", type=int, default=20_000, help="пар для --evaluate")
+    args = parser.parse_args(argv)
+
+    noises = load_noises(args)
+    if not noises:
+        parser.error("нужны --en-words/--ru-words или --generator-words")
+    if not args.output and not args.evaluate:
+        parser.error("нужен --output и/или --evaluate")
+
+    if args.output:
+        start = time.perf_counter()
+        counts = write_pairs(generate(noises, args.count, args.seed, args.batch_size, args.edits), args.output)
+        elapsed = time.perf_counter() - start
+        total = sum(counts.values())
+        summary = ", ".join(f"{language}: {count}" for language, count in counts.items())
+        print(f"✅ Пары сохранены: {args.output} ({total} пар, {summary})")
+        print(f"Скорость: {total / elapsed if elapsed > 0 else float('inf'):,.0f} пар/с ({elapsed:.2f} с)")
+
+    if args.evaluate:
+        batches = generate(noises, args.evaluate_limit, args.seed, args.batch_size, args.edits)
+        stats, elapsed, total = evaluate(batches, args.evaluate, args.evaluate_limit)
+        print(f"Индекс {args.evaluate}: {total} пар, {elapsed / max(total, 1) * 1e6:.1f} мкс/слово")
+        for kind, (count, top1, top5) in stats.items():
+            if count:
+                print(f"   {kind:<14} {count:>7}  top-1 {top1 / count * 100:6.2f}%  top-5 {top5 / count * 100:6.2f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Предрассчитанный кэш классификации частых слов для холодного старта
+
+NeuralLanguageClassifier.predictionCache и CacheManager.languageDetectionCache
+после запуска пусты (а predictionCache еще и очищается таймером setupCache),
+поэтому самые частые слова снова и снова проходят CoreML, NLLanguageRecognizer
+и эвристики. Скрипт заранее классифицирует --top самых частых слов каждого
+языка и их варианты в неправильной раскладке (layout_transcoder: ru -> en для
+ru_wrong, en -> ru для английского, набранного на русской раскладке) эталонным
+классификатором (эвристики heuristic_detector.py или MaxEnt модель train_model.py)
+и пишет компактный файл только для чтения - первый уровень кэша.
+
+Ключ - 64-битный FNV-1a от UTF-8 слова в нижнем регистре (тривиально
+повторяется в Swift), строки в файле не хранятся. Раскладка .bfwc (little-endian):
+    заголовок HEADER_SIZE байт: magic "BFWC", версия, размер заголовка, число записей,
+        смещения массивов и имен меток
+    keys uint64[count] по возрастанию - двоичный поиск
+    labels uint8[count] - индекс в именах меток
+    confidences uint8[count] - уверенность * 255
+    имена меток через запятую (UTF-8)
+
+    python3 ML/warm_cache.py build warm_cache.bfwc --en-words ML/Data/words_en.tsv --ru-words ML/Data/words_ru.tsv --top 5000
+    python3 ML/warm_cache.py lookup warm_cache.bfwc привет ghbdtn hello
+    python3 ML/warm_cache.py benchmark warm_cache.bfwc --en-words ML/Data/words_en.tsv --ru-words ML/Data/words_ru.tsv
+"""
+
+import argparse
+import bisect
+import mmap
+import random
+import struct
+import sys
+import time
+from array import array
+
+import heuristic_detector
+import layout_transcoder
+import prefix_benchmark
+import word_lists
+
+MAGIC = b"BFWC"
+VERSION = 1
+EXTENSION = ".bfwc"
+HEADER_FORMAT = "<4sHHIQQQQI"
+HEADER_SIZE = 48
+DEFAULT_TOP = 5000
+
+FNV64_OFFSET = 0xCBF29CE484222325
+FNV64_PRIME = 0x100000001B3
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def key_hash(word):
+    """FNV-1a 64 от UTF-8 слова в нижнем регистре"""
+    h = FNV64_OFFSET
+    for byte in word.lower().encode("utf-8"):
+        h = ((h ^ byte) * FNV64_PRIME) & MASK64
+    return h
+
+
+def cache_words(en_words, ru_words):
+    """Слова и их варианты в неправильной раскладке, без повторов, в порядке частоты"""
+    seen = set()
+    result = []
+    for words, switch in ((en_words, layout_transcoder.en_to_ru), (ru_words, layout_transcoder.ru_to_en)):
+        for word in words:
+            for text in (word.lower(), switch(word.lower())):
+                if text not in seen:
+                    seen.add(text)
+                    result.append(text)
+    return result
+
+
+def build_cache(words, classify, output_path):
+    """
+    Классифицирует слова (classify: список строк -> [(метка, уверенность)]) и пишет .bfwc.
+    Возвращает {метка: число слов}.
+    """
+    decisions = classify(words)
+    labels = sorted({label for label, _ in decisions})
+    label_ids = {label: index for index, label in enumerate(labels)}
+
+    entries = {}
+    for word, (label, confidence) in zip(words, decisions):
+        key = key_hash(word)
+        if key in entries:
+            raise ValueError(f"Коллизия FNV-1a 64 для {word!r}")
+        entries[key] = (label_ids[label], min(255, max(0, int(round(confidence * 255)))))
+    keys = sorted(entries)
+
+    names = ",".join(labels).encode("utf-8")
+    keys_offset = HEADER_SIZE
+    labels_offset = keys_offset + 8 * len(keys)
+    confidences_offset = labels_offset + len(keys)
+    names_offset = confidences_offset + len(keys)
+    with open(output_path, "wb") as f:
+        f.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, HEADER_SIZE, len(keys), keys_offset,
+                            labels_offset, confidences_offset, names_offset, len(names)).ljust(HEADER_SIZE, b"\0"))
+        f.write(array("Q", keys).tobytes())
+        f.write(bytes(entries[key][0] for key in keys))
+        f.write(bytes(entries[key][1] for key in keys))
+        f.write(names)
+
+    counts = {}
+    for label, _ in decisions:
+        counts[label] = counts.get(label, 0) + 1
+    return counts
+
+
+class WarmCache:
+    """Кэш .bfwc, открытый через mmap: двоичный поиск по ключам без копирования"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, count, keys_offset, labels_offset, confidences_offset,
+         names_offset, names_size) = struct.unpack_from(HEADER_FORMAT, self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: не файл {EXTENSION}")
+        if version != VERSION:
+            raise ValueError(f"{path}: неподдерживаемая версия {EXTENSION} {version}")
+
+        view = memoryview(self._mmap)
+        self._keys = view[keys_offset:keys_offset + 8 * count].cast("Q")
+        self._labels = view[labels_offset:labels_offset + count]
+        self._confidences = view[confidences_offset:confidences_offset + count]
+        self.labels = tuple(bytes(view[names_offset:names_offset + names_size]).decode("utf-8").split(","))
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def get(self, word):
+        """(метка, уверенность) или None"""
+        key = key_hash(word)
+        index = bisect.bisect_left(self._keys, key)
+        if index < self.count and self._keys[index] == key:
+            return self.labels[self._labels[index]], self._confidences[index] / 255
+        return None
+
+    def close(self):
+        for view in (self._keys, self._labels, self._confidences):
+            view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_ranked_words(args):
+    """Частотные списки ((слова, частоты) на язык); списки генераторов - с частотой 1"""
+    lists = {}
+    for language, path in (("en", args.en_words), ("ru", args.ru_words)):
+        if path:
+            lists[language] = word_lists.load_word_counts(path)
+    if args.generator_words:
+        for language, words in zip(("en", "ru"), heuristic_detector.generator_word_lists()):
+            if language not in lists:
+                lists[language] = (words, [1] * len(words))
+    return lists
+
+
+def coverage(cache, words, counts):
+    """Доля словоупотреблений (по частотам списка), которые попадают в кэш"""
+    total = sum(counts)
+    hit = sum(count for word, count in zip(words, counts) if cache.get(word) is not None)
+    return hit / total if total else 0.0
+
+
+def benchmark(cache, words, counts, count, seed=42):
+    """Латентность get на словах, выбранных по частоте: (мкс/запрос, доля попаданий)"""
+    rng = random.Random(seed)
+    queries = word_lists.WordSampler(words, counts).sample(rng, count)
+    start = time.perf_counter()
+    hits = sum(1 for word in queries if cache.get(word) is not None)
+    elapsed = time.perf_counter() - start
+    return elapsed / max(count, 1) * 1e6, hits / max(count, 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Предрассчитанный кэш классификации частых слов")
+    parser.add_argument("command", choices=("build", "lookup", "benchmark"))
+    parser.add_argument("cache", help=f"файл кэша {EXTENSION}")
+    parser.add_argument("words", nargs="*", help="слова для lookup")
+    parser.add_argument("--en-words", help="частотный список английских слов (word_lists.py)")
+    parser.add_argument("--ru-words", help="частотный список русских слов (word_lists.py)")
+    parser.add_argument("--generator-words", action="store_true",
+                        help="списки слов генераторов датасетов (для языков без частотного списка)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP,
+                        help="слов каждого языка (по умолчанию %(default)s)")
+    parser.add_argument("--classifier", choices=("heuristic", "model"), default="heuristic",
+                        help="эталонный классификатор (по умолчанию %(default)s)")
+    parser.add_argument("--model", help="модель .npz из train_model.py для --classifier model")
+    parser.add_argument("--count", type=int, default=200_000, help="запросов в benchmark")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        lists = load_ranked_words(args)
+        if not lists:
+            parser.error("нужны --en-words/--ru-words или --generator-words")
+        if args.classifier == "model":
+            if not args.model:
+                parser.error("для --classifier model нужен --model")
+            classify = prefix_benchmark.model_classifier(args.model)
+        else:
+            # Словарь эвристик - полные списки, а не только кэшируемые слова
+            dictionary = heuristic_detector.WordListDictionary(lists.get("en", ([],))[0],
+                                                               lists.get("ru", ([],))[0])
+            classify = prefix_benchmark.heuristic_classifier(dictionary)
+
+        top = {language: words[:args.top] for language, (words, _) in lists.items()}
+        words = cache_words(top.get("en", []), top.get("ru", []))
+        start = time.perf_counter()
+        counts = build_cache(words, classify, args.cache)
+        summary = ", ".join(f"{label}: {count}" for label, count in sorted(counts.items()))
+        print(f"✅ Кэш сохранен: {args.cache} ({len(words)} слов, {summary}, "
+              f"{time.perf_counter() - start:.1f} с)")
+        return 0
+
+    with WarmCache(args.cache) as cache:
+        if args.command == "lookup":
+            for word in args.words:
+                found = cache.get(word)
+                print(f"{word}: {f'{found[0]} ({found[1]:.2f})' if found else 'нет в кэше'}")
+            return 0
+
+        lists = load_ranked_words(args)
+        if not lists:
+            parser.error("для benchmark нужны частотные списки")
+        print(f"Кэш: {len(cache)} записей, метки {', '.join(cache.labels)}")
+        for language, (words, counts) in lists.items():
+            latency, hit_rate = benchmark(cache, words, counts, args.count)
+            print(f"   {language}: покрытие словоупотреблений {coverage(cache, words, counts) * 100:.2f}%, "
+                  f"попаданий {hit_rate * 100:.2f}%, {latency:.2f} мкс/запрос")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
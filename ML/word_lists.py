@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Частотные списки слов ru/en из локальных текстовых корпусов с ограниченной памятью
+
+Файлы читаются потоково, кусками строк. Слова выделяются регулярными выражениями
+(кириллица -> ru, латиница -> en), приводятся к нижнему регистру и считаются:
+- кандидаты в частые слова - сводка Misra-Gries на --capacity счетчиков для
+  каждого языка (слово с частотой > N/capacity гарантированно в сводке);
+- частоты кандидатов - Count-Min Sketch (NumPy, --cms-depth x 2^--cms-bits),
+  оценка сверху с ошибкой <= e*N/ширина с большой вероятностью.
+Память не зависит от размера корпуса.
+
+Результат - words_en.tsv / words_ru.tsv: "слово\\tчастота", по убыванию частоты.
+Генераторы датасетов загружают их через load_word_counts/WordSampler.
+
+    python3 ML/word_lists.py corpus/*.txt --output-dir ML/Data --top 50000
+"""
+
+import argparse
+import bisect
+import glob
+import os
+import re
+import sys
+import time
+import zlib
+from collections import Counter
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:  # без NumPy работает только сводка Misra-Gries
+    np = None
+
+WORD_PATTERNS = {
+    "en": re.compile(r"[a-z]+(?:'[a-z]+)?"),
+    "ru": re.compile(r"[а-яё]+(?:-[а-яё]+)?"),
+}
+DEFAULT_CAPACITY = 200_000
+DEFAULT_CHUNK_LINES = 100_000
+DEFAULT_CMS_BITS = 20
+DEFAULT_CMS_DEPTH = 4
+
+
+class MisraGries:
+    """
+    Сводка Misra-Gries с пакетным слиянием: локальные счетчики куска добавляются,
+    и если счетчиков больше capacity, из всех вычитается (capacity+1)-й по величине.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.counters = Counter()
+        self.total = 0
+
+    def update(self, counts):
+        self.counters.update(counts)
+        self.total += sum(counts.values())
+        if len(self.counters) > self.capacity:
+            threshold = sorted(self.counters.values(), reverse=True)[self.capacity]
+            self.counters = Counter({word: count - threshold
+                                     for word, count in self.counters.items() if count > threshold})
+
+    def candidates(self):
+        return list(self.counters)
+
+
+class CountMinSketch:
+    """Count-Min Sketch на NumPy: depth строк по 2^bits счетчиков uint64"""
+
+    def __init__(self, bits=DEFAULT_CMS_BITS, depth=DEFAULT_CMS_DEPTH):
+        self.mask = (1 << bits) - 1
+        self.depth = depth
+        self.table = np.zeros((depth, 1 << bits), dtype=np.uint64)
+
+    def _columns(self, words):
+        hashes = np.fromiter((zlib.crc32(word.encode("utf-8")) for word in words),
+                             dtype=np.uint64, count=len(words))
+        columns = []
+        for row in range(self.depth):
+            # Разные хеш-функции для строк: h * (2*row + 1) + row * константа
+            mixed = (hashes * np.uint64(2 * row + 1) + np.uint64(row * 0x9E3779B1)) * np.uint64(0x85EBCA6B)
+            columns.append(((mixed >> np.uint64(16)) & np.uint64(self.mask)).astype(np.int64))
+        return columns
+
+    def update(self, counts):
+        words = list(counts)
+        if not words:
+            return
+        values = np.fromiter(counts.values(), dtype=np.uint64, count=len(words))
+        for row, columns in enumerate(self._columns(words)):
+            np.add.at(self.table[row], columns, values)
+
+    def estimate(self, words):
+        if not words:
+            return []
+        estimates = None
+        for row, columns in enumerate(self._columns(words)):
+            values = self.table[row, columns]
+            estimates = values if estimates is None else np.minimum(estimates, values)
+        return estimates.tolist()
+
+
+class WordCounter:
+    """Подсчет частот одного языка: Misra-Gries + (если есть NumPy) Count-Min Sketch"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, cms_bits=DEFAULT_CMS_BITS,
+                 cms_depth=DEFAULT_CMS_DEPTH, use_sketch=True):
+        self.summary = MisraGries(capacity)
+        self.sketch = CountMinSketch(cms_bits, cms_depth) if use_sketch and np is not None else None
+
+    def update(self, counts):
+        self.summary.update(counts)
+        if self.sketch is not None:
+            self.sketch.update(counts)
+
+    def ranked(self, top=None, min_count=1):
+        """[(слово, частота)] по убыванию частоты (при равенстве - по алфавиту)"""
+        words = self.summary.candidates()
+        if self.sketch is not None:
+            counts = self.sketch.estimate(words)
+        else:
+            counts = [self.summary.counters[word] for word in words]
+        ranked = sorted(((word, int(count)) for word, count in zip(words, counts) if count >= min_count),
+                        key=lambda item: (-item[1], item[0]))
+        return ranked[:top] if top else ranked
+
+
+def iter_files(patterns):
+    for pattern in patterns:
+        paths = sorted(glob.glob(pattern)) or [pattern]
+        for path in paths:
+            if os.path.isdir(path):
+                for root, _, names in os.walk(path):
+                    for name in sorted(names):
+                        yield os.path.join(root, name)
+            else:
+                yield path
+
+
+def iter_line_chunks(paths, chunk_lines=DEFAULT_CHUNK_LINES):
+    chunk = []
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                chunk.append(line)
+                if len(chunk) >= chunk_lines:
+                    yield chunk
+                    chunk = []
+    if chunk:
+        yield chunk
+
+
+def count_chunk(lines, min_length=1):
+    """Частоты слов куска строк по языкам: {"en": Counter, "ru": Counter}"""
+    text = "".join(lines).lower()
+    counts = {}
+    for language, pattern in WORD_PATTERNS.items():
+        words = pattern.findall(text)
+        if min_length > 1:
+            words = [word for word in words if len(word) >= min_length]
+        counts[language] = Counter(words)
+    return counts
+
+
+def ingest(paths, capacity=DEFAULT_CAPACITY, chunk_lines=DEFAULT_CHUNK_LINES, min_length=1,
+           cms_bits=DEFAULT_CMS_BITS, cms_depth=DEFAULT_CMS_DEPTH, use_sketch=True, log=print):
+    """Потоковый подсчет по всем файлам, возвращает {язык: WordCounter}"""
+    counters = {language: WordCounter(capacity, cms_bits, cms_depth, use_sketch)
+                for language in WORD_PATTERNS}
+    lines = 0
+    start = time.perf_counter()
+    for chunk in iter_line_chunks(paths, chunk_lines):
+        for language, counts in count_chunk(chunk, min_length).items():
+            counters[language].update(counts)
+        lines += len(chunk)
+        if log:
+            log(f"   строк: {lines:,}, слов en/ru: {counters['en'].summary.total:,}/"
+                f"{counters['ru'].summary.total:,} ({time.perf_counter() - start:.1f} с)")
+    return counters
+
+
+def write_word_counts(ranked, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for word, count in ranked:
+            f.write(f"{word}\t{count}\n")
+
+
+def load_word_counts(path, limit=None):
+    """Читает "слово\\tчастота" (частота необязательна, тогда 1): (слова, частоты)"""
+    words = []
+    counts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            word, _, count = line.partition("\t")
+            words.append(word)
+            counts.append(int(count) if count else 1)
+            if limit is not None and len(words) >= limit:
+                break
+    return words, counts
+
+
+class WordSampler:
+    """
+    Выборка слов с вероятностью, пропорциональной частоте^power
+    (power < 1 сглаживает закон Ципфа).
+    """
+
+    def __init__(self, words, counts, power=1.0):
+        if not words:
+            raise ValueError("Пустой список слов")
+        self.words = list(words)
+        self.weights = [count ** power for count in counts]
+        self.cum_weights = list(accumulate(self.weights))
+
+    @classmethod
+    def from_file(cls, path, limit=None, power=1.0):
+        return cls(*load_word_counts(path, limit=limit), power=power)
+
+    def sample(self, rng, k):
+        """k слов через random.Random (детерминировано для seed)"""
+        return rng.choices(self.words, cum_weights=self.cum_weights, k=k)
+
+    def choice(self, rng):
+        index = bisect.bisect_right(self.cum_weights, rng.random() * self.cum_weights[-1])
+        return self.words[min(index, len(self.words) - 1)]
+
+    def sample_indices(self, generator, k):
+        """k индексов слов через numpy.random.Generator (пакетно)"""
+        cum = np.asarray(self.cum_weights, dtype=np.float64)
+        return np.minimum(np.searchsorted(cum, generator.random(k) * cum[-1], side="right"),
+                          len(cum) - 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Частотные списки слов ru/en из текстовых корпусов")
+    parser.add_argument("inputs", nargs="+", help="текстовые файлы, каталоги или glob-шаблоны")
+    parser.add_argument("--output-dir", default=".", help="каталог для words_en.tsv / words_ru.tsv")
+    parser.add_argument("--top", type=int, default=None, help="сохранить не больше N слов на язык")
+    parser.add_argument("--min-count", type=int, default=2, help="минимальная частота (по умолчанию %(default)s)")
+    parser.add_argument("--min-length", type=int, default=1, help="минимальная длина слова")
+    parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY,
+                        help="счетчиков Misra-Gries на язык (по умолчанию %(default)s)")
+    parser.add_argument("--cms-bits", type=int, default=DEFAULT_CMS_BITS,
+                        help="ширина Count-Min Sketch 2^N (по умолчанию %(default)s)")
+    parser.add_argument("--cms-depth", type=int, default=DEFAULT_CMS_DEPTH,
+                        help="глубина Count-Min Sketch (по умолчанию %(default)s)")
+    parser.add_argument("--no-sketch", action="store_true",
+                        help="частоты из сводки Misra-Gries (оценка снизу) вместо Count-Min Sketch")
+    parser.add_argument("--chunk-lines", type=int, default=DEFAULT_CHUNK_LINES,
+                        help="строк в куске (по умолчанию %(default)s)")
+    args = parser.parse_args(argv)
+
+    paths = list(iter_files(args.inputs))
+    print(f"Файлов: {len(paths)}")
+    counters = ingest(paths, capacity=args.capacity, chunk_lines=args.chunk_lines,
+                      min_length=args.min_length, cms_bits=args.cms_bits,
+                      cms_depth=args.cms_depth, use_sketch=not args.no_sketch)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for language, counter in counters.items():
+        ranked = counter.ranked(top=args.top, min_count=args.min_count)
+        path = os.path.join(args.output_dir, f"words_{language}.tsv")
+        write_word_counts(ranked, path)
+        print(f"✅ {path}: {len(ranked)} слов (всего в корпусе {counter.summary.total:,})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,8 +4,8 @@ struct LanguageConstants {
     static let commonRuBigrams: Set<String> = [
         "пр", "ри", "ив", "ве", "ет", "по", "ка", "то", "на", "не", "ст", "но", "ал", "ни",
         "ра", "го", "ко", "ов", "во", "ли", "ре", "ос", "од", "ва", "де", "ес", "за", "ль",
-        "ль", "ел", "ем", "ен", "ер", "ес", "ет", "еч", "ею", "ея",
-        "ом", "он", "оп", "ор", "ос", "от", "оф", "ох", "оц", "оч", "ош", "ощ", "ою", "оя",
+        "ел", "ем", "ен", "ер", "еч", "ею", "ея",
+        "ом", "он", "оп", "ор", "от", "оф", "ох", "оц", "оч", "ош", "ощ", "ою", "оя",
         "ам", "ан", "ап", "ар", "ас", "ат", "аф", "ах", "ац", "ач", "аш", "ащ", "аю", "ая",
         "др", "ру", "уг", "га"
     ]
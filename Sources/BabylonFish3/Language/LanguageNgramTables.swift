@@ -0,0 +1,415 @@
+import Foundation
+
+// Сгенерировано ML/ngram_tables.py из: expanded_dataset.csv
+// Не редактировать вручную - перегенерировать скриптом.
+
+/// Log-вероятности биграмм и хешированных триграмм букв, посчитанные по данным
+/// (замена множеств LanguageConstants.commonRuBigrams/commonEnBigrams).
+/// Пока не подключено: EnhancedLanguageDetector и EventProcessor используют множества.
+enum LanguageNgramTables {
+    static let trigramBits = 10
+    static let confidenceSharpness = 2.0
+
+    static let ruAlphabet: [Character] = ["а", "б", "в", "г", "д", "е", "ё", "ж", "з", "и", "й", "к", "л", "м", "н", "о", "п", "р", "с", "т", "у", "ф", "х", "ц", "ч", "ш", "щ", "ъ", "ы", "ь", "э", "ю", "я"]
+    static let enAlphabet: [Character] = ["a", "b", "c", "d", "e", "f", "g", "h", "i", "j", "k", "l", "m", "n", "o", "p", "q", "r", "s", "t", "u", "v", "w", "x", "y", "z"]
+
+    private static let ruIndex: [Character: Int] = Dictionary(
+        uniqueKeysWithValues: ruAlphabet.enumerated().map { ($1, $0) })
+    private static let enIndex: [Character: Int] = Dictionary(
+        uniqueKeysWithValues: enAlphabet.enumerated().map { ($1, $0) })
+
+    /// ln P(ab), индекс index(a) * 33 + index(b)
+    static let ruBigramLogProb: [Float] = [
+        -9.9994, -5.4455, -5.7367, -9.9994, -5.6299, -9.9994, -9.9994, -6.7036, -6.1076, -9.9994, -6.1076, -6.1927,
+        -6.1927, -7.2913, -5.3843, -9.9994, -6.7805, -5.8885, -5.0227, -4.3057, -8.0535, -9.9994, -9.9994, -7.6015,
+        -7.8022, -7.2913, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -8.3900, -6.0291, -9.9994, -9.9994,
+        -9.9994, -9.9994, -5.4043, -9.9994, -9.9994, -9.9994, -6.5654, -9.9994, -8.3900, -6.8639, -9.9994, -9.9994,
+        -4.9821, -9.9994, -6.0291, -9.9994, -9.9994, -7.0549, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -8.3900,
+        -9.9994, -5.6556, -9.9994, -9.9994, -9.9994, -6.7805, -5.4043, -9.9994, -9.9994, -9.9994, -9.9994, -4.5657,
+        -8.3900, -9.9994, -9.9994, -5.4885, -9.9994, -8.9008, -8.0535, -9.9994, -8.0535, -5.2036, -8.9008, -7.0549,
+        -7.8022, -7.8022, -9.9994, -9.9994, -9.9994, -8.3900, -9.9994, -9.9994, -9.9994, -9.9994, -4.4819, -6.5029,
+        -9.9994, -9.9994, -9.9994, -5.6299, -9.9994, -9.9994, -8.3900, -8.3900, -8.3900, -9.9994, -9.9994, -9.9994,
+        -6.8639, -9.9994, -9.9994, -6.1927, -9.9994, -9.9994, -4.6475, -9.9994, -6.2382, -9.9994, -9.9994, -6.4440,
+        -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -5.7367, -9.9994, -8.0535, -9.9994, -9.9994, -5.0506, -9.9994, -6.9549, -9.9994, -8.9008, -9.9994, -7.1662,
+        -5.7367, -8.9008, -5.5108, -4.6475, -9.9994, -6.5654, -8.3900, -6.8639, -6.0291, -9.9994, -9.9994, -6.7805,
+        -9.9994, -9.9994, -9.9994, -9.9994, -7.8022, -6.5029, -9.9994, -9.9994, -9.9994, -9.9994, -5.9921, -6.5029,
+        -6.2382, -5.8885, -8.3900, -9.9994, -5.9563, -6.5029, -9.9994, -6.9549, -6.3885, -4.6571, -5.9921, -4.7471,
+        -9.9994, -7.8022, -4.9560, -5.6049, -4.2156, -9.9994, -8.9008, -6.6321, -8.0535, -6.3885, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -8.3900, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -8.3900, -6.7036, -6.8639, -6.7036, -9.9994, -6.7805, -6.1492,
+        -9.9994, -7.8022, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -5.4043, -9.9994, -9.9994, -9.9994, -6.6321, -5.7653, -6.7036, -9.9994, -9.9994,
+        -6.0291, -9.9994, -8.3900, -9.9994, -9.9994, -5.6049, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -6.7805, -9.9994, -6.7805, -6.9549, -6.0676, -6.0291, -9.9994, -8.9008, -9.9994, -8.9008, -9.9994, -6.7805,
+        -6.7036, -9.9994, -5.7367, -7.0549, -9.9994, -7.6015, -9.9994, -9.9994, -6.8639, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -6.7036, -9.9994, -9.9994, -9.9994, -6.7805, -8.0535, -8.3900, -5.3080,
+        -9.9994, -5.2545, -6.7805, -9.9994, -9.9994, -5.9563, -8.9008, -4.8461, -6.4440, -5.7653, -6.3885, -5.2545,
+        -6.5654, -7.4344, -7.8022, -6.1492, -5.5108, -9.9994, -7.8022, -9.9994, -6.3885, -8.9008, -8.0535, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -7.0549, -9.9994, -8.9008, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -8.0535, -8.9008, -8.3900, -9.9994, -8.9008,
+        -7.8022, -9.9994, -9.9994, -8.3900, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -7.8022, -5.0365, -9.9994, -9.9994, -9.9994, -9.9994, -7.2913, -9.9994, -9.9994, -9.9994,
+        -5.0090, -9.9994, -8.9008, -6.2382, -9.9994, -9.9994, -4.8577, -9.9994, -5.2203, -7.1662, -7.2913, -6.8639,
+        -9.9994, -9.9994, -9.9994, -8.9008, -8.9008, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -4.7899, -9.9994, -9.9994, -8.9008, -9.9994, -4.9056, -6.4440, -6.7036, -9.9994, -5.1090, -9.9994, -7.8022,
+        -8.0535, -9.9994, -6.2858, -4.5922, -9.9994, -9.9994, -8.3900, -6.7036, -5.5805, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -4.8577, -4.8934, -9.9994, -6.5029, -6.4440, -5.1711, -8.9008, -8.9008,
+        -9.9994, -9.9994, -5.7089, -6.7805, -9.9994, -9.9994, -7.2913, -9.9994, -9.9994, -6.5654, -7.8022, -5.9219,
+        -4.6862, -8.3900, -9.9994, -8.9008, -9.9994, -8.3900, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -6.5654, -9.9994, -8.3900, -9.9994, -7.0549, -4.8577, -9.9994, -9.9994, -7.8022, -7.6015, -4.9180,
+        -9.9994, -6.7036, -9.9994, -4.9821, -9.9994, -9.9994, -9.9994, -9.9994, -5.7089, -4.2596, -9.9994, -9.9994,
+        -8.0535, -6.3885, -6.5029, -7.6015, -9.9994, -6.4440, -8.3900, -9.9994, -9.9994, -9.9994, -4.2596, -5.2372,
+        -9.9994, -9.9994, -7.6015, -9.9994, -5.8250, -4.6475, -5.1552, -4.7899, -7.4344, -9.9994, -5.6049, -6.7036,
+        -8.3900, -4.9690, -5.5108, -4.2279, -6.3885, -4.8695, -8.3900, -7.1662, -4.2532, -5.2899, -4.7471, -8.0535,
+        -8.0535, -6.0676, -8.3900, -5.4885, -6.4440, -9.9994, -9.9994, -9.9994, -9.9994, -8.9008, -9.9994, -6.7805,
+        -5.5335, -9.9994, -9.9994, -9.9994, -9.9994, -6.6321, -9.9994, -9.9994, -9.9994, -6.1492, -9.9994, -8.9008,
+        -5.5805, -9.9994, -9.9994, -5.2545, -9.9994, -5.8885, -9.9994, -7.4344, -8.0535, -9.9994, -8.0535, -9.9994,
+        -9.9994, -8.3900, -9.9994, -9.9994, -6.7805, -8.3900, -9.9994, -9.9994, -9.9994, -4.4739, -9.9994, -8.0535,
+        -7.6015, -6.7805, -5.5805, -9.9994, -9.9994, -9.9994, -5.9921, -9.9994, -6.3358, -9.9994, -7.6015, -6.5654,
+        -4.2405, -9.9994, -9.9994, -8.0535, -6.4440, -5.3843, -8.0535, -7.8022, -8.3900, -8.3900, -9.9994, -9.9994,
+        -9.9994, -4.9431, -8.3900, -8.3900, -9.9994, -6.0676, -7.1662, -9.9994, -5.6556, -9.9994, -9.9994, -5.7089,
+        -9.9994, -9.9994, -9.9994, -4.9690, -9.9994, -5.9563, -5.4247, -6.5654, -5.8250, -5.3843, -6.6321, -8.9008,
+        -6.7036, -4.3973, -6.3885, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -6.5029,
+        -8.3900, -9.9994, -8.9008, -5.2203, -7.6015, -6.5654, -9.9994, -9.9994, -4.7683, -6.1492, -9.9994, -9.9994,
+        -5.8563, -9.9994, -6.1076, -6.5654, -8.0535, -9.9994, -4.7264, -9.9994, -5.3266, -9.9994, -9.9994, -6.0291,
+        -9.9994, -8.3900, -8.3900, -8.9008, -9.9994, -9.9994, -9.9994, -5.4247, -3.5778, -9.9994, -8.3900, -8.3900,
+        -8.3900, -5.9563, -8.0535, -6.8639, -8.9008, -9.9994, -9.9994, -6.6321, -8.3900, -9.9994, -8.0535, -5.8250,
+        -9.9994, -5.9921, -6.4440, -9.9994, -6.6321, -6.2382, -5.6299, -6.1927, -9.9994, -8.3900, -5.9219, -9.9994,
+        -6.5654, -6.5654, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -8.3900, -9.9994, -9.9994,
+        -9.9994, -9.9994, -7.8022, -9.9994, -9.9994, -9.9994, -6.6321, -9.9994, -9.9994, -8.3900, -9.9994, -9.9994,
+        -7.2913, -9.9994, -8.9008, -9.9994, -7.8022, -8.0535, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -6.4440, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -8.0535, -9.9994, -9.9994, -6.5029, -9.9994, -8.0535, -4.7683, -8.3900, -6.7805,
+        -9.9994, -7.8022, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -7.2913, -9.9994, -9.9994, -9.9994, -9.9994, -6.0291, -9.9994, -9.9994, -9.9994,
+        -6.9549, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -6.7036, -9.9994, -9.9994, -8.3900, -9.9994, -9.9994,
+        -9.9994, -9.9994, -8.3900, -9.9994, -9.9994, -9.9994, -9.9994, -7.8022, -9.9994, -9.9994, -9.9994, -9.9994,
+        -6.5029, -9.9994, -9.9994, -9.9994, -9.9994, -5.6049, -6.8639, -9.9994, -9.9994, -6.0676, -9.9994, -9.9994,
+        -9.9994, -9.9994, -7.8022, -9.9994, -9.9994, -9.9994, -9.9994, -6.4440, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -5.5567, -9.9994, -9.9994, -9.9994, -5.8885, -9.9994, -9.9994,
+        -9.9994, -9.9994, -8.3900, -9.9994, -9.9994, -9.9994, -7.2913, -9.9994, -8.0535, -8.3900, -9.9994, -8.3900,
+        -6.0676, -8.3900, -9.9994, -9.9994, -8.0535, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -8.0535, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -8.3900,
+        -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -8.3900, -8.9008, -9.9994, -9.9994, -8.3900, -9.9994, -8.3900, -9.9994, -9.9994, -3.2206, -6.7036,
+        -9.9994, -8.3900, -8.3900, -9.9994, -9.9994, -9.9994, -6.1492, -6.0676, -9.9994, -9.9994, -7.8022, -9.9994,
+        -8.9008, -6.7036, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -8.3900, -9.9994,
+        -9.9994, -8.3900, -7.8022, -9.9994, -9.9994, -6.5029, -9.9994, -9.9994, -6.7805, -9.9994, -8.3900, -5.9563,
+        -9.9994, -8.3900, -9.9994, -7.8022, -8.3900, -9.9994, -8.3900, -9.9994, -9.9994, -9.9994, -6.8639, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -8.0535, -8.3900, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -8.3900, -7.8022, -8.0535, -9.9994, -9.9994, -8.3900, -9.9994,
+        -9.9994, -6.5029, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -6.7805, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -8.3900,
+        -9.9994, -9.9994, -9.9994, -8.3900, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -7.4344, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+        -9.9994, -8.9008, -9.9994, -8.3900, -8.9008, -9.9994, -9.9994, -9.9994, -6.0676, -9.9994, -9.9994, -9.9994,
+        -9.9994, -9.9994, -9.9994, -9.9994, -8.3900, -6.7805, -9.9994, -6.7805, -9.9994, -9.9994, -8.3900, -9.9994,
+        -6.8639, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994, -9.9994,
+    ]
+
+    /// ln P(ab), индекс index(a) * 26 + index(b)
+    static let enBigramLogProb: [Float] = [
+        -9.7969, -5.7896, -5.0520, -5.7896, -9.7969, -6.4296, -8.1875, -9.7969, -6.2416, -9.7969, -5.5064, -4.9371,
+        -5.1818, -4.3204, -9.7969, -6.9637, -9.7969, -4.3288, -5.1056, -4.5342, -6.3629, -5.9051, -6.5780, -8.6983,
+        -5.2860, -8.1875, -5.2860, -8.1875, -9.7969, -9.7969, -5.0178, -9.7969, -9.7969, -9.7969, -6.3629, -9.7969,
+        -9.7969, -5.5064, -9.7969, -9.7969, -5.3310, -9.7969, -9.7969, -7.8510, -9.7969, -9.7969, -5.6860, -9.7969,
+        -8.6983, -9.7969, -6.5011, -9.7969, -4.8916, -9.7969, -7.5997, -9.7969, -5.0520, -9.7969, -9.7969, -5.0011,
+        -6.5011, -9.7969, -5.5628, -7.3990, -9.7969, -9.7969, -4.8916, -9.7969, -9.7969, -8.1875, -8.6983, -7.8510,
+        -7.3990, -9.7969, -9.7969, -9.7969, -7.5997, -9.7969, -5.9902, -9.7969, -9.7969, -8.6983, -5.4531, -9.7969,
+        -9.7969, -9.7969, -6.5011, -9.7969, -9.7969, -8.6983, -8.1875, -8.6983, -5.7896, -9.7969, -9.7969, -7.8510,
+        -9.7969, -9.7969, -6.5011, -9.7969, -8.6983, -9.7969, -6.4296, -9.7969, -4.3038, -7.5997, -6.2416, -5.9902,
+        -4.9371, -7.8510, -9.7969, -9.7969, -6.5011, -9.7969, -9.7969, -4.8916, -5.1818, -4.4170, -6.6614, -8.1875,
+        -9.7969, -3.7543, -4.7930, -5.7194, -8.6983, -5.5922, -5.5342, -6.5011, -6.4296, -8.6983, -5.9051, -9.7969,
+        -9.7969, -9.7969, -5.2643, -5.9051, -9.7969, -9.7969, -5.0178, -9.7969, -9.7969, -8.6983, -9.7969, -9.7969,
+        -5.3310, -9.7969, -9.7969, -5.9468, -9.7969, -6.3629, -8.1875, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969,
+        -6.5780, -9.7969, -9.7969, -9.7969, -5.4025, -9.7969, -8.6983, -5.6538, -5.5342, -9.7969, -9.7969, -8.6983,
+        -9.7969, -9.7969, -5.0695, -9.7969, -9.7969, -6.5011, -8.6983, -9.7969, -6.5011, -9.7969, -9.7969, -9.7969,
+        -8.6983, -9.7969, -4.8202, -9.7969, -9.7969, -9.7969, -3.6592, -9.7969, -9.7969, -9.7969, -4.4936, -9.7969,
+        -9.7969, -9.7969, -8.6983, -9.7969, -4.9066, -8.6983, -9.7969, -9.7969, -9.7969, -6.1333, -8.1875, -9.7969,
+        -9.7969, -9.7969, -8.6983, -9.7969, -8.6983, -9.7969, -5.0874, -5.3083, -6.4296, -5.4794, -5.3543, -9.7969,
+        -9.7969, -9.7969, -6.6614, -6.1860, -5.5342, -3.9948, -5.7194, -7.5997, -9.7969, -5.0347, -5.0695, -4.7407,
+        -9.7969, -6.0357, -8.6983, -8.6983, -9.7969, -8.6983, -7.3990, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969,
+        -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969,
+        -8.6983, -9.7969, -6.5011, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -8.6983, -9.7969,
+        -5.1056, -9.7969, -9.7969, -9.7969, -5.8266, -9.7969, -9.7969, -9.7969, -9.7969, -5.8266, -9.7969, -9.7969,
+        -9.7969, -9.7969, -8.6983, -9.7969, -8.6983, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -5.5064, -9.7969,
+        -8.6983, -5.2860, -4.7032, -8.1875, -8.6983, -9.7969, -4.9371, -9.7969, -8.6983, -4.7665, -9.7969, -9.7969,
+        -5.3781, -6.7524, -9.7969, -9.7969, -6.8525, -5.8651, -7.8510, -9.7969, -9.7969, -9.7969, -5.8651, -9.7969,
+        -5.0874, -5.9051, -9.7969, -9.7969, -4.3204, -9.7969, -9.7969, -9.7969, -6.0357, -9.7969, -9.7969, -8.1875,
+        -6.4296, -9.7969, -5.3781, -6.5011, -9.7969, -9.7969, -9.7969, -9.7969, -6.5780, -9.7969, -9.7969, -9.7969,
+        -6.5780, -9.7969, -6.4296, -9.7969, -7.0889, -4.8341, -4.5342, -6.3629, -4.9847, -9.7969, -5.5628, -9.7969,
+        -6.0357, -6.4296, -9.7969, -8.1875, -4.9066, -8.1875, -9.7969, -9.7969, -7.8510, -4.5658, -5.9468, -9.7969,
+        -9.7969, -9.7969, -6.5011, -9.7969, -7.5997, -6.4296, -6.7524, -5.2643, -8.6983, -5.9051, -7.5997, -9.7969,
+        -8.6983, -9.7969, -6.0357, -5.9902, -4.8341, -4.3987, -4.8624, -6.2416, -9.7969, -4.1032, -6.1860, -5.0011,
+        -4.1801, -6.5780, -4.7930, -8.6983, -6.5780, -9.7969, -5.7194, -9.7969, -9.7969, -9.7969, -5.7194, -9.7969,
+        -9.7969, -7.8510, -7.2320, -9.7969, -9.7969, -6.4296, -9.7969, -9.7969, -5.8266, -7.8510, -9.7969, -5.8651,
+        -9.7969, -7.5997, -6.4296, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969,
+        -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969,
+        -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -6.8525, -9.7969,
+        -5.9051, -6.3004, -4.4546, -8.6983, -6.5011, -9.7969, -5.7194, -9.7969, -5.9902, -5.5342, -6.2416, -6.3629,
+        -5.5628, -9.7969, -9.7969, -7.2320, -5.2860, -5.5342, -7.2320, -6.5780, -9.7969, -9.7969, -5.7194, -9.7969,
+        -5.7194, -9.7969, -7.8510, -9.7969, -4.1374, -9.7969, -9.7969, -6.1860, -5.4275, -9.7969, -6.4296, -9.7969,
+        -6.5780, -8.6983, -5.0178, -8.1875, -9.7969, -9.7969, -5.5342, -4.8065, -5.7896, -9.7969, -7.8510, -9.7969,
+        -8.1875, -9.7969, -5.6860, -8.1875, -9.7969, -9.7969, -4.7930, -9.7969, -9.7969, -3.7170, -5.4025, -9.7969,
+        -9.7969, -6.6614, -8.6983, -9.7969, -5.3543, -9.7969, -9.7969, -6.0833, -6.3004, -6.5011, -7.8510, -9.7969,
+        -6.3629, -9.7969, -5.5342, -9.7969, -8.6983, -6.3629, -6.2416, -8.1875, -6.5780, -9.7969, -7.3990, -9.7969,
+        -8.1875, -9.7969, -9.7969, -5.5342, -6.5011, -5.6225, -9.7969, -6.5780, -9.7969, -5.4794, -4.4546, -5.0178,
+        -9.7969, -9.7969, -9.7969, -8.6983, -6.5780, -9.7969, -7.3990, -9.7969, -9.7969, -9.7969, -4.6436, -9.7969,
+        -9.7969, -9.7969, -6.5780, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -8.6983, -9.7969, -9.7969, -9.7969,
+        -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -5.1429, -9.7969, -9.7969, -9.7969,
+        -5.4275, -9.7969, -9.7969, -5.0178, -5.7539, -9.7969, -9.7969, -9.7969, -9.7969, -6.5780, -4.8769, -9.7969,
+        -9.7969, -9.7969, -8.6983, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -8.6983, -9.7969, -9.7969, -9.7969,
+        -8.6983, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -8.6983, -9.7969, -9.7969, -9.7969, -8.6983, -9.7969,
+        -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -6.5780, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969,
+        -8.1875, -7.8510, -8.1875, -9.7969, -6.5011, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -8.6983,
+        -9.7969, -9.7969, -5.4531, -8.6983, -9.7969, -9.7969, -8.6983, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969,
+        -9.7969, -9.7969, -8.6983, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969,
+        -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969, -9.7969,
+        -9.7969, -9.7969, -8.1875, -8.1875,
+    ]
+
+    /// ln P(корзина триграммы), корзина - trigramBucket
+    static let ruTrigramLogProb: [Float] = [
+        -9.7570, -7.5597, -8.1475, -6.3897, -6.0934, -9.7570, -9.7570, -6.3230, -8.1475, -6.5381, -6.4611, -9.7570,
+        -7.5597, -9.7570, -7.8110, -8.1475, -7.5597, -7.5597, -9.7570, -8.1475, -9.7570, -9.7570, -5.5826, -6.6215,
+        -5.7496, -7.5597, -9.7570, -5.7139, -6.1460, -6.4611, -9.7570, -5.7139, -9.7570, -8.1475, -9.7570, -9.7570,
+        -8.1475, -7.8110, -8.1475, -9.7570, -5.8251, -4.9128, -8.1475, -8.1475, -6.3230, -8.1475, -9.7570, -9.7570,
+        -8.1475, -9.7570, -6.2605, -6.3230, -8.1475, -9.7570, -8.6583, -5.8251, -9.7570, -6.4611, -8.1475, -9.7570,
+        -9.7570, -7.8110, -9.7570, -8.1475, -9.7570, -5.6138, -9.7570, -6.3897, -6.1460, -6.2605, -8.1475, -5.6138,
+        -7.8110, -9.7570, -6.4611, -7.8110, -6.4611, -8.6583, -6.3230, -8.1475, -9.7570, -9.7570, -6.9237, -5.3143,
+        -6.4611, -7.8110, -7.8110, -6.3897, -6.3897, -6.1460, -8.6583, -8.1475, -9.7570, -9.7570, -5.7139, -7.8110,
+        -8.1475, -8.1475, -6.5381, -7.3591, -9.7570, -9.7570, -5.2910, -7.8110, -7.5597, -9.7570, -9.7570, -7.8110,
+        -7.5597, -9.7570, -9.7570, -8.1475, -8.1475, -8.1475, -8.6583, -8.6583, -7.0489, -9.7570, -7.5597, -9.7570,
+        -6.5381, -7.8110, -8.1475, -6.2016, -6.5381, -5.7496, -7.0489, -9.7570, -5.7867, -7.5597, -7.8110, -8.6583,
+        -6.1460, -9.7570, -7.8110, -9.7570, -5.8651, -8.6583, -8.6583, -6.4611, -6.3230, -6.3897, -8.1475, -9.7570,
+        -9.7570, -7.5597, -7.8110, -6.3897, -9.7570, -9.7570, -6.4611, -9.7570, -9.7570, -6.3897, -9.7570, -8.1475,
+        -8.6583, -9.7570, -9.7570, -6.5381, -9.7570, -9.7570, -6.4611, -8.1475, -6.2016, -9.7570, -7.5597, -9.7570,
+        -9.7570, -6.6215, -8.1475, -5.4132, -7.0489, -5.9503, -6.3230, -5.3381, -9.7570, -9.7570, -9.7570, -5.2031,
+        -9.7570, -5.3875, -9.7570, -5.4665, -9.7570, -6.4611, -7.1920, -9.7570, -9.7570, -9.7570, -9.7570, -6.5381,
+        -9.7570, -8.6583, -6.5381, -7.3591, -9.7570, -9.7570, -9.7570, -9.7570, -8.6583, -6.1460, -8.6583, -5.8251,
+        -6.4611, -9.7570, -9.7570, -6.6215, -9.7570, -9.7570, -9.7570, -9.7570, -8.1475, -9.7570, -9.7570, -6.3230,
+        -9.7570, -9.7570, -7.8110, -8.1475, -7.1920, -5.5523, -8.1475, -6.0434, -7.5597, -8.1475, -9.7570, -6.5381,
+        -5.7139, -6.6215, -8.1475, -7.8110, -9.7570, -6.2605, -9.7570, -6.4611, -6.3897, -7.5597, -6.5381, -6.8125,
+        -7.1920, -9.7570, -5.9958, -6.4611, -7.8110, -7.8110, -7.1920, -9.7570, -6.6215, -8.6583, -9.7570, -8.1475,
+        -9.7570, -9.7570, -6.3230, -6.3897, -7.5597, -6.2016, -5.4395, -9.7570, -9.7570, -8.1475, -9.7570, -6.5381,
+        -4.8971, -6.6215, -9.7570, -6.7124, -8.6583, -8.6583, -5.7867, -9.7570, -8.6583, -6.7124, -7.8110, -6.6215,
+        -7.5597, -6.3230, -9.7570, -5.7139, -9.7570, -7.1920, -7.8110, -7.0489, -9.7570, -9.7570, -8.1475, -9.7570,
+        -6.3230, -6.3230, -8.1475, -9.7570, -9.7570, -9.7570, -6.6215, -9.7570, -7.5597, -5.0474, -6.7124, -9.7570,
+        -8.1475, -9.7570, -6.4611, -6.5381, -9.7570, -7.8110, -8.1475, -7.8110, -5.9503, -9.7570, -8.1475, -9.7570,
+        -9.7570, -6.4611, -6.2605, -7.0489, -7.8110, -9.7570, -9.7570, -5.4132, -8.6583, -5.6461, -8.1475, -5.8651,
+        -6.2016, -9.7570, -9.7570, -5.7139, -6.2605, -8.6583, -6.7124, -8.6583, -6.3230, -7.8110, -7.8110, -7.8110,
+        -6.6215, -8.1475, -7.5597, -9.7570, -7.3591, -6.6215, -9.7570, -6.9237, -9.7570, -7.5597, -7.8110, -6.0934,
+        -8.1475, -7.0489, -8.1475, -8.1475, -9.7570, -5.4132, -6.3897, -8.6583, -8.1475, -9.7570, -7.8110, -9.7570,
+        -9.7570, -9.7570, -5.1030, -8.1475, -9.7570, -6.7124, -9.7570, -8.1475, -7.3591, -6.3230, -5.0474, -9.7570,
+        -6.4611, -5.7867, -9.7570, -4.7530, -7.8110, -8.6583, -6.3230, -7.8110, -8.1475, -7.5597, -6.2605, -4.9128,
+        -8.1475, -8.1475, -8.1475, -4.8818, -9.7570, -6.2605, -6.3230, -9.7570, -8.1475, -9.7570, -8.6583, -8.1475,
+        -6.2605, -9.7570, -8.1475, -8.1475, -9.7570, -9.7570, -8.6583, -9.7570, -9.7570, -9.7570, -8.1475, -9.7570,
+        -6.2016, -9.7570, -6.6215, -9.7570, -8.6583, -6.4611, -9.7570, -9.7570, -8.6583, -8.1475, -9.7570, -7.8110,
+        -9.7570, -9.7570, -7.5597, -6.3230, -5.9068, -4.3771, -9.7570, -5.4132, -9.7570, -7.5597, -9.7570, -8.1475,
+        -5.6461, -8.6583, -9.7570, -7.8110, -9.7570, -8.6583, -9.7570, -8.6583, -6.9237, -7.5597, -9.7570, -5.6794,
+        -9.7570, -8.1475, -8.6583, -9.7570, -9.7570, -7.5597, -8.1475, -6.0434, -5.5826, -9.7570, -9.7570, -9.7570,
+        -9.7570, -6.9237, -9.7570, -6.2605, -5.9068, -9.7570, -8.1475, -5.5229, -9.7570, -4.2974, -9.7570, -5.7139,
+        -8.6583, -8.1475, -8.1475, -5.7139, -9.7570, -6.2016, -7.5597, -6.4611, -6.7124, -6.4611, -8.1475, -9.7570,
+        -5.4665, -7.3591, -6.3897, -8.1475, -9.7570, -9.7570, -7.0489, -9.7570, -6.4611, -8.1475, -9.7570, -9.7570,
+        -6.2605, -8.6583, -9.7570, -6.4611, -8.6583, -9.7570, -9.7570, -7.5597, -9.7570, -6.4611, -9.7570, -6.3230,
+        -9.7570, -9.7570, -9.7570, -9.7570, -8.1475, -8.1475, -7.5597, -6.3230, -5.6461, -8.1475, -7.1920, -6.6215,
+        -4.0700, -7.5597, -9.7570, -7.3591, -8.1475, -5.0120, -6.1460, -9.7570, -7.5597, -4.7941, -5.8251, -6.0434,
+        -5.7139, -9.7570, -5.9503, -6.3897, -7.8110, -9.7570, -8.1475, -9.7570, -6.4611, -9.7570, -9.7570, -7.8110,
+        -8.1475, -5.3381, -9.7570, -6.3230, -6.4611, -6.2605, -7.1920, -9.7570, -9.7570, -9.7570, -5.4665, -9.7570,
+        -5.8651, -6.5381, -8.1475, -8.1475, -6.3897, -5.9958, -6.4611, -9.7570, -9.7570, -9.7570, -8.1475, -6.5381,
+        -9.7570, -7.1920, -8.1475, -8.6583, -9.7570, -8.6583, -9.7570, -9.7570, -6.7124, -5.9958, -6.4611, -8.1475,
+        -8.1475, -7.8110, -6.3230, -9.7570, -7.3591, -5.8651, -7.5597, -9.7570, -9.7570, -9.7570, -9.7570, -6.4611,
+        -9.7570, -8.6583, -9.7570, -9.7570, -9.7570, -7.3591, -9.7570, -8.6583, -9.7570, -8.6583, -9.7570, -9.7570,
+        -8.1475, -8.6583, -8.1475, -9.7570, -9.7570, -8.1475, -9.7570, -6.0434, -8.6583, -7.0489, -9.7570, -8.6583,
+        -6.2016, -7.1920, -5.7496, -9.7570, -8.1475, -8.1475, -9.7570, -8.1475, -8.1475, -9.7570, -6.6215, -8.6583,
+        -9.7570, -7.3591, -7.5597, -8.1475, -7.5597, -6.0934, -9.7570, -5.9503, -9.7570, -7.5597, -9.7570, -6.8125,
+        -9.7570, -7.1920, -9.7570, -5.4943, -9.7570, -9.7570, -8.1475, -9.7570, -9.7570, -9.7570, -9.7570, -7.3591,
+        -6.0434, -6.6215, -7.5597, -9.7570, -6.3230, -9.7570, -6.4611, -5.1030, -8.6583, -8.6583, -8.6583, -9.7570,
+        -9.7570, -8.1475, -9.7570, -7.5597, -6.3897, -8.6583, -7.3591, -9.7570, -9.7570, -8.1475, -8.1475, -7.8110,
+        -5.1222, -6.3897, -8.1475, -9.7570, -9.7570, -6.6215, -6.4611, -9.7570, -8.1475, -6.5381, -9.7570, -6.2016,
+        -9.7570, -9.7570, -9.7570, -7.5597, -7.5597, -7.8110, -5.4943, -7.8110, -9.7570, -9.7570, -6.5381, -9.7570,
+        -6.2605, -8.1475, -6.0934, -5.3143, -7.1920, -8.6583, -9.7570, -5.2910, -6.3230, -6.6215, -8.1475, -9.7570,
+        -8.6583, -6.3230, -6.6215, -9.7570, -6.2605, -9.7570, -7.0489, -5.5229, -8.1475, -9.7570, -6.5381, -8.1475,
+        -8.6583, -4.3059, -9.7570, -9.7570, -9.7570, -6.5381, -9.7570, -8.1475, -9.7570, -6.8125, -8.1475, -8.1475,
+        -6.4611, -8.6583, -7.5597, -6.4611, -9.7570, -8.1475, -7.1920, -9.7570, -6.3230, -8.1475, -8.1475, -8.1475,
+        -9.7570, -7.8110, -8.6583, -6.5381, -6.5381, -9.7570, -5.3381, -9.7570, -9.7570, -7.3591, -7.1920, -6.4611,
+        -5.1618, -7.5597, -7.8110, -9.7570, -6.6215, -6.2605, -6.3230, -6.6215, -8.1475, -9.7570, -8.1475, -9.7570,
+        -9.7570, -6.5381, -7.0489, -9.7570, -6.3230, -9.7570, -8.1475, -7.5597, -8.6583, -5.8651, -7.1920, -6.5381,
+        -9.7570, -8.6583, -5.2461, -5.0841, -7.8110, -6.3230, -9.7570, -9.7570, -9.7570, -8.1475, -8.6583, -9.7570,
+        -6.9237, -6.3897, -5.9958, -9.7570, -6.2605, -5.5826, -6.3230, -5.9958, -9.7570, -8.1475, -6.3230, -9.7570,
+        -9.7570, -9.7570, -7.8110, -5.9503, -7.5597, -9.7570, -8.6583, -8.6583, -9.7570, -7.3591, -7.3591, -6.1460,
+        -7.0489, -6.5381, -7.5597, -6.1460, -8.1475, -6.5381, -7.8110, -5.0841, -8.1475, -8.1475, -6.2605, -6.4611,
+        -9.7570, -9.7570, -8.6583, -9.7570, -9.7570, -7.5597, -9.7570, -7.5597, -8.6583, -7.8110, -9.7570, -7.5597,
+        -9.7570, -9.7570, -8.6583, -9.7570, -9.7570, -7.8110, -8.1475, -6.3230, -6.6215, -6.8125, -7.8110, -5.7139,
+        -9.7570, -6.7124, -5.5229, -9.7570, -7.0489, -9.7570, -9.7570, -7.8110, -9.7570, -6.3897, -7.3591, -9.7570,
+        -7.3591, -7.8110, -6.2605, -7.3591, -9.7570, -7.8110, -8.1475, -5.6461, -8.6583, -6.4611, -7.8110, -6.3230,
+        -7.8110, -6.0934, -9.7570, -7.8110, -8.6583, -7.8110, -9.7570, -9.7570, -4.6632, -5.3625, -9.7570, -6.3897,
+        -8.1475, -9.7570, -8.1475, -6.3897, -5.6794, -8.1475, -8.1475, -6.2016, -6.3897, -6.3230, -9.7570, -7.3591,
+        -9.7570, -8.6583, -8.1475, -6.5381, -7.3591, -6.3230, -8.1475, -7.3591, -9.7570, -9.7570, -7.3591, -6.2605,
+        -4.4146, -9.7570, -5.4132, -5.9068, -9.7570, -9.7570, -9.7570, -6.3230, -6.9237, -7.3591, -8.1475, -6.5381,
+        -5.5523, -6.4611, -8.1475, -7.8110, -6.2605, -9.7570, -8.1475, -9.7570, -8.1475, -7.8110, -9.7570, -8.6583,
+        -9.7570, -9.7570, -7.8110, -7.3591, -8.1475, -5.5523, -9.7570, -6.4611, -6.2605, -6.4611, -7.8110, -6.3897,
+        -6.4611, -8.1475, -8.1475, -8.6583, -9.7570, -6.2605, -7.0489, -6.7124, -6.2016, -8.1475, -9.7570, -6.5381,
+        -6.2605, -9.7570, -9.7570, -5.4132, -8.1475, -9.7570, -9.7570, -9.7570, -7.3591, -6.1460, -8.6583, -9.7570,
+        -7.1920, -6.6215, -9.7570, -6.3230, -6.7124, -5.6138, -9.7570, -9.7570, -9.7570, -6.5381, -7.8110, -8.1475,
+        -9.7570, -9.7570, -8.1475, -7.5597, -9.7570, -5.8651, -8.6583, -6.4611, -7.0489, -7.5597, -6.5381, -7.0489,
+        -9.7570, -8.6583, -9.7570, -7.5597, -6.0434, -9.7570, -6.3230, -5.6138, -9.7570, -7.3591, -9.7570, -9.7570,
+        -6.3230, -9.7570, -7.5597, -7.8110, -6.4611, -8.1475, -6.3897, -9.7570, -8.1475, -7.5597, -6.5381, -5.7867,
+        -8.6583, -7.5597, -7.8110, -9.7570,
+    ]
+
+    static let enTrigramLogProb: [Float] = [
+        -6.2574, -9.4762, -7.2790, -9.4762, -8.3776, -7.8668, -9.4762, -7.8668, -6.1804, -9.4762, -8.3776, -5.4332,
+        -6.1089, -8.3776, -6.1804, -6.1089, -9.4762, -9.4762, -6.1804, -9.4762, -9.4762, -9.4762, -9.4762, -9.4762,
+        -6.3407, -7.2790, -8.3776, -9.4762, -9.4762, -6.2574, -9.4762, -9.4762, -9.4762, -8.3776, -7.5303, -9.4762,
+        -6.0422, -9.4762, -8.3776, -9.4762, -8.3776, -7.5303, -9.4762, -8.3776, -9.4762, -8.3776, -7.2790, -7.5303,
+        -9.4762, -9.4762, -7.5303, -7.5303, -6.2574, -9.4762, -5.9209, -8.3776, -8.3776, -7.8668, -8.3776, -9.4762,
+        -8.3776, -9.4762, -9.4762, -9.4762, -9.4762, -9.4762, -9.4762, -9.4762, -5.5444, -7.5303, -5.1858, -9.4762,
+        -9.4762, -6.3407, -7.5303, -9.4762, -9.4762, -8.3776, -9.4762, -9.4762, -9.4762, -9.4762, -6.1804, -8.3776,
+        -9.4762, -9.4762, -9.4762, -8.3776, -8.3776, -5.7150, -5.9797, -8.3776, -6.2574, -6.3407, -5.5444, -9.4762,
+        -8.3776, -9.4762, -9.4762, -7.8668, -6.1804, -9.4762, -8.3776, -7.8668, -6.2574, -5.3331, -9.4762, -9.4762,
+        -9.4762, -5.1858, -8.3776, -7.5303, -9.4762, -9.4762, -8.3776, -9.4762, -9.4762, -7.8668, -9.4762, -9.4762,
+        -5.5444, -8.3776, -6.2574, -9.4762, -9.4762, -5.6696, -5.5844, -6.1089, -9.4762, -8.3776, -5.6261, -6.1089,
+        -9.4762, -9.4762, -9.4762, -9.4762, -9.4762, -7.8668, -9.4762, -6.3407, -7.8668, -8.3776, -8.3776, -9.4762,
+        -5.5844, -7.5303, -9.4762, -5.7150, -6.2574, -9.4762, -9.4762, -9.4762, -6.3407, -6.1089, -9.4762, -9.4762,
+        -9.4762, -5.1858, -6.1804, -9.4762, -8.3776, -6.1089, -5.9797, -9.4762, -6.1804, -8.3776, -7.2790, -6.1804,
+        -9.4762, -9.4762, -8.3776, -9.4762, -8.3776, -8.3776, -9.4762, -5.9209, -9.4762, -7.8668, -9.4762, -6.1804,
+        -9.4762, -9.4762, -5.5444, -7.8668, -8.3776, -9.4762, -9.4762, -9.4762, -9.4762, -9.4762, -9.4762, -9.4762,
+        -7.5303, -8.3776, -9.4762, -8.3776, -6.1089, -8.3776, -9.4762, -9.4762, -8.3776, -9.4762, -9.4762, -9.4762,
+        -6.1804, -9.4762, -6.3407, -9.4762, -6.1089, -5.4332, -6.3407, -9.4762, -8.3776, -9.4762, -9.4762, -9.4762,
+        -9.4762, -5.0574, -7.2790, -7.0783, -9.4762, -8.3776, -6.1089, -9.4762, -8.3776, -6.2574, -6.1804, -6.2574,
+        -9.4762, -8.3776, -5.5059, -9.4762, -7.5303, -9.4762, -9.4762, -6.4317, -8.3776, -9.4762, -8.3776, -7.5303,
+        -8.3776, -8.3776, -9.4762, -6.1804, -6.3407, -8.3776, -9.4762, -9.4762, -6.4317, -9.4762, -5.1858, -9.4762,
+        -9.4762, -6.1089, -4.9015, -5.7627, -8.3776, -9.4762, -4.9436, -5.5844, -7.8668, -9.4762, -9.4762, -9.4762,
+        -6.1089, -9.4762, -8.3776, -5.1587, -8.3776, -5.6696, -7.2790, -9.4762, -9.4762, -6.3407, -6.1089, -6.1804,
+        -9.4762, -9.4762, -9.4762, -8.3776, -7.2790, -6.1089, -9.4762, -8.3776, -9.4762, -9.4762, -9.4762, -8.3776,
+        -6.1804, -7.8668, -8.3776, -9.4762, -8.3776, -8.3776, -9.4762, -6.3407, -8.3776, -6.5318, -9.4762, -8.3776,
+        -9.4762, -6.0422, -9.4762, -9.4762, -9.4762, -9.4762, -8.3776, -8.3776, -9.4762, -9.4762, -8.3776, -7.5303,
+        -7.5303, -9.4762, -5.5059, -8.3776, -8.3776, -8.3776, -5.5844, -8.3776, -8.3776, -8.3776, -9.4762, -5.2715,
+        -7.5303, -8.3776, -8.3776, -5.5844, -7.8668, -9.4762, -7.8668, -6.0422, -4.8223, -9.4762, -9.4762, -9.4762,
+        -6.4317, -7.8668, -8.3776, -9.4762, -9.4762, -9.4762, -7.8668, -8.3776, -9.4762, -8.3776, -7.8668, -5.7150,
+        -7.5303, -6.4317, -7.5303, -6.2574, -8.3776, -9.4762, -5.5059, -9.4762, -5.3987, -9.4762, -7.8668, -9.4762,
+        -6.3407, -9.4762, -7.8668, -6.5318, -9.4762, -8.3776, -4.9654, -8.3776, -4.5859, -9.4762, -6.3407, -9.4762,
+        -7.2790, -7.5303, -6.0422, -9.4762, -9.4762, -9.4762, -9.4762, -7.0783, -9.4762, -5.5444, -6.3407, -9.4762,
+        -6.1089, -9.4762, -8.3776, -9.4762, -8.3776, -9.4762, -7.2790, -6.1804, -8.3776, -9.4762, -7.2790, -9.4762,
+        -9.4762, -9.4762, -8.3776, -5.1858, -9.4762, -9.4762, -6.1804, -5.0574, -9.4762, -7.5303, -9.4762, -7.5303,
+        -8.3776, -9.4762, -9.4762, -8.3776, -8.3776, -6.3407, -9.4762, -7.5303, -9.4762, -6.9113, -9.4762, -5.2136,
+        -8.3776, -6.4317, -7.8668, -9.4762, -5.0336, -6.2574, -8.3776, -8.3776, -8.3776, -9.4762, -5.1324, -6.2574,
+        -9.4762, -9.4762, -8.3776, -9.4762, -9.4762, -6.1089, -9.4762, -8.3776, -9.4762, -6.0422, -6.1804, -5.6261,
+        -8.3776, -7.5303, -9.4762, -9.4762, -5.5844, -9.4762, -6.2574, -5.7150, -9.4762, -9.4762, -8.3776, -9.4762,
+        -8.3776, -9.4762, -6.0422, -5.5844, -5.6696, -9.4762, -8.3776, -5.9797, -5.2715, -6.3407, -9.4762, -6.1804,
+        -9.4762, -6.4317, -9.4762, -9.4762, -9.4762, -6.3407, -7.5303, -9.4762, -4.8811, -7.8668, -8.3776, -7.5303,
+        -9.4762, -5.7627, -5.7627, -6.4317, -9.4762, -9.4762, -6.2574, -7.8668, -9.4762, -9.4762, -8.3776, -6.1804,
+        -7.8668, -5.9209, -9.4762, -6.3407, -9.4762, -6.1089, -6.2574, -9.4762, -9.4762, -9.4762, -9.4762, -8.3776,
+        -8.3776, -9.4762, -9.4762, -8.3776, -5.1858, -9.4762, -9.4762, -7.8668, -6.2574, -8.3776, -7.8668, -9.4762,
+        -5.5844, -4.6164, -9.4762, -7.8668, -9.4762, -5.5844, -7.5303, -7.5303, -9.4762, -8.3776, -9.4762, -9.4762,
+        -9.4762, -6.6430, -6.0422, -9.4762, -4.6804, -9.4762, -9.4762, -7.2790, -9.4762, -8.3776, -6.1804, -8.3776,
+        -9.4762, -8.3776, -6.1089, -8.3776, -9.4762, -6.3407, -9.4762, -8.3776, -6.1804, -9.4762, -9.4762, -7.8668,
+        -7.5303, -9.4762, -6.1089, -9.4762, -9.4762, -7.2790, -8.3776, -9.4762, -6.2574, -8.3776, -8.3776, -8.3776,
+        -6.3407, -8.3776, -7.2790, -8.3776, -9.4762, -6.2574, -6.1804, -5.6261, -8.3776, -6.2574, -9.4762, -5.9209,
+        -9.4762, -7.5303, -8.3776, -8.3776, -7.8668, -9.4762, -8.3776, -8.3776, -9.4762, -9.4762, -5.5844, -6.2574,
+        -7.8668, -6.4317, -9.4762, -9.4762, -9.4762, -5.7627, -5.1587, -6.2574, -5.6261, -9.4762, -9.4762, -9.4762,
+        -9.4762, -9.4762, -9.4762, -9.4762, -8.3776, -8.3776, -9.4762, -9.4762, -9.4762, -4.4995, -9.4762, -7.8668,
+        -9.4762, -8.3776, -9.4762, -9.4762, -8.3776, -9.4762, -9.4762, -8.3776, -7.8668, -8.3776, -5.4689, -6.1089,
+        -9.4762, -8.3776, -8.3776, -7.5303, -6.0422, -8.3776, -7.8668, -5.5059, -8.3776, -6.1089, -9.4762, -8.3776,
+        -8.3776, -9.4762, -9.4762, -8.3776, -6.0422, -6.2574, -6.2574, -9.4762, -6.2574, -5.5444, -7.2790, -7.5303,
+        -9.4762, -6.1089, -5.9797, -6.2574, -7.0783, -8.3776, -7.8668, -6.1804, -9.4762, -8.3776, -9.4762, -5.7627,
+        -8.3776, -8.3776, -9.4762, -9.4762, -9.4762, -7.5303, -6.3407, -5.5059, -9.4762, -9.4762, -6.1089, -5.5059,
+        -9.4762, -8.3776, -9.4762, -9.4762, -6.3407, -9.4762, -9.4762, -9.4762, -8.3776, -9.4762, -9.4762, -9.4762,
+        -6.2574, -6.3407, -8.3776, -8.3776, -7.8668, -9.4762, -9.4762, -9.4762, -8.3776, -6.2574, -7.2790, -8.3776,
+        -8.3776, -9.4762, -8.3776, -9.4762, -8.3776, -9.4762, -5.4689, -6.1804, -9.4762, -7.2790, -6.1089, -8.3776,
+        -5.9209, -8.3776, -9.4762, -9.4762, -5.1324, -8.3776, -9.4762, -5.5844, -9.4762, -8.3776, -9.4762, -9.4762,
+        -9.4762, -9.4762, -8.3776, -4.1930, -9.4762, -6.2574, -8.3776, -7.8668, -9.4762, -9.4762, -9.4762, -7.5303,
+        -9.4762, -8.3776, -9.4762, -9.4762, -5.5844, -6.0422, -9.4762, -8.3776, -9.4762, -9.4762, -9.4762, -7.5303,
+        -9.4762, -8.3776, -6.2574, -8.3776, -6.2574, -6.2574, -3.9117, -8.3776, -9.4762, -9.4762, -6.5318, -5.6696,
+        -9.4762, -9.4762, -6.4317, -8.3776, -7.8668, -7.8668, -7.8668, -6.2574, -6.1804, -9.4762, -9.4762, -8.3776,
+        -9.4762, -6.3407, -5.9797, -9.4762, -9.4762, -5.9797, -8.3776, -6.2574, -8.3776, -9.4762, -6.1089, -5.3018,
+        -8.3776, -6.2574, -7.5303, -6.4317, -8.3776, -6.1089, -9.4762, -9.4762, -5.3987, -7.8668, -9.4762, -6.6430,
+        -9.4762, -8.3776, -5.3654, -9.4762, -7.2790, -8.3776, -8.3776, -8.3776, -9.4762, -9.4762, -9.4762, -9.4762,
+        -9.4762, -9.4762, -9.4762, -5.4332, -5.1858, -9.4762, -9.4762, -8.3776, -8.3776, -7.5303, -9.4762, -4.8223,
+        -5.3987, -9.4762, -9.4762, -8.3776, -6.1089, -8.3776, -9.4762, -6.2574, -9.4762, -6.3407, -9.4762, -9.4762,
+        -7.0783, -9.4762, -7.2790, -7.8668, -7.8668, -7.5303, -5.9797, -7.5303, -7.2790, -9.4762, -9.4762, -9.4762,
+        -9.4762, -8.3776, -9.4762, -5.6261, -8.3776, -9.4762, -9.4762, -8.3776, -9.4762, -7.5303, -5.0103, -8.3776,
+        -5.4689, -9.4762, -9.4762, -8.3776, -7.8668, -7.5303, -9.4762, -9.4762, -6.1804, -9.4762, -9.4762, -5.6696,
+        -8.3776, -8.3776, -7.5303, -9.4762, -9.4762, -6.1089, -5.6261, -5.5844, -7.8668, -9.4762, -9.4762, -7.0783,
+        -9.4762, -9.4762, -9.4762, -9.4762, -9.4762, -9.4762, -7.8668, -9.4762, -8.3776, -7.8668, -4.4328, -5.6696,
+        -9.4762, -9.4762, -8.3776, -6.1089, -8.3776, -9.4762, -7.8668, -5.6261, -9.4762, -9.4762, -6.2574, -8.3776,
+        -7.8668, -8.3776, -9.4762, -7.8668, -7.8668, -7.8668, -9.4762, -8.3776, -7.8668, -7.8668, -9.4762, -9.4762,
+        -7.8668, -6.2574, -9.4762, -6.1089, -9.4762, -8.3776, -5.5059, -9.4762, -9.4762, -8.3776, -9.4762, -9.4762,
+        -7.5303, -8.3776, -6.2574, -9.4762, -8.3776, -6.3407, -5.9797, -9.4762, -9.4762, -9.4762, -6.9113, -8.3776,
+        -6.1804, -9.4762, -9.4762, -5.6261, -9.4762, -8.3776, -7.8668, -5.9797, -5.3987, -9.4762, -8.3776, -9.4762,
+        -5.4332, -6.6430, -9.4762, -8.3776, -6.4317, -9.4762, -9.4762, -9.4762, -9.4762, -7.2790, -9.4762, -6.2574,
+        -8.3776, -8.3776, -7.8668, -9.4762, -8.3776, -7.8668, -9.4762, -9.4762, -9.4762, -9.4762, -7.8668, -9.4762,
+        -9.4762, -9.4762, -9.4762, -9.4762, -9.4762, -5.3987, -9.4762, -5.1858, -5.4332, -6.0422, -9.4762, -6.3407,
+        -8.3776, -6.1804, -6.4317, -9.4762, -9.4762, -5.8653, -9.4762, -7.8668, -7.8668, -9.4762, -8.3776, -9.4762,
+        -9.4762, -8.3776, -9.4762, -9.4762, -9.4762, -5.2421, -9.4762, -6.3407, -9.4762, -9.4762, -6.1804, -6.2574,
+        -9.4762, -9.4762, -8.3776, -8.3776, -7.8668, -9.4762, -6.2574, -8.3776, -6.2574, -8.3776, -9.4762, -6.3407,
+        -5.6261, -8.3776, -9.4762, -4.8223,
+    ]
+
+    /// FNV-1 по кодовым точкам с начальным значением 3, затем фибоначчиево хеширование
+    static func trigramBucket(_ a: UInt32, _ b: UInt32, _ c: UInt32) -> Int {
+        var h: UInt32 = 3
+        for code in [a, b, c] {
+            h = (h &* 0x01000193) ^ code
+        }
+        return Int((h &* 0x9E3779B1) >> UInt32(32 - trigramBits))
+    }
+
+    /// Средний log-lift n-грамм слова: 0 - как равномерный шум, больше 0 - типично для языка.
+    /// nil, если в слове нет ни одной n-граммы алфавита.
+    static func score(_ word: String, language: Language) -> Double? {
+        let index = language == .russian ? ruIndex : enIndex
+        let bigrams = language == .russian ? ruBigramLogProb : enBigramLogProb
+        let trigrams = language == .russian ? ruTrigramLogProb : enTrigramLogProb
+        let size = index.count
+        let bigramLift = log(Double(bigrams.count))
+        let trigramLift = log(Double(trigrams.count))
+
+        var total = 0.0
+        var count = 0
+        // Символы вне алфавита разрывают последовательность
+        var run: [(Int, UInt32)] = []
+        for character in word.lowercased() + " " {
+            if let i = index[character], let scalar = character.unicodeScalars.first {
+                run.append((i, scalar.value))
+                let n = run.count
+                if n >= 2 {
+                    total += Double(bigrams[run[n - 2].0 * size + run[n - 1].0]) + bigramLift
+                    count += 1
+                }
+                if n >= 3 {
+                    let bucket = trigramBucket(run[n - 3].1, run[n - 2].1, run[n - 1].1)
+                    total += Double(trigrams[bucket]) + trigramLift
+                    count += 1
+                }
+            } else {
+                run.removeAll(keepingCapacity: true)
+            }
+        }
+        return count > 0 ? total / Double(count) : nil
+    }
+
+    /// Язык и уверенность (0.5...1.0) по одним и тем же клавишам в английской и русской раскладке
+    static func compare(enString: String, ruString: String) -> (language: Language, confidence: Double)? {
+        let enScore = score(enString, language: .english)
+        let ruScore = score(ruString, language: .russian)
+        switch (enScore, ruScore) {
+        case (nil, nil):
+            return nil
+        case (nil, _):
+            return (.russian, 1.0)
+        case (_, nil):
+            return (.english, 1.0)
+        case let (en?, ru?):
+            let probabilityRu = 1.0 / (1.0 + exp(-confidenceSharpness * (ru - en)))
+            return probabilityRu >= 0.5 ? (.russian, probabilityRu) : (.english, 1.0 - probabilityRu)
+        }
+    }
+}
@@ -309,7 +309,11 @@ class LearningManager {
     private func appendToDataset(text: String, label: String) {
         guard let url = datasetPath else { return }
         
-        let csvLine = "\"\(text)\",\(label)\n"
+        // CSV-экранирование: кавычки удваиваются, переводы строк ломали бы разбор
+        let escaped = text
+            .replacingOccurrences(of: "\"", with: "\"\"")
+            .replacingOccurrences(of: "\n", with: " ")
+        let csvLine = "\"\(escaped)\",\(label)\n"
         
         if !FileManager.default.fileExists(atPath: url.path) {
             let header = "text,label\n"
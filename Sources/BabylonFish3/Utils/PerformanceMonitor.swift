@@ -91,6 +91,14 @@ class PerformanceMonitor {
     private var samplingInterval: TimeInterval = 60 // 1 минута
     private var lastSampleTime: Date = Date()
     
+    // Построчный экспорт замеров (формат BFPERF, см. ML/perf_report.py);
+    // sampleExportHandle читается и меняется только на sampleExportQueue,
+    // sampleExportEnabled - только под sampleExportLock (читается с любого потока)
+    private var sampleExportHandle: FileHandle?
+    private var sampleExportEnabled = false
+    private let sampleExportLock = NSLock()
+    private let sampleExportQueue = DispatchQueue(label: "com.babylonfish.performance.samples", qos: .utility)
+    
     // Обработчики событий
     var onMetricsUpdated: ((PerformanceMetrics) -> Void)?
     
@@ -122,6 +130,7 @@ class PerformanceMonitor {
         guard isEnabled, let start = startTimes[operation] else { return 0 }
         
         let duration = Date().timeIntervalSince(start)
+        exportSample("lat", value: duration, format: "%.9f", name: operation)
         
         // Обновляем метрики в зависимости от типа операции
         switch operation {
@@ -154,21 +163,24 @@ class PerformanceMonitor {
     }
     
     /// Регистрирует попадание в кэш
-    func recordCacheHit() {
+    func recordCacheHit(cache: String = "default") {
         guard isEnabled else { return }
         metrics.cacheHits += 1
+        exportSample("hit", value: 1, name: cache)
     }
     
     /// Регистрирует промах кэша
-    func recordCacheMiss() {
+    func recordCacheMiss(cache: String = "default") {
         guard isEnabled else { return }
         metrics.cacheMisses += 1
+        exportSample("miss", value: 1, name: cache)
     }
     
     /// Регистрирует ошибку
     func recordError(_ error: String) {
         guard isEnabled else { return }
         metrics.errors[error, default: 0] += 1
+        exportSample("err", value: 1, name: error)
     }
     
     /// Получает текущие метрики
@@ -200,6 +212,38 @@ class PerformanceMonitor {
         }
     }
     
+    /// Включает построчную запись каждого замера в файл (формат BFPERF, см. ML/perf_report.py)
+    @discardableResult
+    func startSampleExport(to filePath: String) -> Bool {
+        if !FileManager.default.fileExists(atPath: filePath) {
+            guard FileManager.default.createFile(atPath: filePath, contents: nil) else {
+                logDebug("Failed to create sample export file: \(filePath)")
+                return false
+            }
+        }
+        guard let handle = FileHandle(forWritingAtPath: filePath) else {
+            logDebug("Failed to open sample export file: \(filePath)")
+            return false
+        }
+        handle.seekToEndOfFile()
+        
+        sampleExportQueue.sync {
+            sampleExportHandle?.closeFile()
+            sampleExportHandle = handle
+        }
+        setSampleExportEnabled(true)
+        return true
+    }
+    
+    /// Выключает построчную запись замеров
+    func stopSampleExport() {
+        setSampleExportEnabled(false)
+        sampleExportQueue.sync {
+            sampleExportHandle?.closeFile()
+            sampleExportHandle = nil
+        }
+    }
+    
     /// Устанавливает интервал сбора метрик
     func setSamplingInterval(_ interval: TimeInterval) {
         samplingInterval = max(1, interval) // Минимум 1 секунда
@@ -224,6 +268,7 @@ class PerformanceMonitor {
         
         // Обновляем использование памяти
         metrics.memoryUsage = getMemoryUsage()
+        exportSample("mem", value: Double(metrics.memoryUsage), name: "resident")
         
         // Уведомляем об обновлении метрик
         DispatchQueue.main.async {
@@ -233,6 +278,40 @@ class PerformanceMonitor {
         lastSampleTime = Date()
     }
     
+    private func setSampleExportEnabled(_ enabled: Bool) {
+        sampleExportLock.lock()
+        sampleExportEnabled = enabled
+        sampleExportLock.unlock()
+    }
+    
+    private var isSampleExportEnabled: Bool {
+        sampleExportLock.lock()
+        defer { sampleExportLock.unlock() }
+        return sampleExportEnabled
+    }
+    
+    /// Пишет строку BFPERF: маркер, версия, время, тип, значение, имя.
+    /// При выключенном экспорте - только проверка флага, без форматирования и очереди
+    private func exportSample(_ type: String, value: Double, format: String = "%.0f", name: String) {
+        guard isSampleExportEnabled else { return }
+        
+        let time = Date().timeIntervalSince1970
+        sampleExportQueue.async { [weak self] in
+            guard let handle = self?.sampleExportHandle else { return }
+            
+            // Имя (например, текст ошибки из recordError) не должно рвать поля и строки
+            let safeName = name
+                .replacingOccurrences(of: "\t", with: " ")
+                .replacingOccurrences(of: "\r", with: " ")
+                .replacingOccurrences(of: "\n", with: " ")
+            let timestamp = String(format: "%.6f", time)
+            let formattedValue = String(format: format, value)
+            let line = "BFPERF\t1\t\(timestamp)\t\(type)\t\(formattedValue)\t\(safeName)\n"
+            guard let data = line.data(using: .utf8) else { return }
+            handle.write(data)
+        }
+    }
+    
     private func getMemoryUsage() -> UInt64 {
         var info = mach_task_basic_info()
         var count = mach_msg_type_number_t(MemoryLayout<mach_task_basic_info>.size) / 4
@@ -1,57 +1,167 @@
 #!/usr/bin/env python3
+"""
+Build AppIcon.icns from icon.png without iconutil.
+
+The source is downscaled once into a pyramid (1024 -> 512 -> ... -> 16, each
+level resized from the previous one instead of from the full-size original),
+the levels are PNG-encoded in parallel and packed into .icns directly, so the
+script also runs on Linux CI. A SHA-256 of the source (plus the layout below)
+is stored in --stamp; when it is unchanged and the output exists the build is skipped.
+
+    python3 process_icon.py
+    python3 process_icon.py --source icon.png --output Sources/BabylonFish3/Resources/AppIcon.icns --iconset
+"""
+
+import argparse
+import hashlib
+import io
 import os
-import sys
+import shutil
+import struct
 import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_SOURCE = "icon.png"
+DEFAULT_OUTPUT = "Sources/BabylonFish3/Resources/AppIcon.icns"
+ICONSET_DIR = "AppIcon.iconset"
+# Kept outside Resources so SwiftPM does not bundle it
+DEFAULT_STAMP = ".build/icon-cache/AppIcon.sha256"
+
+# Standard sizes for macOS icons (points); each also gets a @2x variant
+SIZES = [16, 32, 128, 256, 512]
+
+# .icns chunk types holding PNG data, by pixel size (1x and @2x variants)
+ICNS_TYPES = {
+    16: [b"icp4"],
+    32: [b"icp5", b"ic11"],
+    64: [b"ic12"],
+    128: [b"ic07"],
+    256: [b"ic08", b"ic13"],
+    512: [b"ic09", b"ic14"],
+    1024: [b"ic10"],
+}
+CACHE_VERSION = 1
 
-def main():
-    icon_path = "icon.png"
-    if not os.path.exists(icon_path):
-        print(f"Error: {icon_path} not found.")
-        print("Please place your icon.png in the project root.")
-        return
 
-    # Check for Pillow
+def load_pillow():
     try:
         from PIL import Image
     except ImportError:
         print("Pillow not found. Installing...")
         subprocess.check_call([sys.executable, "-m", "pip", "install", "Pillow"])
         from PIL import Image
+    return Image
 
-    print("Generating icons...")
-    
-    iconset_dir = "AppIcon.iconset"
-    if not os.path.exists(iconset_dir):
-        os.makedirs(iconset_dir)
-
-    img = Image.open(icon_path)
-    
-    # Standard sizes for macOS icons
-    sizes = [16, 32, 128, 256, 512]
-    
+
+def pixel_sizes():
+    """All pixel sizes needed for the iconset, largest first"""
+    return sorted({px for size in SIZES for px in (size, size * 2)}, reverse=True)
+
+
+def source_digest(path):
+    """Hash of the source image and of everything that affects the output"""
+    sha = hashlib.sha256(f"v{CACHE_VERSION}:{SIZES}:{sorted(ICNS_TYPES)}".encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def build_pyramid(Image, img, sizes):
+    """
+    {size: image}: the largest size is resized from the source, every smaller
+    one from the nearest larger level (halving keeps the Lanczos kernel small).
+    """
+    img = img.convert("RGBA")
+    levels = {}
+    previous = img
     for size in sizes:
-        # Normal
-        resized = img.resize((size, size), Image.Resampling.LANCZOS)
-        resized.save(os.path.join(iconset_dir, f"icon_{size}x{size}.png"))
-        
-        # Retina (@2x)
-        resized_2x = img.resize((size * 2, size * 2), Image.Resampling.LANCZOS)
-        resized_2x.save(os.path.join(iconset_dir, f"icon_{size}x{size}@2x.png"))
-
-    # Convert to icns
-    print("Converting to icns...")
-    subprocess.check_call(["iconutil", "-c", "icns", iconset_dir])
-    
-    # Move to resources
-    dest = "Sources/BabylonFish/Resources/AppIcon.icns"
-    if os.path.exists("AppIcon.icns"):
-        os.rename("AppIcon.icns", dest)
-        print(f"Icon updated at {dest}")
-    
-    # Cleanup
-    import shutil
-    if os.path.exists(iconset_dir):
-        shutil.rmtree(iconset_dir)
+        if previous.size != (size, size):
+            previous = previous.resize((size, size), Image.Resampling.LANCZOS)
+        levels[size] = previous
+    return levels
+
+
+def encode_png(img):
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG", optimize=False)
+    return buffer.getvalue()
+
+
+def render(Image, source_path, workers=None):
+    """{pixel size: PNG bytes}; PNG encoding runs in a thread pool (Pillow releases the GIL)"""
+    with Image.open(source_path) as img:
+        img.load()
+        levels = build_pyramid(Image, img, pixel_sizes())
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        encoded = pool.map(encode_png, levels.values())
+        return dict(zip(levels, encoded))
+
+
+def write_icns(pngs, path):
+    """Packs PNG images into .icns: "icns" + total length, then (type, length, data) chunks"""
+    chunks = []
+    for size in sorted(pngs):
+        for icns_type in ICNS_TYPES.get(size, []):
+            chunks.append(icns_type + struct.pack(">I", len(pngs[size]) + 8) + pngs[size])
+    body = b"".join(chunks)
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(b"icns" + struct.pack(">I", len(body) + 8) + body)
+    os.replace(temporary, path)
+
+
+def write_iconset(pngs, iconset_dir):
+    """Same images as an .iconset directory (for iconutil or manual inspection)"""
+    os.makedirs(iconset_dir, exist_ok=True)
+    for size in SIZES:
+        with open(os.path.join(iconset_dir, f"icon_{size}x{size}.png"), "wb") as f:
+            f.write(pngs[size])
+        with open(os.path.join(iconset_dir, f"icon_{size}x{size}@2x.png"), "wb") as f:
+            f.write(pngs[size * 2])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate AppIcon.icns from icon.png")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="source image (default: %(default)s)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="output .icns (default: %(default)s)")
+    parser.add_argument("--stamp", default=DEFAULT_STAMP, help="source hash file (default: %(default)s)")
+    parser.add_argument("--iconset", action="store_true", help=f"also keep PNGs in {ICONSET_DIR}")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the source is unchanged")
+    parser.add_argument("--workers", type=int, default=None, help="PNG encoder threads")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.source):
+        print(f"Error: {args.source} not found.")
+        print("Please place your icon.png in the project root.")
+        return 1
+
+    digest = source_digest(args.source)
+    if not args.force and os.path.exists(args.output) and os.path.exists(args.stamp):
+        with open(args.stamp) as f:
+            if f.read().strip() == digest:
+                print(f"Icon is up to date: {args.output}")
+                return 0
+
+    Image = load_pillow()
+    print("Generating icons...")
+    pngs = render(Image, args.source, args.workers)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    write_icns(pngs, args.output)
+    os.makedirs(os.path.dirname(os.path.abspath(args.stamp)), exist_ok=True)
+    with open(args.stamp, "w") as f:
+        f.write(digest + "\n")
+    print(f"Icon updated at {args.output}")
+
+    if args.iconset:
+        if os.path.exists(ICONSET_DIR):
+            shutil.rmtree(ICONSET_DIR)
+        write_iconset(pngs, ICONSET_DIR)
+        print(f"Iconset written to {ICONSET_DIR}")
+    return 0
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())